@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Bedrock 배치 추론으로 커리큘럼 일괄 생성 (야간 대량 처리용)
+
+input/ 아래의 모든 title/data 쌍에 대해 generate_without_kb와 같은 프롬프트를 만들어 JSONL 매니페스트로
+S3에 저장하고 create_model_invocation_job으로 제출합니다. 작업이 끝나면 출력 JSONL을 읽어
+save_curriculum과 같은 형식(curriculum/<주제>-<시각>.txt, UTF-8 텍스트)으로 주제별 파일을 저장합니다.
+
+제출과 결과 분리 모두 S3 멀티파트 업로드와 줄 단위 읽기로 스트리밍하므로, 레코드 수가 수만 개여도
+메모리 사용량은 (레코드 ID -> 제목 파일 키 대응표를 빼면) 일정합니다.
+
+S3 레이아웃 (batch-inference/<작업 이름>/):
+    input/records-0001.jsonl   배치 추론 입력 ({"recordId", "modelInput"})
+    record-map.jsonl           레코드 ID -> 제목 파일 키
+    skipped.json               토큰 예산을 넘어 배치에서 뺀 항목 (온디맨드로 처리)
+    output/<작업 ID>/...out    Bedrock이 쓰는 결과
+
+사용 예:
+    python bedrock_batch.py run
+    python bedrock_batch.py submit --model-id anthropic.claude-3-haiku-20240307-v1:0
+    python bedrock_batch.py wait --job-arn arn:aws:bedrock:...:model-invocation-job/abc123
+    python bedrock_batch.py split --job-name curriculum-20250401020000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+import chunking  # noqa: E402
+from aws_clients import get_client  # noqa: E402
+from output_keys import build_output_key  # noqa: E402
+from prompts import build_prompt, build_request_body  # noqa: E402
+from streaming import S3MultipartSink  # noqa: E402
+
+# 환경 설정
+BUCKET_NAME = 'curriculum-bucket-20250331'
+INPUT_PREFIX = 'input/'
+BATCH_INFERENCE_PREFIX = 'batch-inference/'
+BATCH_MODEL_ID = 'anthropic.claude-3-haiku-20240307-v1:0'  # 배치 추론을 지원하는 모델
+BATCH_ROLE_NAME = 'BedrockBatchInferenceRole'
+MAX_OUTPUT_TOKENS = chunking.DEFAULT_CHUNK_OPTIONS['maxOutputTokens']
+TOKEN_BUDGET = chunking.DEFAULT_CHUNK_OPTIONS['tokenBudget']
+BATCH_MIN_RECORDS = 100  # 배치 추론 작업의 최소 레코드 수
+BATCH_MAX_RECORDS_PER_FILE = 50000  # 입력 파일 하나의 최대 레코드 수
+BATCH_TIMEOUT_HOURS = 72
+IO_WINDOW = 32  # 동시에 읽거나 쓸 S3 객체 수
+TERMINAL_JOB_STATUSES = ('Completed', 'PartiallyCompleted', 'Failed', 'Stopped', 'Expired')
+
+
+def job_prefix(job_name):
+    return f"{BATCH_INFERENCE_PREFIX}{job_name}/"
+
+
+def iter_input_pairs(prefix=INPUT_PREFIX, bucket=BUCKET_NAME):
+    """
+    prefix 아래의 title-*.txt와 같은 이름의 data-*.txt 쌍을 차례로 반환
+
+    Yields:
+        dict: {'titleKey', 'dataKey'}
+    """
+    title_keys = []
+    data_keys = set()
+    paginator = get_client('s3').get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            file_name = obj['Key'][len(prefix):]
+            if '/' in file_name or not file_name.endswith('.txt'):
+                continue
+            if file_name.startswith('title-'):
+                title_keys.append(obj['Key'])
+            elif file_name.startswith('data-'):
+                data_keys.add(obj['Key'])
+
+    for title_key in title_keys:
+        data_key = f"{prefix}data-{title_key[len(prefix) + 6:]}"
+        if data_key in data_keys:
+            yield {'titleKey': title_key, 'dataKey': data_key}
+        else:
+            print(f"데이터 파일이 없어 건너뜁니다: {title_key}")
+
+
+def bounded_map(executor, func, items, window=IO_WINDOW):
+    """
+    executor.map과 같지만 진행 중인 작업을 window개로 제한 (입력을 한꺼번에 읽지 않음)
+
+    Yields:
+        func(item)의 결과 (입력 순서대로)
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_lines(body, chunk_size=64 * 1024):
+    """S3 객체 본문을 조금씩 읽어 한 줄씩 반환 (UTF-8 디코딩, 빈 줄 제외)"""
+    remainder = b''
+    try:
+        while True:
+            chunk = body.read(chunk_size)
+            if not chunk:
+                break
+            lines = (remainder + chunk).split(b'\n')
+            remainder = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield line.decode('utf-8')
+    finally:
+        body.close()
+    if remainder.strip():
+        yield remainder.decode('utf-8')
+
+
+def _read_text(bucket, key):
+    return get_client('s3').get_object(Bucket=bucket, Key=key)['Body'].read().decode('utf-8')
+
+
+def render_record(record_id, title, data, model_id=BATCH_MODEL_ID, max_tokens=MAX_OUTPUT_TOKENS):
+    """
+    배치 추론 입력 레코드 하나 생성 (generate_without_kb와 같은 프롬프트와 요청 본문)
+
+    Returns:
+        dict: {'recordId', 'modelInput'} (프롬프트가 토큰 예산을 넘으면 None)
+    """
+    prompt = build_prompt(title, data)
+    if chunking.estimate_tokens(prompt) > TOKEN_BUDGET:
+        # 데이터를 나눠 개요를 만드는 다단계 처리는 배치 한 번으로 할 수 없으므로 온디맨드로 처리
+        return None
+    return {'recordId': record_id, 'modelInput': build_request_body(model_id, prompt, max_tokens)}
+
+
+class _RotatingJsonlSink:
+    """BATCH_MAX_RECORDS_PER_FILE개마다 새 파일로 넘어가는 JSONL 멀티파트 싱크"""
+
+    def __init__(self, bucket, prefix, max_records=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_records = max_records or BATCH_MAX_RECORDS_PER_FILE
+        self.keys = []
+        self._sink = None
+        self._count = 0
+
+    def write(self, record):
+        if self._sink is None or self._count >= self.max_records:
+            self.close()
+            key = f"{self.prefix}records-{len(self.keys) + 1:04d}.jsonl"
+            self._sink = S3MultipartSink(get_client('s3'), self.bucket, key, 'application/jsonl')
+            self.keys.append(key)
+            self._count = 0
+        self._sink.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._count += 1
+
+    def close(self):
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def abort(self):
+        if self._sink is not None:
+            self._sink.abort()
+            self._sink = None
+
+
+def write_manifest(job_name, model_id=BATCH_MODEL_ID, pairs=None, bucket=BUCKET_NAME):
+    """
+    입력 쌍을 읽으며 배치 추론 입력 JSONL과 레코드 대응표를 S3에 스트리밍으로 저장
+
+    Args:
+        job_name (str): 작업 이름 (S3 경로에 사용)
+        model_id (str): 모델 ID (요청 본문 형식 결정)
+        pairs (iterable, optional): {'titleKey', 'dataKey'} (기본값: iter_input_pairs())
+        bucket (str): 버킷 이름
+
+    Returns:
+        dict: {'records', 'inputKeys', 'skipped'}
+    """
+    prefix = job_prefix(job_name)
+    s3_client = get_client('s3')
+
+    def read_pair(pair):
+        return pair, _read_text(bucket, pair['titleKey']), _read_text(bucket, pair['dataKey'])
+
+    records = _RotatingJsonlSink(bucket, f"{prefix}input/")
+    record_map = S3MultipartSink(s3_client, bucket, f"{prefix}record-map.jsonl", 'application/jsonl')
+    skipped = []
+    count = 0
+    try:
+        with ThreadPoolExecutor(max_workers=IO_WINDOW) as executor:
+            for pair, title, data in bounded_map(executor, read_pair, pairs if pairs is not None else iter_input_pairs()):
+                record = render_record(f"{count + 1:011d}", title, data, model_id)
+                if record is None:
+                    skipped.append(pair['titleKey'])
+                    continue
+                records.write(record)
+                record_map.write(json.dumps({'recordId': record['recordId'], 'titleKey': pair['titleKey']},
+                                            ensure_ascii=False) + '\n')
+                count += 1
+                if count % 1000 == 0:
+                    print(f"  {count}개 레코드 작성")
+    except Exception:
+        records.abort()
+        record_map.abort()
+        raise
+
+    records.close()
+    record_map.close()
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=f"{prefix}skipped.json",
+        Body=json.dumps(skipped, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json; charset=utf-8'
+    )
+    return {'records': count, 'inputKeys': records.keys, 'skipped': skipped}
+
+
+def submit_job(job_name, model_id=BATCH_MODEL_ID, role_arn=None, pairs=None, bucket=BUCKET_NAME):
+    """
+    매니페스트를 만들고 배치 추론 작업 제출
+
+    Returns:
+        str: 작업 ARN (레코드가 최소 개수보다 적으면 None)
+    """
+    print(f"배치 입력 작성 중: s3://{bucket}/{job_prefix(job_name)}input/")
+    manifest = write_manifest(job_name, model_id, pairs, bucket)
+    print(f"레코드 {manifest['records']}개, 입력 파일 {len(manifest['inputKeys'])}개 작성")
+    if manifest['skipped']:
+        print(f"토큰 예산({TOKEN_BUDGET})을 넘는 {len(manifest['skipped'])}개 항목은 배치에서 제외했습니다. "
+              f"(목록: s3://{bucket}/{job_prefix(job_name)}skipped.json, curriculum_workflow.py --batch로 처리)")
+
+    if manifest['records'] < BATCH_MIN_RECORDS:
+        print(f"배치 추론은 레코드가 {BATCH_MIN_RECORDS}개 이상이어야 합니다. "
+              f"적은 항목은 curriculum_workflow.py --batch로 처리하세요.")
+        return None
+
+    if role_arn is None:
+        from create_bedrock_role import create_batch_inference_role
+        role_arn = create_batch_inference_role(BATCH_ROLE_NAME, bucket)
+
+    response = get_client('bedrock').create_model_invocation_job(
+        jobName=job_name,
+        roleArn=role_arn,
+        modelId=model_id,
+        inputDataConfig={'s3InputDataConfig': {
+            's3Uri': f"s3://{bucket}/{job_prefix(job_name)}input/",
+            's3InputFormat': 'JSONL'
+        }},
+        outputDataConfig={'s3OutputDataConfig': {'s3Uri': f"s3://{bucket}/{job_prefix(job_name)}output/"}},
+        timeoutDurationInHours=BATCH_TIMEOUT_HOURS
+    )
+    print(f"배치 추론 작업 제출: {response['jobArn']}")
+    return response['jobArn']
+
+
+def wait_for_job(job_arn, min_interval=30.0, max_interval=600.0, backoff_rate=1.5, timeout=None,
+                 sleep=time.sleep, clock=time.monotonic):
+    """
+    배치 추론 작업이 끝날 때까지 대기
+
+    작업은 몇 시간씩 걸리므로 상태가 바뀌지 않으면 확인 간격을 max_interval까지 늘리고,
+    상태가 바뀌면 다시 min_interval부터 확인합니다.
+
+    Returns:
+        dict: 마지막 get_model_invocation_job 응답 (timeout을 넘기면 진행 중인 상태)
+    """
+    bedrock_client = get_client('bedrock')
+    start_time = clock()
+    interval = min_interval
+    last_status = None
+    while True:
+        job = bedrock_client.get_model_invocation_job(jobIdentifier=job_arn)
+        status = job['status']
+        if status != last_status:
+            print(f"[{(clock() - start_time) / 60:6.1f}분] 작업 상태: {status}"
+                  + (f" ({job['message']})" if job.get('message') else ''))
+            last_status = status
+            interval = min_interval
+        else:
+            interval = min(max_interval, interval * backoff_rate)
+
+        if status in TERMINAL_JOB_STATUSES:
+            return job
+        if timeout is not None and clock() - start_time >= timeout:
+            print(f"최대 대기 시간({timeout}초)이 초과되었습니다. 작업은 계속 진행됩니다.")
+            return job
+        sleep(random.uniform(min_interval, interval))
+
+
+def output_text(model_output):
+    """배치 출력 레코드의 modelOutput(InvokeModel 응답 본문)에서 생성된 텍스트 추출"""
+    if 'content' in model_output:
+        return ''.join(block.get('text', '') for block in model_output['content'])
+    if 'results' in model_output:
+        return model_output['results'][0]['outputText']
+    for field in ('completion', 'generation', 'generated_text'):
+        if field in model_output:
+            return model_output[field]
+    return None
+
+
+def load_record_map(job_name, bucket=BUCKET_NAME):
+    """레코드 ID -> 제목 파일 키"""
+    body = get_client('s3').get_object(Bucket=bucket, Key=f"{job_prefix(job_name)}record-map.jsonl")['Body']
+    return {entry['recordId']: entry['titleKey'] for entry in map(json.loads, iter_lines(body))}
+
+
+def split_output(job_name, bucket=BUCKET_NAME):
+    """
+    배치 출력 JSONL을 한 줄씩 읽어 주제별 커리큘럼 파일로 저장
+
+    Returns:
+        dict: {'saved', 'failed', 'inputTokens', 'outputTokens'}
+    """
+    s3_client = get_client('s3')
+    record_map = load_record_map(job_name, bucket)
+    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    output_prefix = f"{job_prefix(job_name)}output/"
+
+    output_keys = []
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=output_prefix):
+        output_keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.jsonl.out'))
+
+    stats = {'saved': 0, 'failed': 0, 'inputTokens': 0, 'outputTokens': 0}
+
+    def iter_results():
+        for key in output_keys:
+            for line in iter_lines(s3_client.get_object(Bucket=bucket, Key=key)['Body']):
+                yield json.loads(line)
+
+    def save(result):
+        title_key = record_map.get(result.get('recordId'))
+        model_output = result.get('modelOutput') or {}
+        text = output_text(model_output) if 'error' not in result else None
+        if title_key is None or not text:
+            print(f"레코드 {result.get('recordId')} 실패: {result.get('error') or '출력 없음'}")
+            return None, model_output
+
+        # save_curriculum과 같은 키/형식으로 저장
+        output_key = build_output_key(title_key, timestamp)
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=output_key,
+            Body=text.encode('utf-8'),
+            ContentType='text/plain; charset=utf-8'
+        )
+        return output_key, model_output
+
+    with ThreadPoolExecutor(max_workers=IO_WINDOW) as executor:
+        for output_key, model_output in bounded_map(executor, save, iter_results()):
+            if output_key is None:
+                stats['failed'] += 1
+                continue
+            stats['saved'] += 1
+            usage = model_output.get('usage') or {}
+            stats['inputTokens'] += usage.get('input_tokens') or model_output.get('inputTextTokenCount') or 0
+            stats['outputTokens'] += usage.get('output_tokens') or sum(
+                result.get('tokenCount', 0) for result in model_output.get('results', []))
+
+    print(f"커리큘럼 {stats['saved']}개 저장, 실패 {stats['failed']}개 "
+          f"(입력 토큰 {stats['inputTokens']}, 출력 토큰 {stats['outputTokens']})")
+    return stats
+
+
+def job_name_from_arn(job_arn):
+    """작업 ARN으로 작업 이름 조회"""
+    return get_client('bedrock').get_model_invocation_job(jobIdentifier=job_arn)['jobName']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bedrock 배치 추론 커리큘럼 일괄 생성')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in (('run', '제출 → 완료 대기 → 결과 분리'), ('submit', '입력 매니페스트 작성 및 작업 제출')):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument('--model-id', default=BATCH_MODEL_ID, help='배치 추론 모델 ID')
+        command.add_argument('--role-arn', help=f"배치 추론 서비스 역할 ARN (기본값: {BATCH_ROLE_NAME} 생성/사용)")
+        command.add_argument('--job-name', help='작업 이름 (기본값: curriculum-<시각>)')
+
+    wait = subparsers.add_parser('wait', help='작업 완료 대기')
+    wait.add_argument('--job-arn', required=True)
+    wait.add_argument('--timeout', type=float, help='최대 대기 시간(초)')
+
+    split = subparsers.add_parser('split', help='작업 출력을 주제별 커리큘럼 파일로 저장')
+    split.add_argument('--job-name', help='작업 이름')
+    split.add_argument('--job-arn', help='작업 ARN (--job-name 대신)')
+
+    args = parser.parse_args()
+
+    if args.command in ('run', 'submit'):
+        job_name = args.job_name or f"curriculum-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        job_arn = submit_job(job_name, args.model_id, args.role_arn)
+        if job_arn is None or args.command == 'submit':
+            return
+        job = wait_for_job(job_arn)
+        if job['status'] in ('Completed', 'PartiallyCompleted'):
+            split_output(job_name)
+        else:
+            print(f"배치 추론 작업 실패: {job['status']} {job.get('message', '')}")
+    elif args.command == 'wait':
+        job = wait_for_job(args.job_arn, timeout=args.timeout)
+        print(f"작업 상태: {job['status']}")
+    elif args.command == 'split':
+        if not args.job_name and not args.job_arn:
+            parser.error('--job-name 또는 --job-arn이 필요합니다.')
+        split_output(args.job_name or job_name_from_arn(args.job_arn))
+
+
+if __name__ == '__main__':
+    main()
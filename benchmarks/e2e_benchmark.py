@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+종단 간(end-to-end) 워크플로우 벤치마크
+
+simplified_curriculum_workflow.run_workflow 진입점부터 실제 Lambda 핸들러(fetch_s3_data,
+generate_curriculum_kb, save_curriculum)까지 전체 경로를 로컬 에뮬레이터(local_runner)로 실행합니다.
+S3는 메모리 안의 가짜 클라이언트, Bedrock은 결정적인 가짜 모델을 쓰고, 지연 분포/스로틀링 비율/
+토큰 생성 속도를 인자로 주입합니다. 입력은 data/ 디렉토리의 title/data 파일 쌍을 사용합니다.
+
+측정 항목:
+- 동시 실행 수별 처리량(실행/초)과 진입점 지연 시간 p50/p95/p99
+- 상태(단계)별 지연 시간 p50/p95/p99
+- 생성 실패(대체 응답) 수, 모델 호출/스로틀링 수, 최대 RSS
+
+결과는 커밋 해시와 함께 JSON으로 저장하므로 커밋 사이의 회귀를 비교할 수 있습니다.
+
+사용 예:
+    python benchmarks/e2e_benchmark.py --runs 20 --concurrency 1,4,16 --model-latency lognormal:0.8,0.4 \\
+        --throttle-rate 0.05 --tokens-per-second 200 --output bench_e2e.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+DATA_DIR = os.path.join(REPO_ROOT, 'data')
+DEFAULT_CONCURRENCY = '1,2,4,8'
+
+
+def percentile(values, q):
+    """선형 보간 백분위수 (values가 비어 있으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values):
+    """지연 시간 목록(ms) 요약"""
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50Ms': round(percentile(values, 50), 1),
+        'p95Ms': round(percentile(values, 95), 1),
+        'p99Ms': round(percentile(values, 99), 1),
+        'meanMs': round(sum(values) / len(values), 1),
+        'maxMs': round(max(values), 1)
+    }
+
+
+def latency_sampler(spec, seed):
+    """
+    지연 분포 사양으로 지연(초)을 뽑는 함수 생성
+
+    Args:
+        spec (str): 'fixed:0.5', 'uniform:0.2,0.8', 'normal:0.5,0.1', 'lognormal:<중앙값>,<sigma>'
+        seed (int): 난수 시드
+
+    Returns:
+        callable: 호출할 때마다 지연(초)을 반환 (스레드 안전)
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(',') if value]
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    if kind == 'fixed':
+        draw = lambda: values[0]  # noqa: E731
+    elif kind == 'uniform':
+        draw = lambda: rng.uniform(values[0], values[1])  # noqa: E731
+    elif kind == 'normal':
+        draw = lambda: max(0.0, rng.gauss(values[0], values[1]))  # noqa: E731
+    elif kind == 'lognormal':
+        draw = lambda: rng.lognormvariate(math.log(values[0]), values[1])  # noqa: E731
+    else:
+        raise ValueError(f"알 수 없는 지연 분포: {spec}")
+
+    def sample():
+        with lock:
+            return draw()
+
+    return sample
+
+
+def load_corpora(data_dir=DATA_DIR):
+    """data/ 디렉토리의 title-*/data-* 파일 쌍 목록 [(이름, 제목, 데이터), ...]"""
+    corpora = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.startswith('title-'):
+            continue
+        data_path = os.path.join(data_dir, 'data-' + name[len('title-'):])
+        if not os.path.exists(data_path):
+            continue
+        with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+            title = f.read()
+        with open(data_path, 'r', encoding='utf-8') as f:
+            data = f.read()
+        corpora.append((name[len('title-'):-len('.txt')], title, data))
+    return corpora
+
+
+def peak_rss_kb():
+    """현재 프로세스의 최대 RSS(KB) (macOS는 바이트 단위로 보고하므로 변환)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def git_commit():
+    """현재 커밋 해시 (git 저장소가 아니면 None)"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_level(concurrency, runs, corpora, sfn, run_workflow, state_machine_arn, sync):
+    """
+    동시 실행 수 하나에 대해 runs번 진입점을 실행하고 지연 시간/상태별 시간/실패 수 반환
+    """
+    def run_one(index):
+        _, title, data = corpora[index % len(corpora)]
+        start = time.perf_counter()
+        execution_arn = run_workflow(title, data, state_machine_arn, sync)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return elapsed_ms, sfn.results.get(execution_arn)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(run_one, range(runs)))
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    stage_timings = {}
+    failed = 0
+    fallbacks = 0
+    for elapsed_ms, result in outcomes:
+        latencies.append(elapsed_ms)
+        if result is None or result['status'] != 'SUCCEEDED':
+            failed += 1
+        elif (result['output'].get('generateResult', {}).get('Payload') or {}).get('error'):
+            # 생성 Lambda가 오류를 삼키고 대체 커리큘럼을 반환한 경우
+            fallbacks += 1
+        for record in (result or {}).get('states', []):
+            stage_timings.setdefault(record['name'], []).append(record['durationMs'])
+
+    return {
+        'concurrency': concurrency,
+        'runs': runs,
+        'elapsedSeconds': round(elapsed, 3),
+        'throughputPerSecond': round(runs / elapsed, 2) if elapsed else None,
+        'entrypoint': summarize(latencies),
+        'stages': {name: summarize(values) for name, values in stage_timings.items()},
+        'failed': failed,
+        'fallbacks': fallbacks,
+        'peakRssKb': peak_rss_kb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='가짜 S3/Bedrock을 사용하는 종단 간 워크플로우 벤치마크')
+    parser.add_argument('--runs', type=int, default=20, help='동시 실행 수마다 실행할 워크플로우 수')
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY, help="쉼표로 구분한 동시 실행 수 (예: '1,4,16')")
+    parser.add_argument('--workflow', choices=['standard', 'direct'], default='standard',
+                        help='실행할 상태 머신 정의 (curriculum_workflow로 생성)')
+    parser.add_argument('--strategies', help="direct 워크플로우의 단계별 방식 (예: 'fetch=direct,generate=lambda')")
+    parser.add_argument('--no-sync', action='store_true', help='STANDARD처럼 시작 후 완료를 기다리는 방식으로 실행')
+    parser.add_argument('--model-latency', default='fixed:0',
+                        help="모델 첫 토큰 지연 분포 (fixed:s, uniform:a,b, normal:m,sd, lognormal:중앙값,sigma)")
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='모델 출력 토큰 생성 속도 (0이면 지연 없음)')
+    parser.add_argument('--output-tokens', type=int, default=400, help='응답 하나의 출력 토큰 수')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='모델 호출이 스로틀링될 확률 (0~1)')
+    parser.add_argument('--s3-latency', type=float, default=0.0, help='S3 호출당 지연(초)')
+    parser.add_argument('--seed', type=int, default=42, help='지연/스로틀링 난수 시드')
+    parser.add_argument('--cache', action='store_true', help='생성 응답 캐시 사용 (기본값: 매번 새로 생성)')
+    parser.add_argument('--rate-limit', choices=['none', 'memory'], default='none',
+                        help='생성 Lambda의 호출 한도 관리 방식 (기본값: 한도 없이 스로틀링만 재시도 오류로 변환)')
+    parser.add_argument('--rpm', type=float, help='--rate-limit 사용 시 모델별 분당 요청 수')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    # 같은 입력을 반복하므로 응답 캐시를 끄지 않으면 두 번째 실행부터 모델을 호출하지 않음
+    if not args.cache:
+        os.environ['CACHE_BACKEND'] = 'none'
+    os.environ['RATE_LIMIT_BACKEND'] = args.rate_limit
+    if args.rpm:
+        os.environ['RATE_LIMIT_RPM'] = str(args.rpm)
+
+    import local_runner
+    import metrics
+    import simplified_curriculum_workflow
+
+    # Lambda 지표 레코드는 출력하지 않고 모아서 함수별 합계를 결과에 포함
+    metrics_sink = metrics.MemorySink()
+    metrics.set_sink(metrics_sink)
+
+    fakes = local_runner.install_fakes(
+        s3_latency=args.s3_latency,
+        model_latency=latency_sampler(args.model_latency, args.seed),
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed
+    )
+    definition = local_runner.build_definition(args.workflow, local_runner._parse_strategies(args.strategies))
+    sfn = local_runner.LocalStepFunctions()
+    sfn.register(simplified_curriculum_workflow.DEFAULT_STATE_MACHINE_ARN, definition)
+    sfn.register(simplified_curriculum_workflow.DEFAULT_EXPRESS_STATE_MACHINE_ARN, definition)
+    local_runner.aws_clients.set_client('stepfunctions', sfn)
+
+    sync = not args.no_sync
+    state_machine_arn = (simplified_curriculum_workflow.DEFAULT_EXPRESS_STATE_MACHINE_ARN if sync
+                         else simplified_curriculum_workflow.DEFAULT_STATE_MACHINE_ARN)
+    corpora = load_corpora()
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'corpora': [{'name': name, 'titleBytes': len(title.encode('utf-8')), 'dataBytes': len(data.encode('utf-8'))}
+                    for name, title, data in corpora],
+        'levels': []
+    }
+
+    for concurrency in levels:
+        # 진입점과 핸들러의 출력은 측정에 방해되므로 버림
+        with contextlib.redirect_stdout(io.StringIO()):
+            level = run_level(concurrency, max(args.runs, concurrency), corpora, sfn,
+                              simplified_curriculum_workflow.run_workflow, state_machine_arn, sync)
+        results['levels'].append(level)
+
+        entry = level['entrypoint']
+        print(f"동시 {concurrency:3d}: {level['throughputPerSecond']:8.2f} 실행/초  "
+              f"p50 {entry['p50Ms']:8.1f} ms  p95 {entry['p95Ms']:8.1f} ms  p99 {entry['p99Ms']:8.1f} ms  "
+              f"실패 {level['failed']}  대체 응답 {level['fallbacks']}")
+        for name, stage in level['stages'].items():
+            print(f"    {name:30s} p50 {stage['p50Ms']:8.1f} ms  p95 {stage['p95Ms']:8.1f} ms  p99 {stage['p99Ms']:8.1f} ms")
+
+    results['fake'] = {
+        'modelCalls': fakes.bedrock_runtime.calls,
+        'throttles': fakes.bedrock_runtime.throttles,
+        'inputTokens': fakes.bedrock_runtime.input_tokens,
+        'outputTokens': fakes.bedrock_runtime.generated_tokens,
+        's3Calls': fakes.s3.calls,
+        's3BytesRead': fakes.s3.bytes_read,
+        's3BytesWritten': fakes.s3.bytes_written
+    }
+    results['lambdaMetrics'] = local_runner.summarize_metrics(metrics_sink.records)
+    results['peakRssKb'] = peak_rss_kb()
+    print(f"모델 호출 {fakes.bedrock_runtime.calls}회 (스로틀링 {fakes.bedrock_runtime.throttles}회), "
+          f"최대 RSS {results['peakRssKb'] / 1024:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+STANDARD(시작 후 폴링) vs EXPRESS(동기 실행) 지연 시간 비교 벤치마크
+
+AWS를 호출하지 않는 로컬 대역(stand-in) Step Functions 클라이언트를 사용합니다.
+- STANDARD: start_execution 후 execution_waiter.wait_for_execution이 describe_execution으로 폴링
+  (실제 클라이언트와 같은 백오프를 쓰므로 완료 후 다음 확인까지의 폴링 지연이 그대로 드러남)
+- EXPRESS: start_sync_execution이 실행이 끝나는 즉시 응답 (execution_waiter.run_sync_execution)
+
+작업 시간(Lambda 실행 시간 합계)과 상태 전환당 오버헤드는 인자로 조절합니다.
+
+사용 예:
+    python benchmarks/express_benchmark.py --work-seconds 2 --runs 5 --output bench_express.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from execution_waiter import wait_for_execution, run_sync_execution  # noqa: E402
+
+STATE_MACHINE_ARN = 'arn:aws:states:us-west-2:000000000000:stateMachine:CurriculumGenerator-bench'
+
+# FetchS3Data → GenerateCurriculum → SaveCurriculum (시작/종료 포함 상태 전환 수)
+STATE_TRANSITIONS = 4
+
+
+class StandInStepFunctions:
+    """
+    실행 시간을 흉내 내는 로컬 Step Functions 클라이언트
+
+    Attributes:
+        work_seconds: 실행 하나의 작업 시간(초)
+        standard_overhead: STANDARD 상태 전환당 오버헤드(초)
+        express_overhead: EXPRESS 상태 전환당 오버헤드(초)
+        describe_calls: describe_execution 호출 횟수
+    """
+
+    def __init__(self, work_seconds, standard_overhead, express_overhead):
+        self.work_seconds = work_seconds
+        self.standard_overhead = standard_overhead
+        self.express_overhead = express_overhead
+        self.describe_calls = 0
+        self._finish_at = {}
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def _duration(self, overhead):
+        return self.work_seconds + STATE_TRANSITIONS * overhead
+
+    def start_execution(self, stateMachineArn, name=None, input=None):
+        with self._lock:
+            self._counter += 1
+            execution_arn = stateMachineArn.replace(':stateMachine:', ':execution:') + f":{name or self._counter}"
+            self._finish_at[execution_arn] = time.monotonic() + self._duration(self.standard_overhead)
+        return {'executionArn': execution_arn}
+
+    def describe_execution(self, executionArn):
+        self.describe_calls += 1
+        if time.monotonic() < self._finish_at[executionArn]:
+            return {'executionArn': executionArn, 'status': 'RUNNING'}
+        return {'executionArn': executionArn, 'status': 'SUCCEEDED', 'output': json.dumps({'ok': True})}
+
+    def start_sync_execution(self, stateMachineArn, input=None, name=None):
+        duration = self._duration(self.express_overhead)
+        time.sleep(duration)
+        return {
+            'executionArn': stateMachineArn.replace(':stateMachine:', ':express:') + f":{name}",
+            'status': 'SUCCEEDED',
+            'output': json.dumps({'ok': True}),
+            'billingDetails': {'billedDurationInMilliseconds': int(duration * 1000)}
+        }
+
+
+def summarize(timings):
+    return {
+        'medianSeconds': statistics.median(timings),
+        'minSeconds': min(timings),
+        'maxSeconds': max(timings)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='STANDARD vs EXPRESS 지연 시간 비교 벤치마크 (로컬 대역)')
+    parser.add_argument('--runs', type=int, default=5, help='방식별 반복 실행 횟수')
+    parser.add_argument('--work-seconds', type=float, default=2.0, help='실행 하나의 작업 시간(초)')
+    parser.add_argument('--standard-overhead', type=float, default=0.05, help='STANDARD 상태 전환당 오버헤드(초)')
+    parser.add_argument('--express-overhead', type=float, default=0.01, help='EXPRESS 상태 전환당 오버헤드(초)')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    client = StandInStepFunctions(args.work_seconds, args.standard_overhead, args.express_overhead)
+
+    standard = []
+    for i in range(args.runs):
+        start = time.monotonic()
+        response = client.start_execution(stateMachineArn=STATE_MACHINE_ARN, name=f"standard-{i}")
+        wait_for_execution(client, response['executionArn'])
+        standard.append(time.monotonic() - start)
+
+    express = []
+    for i in range(args.runs):
+        start = time.monotonic()
+        run_sync_execution(client, STATE_MACHINE_ARN + '-Express', {}, f"express-{i}")
+        express.append(time.monotonic() - start)
+
+    results = {
+        'runs': args.runs,
+        'workSeconds': args.work_seconds,
+        'STANDARD': dict(summarize(standard), describeCalls=client.describe_calls),
+        'EXPRESS': summarize(express)
+    }
+    for mode in ('STANDARD', 'EXPRESS'):
+        print(f"{mode:10s} median {results[mode]['medianSeconds']:6.2f} s  "
+              f"min {results[mode]['minSeconds']:6.2f} s  max {results[mode]['maxSeconds']:6.2f} s")
+    print(f"STANDARD describe_execution 호출: {client.describe_calls}회 "
+          f"(실행당 {client.describe_calls / max(1, args.runs):.1f}회)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+검색 단계 벤치마크 (로컬 벡터 인덱스 vs Knowledge Base retrieve)
+
+data/ 디렉토리의 data-*.txt로 로컬 벡터 인덱스를 만들고, 각 주제의 검색 쿼리(retrieval.build_query)로
+같은 횟수만큼 두 경로를 호출해 쿼리 지연 시간을 비교합니다.
+
+- local: vector_index.VectorIndex.search (쿼리 임베딩 + 메모리 매핑된 행렬의 top-k 코사인 검색)
+- kb: retrieval.retrieve (Knowledge Base retrieve 호출, 가짜 클라이언트에 지연 분포 주입)
+
+Titan 임베더를 쓰면 가짜 Bedrock Runtime이 임베딩을 반환하며 --embed-latency로 호출 지연을 주입합니다.
+--scale로 코퍼스를 복제해 인덱스 크기에 따른 검색 시간 변화를 확인할 수 있습니다.
+검색 결과 캐시와 임베딩 캐시는 쓰지 않고 매번 새로 검색합니다.
+
+사용 예:
+    python benchmarks/retrieval_benchmark.py --queries 200 --kb-latency lognormal:0.3,0.3
+    python benchmarks/retrieval_benchmark.py --embedder titan --embed-latency fixed:0.05 --scale 100 --output bench_retrieval.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.e2e_benchmark import git_commit, latency_sampler, load_corpora, peak_rss_kb, summarize  # noqa: E402
+
+
+def timed(func, *args, **kwargs):
+    """(결과, 소요 시간 ms)"""
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='검색 단계 벤치마크 (로컬 벡터 인덱스 vs Knowledge Base)')
+    parser.add_argument('--queries', type=int, default=200, help='경로마다 실행할 검색 수')
+    parser.add_argument('-k', type=int, default=5, help='검색할 문단 수')
+    parser.add_argument('--embedder', choices=['hashing', 'titan'], default='hashing', help='로컬 인덱스 임베더')
+    parser.add_argument('--dimensions', type=int, default=512, help='임베딩 차원')
+    parser.add_argument('--scale', type=int, default=1, help='코퍼스 복제 횟수 (인덱스 크기)')
+    parser.add_argument('--embed-latency', default='fixed:0',
+                        help="Titan 임베딩 호출 지연 분포 (fixed:s, uniform:a,b, normal:m,sd, lognormal:중앙값,sigma)")
+    parser.add_argument('--kb-latency', default='fixed:0', help='Knowledge Base retrieve 호출 지연 분포')
+    parser.add_argument('--seed', type=int, default=42, help='지연 난수 시드')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    os.environ['RETRIEVAL_CACHE_BACKEND'] = 'none'
+    os.environ['EMBEDDING_CACHE_BACKEND'] = 'none'
+
+    import local_runner
+    import retrieval
+    import vector_index
+
+    fakes = local_runner.install_fakes()
+    fakes.bedrock_runtime.embed_latency = latency_sampler(args.embed_latency, args.seed)
+    fakes.bedrock_agent_runtime.latency = latency_sampler(args.kb_latency, args.seed + 1)
+
+    corpora = load_corpora()
+    for name, _, data in corpora:
+        fakes.s3.put_object(Bucket=fakes.bedrock_agent_runtime.bucket, Key=f"input/data-{name}.txt", Body=data)
+    documents = [(f"data-{name}-{copy:04d}.txt", data) for copy in range(args.scale) for name, _, data in corpora]
+    queries = [retrieval.build_query(title, data) for _, title, data in corpora]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        index_path = os.path.join(work_dir, 'index.cvix')
+        embedder = vector_index.create_embedder(args.embedder, dimensions=args.dimensions)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, build_ms = timed(vector_index.build_index, documents, index_path, embedder)
+        index, load_ms = timed(vector_index.VectorIndex, index_path)
+        index_bytes = os.path.getsize(index_path)
+        print(f"인덱스: 청크 {len(index.chunks)}개, {args.dimensions}차원, {index_bytes / 1024:.1f}KB "
+              f"(생성 {build_ms:.1f} ms, 로드 {load_ms:.2f} ms)")
+
+        options = retrieval.options_from_event({'numberOfResults': args.k})
+        local_ms, search_ms, kb_ms = [], [], []
+        for i in range(args.queries):
+            query = queries[i % len(queries)]
+            _, elapsed = timed(index.search, query, args.k)
+            local_ms.append(elapsed)
+
+            # 쿼리 임베딩을 뺀 행렬 검색 시간
+            query_vector = index.embedder.embed([query])[0]
+            _, elapsed = timed(lambda: index.vectors @ query_vector)
+            search_ms.append(elapsed)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, elapsed = timed(retrieval.retrieve, 'BENCHMARK-KB', query, options, None, True)
+            kb_ms.append(elapsed)
+
+    paths = {'local': summarize(local_ms), 'localMatrixOnly': summarize(search_ms), 'kb': summarize(kb_ms)}
+    for name, summary in paths.items():
+        print(f"{name:16s} p50 {summary['p50Ms']:9.2f} ms  p95 {summary['p95Ms']:9.2f} ms  "
+              f"p99 {summary['p99Ms']:9.2f} ms  평균 {summary['meanMs']:9.2f} ms")
+    if paths['local']['p50Ms']:
+        print(f"p50 기준 로컬 인덱스가 {paths['kb']['p50Ms'] / paths['local']['p50Ms']:.1f}배 빠름")
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'index': {
+            'chunks': len(index.chunks),
+            'bytes': index_bytes,
+            'buildMs': round(build_ms, 1),
+            'loadMs': round(load_ms, 2)
+        },
+        'paths': paths,
+        'fake': {
+            'embedCalls': fakes.bedrock_runtime.embed_calls,
+            'retrieveCalls': fakes.bedrock_agent_runtime.retrieve_calls
+        },
+        'peakRssKb': peak_rss_kb()
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+진입점 시작 시간 벤치마크
+
+각 스크립트를 '--help'로 여러 번 실행하여 인자 파싱까지 걸리는 시간을 측정합니다.
+AWS 클라이언트를 가져오기 시점에 만들지 않으므로 boto3를 가져오지 않고 끝나야 합니다.
+
+사용 예:
+    python benchmarks/startup_benchmark.py --runs 10 --output bench_startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    'setup_and_run.py',
+    'curriculum_workflow.py',
+    'simplified_curriculum_workflow.py',
+    'upload_files.py',
+    'create_bedrock_role.py',
+    'lambda_functions/lambda_make.py',
+]
+
+# --help 처리 후 boto3가 로드되었는지 확인하는 코드
+IMPORT_CHECK = (
+    "import runpy, sys; sys.argv = [{script!r}, '--help']\n"
+    "try:\n"
+    "    runpy.run_path({script!r}, run_name='__main__')\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "print('BOTO3_LOADED=' + str('boto3' in sys.modules), file=sys.stderr)\n"
+)
+
+
+def measure(script, runs):
+    """스크립트를 runs번 실행하여 소요 시간(초) 목록과 boto3 로드 여부 반환"""
+    timings = []
+    boto3_loaded = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', IMPORT_CHECK.format(script=script)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True
+        )
+        timings.append(time.perf_counter() - start)
+        if 'BOTO3_LOADED=' in result.stderr:
+            boto3_loaded = 'BOTO3_LOADED=True' in result.stderr
+        elif result.returncode != 0:
+            print(f"{script} 실행 실패:\n{result.stderr}", file=sys.stderr)
+    return timings, boto3_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='진입점 시작 시간 벤치마크')
+    parser.add_argument('--runs', type=int, default=5, help='스크립트별 반복 실행 횟수')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    results = {}
+    for script in ENTRY_POINTS:
+        timings, boto3_loaded = measure(script, args.runs)
+        results[script] = {
+            'runs': args.runs,
+            'medianSeconds': statistics.median(timings),
+            'minSeconds': min(timings),
+            'maxSeconds': max(timings),
+            'boto3Loaded': boto3_loaded
+        }
+        print(f"{script:40s} median {results[script]['medianSeconds'] * 1000:8.1f} ms  boto3 loaded: {boto3_loaded}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
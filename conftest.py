@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+실행별 토큰 사용량/비용 장부
+
+워크플로우 실행 출력의 usage(모델 호출별 입력/출력 토큰 수와 소요 시간)를 모아 실행 하나의 장부 항목을 만들고,
+모델별 단가표로 예상 비용을 계산해 S3(ledger/<날짜>/<실행 이름>.json)에 저장합니다.
+저장된 장부로 주제/모델/날짜별 비용과 토큰 처리 속도(출력 토큰/초)를 요약합니다.
+
+사용 예:
+    python cost_ledger.py report --by subject
+    python cost_ledger.py report --by model --days 7 --output cost_report.json
+    python cost_ledger.py report --by day --pricing pricing.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+from aws_clients import get_client  # noqa: E402
+from model_adapters import base_model_id  # noqa: E402
+
+# 환경 설정
+BUCKET_NAME = 'curriculum-bucket-20250331'
+LEDGER_PREFIX = 'ledger/'
+REPORT_GROUPS = ('subject', 'model', 'day')
+
+# 1,000 토큰당 예상 단가 (USD, 온디맨드 기준). 실제 청구액은 AWS 요금 페이지를 확인하고,
+# 바뀐 단가는 --pricing 파일({"모델 ID": {"input": ..., "output": ..., "cacheRead": ..., "cacheWrite": ...}})로 덮어씁니다.
+# cacheRead/cacheWrite는 프롬프트 캐시에서 읽은/캐시에 쓴 입력 토큰의 단가이며, 없으면 input 단가를 씁니다.
+MODEL_PRICING = {
+    'anthropic.claude-3-7-sonnet-20250219-v1:0': {'input': 0.003, 'output': 0.015,
+                                                  'cacheRead': 0.0003, 'cacheWrite': 0.00375},
+    'anthropic.claude-3-5-haiku-20241022-v1:0': {'input': 0.0008, 'output': 0.004,
+                                                 'cacheRead': 0.00008, 'cacheWrite': 0.001},
+    'anthropic.claude-3-5-sonnet-20240620-v1:0': {'input': 0.003, 'output': 0.015},
+    'anthropic.claude-3-sonnet-20240229-v1:0': {'input': 0.003, 'output': 0.015},
+    'anthropic.claude-3-haiku-20240307-v1:0': {'input': 0.00025, 'output': 0.00125},
+    'anthropic.claude-v2:1': {'input': 0.008, 'output': 0.024},
+    'anthropic.claude-v2': {'input': 0.008, 'output': 0.024},
+    'anthropic.claude-instant-v1': {'input': 0.0008, 'output': 0.0024},
+    'amazon.titan-text-premier-v1:0': {'input': 0.0005, 'output': 0.0015},
+    'amazon.titan-text-express-v1': {'input': 0.0002, 'output': 0.0006},
+    'amazon.titan-text-lite-v1': {'input': 0.00015, 'output': 0.0002},
+}
+
+
+def load_pricing(path=None):
+    """
+    단가표 반환 (path의 JSON 파일이 있으면 기본 단가표에 덮어씀)
+
+    Args:
+        path (str, optional): {"모델 ID": {"input": USD/1K, "output": USD/1K, "cacheRead": USD/1K, "cacheWrite": USD/1K}}
+            형식의 JSON 파일 (cacheRead/cacheWrite는 생략 가능)
+
+    Returns:
+        dict: 모델 ID -> {'input', 'output', 'cacheRead', 'cacheWrite'}
+    """
+    pricing = dict(MODEL_PRICING)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            pricing.update(json.load(f))
+    return pricing
+
+
+def estimate_cost(model_id, input_tokens, output_tokens, pricing=MODEL_PRICING,
+                  cache_read_tokens=0, cache_write_tokens=0):
+    """
+    토큰 수로 예상 비용 계산
+
+    Args:
+        cache_read_tokens (int): 프롬프트 캐시에서 읽은 입력 토큰 수 (input_tokens에 포함되지 않음)
+        cache_write_tokens (int): 프롬프트 캐시에 쓴 입력 토큰 수 (input_tokens에 포함되지 않음)
+
+    Returns:
+        float: 예상 비용(USD). 단가를 모르는 모델이거나 토큰 수가 없으면 None
+    """
+    if not model_id or input_tokens is None or output_tokens is None:
+        return None
+    price = pricing.get(model_id) or pricing.get(base_model_id(model_id))
+    if price is None:
+        return None
+    return (input_tokens / 1000 * price['input'] + output_tokens / 1000 * price['output']
+            + (cache_read_tokens or 0) / 1000 * price.get('cacheRead', price['input'])
+            + (cache_write_tokens or 0) / 1000 * price.get('cacheWrite', price['input']))
+
+
+def subject_from_key(title_key):
+    """
+    제목 파일 키에서 주제 이름 추출
+
+    예: input/title-미술-20250401.txt -> 미술, input/title-A-20250331103000.txt -> A
+    """
+    name = os.path.splitext(os.path.basename(title_key or ''))[0]
+    if name.startswith('title-'):
+        name = name[len('title-'):]
+    head, _, tail = name.rpartition('-')
+    return head if head and tail.isdigit() else name or 'unknown'
+
+
+def usage_calls(usage):
+    """usage 값을 호출 목록으로 정규화 (Lambda는 {'calls': [...]}, 직접 통합은 호출 하나의 dict)"""
+    if not usage:
+        return []
+    if 'calls' in usage:
+        return list(usage['calls'])
+    return [usage]
+
+
+def usage_from_output(output):
+    """
+    실행 출력에서 모델 호출 목록 찾기
+
+    build_workflow_states(generateResult.Payload.usage), build_direct_definition과
+    step_function_definition.json(generated.usage), 일괄 처리 항목 요약(usage) 출력 모양을 모두 지원합니다.
+    """
+    if not isinstance(output, dict):
+        return []
+    generated = (output.get('generateResult') or {}).get('Payload') or {}
+    for usage in (generated.get('usage'), (output.get('generated') or {}).get('usage'), output.get('usage')):
+        if usage:
+            return usage_calls(usage)
+    return []
+
+
+def usage_from_history(execution_arn, sfn_client=None):
+    """
+    실행 기록에서 마지막으로 성공한 상태의 출력으로 모델 호출 목록 찾기 (실패/시간 초과/중단된 실행용)
+
+    출력에 usage가 있는 가장 최근 상태(StateExited 이벤트)를 사용합니다.
+    기록을 조회할 수 없는 실행(EXPRESS 등)이면 빈 목록을 반환합니다.
+
+    Args:
+        execution_arn (str): 실행 ARN
+        sfn_client: Step Functions 클라이언트 (기본값: 공용 클라이언트)
+
+    Returns:
+        list: 모델 호출 목록
+    """
+    sfn_client = sfn_client or get_client('stepfunctions')
+    params = {'executionArn': execution_arn, 'reverseOrder': True, 'includeExecutionData': True, 'maxResults': 100}
+    try:
+        while True:
+            response = sfn_client.get_execution_history(**params)
+            for event in response['events']:
+                details = event.get('stateExitedEventDetails') or {}
+                if not details.get('output'):
+                    continue
+                try:
+                    calls = usage_from_output(json.loads(details['output']))
+                except ValueError:
+                    # 256KB를 넘어 잘린 출력
+                    continue
+                if calls:
+                    return calls
+            if not response.get('nextToken'):
+                return []
+            params['nextToken'] = response['nextToken']
+    except Exception as e:
+        print(f"실행 기록 조회 실패: {str(e)}")
+        return []
+
+
+def build_ledger_entry(execution_arn, title_key, calls, status='SUCCEEDED', wall_time=None,
+                       correlation_id=None, pricing=MODEL_PRICING, now=None):
+    """
+    실행 하나의 장부 항목 생성
+
+    Args:
+        execution_arn (str): 실행 ARN
+        title_key (str): 제목 파일 키 (주제 이름 추출용)
+        calls (list): 모델 호출 목록
+            [{'modelId', 'inputTokens', 'outputTokens', 'cacheReadInputTokens', 'cacheWriteInputTokens', 'latencyMs'}, ...]
+        status (str): 실행 상태
+        wall_time (float, optional): 실행 소요 시간(초)
+        correlation_id (str, optional): 상관관계 ID
+        pricing (dict): 단가표
+
+    Returns:
+        dict: 장부 항목
+    """
+    now = now or datetime.now(timezone.utc)
+    priced_calls = []
+    for call in calls:
+        cost = estimate_cost(call.get('modelId'), call.get('inputTokens'), call.get('outputTokens'), pricing,
+                             call.get('cacheReadInputTokens'), call.get('cacheWriteInputTokens'))
+        priced_calls.append(dict(call, cost=round(cost, 6) if cost is not None else None))
+
+    return {
+        'executionArn': execution_arn,
+        'correlationId': correlation_id,
+        'titleKey': title_key,
+        'subject': subject_from_key(title_key),
+        'day': now.strftime('%Y-%m-%d'),
+        'recordedAt': now.isoformat(),
+        'status': status,
+        'wallTime': wall_time,
+        'calls': priced_calls,
+        'inputTokens': sum(call.get('inputTokens') or 0 for call in priced_calls),
+        'outputTokens': sum(call.get('outputTokens') or 0 for call in priced_calls),
+        'cacheReadInputTokens': sum(call.get('cacheReadInputTokens') or 0 for call in priced_calls),
+        'cacheWriteInputTokens': sum(call.get('cacheWriteInputTokens') or 0 for call in priced_calls),
+        'cost': round(sum(call['cost'] or 0 for call in priced_calls), 6),
+        'unpricedCalls': sum(1 for call in priced_calls if call['cost'] is None)
+    }
+
+
+def ledger_key(entry, entry_name=None):
+    """장부 항목을 저장할 S3 키 (ledger/<날짜>/<실행 이름>.json)"""
+    name = entry_name or entry['executionArn'].rsplit(':', 1)[-1]
+    return f"{LEDGER_PREFIX}{entry['day']}/{name}.json"
+
+
+def save_ledger_entry(entry, entry_name=None, bucket=BUCKET_NAME):
+    """장부 항목을 S3에 저장하고 키 반환"""
+    key = ledger_key(entry, entry_name)
+    get_client('s3').put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps(entry, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json; charset=utf-8'
+    )
+    return key
+
+
+def record_execution(execution_arn, title_key, output, wall_time=None, correlation_id=None,
+                     entry_name=None, status='SUCCEEDED', calls=None):
+    """
+    실행 출력의 사용량으로 장부 항목을 만들어 저장 (실패해도 워크플로우 결과에는 영향 없음)
+
+    Args:
+        execution_arn (str): 실행 ARN
+        title_key (str): 제목 파일 키
+        output (dict): 실행 출력 (또는 일괄 처리 항목 요약, 실패한 실행이면 None)
+        wall_time (float, optional): 실행 소요 시간(초)
+        correlation_id (str, optional): 상관관계 ID
+        entry_name (str, optional): 저장할 파일 이름 (기본값: 실행 이름)
+        status (str): 실행 상태
+        calls (list, optional): 모델 호출 목록 (기본값: output에서 찾음, 실패한 실행은 usage_from_history)
+
+    Returns:
+        dict: 장부 항목 (저장 실패 시 None)
+    """
+    try:
+        if calls is None:
+            calls = usage_from_output(output)
+        entry = build_ledger_entry(execution_arn, title_key, calls, status, wall_time, correlation_id)
+        key = save_ledger_entry(entry, entry_name)
+        print(f"토큰 사용량: 입력 {entry['inputTokens']} / 출력 {entry['outputTokens']}, "
+              f"예상 비용 ${entry['cost']:.4f} (장부: s3://{BUCKET_NAME}/{key})")
+        return entry
+    except Exception as e:
+        print(f"비용 장부 저장 실패: {str(e)}")
+        return None
+
+
+def load_ledgers(days=None, bucket=BUCKET_NAME, prefix=LEDGER_PREFIX):
+    """
+    저장된 장부 항목 읽기
+
+    Args:
+        days (int, optional): 최근 며칠치만 읽음 (기본값: 전체)
+        bucket (str): 버킷 이름
+        prefix (str): 장부 접두사
+
+    Returns:
+        list: 장부 항목 목록
+    """
+    s3_client = get_client('s3')
+    if days:
+        today = datetime.now(timezone.utc).date()
+        prefixes = [f"{prefix}{(today - timedelta(days=i)).isoformat()}/" for i in range(days)]
+    else:
+        prefixes = [prefix]
+
+    keys = []
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for day_prefix in prefixes:
+        for page in paginator.paginate(Bucket=bucket, Prefix=day_prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.json'))
+
+    def read(key):
+        return json.loads(s3_client.get_object(Bucket=bucket, Key=key)['Body'].read().decode('utf-8'))
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        return list(executor.map(read, keys))
+
+
+def summarize(entries, by='subject'):
+    """
+    장부 항목을 주제/모델/날짜별로 합산
+
+    Args:
+        entries (list): 장부 항목 목록
+        by (str): 'subject', 'model', 'day' 중 하나
+
+    Returns:
+        list: [{'key', 'executions', 'calls', 'inputTokens', 'outputTokens', 'cost',
+               'unpricedCalls', 'outputTokensPerSecond'}, ...] (비용이 큰 순)
+    """
+    groups = {}
+    for entry in entries:
+        for call in entry.get('calls', []):
+            key = call.get('modelId') if by == 'model' else entry.get(by)
+            group = groups.setdefault(key or 'unknown', {
+                'executions': set(), 'calls': 0, 'inputTokens': 0, 'outputTokens': 0,
+                'cost': 0.0, 'unpricedCalls': 0, 'timedOutputTokens': 0, 'latencyMs': 0.0
+            })
+            group['executions'].add((entry['executionArn'], entry.get('titleKey')))
+            group['calls'] += 1
+            group['inputTokens'] += call.get('inputTokens') or 0
+            group['outputTokens'] += call.get('outputTokens') or 0
+            if call.get('cost') is None:
+                group['unpricedCalls'] += 1
+            else:
+                group['cost'] += call['cost']
+            # 처리 속도는 소요 시간과 출력 토큰 수를 모두 아는 호출로만 계산
+            if call.get('latencyMs') and call.get('outputTokens') is not None:
+                group['timedOutputTokens'] += call['outputTokens']
+                group['latencyMs'] += call['latencyMs']
+
+    rows = []
+    for key, group in groups.items():
+        rows.append({
+            'key': key,
+            'executions': len(group['executions']),
+            'calls': group['calls'],
+            'inputTokens': group['inputTokens'],
+            'outputTokens': group['outputTokens'],
+            'cost': round(group['cost'], 6),
+            'unpricedCalls': group['unpricedCalls'],
+            'outputTokensPerSecond': (round(group['timedOutputTokens'] / (group['latencyMs'] / 1000), 1)
+                                      if group['latencyMs'] else None)
+        })
+    return sorted(rows, key=lambda row: row['cost'], reverse=True)
+
+
+def print_report(rows, by):
+    """요약 표 출력"""
+    print(f"{by:40s} {'실행':>6s} {'호출':>6s} {'입력 토큰':>12s} {'출력 토큰':>12s} {'비용(USD)':>11s} {'토큰/초':>9s}")
+    for row in rows:
+        speed = f"{row['outputTokensPerSecond']:9.1f}" if row['outputTokensPerSecond'] is not None else f"{'-':>9s}"
+        print(f"{str(row['key'])[:40]:40s} {row['executions']:6d} {row['calls']:6d} {row['inputTokens']:12d} "
+              f"{row['outputTokens']:12d} {row['cost']:11.4f} {speed}"
+              + (f"  (단가 없는 호출 {row['unpricedCalls']}개)" if row['unpricedCalls'] else ''))
+    total = sum(row['cost'] for row in rows)
+    print(f"\n합계 예상 비용: ${total:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='실행별 토큰 사용량/비용 장부 보고서')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report = subparsers.add_parser('report', help='저장된 장부를 주제/모델/날짜별로 요약')
+    report.add_argument('--by', choices=REPORT_GROUPS, default='subject', help='묶을 기준')
+    report.add_argument('--days', type=int, help='최근 며칠치만 요약 (기본값: 전체)')
+    report.add_argument('--bucket', default=BUCKET_NAME, help='장부가 저장된 버킷')
+    report.add_argument('--pricing', help='단가표 JSON 파일 (지정하면 저장된 비용 대신 이 단가로 다시 계산)')
+    report.add_argument('--output', help='요약을 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    entries = load_ledgers(args.days, args.bucket)
+    if not entries:
+        print("저장된 장부가 없습니다.")
+        return
+
+    if args.pricing:
+        pricing = load_pricing(args.pricing)
+        entries = [
+            build_ledger_entry(entry['executionArn'], entry['titleKey'], entry['calls'], entry.get('status'),
+                               entry.get('wallTime'), entry.get('correlationId'), pricing,
+                               datetime.fromisoformat(entry['recordedAt']))
+            for entry in entries
+        ]
+
+    rows = summarize(entries, args.by)
+    print(f"장부 {len(entries)}개 요약 (기준: {args.by})\n")
+    print_report(rows, args.by)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'by': args.by, 'days': args.days, 'entries': len(entries), 'rows': rows},
+                      f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
-import boto3
 import json
+import os
+import sys
 import time
 import uuid
 
@@ -9,8 +10,12 @@ import uuid
 # create_opensearch_collection 을 만들고 
 
 
-# IAM 클라이언트 초기화
-iam_client = boto3.client('iam')
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+from aws_clients import get_client  # noqa: E402
 
 class BedrockResourceManager:
     """
@@ -30,9 +35,9 @@ class BedrockResourceManager:
         Args:
             s3_bucket_name (str): S3 버킷 이름
         """
-        self.iam_client = boto3.client('iam')
-        self.aoss_client = boto3.client('opensearchserverless')
-        self.bedrock_client = boto3.client('bedrock')
+        self.iam_client = get_client('iam')
+        self.aoss_client = get_client('opensearchserverless')
+        self.bedrock_client = get_client('bedrock')
         self.s3_bucket_name = s3_bucket_name
     
     def create_bedrock_knowledge_base_role(self, role_name='BedrockKnowledgeBaseRole'):
@@ -176,7 +181,7 @@ class BedrockResourceManager:
             policy_arn = policy_response['Policy']['Arn']
             print(f"Policy '{policy_name}' has been created. ARN: {policy_arn}")
         except self.iam_client.exceptions.EntityAlreadyExistsException:
-            account_id = boto3.client('sts').get_caller_identity()['Account']
+            account_id = get_client('sts').get_caller_identity()['Account']
             policy_arn = f"arn:aws:iam::{account_id}:policy/{policy_name}"
             print(f"Policy '{policy_name}' already exists. ARN: {policy_arn}")
         
@@ -619,7 +624,7 @@ def get_knowledge_base_id(kb_name='curriculum-knowledge-base'):
     Returns:
         str: Knowledge Base ID
     """
-    bedrock_client = boto3.client('bedrock')
+    bedrock_client = get_client('bedrock')
     
     try:
         knowledge_bases = bedrock_client.list_knowledge_bases()['knowledgeBases']
@@ -680,7 +685,7 @@ def create_step_function_role(role_name='StepFunctionExecutionRole'):
     Returns:
         str: 생성된 역할의 ARN
     """
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
     
     # 역할이 이미 존재하는지 확인
     try:
@@ -739,7 +744,7 @@ def create_step_function_role(role_name='StepFunctionExecutionRole'):
         lambda_policy_arn = policy_response['Policy']['Arn']
         print(f"정책 '{lambda_policy_name}'이(가) 생성되었습니다. ARN: {lambda_policy_arn}")
     except iam_client.exceptions.EntityAlreadyExistsException:
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_client('sts').get_caller_identity()['Account']
         lambda_policy_arn = f"arn:aws:iam::{account_id}:policy/{lambda_policy_name}"
         print(f"정책 '{lambda_policy_name}'이(가) 이미 존재합니다. ARN: {lambda_policy_arn}")
     
@@ -763,6 +768,222 @@ def create_step_function_role(role_name='StepFunctionExecutionRole'):
     
     return role_arn
 
+def add_distributed_map_permissions(role_name='StepFunctionExecutionRole', bucket_name='curriculum-bucket-20250331'):
+    """
+    Step Function 실행 역할에 Distributed Map 실행 권한 추가
+    
+    Distributed Map은 항목마다 하위 실행을 시작하고 S3의 매니페스트를 직접 읽고 결과를 S3에 쓰므로(ResultWriter)
+    states:StartExecution 등과 s3:GetObject, s3:PutObject 권한이 필요합니다.
+    
+    Args:
+        role_name (str): Step Function 실행 역할 이름
+        bucket_name (str): 매니페스트가 저장된 S3 버킷 이름
+        
+    Returns:
+        bool: 권한 추가 성공 여부
+    """
+    iam_client = get_client('iam')
+    
+    distributed_map_policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Action": [
+                    "states:StartExecution",
+                    "states:DescribeExecution",
+                    "states:StopExecution"
+                ],
+                "Resource": "*"
+            },
+            {
+                "Effect": "Allow",
+                "Action": [
+                    "s3:GetObject",
+                    "s3:PutObject",
+                    "s3:ListBucket",
+                    "s3:ListMultipartUploadParts",
+                    "s3:AbortMultipartUpload"
+                ],
+                "Resource": [
+                    f"arn:aws:s3:::{bucket_name}",
+                    f"arn:aws:s3:::{bucket_name}/*"
+                ]
+            }
+        ]
+    }
+    
+    try:
+        iam_client.put_role_policy(
+            RoleName=role_name,
+            PolicyName='distributed-map-policy',
+            PolicyDocument=json.dumps(distributed_map_policy)
+        )
+        print(f"Distributed Map 권한이 '{role_name}' 역할에 추가되었습니다.")
+        return True
+    except Exception as e:
+        print(f"Distributed Map 권한 추가 중 오류 발생: {str(e)}")
+        return False
+
+def add_direct_integration_permissions(role_name='StepFunctionExecutionRole', bucket_name='curriculum-bucket-20250331'):
+    """
+    Step Function 실행 역할에 직접 서비스 통합 권한 추가
+    
+    Lambda를 거치지 않고 상태에서 S3(getObject/putObject)와 Bedrock(invokeModel)을
+    직접 호출하려면 실행 역할에 해당 권한이 필요합니다.
+    
+    Args:
+        role_name (str): Step Function 실행 역할 이름
+        bucket_name (str): 입력/출력 파일이 저장된 S3 버킷 이름
+    
+    Returns:
+        bool: 권한 추가 성공 여부
+    """
+    iam_client = get_client('iam')
+    
+    direct_integration_policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Action": [
+                    "s3:GetObject",
+                    "s3:PutObject"
+                ],
+                "Resource": [
+                    f"arn:aws:s3:::{bucket_name}/*"
+                ]
+            },
+            {
+                "Effect": "Allow",
+                "Action": [
+                    "bedrock:InvokeModel"
+                ],
+                "Resource": "arn:aws:bedrock:*::foundation-model/*"
+            }
+        ]
+    }
+    
+    try:
+        iam_client.put_role_policy(
+            RoleName=role_name,
+            PolicyName='direct-integration-policy',
+            PolicyDocument=json.dumps(direct_integration_policy)
+        )
+        print(f"직접 서비스 통합 권한이 '{role_name}' 역할에 추가되었습니다.")
+        return True
+    except Exception as e:
+        print(f"직접 서비스 통합 권한 추가 중 오류 발생: {str(e)}")
+        return False
+
+def create_batch_inference_role(role_name='BedrockBatchInferenceRole', bucket_name='curriculum-bucket-20250331'):
+    """
+    Bedrock 배치 추론(create_model_invocation_job) 서비스 역할 생성
+    
+    배치 작업은 Bedrock이 이 역할로 입력 JSONL을 읽고 결과를 같은 버킷에 씁니다.
+    
+    Args:
+        role_name (str): 생성할 역할 이름
+        bucket_name (str): 입력/출력 JSONL이 저장될 S3 버킷 이름
+    
+    Returns:
+        str: 역할 ARN
+    """
+    iam_client = get_client('iam')
+    
+    try:
+        response = iam_client.get_role(RoleName=role_name)
+        print(f"배치 추론 역할 '{role_name}'이(가) 이미 존재합니다.")
+        return response['Role']['Arn']
+    except iam_client.exceptions.NoSuchEntityException:
+        print(f"배치 추론 역할 '{role_name}'을(를) 생성합니다...")
+    
+    account_id = get_client('sts').get_caller_identity()['Account']
+    trust_policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {
+                    "Service": "bedrock.amazonaws.com"
+                },
+                "Action": "sts:AssumeRole",
+                "Condition": {
+                    "StringEquals": {
+                        "aws:SourceAccount": account_id
+                    }
+                }
+            }
+        ]
+    }
+    
+    response = iam_client.create_role(
+        RoleName=role_name,
+        AssumeRolePolicyDocument=json.dumps(trust_policy),
+        Description='Role for Bedrock batch inference jobs'
+    )
+    role_arn = response['Role']['Arn']
+    
+    batch_policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Action": [
+                    "s3:GetObject",
+                    "s3:PutObject",
+                    "s3:ListBucket"
+                ],
+                "Resource": [
+                    f"arn:aws:s3:::{bucket_name}",
+                    f"arn:aws:s3:::{bucket_name}/*"
+                ]
+            }
+        ]
+    }
+    
+    iam_client.put_role_policy(
+        RoleName=role_name,
+        PolicyName='batch-inference-s3-policy',
+        PolicyDocument=json.dumps(batch_policy)
+    )
+    print(f"배치 추론 역할 '{role_name}'이(가) 생성되었습니다. ARN: {role_arn}")
+    
+    # 역할 권한이 전파될 시간을 주기 위해 잠시 대기
+    print("IAM 역할 권한이 전파될 때까지 10초 대기 중...")
+    time.sleep(10)
+    
+    return role_arn
+
+def create_rate_limit_table(table_name='curriculum-rate-limits'):
+    """
+    모델별 호출 한도 상태 테이블 생성 (생성 Lambda는 RATE_LIMIT_BACKEND=dynamodb로 배포되어 이 테이블을 사용)
+    
+    키 스키마는 문자열 파티션 키 'pk'(모델 ID) 하나이며, 항목의 'state'(S)와 'version'(N)은
+    rate_limiter.DynamoDBStore가 기록합니다.
+    
+    Args:
+        table_name (str): 테이블 이름
+        
+    Returns:
+        str: 테이블 이름
+    """
+    dynamodb_client = get_client('dynamodb')
+    try:
+        print(f"DynamoDB 테이블 '{table_name}' 생성 중...")
+        dynamodb_client.create_table(
+            TableName=table_name,
+            AttributeDefinitions=[{'AttributeName': 'pk', 'AttributeType': 'S'}],
+            KeySchema=[{'AttributeName': 'pk', 'KeyType': 'HASH'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        dynamodb_client.get_waiter('table_exists').wait(TableName=table_name)
+        print(f"DynamoDB 테이블 '{table_name}' 생성 완료")
+    except dynamodb_client.exceptions.ResourceInUseException:
+        print(f"DynamoDB 테이블 '{table_name}'이(가) 이미 존재합니다.")
+    
+    return table_name
+
 def main():
     """메인 함수 - 명령줄에서 직접 실행할 때 사용"""
     
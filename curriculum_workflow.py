@@ -1,22 +1,52 @@
-import boto3
 import json
 import os
+import sys
+import argparse
 import uuid
-import time
 from datetime import datetime
-from lambda_functions.lambda_make import create_lambda_function, LambdaFunctionManager, add_bedrock_permissions_to_role
-from create_bedrock_role import create_bedrock_role_functions, get_knowledge_base_id, create_step_function_role
 
-# AWS 서비스 클라이언트 초기화
-s3_client = boto3.client('s3')
-bedrock_client = boto3.client('bedrock-agent-runtime')
-sfn_client = boto3.client('stepfunctions')
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+import cost_ledger  # noqa: E402
+from aws_clients import get_client  # noqa: E402
+from output_keys import build_output_key  # noqa: E402
+from prompts import build_prompt, build_request_body  # noqa: E402
+from lambda_functions.lambda_make import create_lambda_function, LambdaFunctionManager, add_bedrock_permissions_to_role  # noqa: E402
+from execution_waiter import wait_for_execution, run_sync_execution  # noqa: E402
+from create_bedrock_role import create_bedrock_role_functions, get_knowledge_base_id, create_step_function_role, add_distributed_map_permissions, add_direct_integration_permissions, create_rate_limit_table
 
 # 환경 설정
 BUCKET_NAME = 'curriculum-bucket-20250331'
 INPUT_PREFIX = 'input/'
 OUTPUT_PREFIX = 'curriculum/'
 BEDROCK_MODEL_ID = 'amazon.titan-text-express-v1'  # 기본 모델을 Titan으로 변경
+STREAM_GENERATION = False  # True이면 생성 Lambda가 응답을 스트리밍하여 S3에 바로 저장
+CLAIM_CHECK = True  # True이면 상태에 본문 대신 S3 참조({bucket, key, etag, size})를 전달
+CLAIM_CHECK_INLINE_BYTES = 8 * 1024  # 이 크기 이하의 본문은 참조 대신 상태에 그대로 포함
+# EXPRESS(동기 실행) 변형: 커리큘럼을 응답에 바로 담도록 인라인 한도를 높임 (응답 한도 256KB 이내)
+EXPRESS_SUFFIX = '-Express'
+EXPRESS_INLINE_CURRICULUM_BYTES = 128 * 1024
+# 직접 서비스 통합 워크플로우의 단계별 기본 방식 ('lambda' 또는 'direct')
+DIRECT_SUFFIX = '-Direct'
+DEFAULT_STRATEGIES = {'fetch': 'direct', 'generate': 'direct', 'save': 'direct'}
+DIRECT_MAX_TOKENS = 4000
+BATCH_PREFIX = 'batch/'
+BATCH_RESULTS_PREFIX = f'{BATCH_PREFIX}results'  # Distributed Map의 ResultWriter가 항목별 결과를 쓰는 위치
+BATCH_MAX_CONCURRENCY = 10  # 일괄 처리 시 동시에 실행할 최대 항목 수
+# 생성 Lambda가 호출 한도 초과(BedrockThrottledError)를 알리면 지터를 섞은 지수 백오프로 다시 실행
+GENERATION_RETRY = [
+    {
+        "ErrorEquals": ["BedrockThrottledError"],
+        "IntervalSeconds": 5,
+        "MaxAttempts": 6,
+        "BackoffRate": 2.0,
+        "MaxDelaySeconds": 60,
+        "JitterStrategy": "FULL"
+    }
+]
 STEP_FUNCTION_ROLE_ARN = None  # 역할 ARN을 저장할 변수
 
 def create_bedrock_resources():
@@ -52,6 +82,9 @@ def create_lambda_functions():
     print("Lambda 실행 역할에 Bedrock 권한 추가 중...")
     add_bedrock_permissions_to_role()
     
+    # 생성 Lambda가 컨테이너 간에 호출 한도를 나눠 쓰는 상태 테이블 (lambda_make.FUNCTION_CONFIG_OVERRIDES)
+    create_rate_limit_table()
+    
     # 필요한 Lambda 함수 목록
     lambda_list = {
         'fetch-s3-data': os.path.join(os.path.dirname(__file__), 'lambda_functions/fetch_s3_data.py'),
@@ -59,109 +92,672 @@ def create_lambda_functions():
         'save-curriculum': os.path.join(os.path.dirname(__file__), 'lambda_functions/save_curriculum.py'),
     }
     
-    # Lambda 함수 생성 또는 업데이트
+    # Lambda 함수 생성 또는 업데이트 (생성 Lambda에는 numpy가 든 공용 레이어가 함께 연결됨)
     manager = LambdaFunctionManager()
     lambda_arns = manager.create_or_update_functions(lambda_list)
     
+    failed = sorted(set(lambda_list) - set(lambda_arns))
+    if failed:
+        raise RuntimeError(f"Lambda 함수 배포 실패: {', '.join(failed)}")
+    
     print("Lambda 함수 생성/업데이트 완료:")
     for name, arn in lambda_arns.items():
         print(f"  {name}: {arn}")
     
     return lambda_arns
 
-def create_step_function(title_key=None, knowledge_base_id=None):
-    """Step Function 워크플로우 생성"""
+def build_workflow_states(lambda_arns, knowledge_base_id=None, claim_check=CLAIM_CHECK,
+                          curriculum_inline_bytes=CLAIM_CHECK_INLINE_BYTES):
+    """
+    FetchS3Data → GenerateCurriculum → SaveCurriculum 상태 정의 생성
     
-    global STEP_FUNCTION_ROLE_ARN
+    claim_check가 True이면 단계 사이에 본문(title, data, curriculum) 대신
+    S3 참조(titleRef, dataRef, curriculumRef)를 전달해 상태 크기를 256KB 제한보다 훨씬 작게 유지합니다.
+    curriculum_inline_bytes 이하의 커리큘럼은 참조 대신 실행 출력에 그대로 포함됩니다.
+    """
     
-    # Step Function 실행 역할 생성 또는 가져오기
-    if not STEP_FUNCTION_ROLE_ARN:
-        STEP_FUNCTION_ROLE_ARN = create_step_function_role()
+    states = {
+        "FetchS3Data": {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::lambda:invoke",
+            "Parameters": {
+                "FunctionName": lambda_arns['fetch-s3-data'],
+                "Payload": {
+                    "bucket": BUCKET_NAME,
+                    "titleKey.$": "$.titleKey",
+                    "dataKey.$": "$.dataKey"
+                }
+            },
+            "ResultPath": "$.fetchResult",
+            "Next": "GenerateCurriculum"
+        },
+        "GenerateCurriculum": {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::lambda:invoke",
+            "Parameters": {
+                "FunctionName": lambda_arns['generate-curriculum-kb'],
+                "Payload": {
+                    "bucket": BUCKET_NAME,
+                    "titleKey.$": "$.titleKey",
+                    "dataKey.$": "$.dataKey",
+                    "title.$": "$.fetchResult.Payload.title",
+                    "data.$": "$.fetchResult.Payload.data",
+                    "modelId": BEDROCK_MODEL_ID,
+                    "stream": STREAM_GENERATION
+                }
+            },
+            "ResultPath": "$.generateResult",
+            "Retry": GENERATION_RETRY,
+            "Next": "SaveCurriculum"
+        },
+        "SaveCurriculum": {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::lambda:invoke",
+            "Parameters": {
+                "FunctionName": lambda_arns['save-curriculum'],
+                "Payload": {
+                    "bucket": BUCKET_NAME,
+                    "curriculum.$": "$.generateResult.Payload.curriculum",
+                    "outputKey.$": "$.generateResult.Payload.outputKey",
+                    "titleKey.$": "$.titleKey"
+                }
+            },
+            "ResultPath": "$.saveResult",
+            "End": True
+        }
+    }
     
-    # Lambda 함수 ARN 가져오기
-    lambda_arns = create_lambda_functions()
+    # Knowledge Base ID가 있으면 추가
+    if knowledge_base_id:
+        states["GenerateCurriculum"]["Parameters"]["Payload"]["knowledgeBaseId"] = knowledge_base_id
     
-    # Knowledge Base ID 확인
-    if not knowledge_base_id:
-        knowledge_base_id = create_bedrock_resources()
+    if claim_check:
+        claim_check_options = {"claimCheck": True, "inlineBytes": CLAIM_CHECK_INLINE_BYTES}
+        states["FetchS3Data"]["Parameters"]["Payload"].update(claim_check_options)
+        
+        generate_payload = states["GenerateCurriculum"]["Parameters"]["Payload"]
+        del generate_payload["title.$"]
+        del generate_payload["data.$"]
+        generate_payload.update(claim_check_options, inlineBytes=curriculum_inline_bytes)
+        generate_payload["titleRef.$"] = "$.fetchResult.Payload.titleRef"
+        generate_payload["dataRef.$"] = "$.fetchResult.Payload.dataRef"
+        
+        save_payload = states["SaveCurriculum"]["Parameters"]["Payload"]
+        del save_payload["curriculum.$"]
+        save_payload["curriculumRef.$"] = "$.generateResult.Payload.curriculumRef"
     
-    # Step Function 정의 - 전체 워크플로우
-    definition = {
-        "Comment": "커리큘럼 생성 및 S3 저장 워크플로우",
-        "StartAt": "FetchS3Data",
-        "States": {
-            "FetchS3Data": {
-                "Type": "Task",
-                "Resource": "arn:aws:states:::lambda:invoke",
+    add_correlation_id(states)
+    return states
+
+def add_correlation_id(states):
+    """
+    모든 Lambda 호출 상태의 Payload에 실행 입력의 상관관계 ID(correlationId) 추가
+    
+    각 Lambda가 내보내는 지표 레코드(metrics.instrument)를 실행 단위로 묶어 볼 수 있게 합니다.
+    """
+    for state in states.values():
+        if state.get("Resource") == "arn:aws:states:::lambda:invoke":
+            state["Parameters"]["Payload"]["correlationId.$"] = "$.correlationId"
+
+def add_correlation_prologue(states, start_at, input_keys):
+    """
+    실행 입력에 correlationId가 없으면 실행 이름으로 채우는 Choice/Pass 상태를 맨 앞에 추가
+    
+    step_function_definition.json과 같은 구성이며, Pass 상태는 입력을 다시 만들므로
+    워크플로우가 읽는 최상위 입력 키(input_keys)를 그대로 옮겨 담습니다.
+    
+    Args:
+        states (dict): 상태 정의 (제자리에서 수정)
+        start_at (str): 기존 시작 상태 이름
+        input_keys (tuple): 옮겨 담을 실행 입력 키
+    
+    Returns:
+        str: 새 시작 상태 이름
+    """
+    parameters = {f"{key}.$": f"$.{key}" for key in input_keys}
+    parameters["correlationId.$"] = "$$.Execution.Name"
+    
+    states["CheckCorrelationId"] = {
+        "Type": "Choice",
+        "Choices": [
+            {
+                "Variable": "$.correlationId",
+                "IsPresent": True,
+                "Next": start_at
+            }
+        ],
+        "Default": "DefaultCorrelationId"
+    }
+    states["DefaultCorrelationId"] = {
+        "Type": "Pass",
+        "Parameters": parameters,
+        "Next": start_at
+    }
+    return "CheckCorrelationId"
+
+def build_workflow_definition(lambda_arns, knowledge_base_id=None, curriculum_inline_bytes=CLAIM_CHECK_INLINE_BYTES,
+                              comment="커리큘럼 생성 및 S3 저장 워크플로우"):
+    """
+    FetchS3Data → GenerateCurriculum → SaveCurriculum 상태 머신 정의 생성
+    
+    입력: {"titleKey": ..., "dataKey": ..., "correlationId": ...(선택)}
+    
+    Returns:
+        dict: 상태 머신 정의
+    """
+    states = build_workflow_states(lambda_arns, knowledge_base_id, curriculum_inline_bytes=curriculum_inline_bytes)
+    start_at = add_correlation_prologue(states, "FetchS3Data", ("titleKey", "dataKey"))
+    return {
+        "Comment": comment,
+        "StartAt": start_at,
+        "States": states
+    }
+
+def build_batch_definition(lambda_arns, knowledge_base_id=None, max_concurrency=BATCH_MAX_CONCURRENCY):
+    """
+    모든 title/data 쌍을 한 번의 실행으로 처리하는 Distributed Map 워크플로우 정의 생성
+    
+    입력: {"bucket": ..., "manifestKey": ...}
+    manifestKey가 가리키는 JSON 배열의 항목({"titleKey", "dataKey"})마다
+    FetchS3Data → GenerateCurriculum → SaveCurriculum 체인을 실행하고,
+    항목별 요약({"titleKey", "dataKey", "status", ...})을 ResultWriter로 S3(BATCH_RESULTS_PREFIX)에 씁니다.
+    항목 수가 많아도 실행 출력은 결과 매니페스트 위치(ResultWriterDetails)뿐이므로 256KB 제한에 걸리지 않습니다.
+    생성 Lambda가 오류로 기본 커리큘럼을 반환한 항목(Payload.error)은 저장하지 않고 실패로 기록합니다.
+    """
+    
+    item_states = build_workflow_states(lambda_arns, knowledge_base_id)
+    
+    # 항목 하나의 실패가 전체 배치를 중단시키지 않도록 실패를 요약으로 기록
+    for state in item_states.values():
+        state["Catch"] = [
+            {
+                "ErrorEquals": ["States.ALL"],
+                "ResultPath": "$.error",
+                "Next": "RecordFailure"
+            }
+        ]
+    
+    # 생성 Lambda가 오류로 기본 커리큘럼을 반환했으면 저장하지 않고 실패로 기록
+    item_states["GenerateCurriculum"]["Next"] = "CheckGeneration"
+    item_states["CheckGeneration"] = {
+        "Type": "Choice",
+        "Choices": [
+            {
+                "Variable": "$.generateResult.Payload.error",
+                "IsPresent": True,
+                "Next": "RecordGenerationError"
+            }
+        ],
+        "Default": "SaveCurriculum"
+    }
+    item_states["RecordGenerationError"] = {
+        "Type": "Pass",
+        "Parameters": {
+            "Error": "GenerationError",
+            "Cause.$": "$.generateResult.Payload.error"
+        },
+        "ResultPath": "$.error",
+        "Next": "RecordFailure"
+    }
+    
+    # 마지막 단계 뒤에 요약 상태 추가 (생성된 본문은 출력에 포함하지 않음)
+    save_state = item_states["SaveCurriculum"]
+    del save_state["End"]
+    save_state["Next"] = "RecordSuccess"
+    
+    item_states["RecordSuccess"] = {
+        "Type": "Pass",
+        "Parameters": {
+            "titleKey.$": "$.titleKey",
+            "dataKey.$": "$.dataKey",
+            "status": "SUCCEEDED",
+            "outputKey.$": "$.saveResult.Payload.outputKey",
+            "usage.$": "$.generateResult.Payload.usage"
+        },
+        "End": True
+    }
+    item_states["RecordFailure"] = {
+        "Type": "Pass",
+        "Parameters": {
+            "titleKey.$": "$.titleKey",
+            "dataKey.$": "$.dataKey",
+            "status": "FAILED",
+            "error.$": "$.error.Error",
+            "cause.$": "$.error.Cause"
+        },
+        "End": True
+    }
+    
+    states = {
+        "GenerateAll": {
+            "Type": "Map",
+            "ItemReader": {
+                "Resource": "arn:aws:states:::s3:getObject",
+                "ReaderConfig": {
+                    "InputType": "JSON"
+                },
                 "Parameters": {
-                    "FunctionName": lambda_arns['fetch-s3-data'],
-                    "Payload": {
-                        "bucket": BUCKET_NAME,
-                        "titleKey.$": "$.titleKey",
-                        "dataKey.$": "$.dataKey"
-                    }
+                    "Bucket.$": "$.bucket",
+                    "Key.$": "$.manifestKey"
+                }
+            },
+            "ItemSelector": {
+                "titleKey.$": "$$.Map.Item.Value.titleKey",
+                "dataKey.$": "$$.Map.Item.Value.dataKey",
+                "correlationId.$": "$.correlationId"
+            },
+            "ItemProcessor": {
+                "ProcessorConfig": {
+                    "Mode": "DISTRIBUTED",
+                    "ExecutionType": "STANDARD"
                 },
-                "ResultPath": "$.fetchResult",
-                "Next": "GenerateCurriculum"
+                "StartAt": "FetchS3Data",
+                "States": item_states
             },
-            "GenerateCurriculum": {
-                "Type": "Task",
-                "Resource": "arn:aws:states:::lambda:invoke",
+            "MaxConcurrency": max_concurrency,
+            "ResultWriter": {
+                "Resource": "arn:aws:states:::s3:putObject",
                 "Parameters": {
-                    "FunctionName": lambda_arns['generate-curriculum-kb'],
-                    "Payload": {
-                        "bucket": BUCKET_NAME,
-                        "titleKey.$": "$.titleKey",
-                        "title.$": "$.fetchResult.Payload.title",
-                        "data.$": "$.fetchResult.Payload.data",
-                        "modelId": BEDROCK_MODEL_ID
-                    }
-                },
-                "ResultPath": "$.generateResult",
-                "Next": "SaveCurriculum"
+                    "Bucket.$": "$.bucket",
+                    "Prefix": BATCH_RESULTS_PREFIX
+                }
             },
-            "SaveCurriculum": {
+            "End": True
+        }
+    }
+    
+    # ItemSelector가 항목마다 넘기는 correlationId를 입력에 없을 때도 채움
+    start_at = add_correlation_prologue(states, "GenerateAll", ("bucket", "manifestKey"))
+    return {
+        "Comment": "input/ 아래의 모든 title/data 쌍에 대한 일괄 커리큘럼 생성 워크플로우",
+        "StartAt": start_at,
+        "States": states
+    }
+
+def read_batch_results(output):
+    """
+    Distributed Map의 ResultWriter가 S3에 쓴 결과를 항목별 요약 목록으로 변환
+    
+    Args:
+        output (dict): 일괄 처리 실행의 출력 ({"ResultWriterDetails": {"Bucket", "Key"}, ...})
+    
+    Returns:
+        list: 항목별 요약 목록 (하위 실행 자체가 실패한 항목은 status가 FAILED인 요약으로 변환)
+    """
+    s3_client = get_client('s3')
+    details = output['ResultWriterDetails']
+    manifest = json.loads(s3_client.get_object(Bucket=details['Bucket'], Key=details['Key'])['Body'].read())
+    
+    summaries = []
+    for result_files in manifest['ResultFiles'].values():
+        for result_file in result_files:
+            response = s3_client.get_object(Bucket=manifest['DestinationBucket'], Key=result_file['Key'])
+            for result in json.loads(response['Body'].read()):
+                if result.get('Status') == 'SUCCEEDED':
+                    summaries.append(json.loads(result['Output']))
+                    continue
+                item = json.loads(result.get('Input') or '{}')
+                summaries.append({
+                    'titleKey': item.get('titleKey'),
+                    'dataKey': item.get('dataKey'),
+                    'status': 'FAILED',
+                    'error': result.get('Error'),
+                    'cause': result.get('Cause')
+                })
+    return summaries
+
+def _format_template(text):
+    """States.Format 템플릿의 문자열 상수로 쓸 수 있도록 특수 문자(\\, ', {, }) 이스케이프"""
+    for ch in ('\\', "'", '{', '}'):
+        text = text.replace(ch, '\\' + ch)
+    return text
+
+def build_direct_request_body(model_id, title_path, data_path, max_tokens=DIRECT_MAX_TOKENS):
+    """
+    bedrock:invokeModel 통합에 넘길 요청 본문 생성
+    
+    생성 Lambda와 같은 프롬프트/요청 형식(prompts.build_prompt, prompts.build_request_body)을 쓰고,
+    프롬프트 자리에는 제목과 데이터를 States.Format으로 채우는 식을 넣습니다.
+    
+    Args:
+        model_id (str): Bedrock 모델 ID
+        title_path (str): 제목 본문의 JSONPath
+        data_path (str): 데이터 본문의 JSONPath
+        max_tokens (int): 최대 출력 토큰 수
+    
+    Returns:
+        dict: 상태 정의에 넣을 요청 본문
+    """
+    # 자리 표시자로 프롬프트를 만든 뒤 States.Format 식으로 바꿈
+    title_marker, data_marker = '\x00TITLE\x00', '\x00DATA\x00'
+    prompt = build_prompt(title_marker, data_marker)
+    template = _format_template(prompt).replace(title_marker, '{}').replace(data_marker, '{}')
+    expression = f"States.Format('{template}', {title_path}, {data_path})"
+    
+    def substitute(value):
+        if isinstance(value, dict):
+            return {
+                (f"{key}.$" if item == prompt else key): (expression if item == prompt else substitute(item))
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [substitute(item) for item in value]
+        return value
+    
+    return substitute(build_request_body(model_id, prompt, max_tokens))
+
+def direct_result_path(model_id):
+    """bedrock:invokeModel 결과에서 생성된 텍스트의 JSONPath (지원하지 않는 모델이면 None)"""
+    if 'claude' in model_id.lower():
+        return "$.Body.content[0].text"
+    if 'titan' in model_id.lower():
+        return "$.Body.results[0].outputText"
+    return None
+
+def direct_usage_selector(model_id):
+    """bedrock:invokeModel 결과에서 토큰 사용량을 고르는 ResultSelector 항목 (Lambda의 usage.calls 항목과 같은 모양)"""
+    if 'claude' in model_id.lower():
+        input_path, output_path = "$.Body.usage.input_tokens", "$.Body.usage.output_tokens"
+    elif 'titan' in model_id.lower():
+        input_path, output_path = "$.Body.inputTextTokenCount", "$.Body.results[0].tokenCount"
+    else:
+        return {"modelId": model_id}
+    return {"modelId": model_id, "inputTokens.$": input_path, "outputTokens.$": output_path}
+
+def build_direct_definition(lambda_arns, knowledge_base_id=None, strategies=None,
+                            model_id=BEDROCK_MODEL_ID, region_name=None):
+    """
+    단계마다 Lambda 또는 직접 서비스 통합을 골라 쓰는 워크플로우 정의 생성
+    
+    - fetch: 'direct'이면 aws-sdk:s3:getObject로 제목/데이터 파일을 직접 읽음
+    - generate: 'direct'이면 bedrock:invokeModel로 모델을 직접 호출 (Knowledge Base 미사용 시에만)
+    - save: 'direct'이면 aws-sdk:s3:putObject로 실행 입력의 outputKey에 직접 저장
+    
+    어떤 조합이든 단계 사이에는 같은 모양($.fetched.title.Body, $.fetched.data.Body,
+    $.generated.curriculum, $.saveResult.Payload.outputKey)으로 값을 전달하므로 방식별로 비교할 수 있습니다.
+    직접 통합은 본문을 상태에 싣기 때문에 claim-check를 쓰지 않으며, 입력과 결과가 256KB 제한 안에 있어야 합니다.
+    
+    Args:
+        lambda_arns (dict): Lambda 함수 이름 -> ARN
+        knowledge_base_id (str, optional): Knowledge Base ID
+        strategies (dict, optional): 단계('fetch', 'generate', 'save') -> 'lambda' 또는 'direct'
+        model_id (str): 직접 호출할 Bedrock 모델 ID
+        region_name (str, optional): 모델 ARN을 만들 리전 (기본값: Step Functions 클라이언트 리전)
+    
+    Returns:
+        dict: 상태 머신 정의
+    """
+    strategies = dict(DEFAULT_STRATEGIES, **(strategies or {}))
+    if strategies['generate'] == 'direct' and knowledge_base_id:
+        print("Knowledge Base를 사용하는 생성 단계는 Lambda로 실행합니다.")
+        strategies['generate'] = 'lambda'
+    if strategies['generate'] == 'direct' and direct_result_path(model_id) is None:
+        print(f"모델 '{model_id}'의 응답 형식을 알 수 없어 생성 단계는 Lambda로 실행합니다.")
+        strategies['generate'] = 'lambda'
+    
+    states = {}
+    
+    # 1. 제목/데이터 읽기
+    if strategies['fetch'] == 'direct':
+        for name, key_path, next_state in (("FetchTitle", "$.titleKey", "FetchData"),
+                                           ("FetchData", "$.dataKey", "GenerateCurriculum")):
+            states[name] = {
                 "Type": "Task",
-                "Resource": "arn:aws:states:::lambda:invoke",
+                "Resource": "arn:aws:states:::aws-sdk:s3:getObject",
                 "Parameters": {
-                    "FunctionName": lambda_arns['save-curriculum'],
-                    "Payload": {
-                        "bucket": BUCKET_NAME,
-                        "curriculum.$": "$.generateResult.Payload.curriculum",
-                        "titleKey.$": "$.titleKey"
-                    }
+                    "Bucket": BUCKET_NAME,
+                    "Key.$": key_path
+                },
+                "ResultSelector": {
+                    "Body.$": "$.Body"
                 },
-                "ResultPath": "$.saveResult",
-                "End": True
+                "ResultPath": "$.fetched.title" if name == "FetchTitle" else "$.fetched.data",
+                "Next": next_state
             }
+        start_at = "FetchTitle"
+    else:
+        states["FetchS3Data"] = {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::lambda:invoke",
+            "Parameters": {
+                "FunctionName": lambda_arns['fetch-s3-data'],
+                "Payload": {
+                    "bucket": BUCKET_NAME,
+                    "titleKey.$": "$.titleKey",
+                    "dataKey.$": "$.dataKey"
+                }
+            },
+            "ResultSelector": {
+                "title": {"Body.$": "$.Payload.title"},
+                "data": {"Body.$": "$.Payload.data"}
+            },
+            "ResultPath": "$.fetched",
+            "Next": "GenerateCurriculum"
+        }
+        start_at = "FetchS3Data"
+    
+    # 2. 커리큘럼 생성
+    if strategies['generate'] == 'direct':
+        region_name = region_name or get_client('stepfunctions').meta.region_name
+        states["GenerateCurriculum"] = {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::bedrock:invokeModel",
+            "Parameters": {
+                "ModelId": f"arn:aws:bedrock:{region_name}::foundation-model/{model_id}",
+                "ContentType": "application/json",
+                "Accept": "application/json",
+                "Body": build_direct_request_body(model_id, "$.fetched.title.Body", "$.fetched.data.Body")
+            },
+            "ResultSelector": {
+                "curriculum.$": direct_result_path(model_id),
+                "usage": direct_usage_selector(model_id)
+            },
+            "ResultPath": "$.generated",
+            "Retry": [
+                {
+                    "ErrorEquals": ["Bedrock.ThrottlingException", "Bedrock.ServiceUnavailableException"],
+                    "IntervalSeconds": 2,
+                    "MaxAttempts": 3,
+                    "BackoffRate": 2.0
+                }
+            ],
+            "Next": "SaveCurriculum"
+        }
+    else:
+        generate_payload = {
+            "bucket": BUCKET_NAME,
+            "titleKey.$": "$.titleKey",
+            "dataKey.$": "$.dataKey",
+            "title.$": "$.fetched.title.Body",
+            "data.$": "$.fetched.data.Body",
+            "modelId": model_id
+        }
+        if knowledge_base_id:
+            generate_payload["knowledgeBaseId"] = knowledge_base_id
+        states["GenerateCurriculum"] = {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::lambda:invoke",
+            "Parameters": {
+                "FunctionName": lambda_arns['generate-curriculum-kb'],
+                "Payload": generate_payload
+            },
+            "ResultSelector": {
+                "curriculum.$": "$.Payload.curriculum",
+                "usage.$": "$.Payload.usage"
+            },
+            "ResultPath": "$.generated",
+            "Retry": GENERATION_RETRY,
+            "Next": "SaveCurriculum"
+        }
+    
+    # 3. 저장
+    if strategies['save'] == 'direct':
+        states["SaveCurriculum"] = {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::aws-sdk:s3:putObject",
+            "Parameters": {
+                "Bucket": BUCKET_NAME,
+                "Key.$": "$.outputKey",
+                "Body.$": "$.generated.curriculum",
+                "ContentType": "text/plain; charset=utf-8"
+            },
+            "ResultSelector": {
+                "ETag.$": "$.ETag"
+            },
+            "ResultPath": "$.saveResult",
+            "Next": "RecordOutput"
         }
+        # Lambda 방식과 같은 위치($.saveResult.Payload.outputKey)에 저장 위치 기록
+        states["RecordOutput"] = {
+            "Type": "Pass",
+            "Parameters": {
+                "bucket": BUCKET_NAME,
+                "outputKey.$": "$.outputKey"
+            },
+            "ResultPath": "$.saveResult.Payload",
+            "End": True
+        }
+    else:
+        states["SaveCurriculum"] = {
+            "Type": "Task",
+            "Resource": "arn:aws:states:::lambda:invoke",
+            "Parameters": {
+                "FunctionName": lambda_arns['save-curriculum'],
+                "Payload": {
+                    "bucket": BUCKET_NAME,
+                    "curriculum.$": "$.generated.curriculum",
+                    "titleKey.$": "$.titleKey"
+                }
+            },
+            "ResultPath": "$.saveResult",
+            "End": True
+        }
+    
+    add_correlation_id(states)
+    start_at = add_correlation_prologue(states, start_at, ("titleKey", "dataKey", "outputKey"))
+    return {
+        "Comment": "커리큘럼 생성 워크플로우 (단계별 방식: "
+                   + ", ".join(f"{step}={strategy}" for step, strategy in strategies.items()) + ")",
+        "StartAt": start_at,
+        "States": states
     }
+
+def list_input_pairs(prefix=INPUT_PREFIX):
+    """
+    prefix 아래의 title-*.txt 파일과 같은 이름의 data-*.txt 파일을 짝지어 반환
     
-    # Knowledge Base ID가 있으면 추가
-    if knowledge_base_id:
-        definition["States"]["GenerateCurriculum"]["Parameters"]["Payload"]["knowledgeBaseId"] = knowledge_base_id
+    Args:
+        prefix (str): 입력 파일 접두사
+    
+    Returns:
+        list: [{"titleKey": ..., "dataKey": ...}, ...] (titleKey 순 정렬)
+    """
+    keys = set()
+    paginator = get_client('s3').get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=BUCKET_NAME, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            keys.add(obj['Key'])
+    
+    pairs = []
+    for key in sorted(keys):
+        file_name = key[len(prefix):]
+        if '/' in file_name or not file_name.startswith('title-') or not file_name.endswith('.txt'):
+            continue
+        
+        data_key = f"{prefix}data-{file_name[6:]}"
+        if data_key in keys:
+            pairs.append({'titleKey': key, 'dataKey': data_key})
+        else:
+            print(f"데이터 파일이 없어 건너뜁니다: {key}")
+    
+    return pairs
+
+def create_step_function(title_key=None, knowledge_base_id=None, batch=False, max_concurrency=BATCH_MAX_CONCURRENCY,
+                         workflow_type='STANDARD'):
+    """
+    Step Function 워크플로우 생성
+    
+    Args:
+        title_key (str, optional): 상태 머신 이름을 만들 제목 파일 키
+        knowledge_base_id (str, optional): Knowledge Base ID
+        batch (bool): True이면 Distributed Map 기반 일괄 처리 상태 머신 생성
+        max_concurrency (int): 일괄 처리 시 동시에 처리할 최대 항목 수
+        workflow_type (str): 'STANDARD' 또는 'EXPRESS'. EXPRESS는 같은 정의를 이름에 '-Express'를 붙여 만들며,
+                             start_sync_execution으로 실행합니다 (최대 5분, 일괄 처리는 항상 STANDARD)
+    
+    Returns:
+        str: 상태 머신 ARN
+    """
+    
+    if batch and workflow_type != 'STANDARD':
+        print("일괄 처리 상태 머신은 STANDARD로만 생성합니다.")
+        workflow_type = 'STANDARD'
+    express = workflow_type == 'EXPRESS'
+    
+    global STEP_FUNCTION_ROLE_ARN
+    
+    # Step Function 실행 역할 생성 또는 가져오기
+    if not STEP_FUNCTION_ROLE_ARN:
+        STEP_FUNCTION_ROLE_ARN = create_step_function_role()
+    
+    # Lambda 함수 ARN 가져오기
+    lambda_arns = create_lambda_functions()
+    
+    # Knowledge Base ID 확인
+    if not knowledge_base_id:
+        knowledge_base_id = create_bedrock_resources()
+    
+    # Step Function 정의 생성
+    if batch:
+        definition = build_batch_definition(lambda_arns, knowledge_base_id, max_concurrency)
+        add_distributed_map_permissions(bucket_name=BUCKET_NAME)
+    else:
+        definition = build_workflow_definition(
+            lambda_arns,
+            knowledge_base_id,
+            curriculum_inline_bytes=EXPRESS_INLINE_CURRICULUM_BYTES if express else CLAIM_CHECK_INLINE_BYTES
+        )
     
     # Step Function 이름 생성
-    if title_key:
-        # title_key에서 파일명 추출 (예: input/title-A-20250331.txt -> A-20250331)
-        file_name = os.path.basename(title_key)
-        prefix = file_name.split('.')[0]
-        if prefix.startswith('title-'):
-            prefix = prefix[6:]  # 'title-' 제거
-        state_machine_name = f'CurriculumGenerator-{prefix}'
+    if batch:
+        state_machine_name = 'CurriculumGenerator-Batch'
     else:
+        state_machine_name = _state_machine_name(title_key)
+    
+    if express:
+        state_machine_name += EXPRESS_SUFFIX
+    
+    return _create_or_update_state_machine(state_machine_name, definition, workflow_type)
+
+def _state_machine_name(title_key):
+    """제목 파일 키로 상태 머신 이름 생성 (예: input/title-A-20250331.txt -> CurriculumGenerator-A-20250331)"""
+    if not title_key:
         # 기본 이름 사용
-        state_machine_name = f'CurriculumGenerator-{uuid.uuid4()}'
+        return f'CurriculumGenerator-{uuid.uuid4()}'
+    
+    # title_key에서 파일명 추출 (예: input/title-A-20250331.txt -> A-20250331)
+    file_name = os.path.basename(title_key)
+    prefix = file_name.split('.')[0]
+    if prefix.startswith('title-'):
+        prefix = prefix[6:]  # 'title-' 제거
+    return f'CurriculumGenerator-{prefix}'
+
+def _create_or_update_state_machine(state_machine_name, definition, workflow_type='STANDARD'):
+    """
+    같은 이름의 상태 머신이 있으면 정의를 업데이트하고, 없으면 새로 생성
     
+    Returns:
+        str: 상태 머신 ARN
+    """
     # 기존 Step Function 확인
     try:
         # 이름으로 Step Function 찾기
-        existing_state_machines = sfn_client.list_state_machines()
+        existing_state_machines = get_client('stepfunctions').list_state_machines()
         for machine in existing_state_machines['stateMachines']:
             if machine['name'] == state_machine_name:
                 # 기존 Step Function 업데이트
                 print(f"기존 Step Function '{state_machine_name}' 업데이트 중...")
-                response = sfn_client.update_state_machine(
+                response = get_client('stepfunctions').update_state_machine(
                     stateMachineArn=machine['stateMachineArn'],
                     definition=json.dumps(definition),
                     roleArn=STEP_FUNCTION_ROLE_ARN  # 새 역할 ARN 사용
@@ -172,23 +768,70 @@ def create_step_function(title_key=None, knowledge_base_id=None):
     
     # 새 Step Function 생성
     print(f"새 Step Function '{state_machine_name}' 생성 중...")
-    response = sfn_client.create_state_machine(
+    response = get_client('stepfunctions').create_state_machine(
         name=state_machine_name,
         definition=json.dumps(definition),
         roleArn=STEP_FUNCTION_ROLE_ARN,  # 새 역할 ARN 사용
-        type='STANDARD'
+        type=workflow_type
     )
     
     return response['stateMachineArn']
 
-def execute_workflow(title_key, data_key, state_machine_arn):
-    """워크플로우 실행"""
+def create_direct_step_function(title_key=None, knowledge_base_id=None, strategies=None, workflow_type='STANDARD'):
+    """
+    직접 서비스 통합을 사용하는 Step Function 워크플로우 생성
+    
+    create_step_function과 같은 이름에 '-Direct'를 붙여 만들며, 단계별 방식은 strategies로 고릅니다.
+    
+    Args:
+        title_key (str, optional): 상태 머신 이름을 만들 제목 파일 키
+        knowledge_base_id (str, optional): Knowledge Base ID
+        strategies (dict, optional): 단계('fetch', 'generate', 'save') -> 'lambda' 또는 'direct'
+                                     (기본값: DEFAULT_STRATEGIES)
+        workflow_type (str): 'STANDARD' 또는 'EXPRESS'
+    
+    Returns:
+        str: 상태 머신 ARN
+    """
+    
+    global STEP_FUNCTION_ROLE_ARN
+    
+    if not STEP_FUNCTION_ROLE_ARN:
+        STEP_FUNCTION_ROLE_ARN = create_step_function_role()
+    add_direct_integration_permissions(bucket_name=BUCKET_NAME)
+    
+    strategies = dict(DEFAULT_STRATEGIES, **(strategies or {}))
+    lambda_arns = create_lambda_functions() if 'lambda' in strategies.values() or knowledge_base_id else {}
+    
+    definition = build_direct_definition(lambda_arns, knowledge_base_id, strategies)
+    
+    state_machine_name = _state_machine_name(title_key) + DIRECT_SUFFIX
+    if workflow_type == 'EXPRESS':
+        state_machine_name += EXPRESS_SUFFIX
+    
+    return _create_or_update_state_machine(state_machine_name, definition, workflow_type)
+
+def execute_workflow(title_key, data_key, state_machine_arn, sync=False):
+    """
+    워크플로우 실행
+    
+    Args:
+        title_key (str): 제목 파일 키
+        data_key (str): 데이터 파일 키
+        state_machine_arn (str): 상태 머신 ARN
+        sync (bool): True이면 EXPRESS 상태 머신을 start_sync_execution으로 실행 (폴링 없음)
+    
+    Returns:
+        str: 실행 ARN
+    """
     
     # Step Function 실행
     execution_input = {
         'bucket': BUCKET_NAME,
         'titleKey': title_key,
-        'dataKey': data_key
+        'dataKey': data_key,
+        'outputKey': build_output_key(title_key),  # 직접 통합 저장 단계(aws-sdk:s3:putObject)가 사용
+        'correlationId': uuid.uuid4().hex  # 모든 Lambda의 지표 레코드에 기록되는 상관관계 ID
     }
     
     # 실행 이름 생성 (title_key에서 파생)
@@ -199,59 +842,168 @@ def execute_workflow(title_key, data_key, state_machine_arn):
     
     execution_name = f'Execution-{prefix}-{datetime.now().strftime("%Y%m%d%H%M%S")}'
     
-    response = sfn_client.start_execution(
+    if sync:
+        # 동기 실행: 실행이 끝나면 응답으로 결과를 받음
+        print(f"Step Function 동기 실행 시작: {execution_name}")
+        execution = run_sync_execution(get_client('stepfunctions'), state_machine_arn, execution_input, execution_name)
+        execution_arn = execution['executionArn']
+        print(f"실행 ARN: {execution_arn}")
+    else:
+        response = get_client('stepfunctions').start_execution(
+            stateMachineArn=state_machine_arn,
+            name=execution_name,
+            input=json.dumps(execution_input)
+        )
+        
+        execution_arn = response['executionArn']
+        print(f"Step Function 실행 시작: {execution_name}")
+        print(f"실행 ARN: {execution_arn}")
+        
+        # 실행 완료 대기
+        print("Step Function 실행 완료 대기 중...")
+        execution = wait_for_execution(get_client('stepfunctions'), execution_arn)
+    status = execution['status']
+    
+    if status == 'SUCCEEDED':
+        print(f"Step Function 실행 완료! (소요 시간: {execution['wallTime']:.1f}초)")
+        output = json.loads(execution['output'])
+        cost_ledger.record_execution(execution_arn, title_key, output, execution['wallTime'], execution_input['correlationId'])
+        save_result = output.get('saveResult', {}).get('Payload', {})
+        output_key = save_result.get('outputKey', '')
+        
+        if output_key:
+            print(f"커리큘럼이 S3에 저장되었습니다: s3://{BUCKET_NAME}/{output_key}")
+            
+            # 저장된 파일 내용 출력 (선택 사항)
+            try:
+                s3_response = get_client('s3').get_object(Bucket=BUCKET_NAME, Key=output_key)
+                curriculum_content = s3_response['Body'].read().decode('utf-8')
+                print("\n=== 생성된 커리큘럼 ===")
+                print(curriculum_content[:500] + "..." if len(curriculum_content) > 500 else curriculum_content)
+                print("=== 커리큘럼 끝 ===\n")
+            except Exception as e:
+                print(f"저장된 파일 읽기 실패: {str(e)}")
+        else:
+            print("저장된 파일 정보를 찾을 수 없습니다.")
+    else:
+        print(f"Step Function 실행 실패: {status}")
+        if execution.get('error') and execution.get('cause'):
+            print(f"오류: {execution['error']}")
+            print(f"원인: {execution['cause']}")
+        
+        # 실패/시간 초과/중단된 실행도 마지막으로 성공한 상태까지 쓴 토큰을 장부에 기록
+        cost_ledger.record_execution(execution_arn, title_key, None, execution['wallTime'],
+                                     execution_input['correlationId'], status=status,
+                                     calls=cost_ledger.usage_from_history(execution_arn))
+    
+    return execution_arn
+
+def execute_batch_workflow(state_machine_arn, pairs=None):
+    """
+    일괄 처리 워크플로우 실행
+    
+    Args:
+        state_machine_arn (str): build_batch_definition으로 만든 상태 머신 ARN
+        pairs (list, optional): 처리할 {"titleKey", "dataKey"} 목록. 지정하지 않으면 INPUT_PREFIX 아래를 모두 처리
+    
+    Returns:
+        list: 항목별 요약 목록 (실행 실패 시 빈 목록)
+    """
+    if pairs is None:
+        pairs = list_input_pairs()
+    
+    if not pairs:
+        print("처리할 title/data 쌍이 없습니다.")
+        return []
+    
+    # 항목 목록을 매니페스트로 저장 (Distributed Map의 ItemReader가 직접 읽음)
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    manifest_key = f"{BATCH_PREFIX}manifest-{timestamp}.json"
+    get_client('s3').put_object(
+        Bucket=BUCKET_NAME,
+        Key=manifest_key,
+        Body=json.dumps(pairs, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json; charset=utf-8'
+    )
+    print(f"{len(pairs)}개 항목의 매니페스트 저장: s3://{BUCKET_NAME}/{manifest_key}")
+    
+    execution_name = f'Batch-{timestamp}'
+    correlation_id = uuid.uuid4().hex
+    response = get_client('stepfunctions').start_execution(
         stateMachineArn=state_machine_arn,
         name=execution_name,
-        input=json.dumps(execution_input)
+        input=json.dumps({
+            'bucket': BUCKET_NAME,
+            'manifestKey': manifest_key,
+            'correlationId': correlation_id
+        })
     )
     
     execution_arn = response['executionArn']
-    print(f"Step Function 실행 시작: {execution_name}")
+    print(f"일괄 처리 실행 시작: {execution_name}")
     print(f"실행 ARN: {execution_arn}")
     
     # 실행 완료 대기
-    print("Step Function 실행 완료 대기 중...")
+    execution = wait_for_execution(get_client('stepfunctions'), execution_arn, max_interval=30.0)
+    status = execution['status']
+    
+    if status != 'SUCCEEDED':
+        print(f"일괄 처리 실행 실패: {status}")
+        if execution.get('error') and execution.get('cause'):
+            print(f"오류: {execution['error']}")
+            print(f"원인: {execution['cause']}")
+        return []
+    
+    summaries = read_batch_results(json.loads(execution['output']))
+    succeeded = sum(1 for summary in summaries if summary.get('status') == 'SUCCEEDED')
+    print(f"일괄 처리 완료: {succeeded}/{len(summaries)}개 성공 (소요 시간: {execution['wallTime']:.1f}초)")
+    for index, summary in enumerate(summaries):
+        if summary.get('status') == 'SUCCEEDED':
+            print(f"  [성공] {summary['titleKey']} -> {summary['outputKey']}")
+            # 항목마다 장부 항목 하나 (ledger/<날짜>/Batch-<시각>-<순번>.json)
+            cost_ledger.record_execution(execution_arn, summary['titleKey'], summary, correlation_id=correlation_id,
+                                         entry_name=f"{execution_name}-{index:04d}")
+        else:
+            print(f"  [실패] {summary['titleKey']}: {summary.get('error')}")
+    
+    return summaries
+
+def run_batch(max_concurrency=BATCH_MAX_CONCURRENCY):
+    """INPUT_PREFIX 아래의 모든 title/data 쌍을 한 번의 실행으로 처리"""
+    
+    print("=== 일괄 커리큘럼 생성 워크플로우 시작 ===")
     
-    while True:
-        execution = sfn_client.describe_execution(executionArn=execution_arn)
-        status = execution['status']
+    try:
+        print("\n1. 입력 파일 목록 확인 중...")
+        pairs = list_input_pairs()
+        print(f"{len(pairs)}개의 title/data 쌍을 찾았습니다.")
         
-        if status == 'SUCCEEDED':
-            print("Step Function 실행 완료!")
-            output = json.loads(execution['output'])
-            save_result = output.get('saveResult', {}).get('Payload', {})
-            output_key = save_result.get('outputKey', '')
-            
-            if output_key:
-                print(f"커리큘럼이 S3에 저장되었습니다: s3://{BUCKET_NAME}/{output_key}")
-                
-                # 저장된 파일 내용 출력 (선택 사항)
-                try:
-                    s3_response = s3_client.get_object(Bucket=BUCKET_NAME, Key=output_key)
-                    curriculum_content = s3_response['Body'].read().decode('utf-8')
-                    print("\n=== 생성된 커리큘럼 ===")
-                    print(curriculum_content[:500] + "..." if len(curriculum_content) > 500 else curriculum_content)
-                    print("=== 커리큘럼 끝 ===\n")
-                except Exception as e:
-                    print(f"저장된 파일 읽기 실패: {str(e)}")
-            else:
-                print("저장된 파일 정보를 찾을 수 없습니다.")
-            
-            break
-        elif status in ['FAILED', 'TIMED_OUT', 'ABORTED']:
-            print(f"Step Function 실행 실패: {status}")
-            if 'error' in execution and 'cause' in execution:
-                print(f"오류: {execution['error']}")
-                print(f"원인: {execution['cause']}")
-            break
+        print("\n2. 일괄 처리 Step Function 생성 중...")
+        state_machine_arn = create_step_function(batch=True, max_concurrency=max_concurrency)
+        print(f"Step Function ARN: {state_machine_arn}")
         
-        print(f"현재 상태: {status}. 5초 후 다시 확인...")
-        time.sleep(5)
+        print("\n3. 일괄 처리 실행 중...")
+        summaries = execute_batch_workflow(state_machine_arn, pairs)
+        
+        print("\n=== 일괄 커리큘럼 생성 워크플로우 완료 ===")
+        return summaries
     
-    return execution_arn
+    except Exception as e:
+        print(f"\n오류 발생: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        print("\n=== 일괄 커리큘럼 생성 워크플로우 실패 ===")
+        return []
 
-def main():
-    """메인 함수"""
+def main(sync=False, direct=False, strategies=None):
+    """
+    메인 함수
+    
+    Args:
+        sync (bool): True이면 EXPRESS 상태 머신을 만들어 동기 실행
+        direct (bool): True이면 직접 서비스 통합 워크플로우(create_direct_step_function) 사용
+        strategies (dict, optional): direct일 때 단계별 방식 ('fetch', 'generate', 'save' -> 'lambda' 또는 'direct')
+    """
     
     print("=== 커리큘럼 생성 워크플로우 시작 ===")
     
@@ -280,7 +1032,11 @@ def main():
             
             # 3. Step Function 생성
             print("\n3. Step Function 워크플로우 생성 중...")
-            state_machine_arn = create_step_function(title_key, knowledge_base_id)
+            workflow_type = 'EXPRESS' if sync else 'STANDARD'
+            if direct:
+                state_machine_arn = create_direct_step_function(title_key, knowledge_base_id, strategies, workflow_type)
+            else:
+                state_machine_arn = create_step_function(title_key, knowledge_base_id, workflow_type=workflow_type)
             print(f"Step Function ARN: {state_machine_arn}")
         else:
             # 기존 Step Function 찾기
@@ -289,7 +1045,7 @@ def main():
         
         # 4. 워크플로우 실행
         print("\n4. 워크플로우 실행 중...")
-        execution_arn = execute_workflow(title_key, data_key, state_machine_arn)
+        execution_arn = execute_workflow(title_key, data_key, state_machine_arn, sync)
         print(f"실행 완료. 실행 ARN: {execution_arn}")
         
         print("\n=== 커리큘럼 생성 워크플로우 완료 ===")
@@ -301,4 +1057,19 @@ def main():
         print("\n=== 커리큘럼 생성 워크플로우 실패 ===")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='커리큘럼 생성 워크플로우')
+    parser.add_argument('--batch', action='store_true', help='input/ 아래의 모든 title/data 쌍을 일괄 처리')
+    parser.add_argument('--max-concurrency', type=int, default=BATCH_MAX_CONCURRENCY, help='일괄 처리 최대 동시 실행 수')
+    parser.add_argument('--sync', action='store_true', help='EXPRESS 상태 머신을 만들어 동기 실행 (폴링 없이 결과 수신)')
+    parser.add_argument('--direct', action='store_true', help='S3/Bedrock 직접 서비스 통합 워크플로우 사용')
+    parser.add_argument('--strategies', default='',
+                        help='--direct일 때 단계별 방식 (예: fetch=direct,generate=lambda,save=direct)')
+    
+    args = parser.parse_args()
+    
+    strategies = dict(item.split('=', 1) for item in args.strategies.split(',') if item)
+    
+    if args.batch:
+        run_batch(args.max_concurrency)
+    else:
+        main(args.sync, args.direct, strategies) 
\ No newline at end of file
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Step Function 실행 완료 대기 모듈
+
+여러 실행 ARN을 한 번에 추적하면서 완료를 기다립니다.
+- 상태 머신별로 list_executions(statusFilter='RUNNING')를 한 번 호출해 여러 실행을 일괄 확인
+- 적응형 백오프 + 지터로 확인 간격 조절 (완료가 감지되면 간격을 다시 줄임)
+- 알림 소스(EventBridge → SQS 등)나 콜백(notify)으로 받은 완료 이벤트를 우선 사용하고,
+  알림이 없으면 폴링으로 대체
+- 실행별 소요 시간(wall time) 제공
+- EXPRESS 상태 머신은 start_sync_execution으로 폴링 없이 결과를 받음 (run_sync_execution)
+"""
+
+import json
+import random
+import time
+
+TERMINAL_STATUSES = ('SUCCEEDED', 'FAILED', 'TIMED_OUT', 'ABORTED')
+
+
+def state_machine_arn_from_execution(execution_arn):
+    """
+    실행 ARN에서 상태 머신 ARN 추출
+
+    예: arn:aws:states:us-west-2:123:execution:Machine:Exec -> arn:aws:states:us-west-2:123:stateMachine:Machine
+    """
+    parts = execution_arn.split(':')
+    if len(parts) < 8 or parts[5] not in ('execution', 'express'):
+        return None
+    return ':'.join(parts[:5] + ['stateMachine', parts[6]])
+
+
+class SqsNotificationSource:
+    """
+    EventBridge 'Step Functions Execution Status Change' 이벤트가 전달되는 SQS 큐에서 완료 알림을 읽는 소스
+
+    추적 중인 실행의 메시지만 삭제하고, 다른 실행의 메시지는 큐에 남겨 두어(가시성 시간 초과 후 다시 보임)
+    같은 큐를 쓰는 다른 대기자가 받을 수 있게 합니다.
+
+    Attributes:
+        sqs_client: AWS SQS 클라이언트
+        queue_url: 이벤트가 전달되는 큐 URL
+    """
+
+    def __init__(self, sqs_client, queue_url):
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+
+    def poll(self, timeout, execution_arns=None):
+        """
+        최대 timeout초 동안 완료 이벤트를 기다려 반환
+
+        Args:
+            timeout (float): 최대 대기 시간(초)
+            execution_arns (iterable, optional): 추적 중인 실행 ARN (지정하지 않으면 모든 메시지를 처리하고 삭제)
+
+        Returns:
+            list: [{'executionArn', 'status', 'output', 'error', 'cause', 'startDate', 'stopDate'}, ...]
+        """
+        response = self.sqs_client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=max(0, min(20, int(timeout)))
+        )
+
+        tracked = set(execution_arns) if execution_arns is not None else None
+        events = []
+        for message in response.get('Messages', []):
+            try:
+                detail = json.loads(message['Body']).get('detail', {})
+            except (ValueError, AttributeError) as e:
+                print(f"알림 메시지 파싱 실패: {str(e)}")
+                continue
+            if not isinstance(detail, dict):
+                continue
+
+            # 다른 대기자의 실행에 대한 메시지는 삭제하지 않음
+            if tracked is not None and detail.get('executionArn') not in tracked:
+                continue
+
+            if detail.get('executionArn') and detail.get('status') in TERMINAL_STATUSES:
+                events.append({
+                    'executionArn': detail['executionArn'],
+                    'status': detail['status'],
+                    'output': detail.get('output'),
+                    'error': detail.get('error'),
+                    'cause': detail.get('cause'),
+                    'startDate': detail.get('startDate'),
+                    'stopDate': detail.get('stopDate')
+                })
+
+            self.sqs_client.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message['ReceiptHandle'])
+
+        return events
+
+
+class ExecutionWaiter:
+    """
+    여러 Step Function 실행의 완료를 기다리는 클래스
+
+    Attributes:
+        sfn_client: AWS Step Functions 클라이언트 (테스트 시 가짜 클라이언트 사용 가능)
+        notification_source: poll(timeout, execution_arns) 메서드를 가진 완료 알림 소스 (선택 사항)
+        min_interval: 최소 확인 간격(초)
+        max_interval: 최대 확인 간격(초)
+        backoff_rate: 변화가 없을 때 확인 간격 증가 비율
+    """
+
+    def __init__(self, sfn_client, notification_source=None, min_interval=0.5, max_interval=10.0,
+                 backoff_rate=1.5, sleep=time.sleep, clock=time.monotonic):
+        self.sfn_client = sfn_client
+        self.notification_source = notification_source
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_rate = backoff_rate
+        self._sleep = sleep
+        self._clock = clock
+        self._pending = {}
+        self._results = {}
+        self._notified = []
+
+    def track(self, execution_arn):
+        """완료를 기다릴 실행 ARN 추가"""
+        if execution_arn not in self._results:
+            self._pending.setdefault(execution_arn, self._clock())
+
+    def notify(self, execution_arn, status, output=None, error=None, cause=None):
+        """콜백(태스크 토큰 응답 등)으로 받은 완료 정보 전달"""
+        self._notified.append({
+            'executionArn': execution_arn,
+            'status': status,
+            'output': output,
+            'error': error,
+            'cause': cause
+        })
+
+    def wall_time(self, execution_arn):
+        """완료된 실행의 소요 시간(초). 아직 완료되지 않았으면 None"""
+        result = self._results.get(execution_arn)
+        return result['wallTime'] if result else None
+
+    def wait(self, execution_arns=None, timeout=None, on_complete=None):
+        """
+        추적 중인 모든 실행이 완료될 때까지 대기
+
+        Args:
+            execution_arns (list, optional): 추가로 추적할 실행 ARN 목록
+            timeout (float, optional): 최대 대기 시간(초). 초과하면 완료된 것만 반환
+            on_complete (callable, optional): 실행이 완료될 때마다 결과 dict로 호출
+
+        Returns:
+            dict: 실행 ARN -> {'status', 'output', 'error', 'cause', 'wallTime'}
+        """
+        for execution_arn in execution_arns or []:
+            self.track(execution_arn)
+
+        start_time = self._clock()
+        interval = self.min_interval
+
+        while self._pending:
+            finished = self._drain_notifications()
+            if not finished:
+                finished = self._poll()
+
+            for execution_arn in finished:
+                if on_complete:
+                    on_complete(self._results[execution_arn])
+
+            if not self._pending:
+                break
+
+            if timeout is not None and self._clock() - start_time >= timeout:
+                print(f"최대 대기 시간({timeout}초)이 초과되었습니다. {len(self._pending)}개 실행이 아직 진행 중입니다.")
+                break
+
+            # 완료가 감지되면 간격을 줄이고, 변화가 없으면 점진적으로 늘림
+            if finished:
+                interval = self.min_interval
+            else:
+                interval = min(self.max_interval, interval * self.backoff_rate)
+
+            delay = random.uniform(self.min_interval, interval)
+            if self.notification_source:
+                events = self.notification_source.poll(delay, list(self._pending))
+                self._notified.extend(events)
+            else:
+                self._sleep(delay)
+
+        return {arn: self._results[arn] for arn in execution_arns or self._results if arn in self._results}
+
+    def _drain_notifications(self):
+        """알림으로 받은 완료 이벤트 처리"""
+        finished = []
+        notified, self._notified = self._notified, []
+
+        for event in notified:
+            execution_arn = event['executionArn']
+            if execution_arn not in self._pending:
+                continue
+
+            if event.get('output') is None and event['status'] == 'SUCCEEDED':
+                # 알림에 출력이 없으면 (EventBridge는 큰 출력을 생략함) 직접 조회
+                self._complete(execution_arn, self.sfn_client.describe_execution(executionArn=execution_arn))
+            else:
+                self._complete(execution_arn, event)
+            finished.append(execution_arn)
+
+        return finished
+
+    def _poll(self):
+        """상태 머신별로 실행 중인 목록을 일괄 조회하여 완료된 실행 확인"""
+        finished = []
+        groups = {}
+        for execution_arn in self._pending:
+            groups.setdefault(state_machine_arn_from_execution(execution_arn), []).append(execution_arn)
+
+        for state_machine_arn, execution_arns in groups.items():
+            running = self._list_running(state_machine_arn) if len(execution_arns) > 1 else None
+
+            for execution_arn in execution_arns:
+                if running is not None and execution_arn in running:
+                    continue
+
+                execution = self.sfn_client.describe_execution(executionArn=execution_arn)
+                if execution['status'] in TERMINAL_STATUSES:
+                    self._complete(execution_arn, execution)
+                    finished.append(execution_arn)
+
+        return finished
+
+    def _list_running(self, state_machine_arn):
+        """상태 머신의 실행 중인 실행 ARN 집합. 조회할 수 없으면 None (Express 등)"""
+        if not state_machine_arn:
+            return None
+
+        running = set()
+        try:
+            paginator = self.sfn_client.get_paginator('list_executions')
+            for page in paginator.paginate(stateMachineArn=state_machine_arn, statusFilter='RUNNING'):
+                for execution in page['executions']:
+                    running.add(execution['executionArn'])
+        except Exception as e:
+            print(f"실행 목록 조회 실패, 개별 조회로 대체합니다: {str(e)}")
+            return None
+
+        return running
+
+    def _complete(self, execution_arn, execution):
+        """완료된 실행 결과 기록"""
+        start_date = execution.get('startDate')
+        stop_date = execution.get('stopDate')
+        if hasattr(start_date, 'timestamp') and hasattr(stop_date, 'timestamp'):
+            wall_time = stop_date.timestamp() - start_date.timestamp()
+        else:
+            wall_time = self._clock() - self._pending[execution_arn]
+
+        self._results[execution_arn] = {
+            'executionArn': execution_arn,
+            'status': execution['status'],
+            'output': execution.get('output'),
+            'error': execution.get('error'),
+            'cause': execution.get('cause'),
+            'wallTime': wall_time
+        }
+        del self._pending[execution_arn]
+
+
+def wait_for_execution(sfn_client, execution_arn, timeout=None, **kwargs):
+    """
+    단일 실행의 완료 대기 (유틸리티 함수)
+
+    Returns:
+        dict: {'status', 'output', 'error', 'cause', 'wallTime'}
+    """
+    waiter = ExecutionWaiter(sfn_client, **kwargs)
+    return waiter.wait([execution_arn], timeout=timeout).get(execution_arn)
+
+
+def run_sync_execution(sfn_client, state_machine_arn, execution_input, name=None):
+    """
+    EXPRESS 상태 머신을 동기 실행하고 결과 반환 (폴링 없음)
+
+    start_sync_execution은 실행이 끝날 때 응답하므로 wait_for_execution과 같은 형식의 결과를 바로 만듭니다.
+
+    Args:
+        sfn_client: AWS Step Functions 클라이언트
+        state_machine_arn (str): EXPRESS 상태 머신 ARN
+        execution_input (dict): 실행 입력
+        name (str, optional): 실행 이름
+
+    Returns:
+        dict: {'executionArn', 'status', 'output', 'error', 'cause', 'wallTime', 'billedDuration'}
+    """
+    params = {'stateMachineArn': state_machine_arn, 'input': json.dumps(execution_input)}
+    if name:
+        params['name'] = name
+
+    start = time.monotonic()
+    response = sfn_client.start_sync_execution(**params)
+    billing = response.get('billingDetails', {})
+    return {
+        'executionArn': response.get('executionArn'),
+        'status': response['status'],
+        'output': response.get('output'),
+        'error': response.get('error'),
+        'cause': response.get('cause'),
+        'wallTime': time.monotonic() - start,
+        'billedDuration': billing.get('billedDurationInMilliseconds')
+    }
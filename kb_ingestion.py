@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Knowledge Base 증분 수집(ingestion) 관리
+
+데이터 소스 접두사(input/) 아래 모든 객체의 ETag/크기/수정 시각을 매니페스트로 S3에 저장해 두고,
+마지막 동기화 이후 바뀐 객체가 있을 때만 start_ingestion_job을 호출합니다.
+
+- 업로드가 몰리는 동안에는 목록이 quiet_seconds 동안 바뀌지 않을 때까지 기다렸다가 작업 하나로 묶습니다.
+- 이미 실행 중인 수집 작업이 있으면 새로 시작하지 않고 그 작업이 끝난 뒤 다시 비교합니다.
+- 매니페스트는 작업이 COMPLETE로 끝난 뒤에만 작업 시작 시점의 목록으로 갱신하므로,
+  수집 중에 올라온 파일이나 실패한 작업의 변경 사항은 다음 동기화에서 다시 반영됩니다.
+
+사용 예:
+    python kb_ingestion.py sync
+    python kb_ingestion.py sync --quiet-seconds 60 --max-wait 600
+    python kb_ingestion.py diff
+    python kb_ingestion.py status --job-id ABCDEFGHIJ
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+from aws_clients import get_client  # noqa: E402
+from create_bedrock_role import get_knowledge_base_id  # noqa: E402
+
+# 환경 설정
+BUCKET_NAME = 'curriculum-bucket-20250331'
+DATA_SOURCE_PREFIX = 'input/'  # create_bedrock_resources의 inclusionPrefixes와 같은 값
+KB_NAME = 'curriculum-knowledge-base'
+MANIFEST_KEY = 'kb-ingestion/manifest.json'
+QUIET_SECONDS = 30.0  # 이 시간 동안 목록이 바뀌지 않아야 수집 시작 (업로드 묶음 처리)
+MAX_COALESCE_SECONDS = 300.0  # 업로드가 계속되더라도 이 시간이 지나면 수집 시작
+ACTIVE_JOB_STATUSES = ('STARTING', 'IN_PROGRESS', 'STOPPING')
+TERMINAL_JOB_STATUSES = ('COMPLETE', 'FAILED', 'STOPPED')
+FAILED_JOB_STATUSES = ('FAILED', 'STOPPED')
+
+
+def snapshot(prefix=DATA_SOURCE_PREFIX, bucket=BUCKET_NAME):
+    """
+    접두사 아래 객체 목록 조회
+
+    Returns:
+        dict: 키 -> {'etag', 'size', 'lastModified'}
+    """
+    objects = {}
+    paginator = get_client('s3').get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            if obj['Key'].endswith('/'):
+                continue
+            last_modified = obj.get('LastModified')
+            objects[obj['Key']] = {
+                'etag': obj['ETag'].strip('"'),
+                'size': obj['Size'],
+                'lastModified': last_modified.isoformat() if last_modified else None
+            }
+    return objects
+
+
+def diff_manifest(previous, current):
+    """
+    두 매니페스트의 차이 계산
+
+    내용이 같으면 다시 올린 객체(수정 시각만 바뀐 경우)는 변경으로 보지 않습니다.
+
+    Args:
+        previous (dict): 이전 매니페스트의 objects
+        current (dict): 현재 목록
+
+    Returns:
+        dict: {'added', 'modified', 'deleted'} (각각 정렬된 키 목록)
+    """
+    added = sorted(key for key in current if key not in previous)
+    deleted = sorted(key for key in previous if key not in current)
+    modified = sorted(
+        key for key in current
+        if key in previous and (current[key]['etag'], current[key]['size'])
+        != (previous[key]['etag'], previous[key]['size'])
+    )
+    return {'added': added, 'modified': modified, 'deleted': deleted}
+
+
+def has_changes(delta):
+    return any(delta[name] for name in ('added', 'modified', 'deleted'))
+
+
+def summarize_delta(delta):
+    return f"추가 {len(delta['added'])}개, 수정 {len(delta['modified'])}개, 삭제 {len(delta['deleted'])}개"
+
+
+def load_manifest(bucket=BUCKET_NAME, key=MANIFEST_KEY):
+    """
+    마지막으로 수집에 성공한 매니페스트 로드
+
+    Returns:
+        dict: {'objects', 'ingestionJobId', 'syncedAt'} (없으면 objects가 빈 매니페스트)
+    """
+    s3_client = get_client('s3')
+    try:
+        body = s3_client.get_object(Bucket=bucket, Key=key)['Body'].read()
+    except s3_client.exceptions.NoSuchKey:
+        return {'objects': {}, 'ingestionJobId': None, 'syncedAt': None}
+    return json.loads(body.decode('utf-8'))
+
+
+def save_manifest(objects, ingestion_job_id, bucket=BUCKET_NAME, key=MANIFEST_KEY):
+    manifest = {
+        'objects': objects,
+        'ingestionJobId': ingestion_job_id,
+        'syncedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+    get_client('s3').put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps(manifest, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json; charset=utf-8'
+    )
+    return manifest
+
+
+def wait_for_quiet(previous_objects, prefix=DATA_SOURCE_PREFIX, bucket=BUCKET_NAME, quiet_seconds=QUIET_SECONDS,
+                   max_wait=MAX_COALESCE_SECONDS, sleep=time.sleep, clock=time.monotonic):
+    """
+    업로드가 잠잠해질 때까지 기다린 뒤의 목록 반환
+
+    목록이 quiet_seconds 동안 바뀌지 않거나 max_wait이 지나면 반환합니다.
+    변경 사항이 없으면 기다리지 않고 바로 반환합니다.
+
+    Returns:
+        dict: 현재 목록
+    """
+    current = snapshot(prefix, bucket)
+    if quiet_seconds <= 0 or not has_changes(diff_manifest(previous_objects, current)):
+        return current
+
+    start_time = clock()
+    while clock() - start_time < max_wait:
+        sleep(quiet_seconds)
+        latest = snapshot(prefix, bucket)
+        if latest == current:
+            return latest
+        print(f"업로드가 계속되고 있습니다: {summarize_delta(diff_manifest(current, latest))}")
+        current = latest
+    print(f"최대 대기 시간({max_wait}초)이 지나 현재 목록으로 수집을 시작합니다.")
+    return current
+
+
+def get_data_source_id(knowledge_base_id, prefix=DATA_SOURCE_PREFIX):
+    """
+    Knowledge Base의 S3 데이터 소스 ID 조회 (접두사가 일치하는 데이터 소스 우선)
+
+    Returns:
+        str: 데이터 소스 ID (없으면 None)
+    """
+    agent_client = get_client('bedrock-agent')
+    data_sources = agent_client.list_data_sources(knowledgeBaseId=knowledge_base_id)['dataSourceSummaries']
+    for summary in data_sources:
+        data_source = agent_client.get_data_source(
+            knowledgeBaseId=knowledge_base_id,
+            dataSourceId=summary['dataSourceId']
+        )['dataSource']
+        s3_config = data_source.get('dataSourceConfiguration', {}).get('s3Configuration', {})
+        if prefix in s3_config.get('inclusionPrefixes', [prefix]):
+            return summary['dataSourceId']
+    return data_sources[0]['dataSourceId'] if data_sources else None
+
+
+def find_active_job(knowledge_base_id, data_source_id):
+    """실행 중인 수집 작업 ID (없으면 None)"""
+    response = get_client('bedrock-agent').list_ingestion_jobs(
+        knowledgeBaseId=knowledge_base_id,
+        dataSourceId=data_source_id,
+        filters=[{'attribute': 'STATUS', 'operator': 'EQ', 'values': list(ACTIVE_JOB_STATUSES)}],
+        maxResults=10
+    )
+    jobs = response.get('ingestionJobSummaries', [])
+    return jobs[0]['ingestionJobId'] if jobs else None
+
+
+def find_last_failed_job(knowledge_base_id, data_source_id):
+    """가장 최근에 실패하거나 중단된 수집 작업 ID (없으면 None)"""
+    response = get_client('bedrock-agent').list_ingestion_jobs(
+        knowledgeBaseId=knowledge_base_id,
+        dataSourceId=data_source_id,
+        filters=[{'attribute': 'STATUS', 'operator': 'EQ', 'values': list(FAILED_JOB_STATUSES)}],
+        sortBy={'attribute': 'STARTED_AT', 'order': 'DESCENDING'},
+        maxResults=1
+    )
+    jobs = response.get('ingestionJobSummaries', [])
+    return jobs[0]['ingestionJobId'] if jobs else None
+
+
+def format_statistics(statistics):
+    return (f"스캔 {statistics.get('numberOfDocumentsScanned', 0)}개, "
+            f"신규 {statistics.get('numberOfNewDocumentsIndexed', 0)}개, "
+            f"수정 {statistics.get('numberOfModifiedDocumentsIndexed', 0)}개, "
+            f"삭제 {statistics.get('numberOfDocumentsDeleted', 0)}개, "
+            f"실패 {statistics.get('numberOfDocumentsFailed', 0)}개")
+
+
+def wait_for_ingestion(knowledge_base_id, data_source_id, ingestion_job_id, min_interval=5.0, max_interval=60.0,
+                       backoff_rate=1.5, timeout=None, sleep=time.sleep, clock=time.monotonic):
+    """
+    수집 작업이 끝날 때까지 대기하며 진행 통계 출력
+
+    상태나 통계가 바뀌지 않으면 확인 간격을 max_interval까지 늘리고, 바뀌면 다시 min_interval부터 확인합니다.
+
+    Returns:
+        dict: 마지막 ingestionJob (timeout을 넘기면 진행 중인 상태)
+    """
+    agent_client = get_client('bedrock-agent')
+    start_time = clock()
+    interval = min_interval
+    last_progress = None
+    while True:
+        job = agent_client.get_ingestion_job(
+            knowledgeBaseId=knowledge_base_id,
+            dataSourceId=data_source_id,
+            ingestionJobId=ingestion_job_id
+        )['ingestionJob']
+        progress = (job['status'], json.dumps(job.get('statistics', {}), sort_keys=True))
+        if progress != last_progress:
+            print(f"[{clock() - start_time:6.1f}초] 수집 작업 {job['status']}: {format_statistics(job.get('statistics', {}))}")
+            last_progress = progress
+            interval = min_interval
+        else:
+            interval = min(max_interval, interval * backoff_rate)
+
+        if job['status'] in TERMINAL_JOB_STATUSES:
+            for reason in job.get('failureReasons', []):
+                print(f"  실패 원인: {reason}")
+            return job
+        if timeout is not None and clock() - start_time >= timeout:
+            print(f"최대 대기 시간({timeout}초)이 초과되었습니다. 수집 작업은 계속 진행됩니다.")
+            return job
+        sleep(random.uniform(min_interval, interval))
+
+
+def sync(knowledge_base_id=None, data_source_id=None, prefix=DATA_SOURCE_PREFIX, bucket=BUCKET_NAME,
+         quiet_seconds=QUIET_SECONDS, max_wait=MAX_COALESCE_SECONDS, wait=True, dry_run=False,
+         sleep=time.sleep, clock=time.monotonic):
+    """
+    바뀐 객체가 있을 때만 수집 작업을 시작하고, 성공하면 매니페스트 갱신
+
+    Args:
+        knowledge_base_id (str, optional): Knowledge Base ID (기본값: KB_NAME으로 조회)
+        data_source_id (str, optional): 데이터 소스 ID (기본값: 접두사로 조회)
+        prefix (str): 데이터 소스 접두사
+        bucket (str): 버킷 이름
+        quiet_seconds (float): 업로드 묶음 처리 대기 시간 (0이면 바로 시작)
+        max_wait (float): 업로드 묶음 처리 최대 대기 시간
+        wait (bool): 수집 작업이 끝날 때까지 기다리고 매니페스트를 갱신할지 여부
+        dry_run (bool): 차이만 출력하고 수집 작업은 시작하지 않음
+
+    Returns:
+        dict: {'status', 'delta', 'ingestionJobId', 'statistics'}
+              status는 'UNCHANGED', 'DRY_RUN', 'STARTED' 또는 작업의 최종 상태
+    """
+    knowledge_base_id = knowledge_base_id or get_knowledge_base_id(KB_NAME)
+    if not knowledge_base_id:
+        raise ValueError(f"Knowledge Base '{KB_NAME}'을(를) 찾을 수 없습니다.")
+    data_source_id = data_source_id or get_data_source_id(knowledge_base_id, prefix)
+    if not data_source_id:
+        raise ValueError(f"Knowledge Base '{knowledge_base_id}'에 데이터 소스가 없습니다.")
+
+    # 이미 실행 중인 작업이 있으면 먼저 끝나기를 기다림 (동시에 하나의 작업만 실행 가능)
+    active_job_id = find_active_job(knowledge_base_id, data_source_id)
+    if active_job_id:
+        if not wait:
+            print(f"수집 작업 {active_job_id}이(가) 이미 실행 중입니다.")
+            return {'status': 'IN_PROGRESS', 'delta': None, 'ingestionJobId': active_job_id, 'statistics': None}
+        print(f"실행 중인 수집 작업 {active_job_id}이(가) 끝나기를 기다립니다...")
+        wait_for_ingestion(knowledge_base_id, data_source_id, active_job_id, sleep=sleep, clock=clock)
+
+    manifest = load_manifest(bucket)
+    current = wait_for_quiet(manifest['objects'], prefix, bucket, quiet_seconds, max_wait, sleep, clock)
+    delta = diff_manifest(manifest['objects'], current)
+    print(f"마지막 동기화({manifest['syncedAt'] or '없음'}) 이후 변경: {summarize_delta(delta)}")
+    result = {'status': 'UNCHANGED', 'delta': delta, 'ingestionJobId': None, 'statistics': None}
+    if not has_changes(delta):
+        print("변경된 객체가 없어 수집 작업을 시작하지 않습니다.")
+        return result
+    if dry_run:
+        result['status'] = 'DRY_RUN'
+        return result
+
+    # 같은 변경 사항으로 다시 호출해도 작업이 중복 생성되지 않도록 목록 해시를 clientToken으로 사용.
+    # 실패한 작업 뒤에는 매니페스트가 그대로이므로, 마지막 실패 작업 ID를 넣어 이전 작업 대신 새 작업을 시작
+    token_source = {
+        'objects': current,
+        'syncedAt': manifest['syncedAt'],
+        'lastFailedJobId': find_last_failed_job(knowledge_base_id, data_source_id)
+    }
+    client_token = hashlib.sha256(json.dumps(token_source, sort_keys=True).encode('utf-8')).hexdigest()
+    job = get_client('bedrock-agent').start_ingestion_job(
+        knowledgeBaseId=knowledge_base_id,
+        dataSourceId=data_source_id,
+        clientToken=client_token,
+        description=summarize_delta(delta)
+    )['ingestionJob']
+    result['ingestionJobId'] = job['ingestionJobId']
+    print(f"수집 작업 시작: {job['ingestionJobId']}")
+    if not wait:
+        result['status'] = 'STARTED'
+        return result
+
+    job = wait_for_ingestion(knowledge_base_id, data_source_id, job['ingestionJobId'], sleep=sleep, clock=clock)
+    result['status'] = job['status']
+    result['statistics'] = job.get('statistics', {})
+    if job['status'] == 'COMPLETE':
+        save_manifest(current, job['ingestionJobId'], bucket)
+        print(f"매니페스트 갱신: s3://{bucket}/{MANIFEST_KEY} (객체 {len(current)}개)")
+    else:
+        print("수집 작업이 완료되지 않아 매니페스트를 갱신하지 않습니다. 다음 동기화에서 다시 시도합니다.")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Knowledge Base 증분 수집 관리')
+    parser.add_argument('--kb-id', help=f"Knowledge Base ID (기본값: '{KB_NAME}' 조회)")
+    parser.add_argument('--data-source-id', help='데이터 소스 ID (기본값: 접두사로 조회)')
+    parser.add_argument('--bucket', default=BUCKET_NAME, help='S3 버킷 이름')
+    parser.add_argument('--prefix', default=DATA_SOURCE_PREFIX, help='데이터 소스 접두사')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sync_parser = subparsers.add_parser('sync', help='변경 사항이 있으면 수집 작업 실행')
+    sync_parser.add_argument('--quiet-seconds', type=float, default=QUIET_SECONDS,
+                             help='업로드가 잠잠해질 때까지 기다리는 시간(초), 0이면 바로 시작')
+    sync_parser.add_argument('--max-wait', type=float, default=MAX_COALESCE_SECONDS, help='업로드 묶음 처리 최대 대기 시간(초)')
+    sync_parser.add_argument('--no-wait', action='store_true', help='수집 작업 완료를 기다리지 않음 (매니페스트는 갱신하지 않음)')
+    sync_parser.add_argument('--dry-run', action='store_true', help='변경 사항만 출력')
+
+    subparsers.add_parser('diff', help='마지막 동기화 이후 변경된 객체 출력')
+
+    status_parser = subparsers.add_parser('status', help='수집 작업 진행 상황 확인')
+    status_parser.add_argument('--job-id', required=True, help='수집 작업 ID')
+
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        delta = diff_manifest(load_manifest(args.bucket)['objects'], snapshot(args.prefix, args.bucket))
+        print(summarize_delta(delta))
+        for name in ('added', 'modified', 'deleted'):
+            for key in delta[name]:
+                print(f"  {name}: {key}")
+        return
+
+    if args.command == 'sync':
+        sync(args.kb_id, args.data_source_id, args.prefix, args.bucket, args.quiet_seconds, args.max_wait,
+             wait=not args.no_wait, dry_run=args.dry_run)
+        return
+
+    knowledge_base_id = args.kb_id or get_knowledge_base_id(KB_NAME)
+    data_source_id = args.data_source_id or get_data_source_id(knowledge_base_id, args.prefix)
+    job = get_client('bedrock-agent').get_ingestion_job(
+        knowledgeBaseId=knowledge_base_id,
+        dataSourceId=data_source_id,
+        ingestionJobId=args.job_id
+    )['ingestionJob']
+    print(f"수집 작업 {job['status']}: {format_statistics(job.get('statistics', {}))}")
+
+
+if __name__ == '__main__':
+    main()
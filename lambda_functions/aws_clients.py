@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+
+# 모든 클라이언트에 공통으로 적용할 botocore 설정
+DEFAULT_CONFIG_OPTIONS = {
+    'max_pool_connections': int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50')),
+    'retries': {
+        'mode': 'adaptive',
+        'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+    },
+    'tcp_keepalive': True,
+    'connect_timeout': 5,
+    'read_timeout': 300,  # 긴 Bedrock 응답을 기다릴 수 있도록 기본값(60초)보다 길게 설정
+}
+
+_clients = {}
+_overrides = {}
+_lock = threading.Lock()
+
+
+def _registry_key(service_name, region_name, config_options):
+    return (service_name, region_name, json.dumps(config_options, sort_keys=True))
+
+
+def get_client(service_name, region_name=None, **config_options):
+    """
+    AWS 서비스 클라이언트 반환 (처음 요청할 때 생성하고 이후에는 재사용)
+
+    boto3는 첫 클라이언트를 만들 때 가져오므로, 클라이언트를 쓰지 않는 실행 경로(--help 등)는
+    boto3 가져오기 비용을 내지 않습니다.
+
+    Args:
+        service_name (str): 서비스 이름 (예: 's3', 'stepfunctions', 'bedrock-runtime')
+        region_name (str, optional): 리전 (기본값: 환경 설정)
+        config_options: DEFAULT_CONFIG_OPTIONS를 덮어쓸 botocore Config 옵션
+
+    Returns:
+        botocore.client.BaseClient: 서비스 클라이언트
+    """
+    override = _overrides.get((service_name, region_name)) or _overrides.get((service_name, None))
+    if override is not None:
+        return override
+
+    options = dict(DEFAULT_CONFIG_OPTIONS, **config_options)
+    key = _registry_key(service_name, region_name, options)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.client(service_name, region_name=region_name, config=Config(**options))
+            _clients[key] = client
+    return client
+
+
+def set_client(service_name, client, region_name=None):
+    """
+    서비스 클라이언트를 직접 지정 (로컬 실행, 테스트, 벤치마크에서 가짜 클라이언트 사용 시)
+
+    Args:
+        service_name (str): 서비스 이름
+        client: 사용할 클라이언트 객체 (None이면 지정 해제)
+        region_name (str, optional): 리전 (None이면 모든 리전에 적용)
+    """
+    if client is None:
+        _overrides.pop((service_name, region_name), None)
+    else:
+        _overrides[(service_name, region_name)] = client
+
+
+def reset_clients():
+    """생성된 클라이언트와 직접 지정한 클라이언트를 모두 제거"""
+    with _lock:
+        _clients.clear()
+        _overrides.clear()
@@ -0,0 +1,199 @@
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# 기본 설정 (이벤트의 chunkTokens, chunkOverlapTokens, fanOut, tokenBudget, maxOutputTokens로 변경 가능)
+DEFAULT_CHUNK_OPTIONS = {
+    'chunkTokens': 3000,         # 섹션 묶음(청크) 하나의 최대 토큰 수
+    'chunkOverlapTokens': 200,   # 이웃한 청크 사이에 겹치는 토큰 수
+    'fanOut': 4,                 # 청크별 개요를 동시에 생성할 최대 호출 수
+    'tokenBudget': 6000,         # 호출 한 번의 입력 토큰 예산 (넘으면 청크로 나눔)
+    'maxOutputTokens': 4000,     # 호출 한 번의 최대 출력 토큰 수
+}
+
+# 제목 구조: "1. 인공지능의 역사", "1.1 인공지능의 정의", "9.1. 국내[편집]"
+HEADING_PATTERN = re.compile(r'^\s*\d+(?:\.\d+)*\.?\s+\S')
+
+def options_from_event(event):
+    """이벤트에서 청크 설정을 읽어 기본값과 합침"""
+    options = dict(DEFAULT_CHUNK_OPTIONS)
+    for name in DEFAULT_CHUNK_OPTIONS:
+        if event.get(name) is not None:
+            options[name] = int(event[name])
+    return options
+
+
+def estimate_tokens(text):
+    """
+    토큰 수 추정 (토크나이저 없이 사용하는 보수적인 추정치)
+
+    한글 음절과 기타 비ASCII 문자는 문자당 약 1토큰, ASCII 문자는 4자당 약 1토큰으로 계산합니다.
+
+    Args:
+        text (str): 추정할 텍스트
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return non_ascii + math.ceil(ascii_chars / 4)
+
+
+def split_sections(text):
+    """
+    제목 구조(1.1, 1.2, ...)를 기준으로 텍스트를 섹션으로 나눔
+
+    Returns:
+        list: 섹션 문자열 목록 (첫 제목 앞의 내용도 하나의 섹션)
+    """
+    sections = []
+    current = []
+    for line in text.splitlines():
+        if HEADING_PATTERN.match(line) and any(part.strip() for part in current):
+            sections.append('\n'.join(current).strip())
+            current = []
+        current.append(line)
+
+    if any(part.strip() for part in current):
+        sections.append('\n'.join(current).strip())
+    return sections
+
+
+def _split_oversized(section, max_tokens):
+    """청크 크기보다 큰 섹션을 문단 → 문자 단위로 나눔"""
+    if estimate_tokens(section) <= max_tokens:
+        return [section]
+
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', section):
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        # 문단도 너무 크면 토큰 예산에 맞춰 문자 단위로 자름
+        start = 0
+        weight = 0.0
+        for i, ch in enumerate(paragraph):
+            weight += 1.0 if ord(ch) > 127 else 0.25
+            if weight > max_tokens:
+                pieces.append(paragraph[start:i])
+                start = i
+                weight = 1.0 if ord(ch) > 127 else 0.25
+        pieces.append(paragraph[start:])
+    return pieces
+
+
+def _tail(text, overlap_tokens):
+    """텍스트 끝부분에서 약 overlap_tokens 토큰만큼 잘라 반환"""
+    if overlap_tokens <= 0:
+        return ''
+    tail = text[-overlap_tokens:]
+    while len(tail) < len(text) and estimate_tokens(tail) < overlap_tokens:
+        tail = text[-(len(tail) + overlap_tokens):]
+    return tail
+
+
+def build_chunks(text, chunk_tokens=DEFAULT_CHUNK_OPTIONS['chunkTokens'],
+                 overlap_tokens=DEFAULT_CHUNK_OPTIONS['chunkOverlapTokens']):
+    """
+    섹션을 청크 크기에 맞게 묶고, 이웃한 청크의 끝부분을 다음 청크 앞에 겹쳐 붙임
+
+    Args:
+        text (str): 원본 데이터
+        chunk_tokens (int): 청크 하나의 최대 토큰 수 (겹치는 부분 제외)
+        overlap_tokens (int): 겹치는 토큰 수
+
+    Returns:
+        list: 청크 문자열 목록
+    """
+    pieces = []
+    for section in split_sections(text):
+        pieces.extend(_split_oversized(section, chunk_tokens))
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and current_tokens + piece_tokens > chunk_tokens:
+            chunks.append('\n\n'.join(current))
+            current = []
+            current_tokens = 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+
+    # 청크 경계에서 문맥이 끊기지 않도록 앞 청크의 끝부분을 겹쳐 붙임
+    overlapped = chunks[:1]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        tail = _tail(previous, overlap_tokens)
+        overlapped.append(f"{tail}\n\n{chunk}" if tail else chunk)
+    return overlapped
+
+
+# 모든 청크의 개요 생성에 공통으로 쓰는 시스템 프롬프트 (프롬프트 캐시 대상)
+OUTLINE_SYSTEM_PROMPT = """당신은 교육 커리큘럼 전문가입니다. 사용자가 주제 참고 자료의 일부를 보내면,
+그 부분에서 커리큘럼에 반영할 핵심 주제, 세부 개념, 중요한 인물/사례를 간결한 개요로 정리해주세요."""
+
+
+def build_outline_prompt(title, chunk, index, total):
+    """청크 하나의 개요를 만드는 map 프롬프트 (지시문은 OUTLINE_SYSTEM_PROMPT)"""
+    return f"""아래는 '{title}' 주제 참고 자료의 일부({index}/{total})입니다.
+
+참고 자료:
+{chunk}"""
+
+
+def build_reduce_prompt(title, outlines):
+    """청크별 개요를 합쳐 최종 커리큘럼을 만드는 reduce 프롬프트"""
+    joined = '\n\n'.join(f"[개요 {i}]\n{outline}" for i, outline in enumerate(outlines, 1))
+    return f"""당신은 교육 커리큘럼 전문가입니다. 제공된 주제와 참고 자료 개요를 바탕으로 체계적인 커리큘럼을 생성해주세요.
+
+주제: {title}
+
+참고 자료 개요:
+{joined}
+
+다음 형식으로 커리큘럼을 작성해주세요:
+
+1. 주제 소개 (주제에 대한 간략한 설명)
+2. 교수진 소개 (이 주제를 가르칠 가상의 교수 3명의 이름, 전공, 경력 등)
+3. 교수별 대표 강의 (각 교수가 담당할 주요 강의 내용)
+4. 교수별 주요 컬럼 (각 교수가 작성한 주요 컬럼이나 연구 내용)
+5. 평가 방식 (학생들의 성취도를 평가하는 방법)
+
+체계적이고 교육적으로 가치 있는 커리큘럼을 작성해주세요."""
+
+
+def map_outlines(title, data, generate, options):
+    """
+    데이터를 청크로 나눠 청크별 개요를 병렬로 생성하고, 개요가 토큰 예산에 들어올 때까지 다시 요약
+
+    Args:
+        title (str): 커리큘럼 제목
+        data (str): 원본 데이터
+        generate (callable): prompt -> 생성된 텍스트 (OUTLINE_SYSTEM_PROMPT를 시스템 프롬프트로 써야 함)
+        options (dict): 청크 설정 (DEFAULT_CHUNK_OPTIONS 참고)
+
+    Returns:
+        list: reduce 프롬프트에 넣을 개요 목록
+    """
+    chunks = build_chunks(data, options['chunkTokens'], options['chunkOverlapTokens'])
+
+    while True:
+        print(f"{len(chunks)}개 청크의 개요 생성 중 (동시 호출 {options['fanOut']}개)")
+        prompts = [build_outline_prompt(title, chunk, i, len(chunks)) for i, chunk in enumerate(chunks, 1)]
+        with ThreadPoolExecutor(max_workers=max(1, options['fanOut'])) as executor:
+            outlines = list(executor.map(generate, prompts))
+
+        # 개요를 합쳐도 예산을 넘으면 개요를 다시 청크로 묶어 한 단계 더 요약
+        if len(outlines) == 1 or estimate_tokens(build_reduce_prompt(title, outlines)) <= options['tokenBudget']:
+            return outlines
+        regrouped = build_chunks('\n\n'.join(outlines), options['chunkTokens'], 0)
+        if len(regrouped) >= len(outlines):
+            # 더 줄일 수 없으면 그대로 사용
+            return outlines
+        chunks = regrouped
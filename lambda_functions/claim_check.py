@@ -0,0 +1,154 @@
+import os
+
+from aws_clients import get_client
+
+# 이 크기(바이트) 이하의 본문은 S3 참조 대신 상태에 그대로 넣음 (0이면 항상 참조)
+CLAIM_CHECK_INLINE_BYTES = int(os.environ.get('CLAIM_CHECK_INLINE_BYTES', str(8 * 1024)))
+
+# 객체 하나에서 읽을 최대 바이트 수 (이벤트의 maxBytes로 변경 가능, fetch_s3_data와 같은 한도)
+MAX_OBJECT_BYTES = int(os.environ.get('MAX_OBJECT_BYTES', str(10 * 1024 * 1024)))
+
+
+class PayloadTooLargeError(Exception):
+    """객체가 읽기 예산(maxBytes)보다 큰 경우
+    
+    Step Functions에서는 오류 이름 'PayloadTooLargeError'로 Catch할 수 있습니다.
+    """
+    
+    def __init__(self, key, size, limit):
+        super().__init__(f"s3 객체 '{key}'의 크기({size} bytes)가 읽기 한도({limit} bytes)를 넘습니다.")
+        self.key = key
+        self.size = size
+        self.limit = limit
+
+
+def is_ref(value):
+    """값이 claim-check 참조({'bucket', 'key', ...} 또는 {'inline', ...})인지 여부"""
+    return isinstance(value, dict) and ('key' in value or 'inline' in value)
+
+
+def inline_ref(text):
+    """본문을 그대로 담은 참조"""
+    return {'inline': text, 'size': len(text.encode('utf-8'))}
+
+
+def object_ref(bucket, key, etag, size):
+    """S3 객체를 가리키는 참조 ({bucket, key, etag, size})"""
+    return {'bucket': bucket, 'key': key, 'etag': etag, 'size': size}
+
+
+def ref_for_object(bucket, key, inline_bytes=CLAIM_CHECK_INLINE_BYTES, s3_client=None):
+    """
+    이미 S3에 있는 객체의 참조 생성
+
+    head_object로 크기와 ETag만 확인하고, inline_bytes 이하이면 본문을 읽어 그대로 담습니다.
+
+    Args:
+        bucket (str): S3 버킷 이름
+        key (str): 객체 키
+        inline_bytes (int): 본문을 그대로 담을 최대 크기(바이트)
+        s3_client: S3 클라이언트 (기본값: 공용 클라이언트)
+
+    Returns:
+        dict: 참조
+    """
+    s3_client = s3_client or get_client('s3')
+    head = s3_client.head_object(Bucket=bucket, Key=key)
+    ref = object_ref(bucket, key, head['ETag'], head['ContentLength'])
+    if ref['size'] <= inline_bytes:
+        return inline_ref(read_ref(ref, s3_client))
+    return ref
+
+
+def read_ref(ref, s3_client=None, max_bytes=MAX_OBJECT_BYTES):
+    """
+    참조가 가리키는 본문 읽기
+
+    ETag가 있으면 IfMatch로 지정해, 참조를 만든 뒤 객체가 바뀌었으면 오류가 나게 합니다.
+    max_bytes보다 큰 본문은 읽지 않고, Range 요청으로 한도보다 1바이트만 더 받아 넘치는지 확인합니다.
+
+    Args:
+        ref (dict): 참조
+        s3_client: S3 클라이언트 (기본값: 공용 클라이언트)
+        max_bytes (int): 읽을 수 있는 최대 바이트 수 (넘으면 PayloadTooLargeError)
+
+    Returns:
+        str: UTF-8로 디코딩한 본문
+    """
+    if 'inline' in ref:
+        return ref['inline']
+
+    size = ref.get('size')
+    if size is not None and size > max_bytes:
+        raise PayloadTooLargeError(ref['key'], size, max_bytes)
+
+    params = {'Bucket': ref['bucket'], 'Key': ref['key']}
+    if ref.get('etag'):
+        params['IfMatch'] = ref['etag']
+    # 빈 객체에 Range 요청을 보내면 416(InvalidRange)이 반환되므로 크기가 0이면 전체를 읽음
+    if size != 0:
+        params['Range'] = f"bytes=0-{max_bytes}"
+    response = (s3_client or get_client('s3')).get_object(**params)
+    body = response['Body']
+    try:
+        data = body.read(max_bytes + 1)
+    finally:
+        body.close()
+    if len(data) > max_bytes:
+        raise PayloadTooLargeError(ref['key'], len(data), max_bytes)
+    return data.decode('utf-8')
+
+
+def write_ref(text, bucket, key, inline_bytes=CLAIM_CHECK_INLINE_BYTES, s3_client=None,
+              content_type='text/plain; charset=utf-8'):
+    """
+    본문을 저장하고 참조 반환 (inline_bytes 이하이면 저장하지 않고 그대로 담음)
+
+    Args:
+        text (str): 저장할 본문
+        bucket (str): S3 버킷 이름
+        key (str): 저장할 객체 키
+        inline_bytes (int): 본문을 그대로 담을 최대 크기(바이트)
+        s3_client: S3 클라이언트 (기본값: 공용 클라이언트)
+        content_type (str): 객체의 Content-Type
+
+    Returns:
+        dict: 참조
+    """
+    body = text.encode('utf-8')
+    if len(body) <= inline_bytes:
+        return inline_ref(text)
+
+    response = (s3_client or get_client('s3')).put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=body,
+        ContentType=content_type
+    )
+    return object_ref(bucket, key, response.get('ETag'), len(body))
+
+
+def resolve(event, name, s3_client=None):
+    """
+    이벤트에서 본문 값 읽기: '<name>Ref' 참조가 있으면 따라가고, 없으면 '<name>' 값을 그대로 사용
+
+    참조는 이벤트의 maxBytes(없으면 MAX_OBJECT_BYTES)까지만 읽습니다.
+
+    Args:
+        event (dict): Lambda 이벤트
+        name (str): 값 이름 (예: 'title', 'data', 'curriculum')
+        s3_client: S3 클라이언트 (기본값: 공용 클라이언트)
+
+    Returns:
+        str: 본문 (둘 다 없으면 None)
+    """
+    ref = event.get(f"{name}Ref")
+    if is_ref(ref):
+        return read_ref(ref, s3_client, int(event.get('maxBytes') or MAX_OBJECT_BYTES))
+    return event.get(name)
+
+
+def inline_bytes_from_event(event):
+    """이벤트의 inlineBytes 설정 (없으면 CLAIM_CHECK_INLINE_BYTES)"""
+    value = event.get('inlineBytes')
+    return CLAIM_CHECK_INLINE_BYTES if value is None else int(value)
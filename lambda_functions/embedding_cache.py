@@ -0,0 +1,330 @@
+import hashlib
+import os
+import re
+import struct
+import threading
+import unicodedata
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy는 공용 레이어(requirements)에 포함. 설치하지 않은 로컬 환경에서는 캐시를 쓸 수 없음
+    np = None
+
+try:
+    # Lambda와 같이 lambda_functions 디렉토리가 경로에 있을 때 (핸들러와 같은 지표 기록기를 공유)
+    from aws_clients import get_client
+    import metrics
+except ImportError:
+    # 저장소 루트에서 패키지로 가져올 때
+    from lambda_functions.aws_clients import get_client
+    from lambda_functions import metrics
+
+# 캐시 설정 (Lambda 환경 변수로 변경 가능)
+EMBEDDING_CACHE_BACKEND = os.environ.get('EMBEDDING_CACHE_BACKEND', 'disk')  # disk | s3 | none
+EMBEDDING_CACHE_DIR = os.environ.get('EMBEDDING_CACHE_DIR', '/tmp/embedding-cache')
+EMBEDDING_CACHE_DTYPE = os.environ.get('EMBEDDING_CACHE_DTYPE', 'float16')  # float16 | float32
+EMBEDDING_CACHE_BUCKET = os.environ.get('EMBEDDING_CACHE_BUCKET', 'curriculum-bucket-20250331')
+EMBEDDING_CACHE_PREFIX = os.environ.get('EMBEDDING_CACHE_PREFIX', 'embedding-cache/')
+
+# 색인 파일의 레코드: 텍스트 해시(SHA-256) + 벡터 파일 안의 바이트 오프셋
+INDEX_RECORD = struct.Struct('<32sQ')
+
+# 벡터 파일의 행 앞에 붙는 텍스트 해시 길이 (조회할 때 색인과 맞는지 확인)
+DIGEST_BYTES = 32
+
+# 한 번에 임베더에 넘길 최대 텍스트 수
+MISS_BATCH_SIZE = 256
+
+
+def normalize_text(text):
+    """캐시 키용 텍스트 정규화 (유니코드 NFC, 공백 정리)"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).digest()
+
+
+def _file_stem(model_id, dimensions, dtype):
+    safe_model_id = re.sub(r'[^A-Za-z0-9._-]', '_', model_id)
+    return f"{safe_model_id}-{dimensions}-{dtype}"
+
+
+class EmbeddingCache:
+    """
+    임베딩 모델 하나의 벡터 캐시 (키: 정규화한 텍스트의 SHA-256)
+
+    벡터는 추가만 하는 파일(.vec) 하나에 고정 크기 행(텍스트 해시 + 벡터)으로 이어 쓰고, 텍스트 해시와 오프셋을
+    추가만 하는 색인 파일(.idx)에 기록합니다. 열 때 색인을 읽어 해시 -> 오프셋 사전을 만들고,
+    벡터 파일 크기를 넘는 레코드나 잘린 마지막 레코드(쓰다가 중단된 경우)는 무시합니다.
+    조회할 때 행의 해시가 색인의 해시와 다르면(다른 파일과 짝이 맞지 않은 색인) 캐시 실패로 처리합니다.
+
+    Attributes:
+        model_id: 임베딩 모델 ID
+        dimensions: 벡터 차원
+        dtype: 저장 형식 ('float16' 또는 'float32', 조회 결과는 항상 float32)
+        hits: 캐시 적중 수
+        misses: 캐시 실패 수
+    """
+
+    def __init__(self, model_id, dimensions, directory=EMBEDDING_CACHE_DIR, dtype=EMBEDDING_CACHE_DTYPE):
+        if np is None:
+            raise RuntimeError("임베딩 캐시에는 numpy가 필요합니다. (pip install numpy)")
+        if dtype not in ('float16', 'float32'):
+            raise ValueError(f"지원하지 않는 저장 형식입니다: {dtype}")
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.dtype = dtype
+        self.row_bytes = DIGEST_BYTES + dimensions * np.dtype(dtype).itemsize
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, _file_stem(model_id, dimensions, dtype))
+        self.vectors_path = f"{stem}.vec"
+        self.index_path = f"{stem}.idx"
+        self._offsets = {}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        vectors_size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        for digest, offset in INDEX_RECORD.iter_unpack(data[:usable]):
+            if offset + self.row_bytes <= vectors_size:
+                self._offsets[digest] = offset
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {'entries': len(self._offsets), 'hits': self.hits, 'misses': self.misses,
+                'hitRatio': round(self.hit_ratio, 4)}
+
+    def get_many(self, digests):
+        """
+        해시 목록의 벡터 조회
+
+        Returns:
+            list: 해시별 float32 벡터 (없으면 None)
+        """
+        with self._lock:
+            offsets = [self._offsets.get(digest) for digest in digests]
+        if all(offset is None for offset in offsets):
+            return [None] * len(digests)
+
+        results = []
+        stale = []
+        with open(self.vectors_path, 'rb') as f:
+            for digest, offset in zip(digests, offsets):
+                if offset is None:
+                    results.append(None)
+                    continue
+                f.seek(offset)
+                row = f.read(self.row_bytes)
+                if len(row) != self.row_bytes or row[:DIGEST_BYTES] != digest:
+                    # 다른 텍스트의 벡터를 가리키는 색인 레코드는 버리고 다시 임베딩
+                    stale.append(digest)
+                    results.append(None)
+                    continue
+                results.append(np.frombuffer(row[DIGEST_BYTES:], dtype=self.dtype).astype(np.float32))
+        if stale:
+            print(f"임베딩 캐시 색인이 벡터 파일과 맞지 않습니다. 항목 {len(stale)}개를 버립니다.")
+            with self._lock:
+                for digest in stale:
+                    self._offsets.pop(digest, None)
+        return results
+
+    def put_many(self, digests, vectors):
+        """
+        벡터 추가 (이미 있는 해시는 건너뜀)
+
+        벡터를 먼저 쓰고 색인을 나중에 쓰므로, 중간에 중단되어도 색인이 가리키는 벡터는 항상 완전합니다.
+        """
+        with self._lock:
+            pending = {}
+            for digest, vector in zip(digests, vectors):
+                if digest not in self._offsets and digest not in pending:
+                    pending[digest] = vector
+            if not pending:
+                return 0
+
+            with open(self.vectors_path, 'ab') as vectors_file:
+                vectors_file.seek(0, os.SEEK_END)
+                start = vectors_file.tell()
+                # 쓰다가 중단된 행이 있으면 행 경계에 맞춰 이어 씀
+                padding = (-start) % self.row_bytes
+                if padding:
+                    vectors_file.write(b'\0' * padding)
+                    start += padding
+                matrix = np.asarray(list(pending.values()), dtype=np.float32).astype(self.dtype)
+                vectors_file.write(b''.join(digest + vector.tobytes() for digest, vector in zip(pending, matrix)))
+                vectors_file.flush()
+                os.fsync(vectors_file.fileno())
+
+            records = []
+            for row, digest in enumerate(pending):
+                offset = start + row * self.row_bytes
+                self._offsets[digest] = offset
+                records.append(INDEX_RECORD.pack(digest, offset))
+            with open(self.index_path, 'ab') as index_file:
+                index_file.write(b''.join(records))
+            return len(pending)
+
+
+class S3SyncedEmbeddingCache(EmbeddingCache):
+    """
+    S3에 보관하는 임베딩 캐시 (Lambda 컨테이너 사이에서 공유)
+
+    처음 열 때 S3의 .vec/.idx를 로컬 디렉토리(/tmp)로 함께 내려받고, flush()에서 새 항목이 있으면 다시 올립니다.
+    여러 곳에서 동시에 올리면 한 곳의 .idx가 다른 곳의 .vec와 짝이 될 수 있지만, 벡터 행마다 텍스트 해시를
+    저장해 조회할 때 확인하므로 다른 텍스트의 벡터를 반환하지 않고 해당 항목만 캐시 실패로 다시 임베딩합니다.
+    """
+
+    def __init__(self, model_id, dimensions, directory=EMBEDDING_CACHE_DIR, dtype=EMBEDDING_CACHE_DTYPE,
+                 bucket=EMBEDDING_CACHE_BUCKET, prefix=EMBEDDING_CACHE_PREFIX, s3_client=None):
+        self._s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        stem = _file_stem(model_id, dimensions, dtype)
+        os.makedirs(directory, exist_ok=True)
+        paths = {suffix: os.path.join(directory, stem + suffix) for suffix in ('.vec', '.idx')}
+        # 로컬 파일과 S3 파일을 섞어 쓰지 않도록 둘 다 있을 때만 로컬 파일 사용
+        if not all(os.path.exists(path) for path in paths.values()):
+            for suffix, path in paths.items():
+                if os.path.exists(path):
+                    os.remove(path)
+                self._download(f"{prefix}{stem}{suffix}", path)
+        super().__init__(model_id, dimensions, directory, dtype)
+        self._synced_entries = len(self._offsets)
+
+    @property
+    def s3_client(self):
+        return self._s3_client or get_client('s3')
+
+    def _download(self, key, path):
+        try:
+            body = self.s3_client.get_object(Bucket=self.bucket, Key=key)['Body']
+        except self.s3_client.exceptions.NoSuchKey:
+            return
+        try:
+            with open(path, 'wb') as f:
+                for chunk in iter(lambda: body.read(1024 * 1024), b''):
+                    f.write(chunk)
+        finally:
+            body.close()
+
+    def flush(self):
+        """
+        새 항목이 있으면 S3에 업로드 (벡터 파일을 먼저 올림)
+
+        두 파일을 모두 올린 뒤에만 동기화된 것으로 기록하므로, 업로드가 실패하면 다음 flush()에서 다시 올립니다.
+        """
+        with self._lock:
+            entries = len(self._offsets)
+            if entries == self._synced_entries:
+                return False
+        stem = _file_stem(self.model_id, self.dimensions, self.dtype)
+        for path, suffix in ((self.vectors_path, '.vec'), (self.index_path, '.idx')):
+            with open(path, 'rb') as f:
+                self.s3_client.put_object(Bucket=self.bucket, Key=f"{self.prefix}{stem}{suffix}", Body=f.read(),
+                                          ContentType='application/octet-stream')
+        with self._lock:
+            self._synced_entries = entries
+        print(f"임베딩 캐시 업로드: s3://{self.bucket}/{self.prefix}{stem} (항목 {entries}개)")
+        return True
+
+
+class CachedEmbedder:
+    """
+    임베더 앞에 두는 캐시 (vector_index의 임베더와 같은 인터페이스)
+
+    embed(texts)는 캐시에 없는 텍스트만 중복을 없애 MISS_BATCH_SIZE개씩 임베더에 넘기고,
+    결과를 캐시에 추가한 뒤 입력 순서대로 합쳐 반환합니다.
+    """
+
+    def __init__(self, embedder, cache):
+        self.embedder = embedder
+        self.cache = cache
+        self.name = embedder.name
+        self.model_id = embedder.model_id
+        self.dimensions = embedder.dimensions
+
+    def config(self):
+        return self.embedder.config()
+
+    def embed(self, texts):
+        digests = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(digests)
+
+        # 같은 텍스트가 여러 번 나오면 한 번만 임베딩
+        missing = {}
+        for position, (digest, vector) in enumerate(zip(digests, vectors)):
+            if vector is None:
+                missing.setdefault(digest, []).append(position)
+        hits = len(texts) - sum(len(positions) for positions in missing.values())
+        self.cache.hits += hits
+        self.cache.misses += len(texts) - hits
+        metrics.add('EmbeddingCacheHits', hits)
+        metrics.add('EmbeddingCacheMisses', len(texts) - hits)
+
+        missing_digests = list(missing)
+        for start in range(0, len(missing_digests), MISS_BATCH_SIZE):
+            batch = missing_digests[start:start + MISS_BATCH_SIZE]
+            embedded = self.embedder.embed([texts[missing[digest][0]] for digest in batch])
+            self.cache.put_many(batch, embedded)
+            for digest, vector in zip(batch, embedded):
+                for position in missing[digest]:
+                    vectors[position] = vector
+
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dimensions)
+
+    def flush(self):
+        if hasattr(self.cache, 'flush'):
+            self.cache.flush()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def create_cache(model_id, dimensions, backend=EMBEDDING_CACHE_BACKEND, directory=EMBEDDING_CACHE_DIR,
+                 dtype=EMBEDDING_CACHE_DTYPE):
+    """
+    설정에 맞는 임베딩 캐시 반환 (같은 모델/차원/위치는 컨테이너 안에서 하나만 생성)
+
+    Args:
+        model_id (str): 임베딩 모델 ID
+        dimensions (int): 벡터 차원
+        backend (str): 'disk', 's3', 'none'
+        directory (str): 로컬 파일 디렉토리 (s3도 여기에 내려받아 사용)
+        dtype (str): 저장 형식 ('float16' 또는 'float32')
+
+    Returns:
+        EmbeddingCache: 캐시 객체 ('none'이거나 numpy가 없으면 None)
+    """
+    if backend not in ('disk', 's3') or np is None:
+        return None
+    key = (model_id, dimensions, backend, directory, dtype)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache_class = S3SyncedEmbeddingCache if backend == 's3' else EmbeddingCache
+            cache = cache_class(model_id, dimensions, directory, dtype)
+            _caches[key] = cache
+    return cache
+
+
+def cached(embedder, backend=EMBEDDING_CACHE_BACKEND, directory=EMBEDDING_CACHE_DIR, dtype=EMBEDDING_CACHE_DTYPE):
+    """임베더에 캐시를 붙여 반환 (캐시를 쓰지 않으면 임베더 그대로)"""
+    cache = create_cache(embedder.model_id, embedder.dimensions, backend, directory, dtype)
+    return CachedEmbedder(embedder, cache) if cache is not None else embedder
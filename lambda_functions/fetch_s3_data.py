@@ -1,27 +1,176 @@
-import boto3
+import codecs
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-s3_client = boto3.client('s3')
+import claim_check
+import metrics
+from aws_clients import get_client
+from claim_check import PayloadTooLargeError
 
+# 객체 하나에서 읽을 최대 바이트 수 (이벤트의 maxBytes로 변경 가능, 다음 단계의 claim_check.read_ref도 같은 한도)
+MAX_OBJECT_BYTES = claim_check.MAX_OBJECT_BYTES
+# 스트림에서 한 번에 읽을 크기
+READ_CHUNK_BYTES = 64 * 1024
+# claimCheck와 previewBytes를 함께 쓸 때 inlineBytes보다 큰 미리보기를 저장할 접두사
+PREVIEW_PREFIX = os.environ.get('PREVIEW_PREFIX', 'preview/')
+
+def _error_code(error):
+    """botocore ClientError(또는 같은 모양의 오류)의 오류 코드"""
+    return (getattr(error, 'response', None) or {}).get('Error', {}).get('Code')
+
+def read_text(bucket, key, max_bytes=MAX_OBJECT_BYTES, preview_bytes=None, s3_client=None):
+    """
+    S3 객체를 조금씩 읽으며 UTF-8로 디코딩
+    
+    preview_bytes를 지정하면 Range 요청으로 앞부분만 읽고(미리보기, 토큰 수 추정용),
+    잘린 위치의 불완전한 멀티바이트 문자는 버립니다. 빈 객체는 Range 없이 읽습니다.
+    
+    Args:
+        bucket (str): S3 버킷 이름
+        key (str): 객체 키
+        max_bytes (int): 읽을 수 있는 최대 바이트 수 (넘으면 PayloadTooLargeError)
+        preview_bytes (int, optional): 앞부분만 읽을 바이트 수
+        s3_client: S3 클라이언트 (기본값: 공용 클라이언트)
+    
+    Returns:
+        tuple: (본문, {'bytes', 'contentLength', 'truncated', 'latencyMs'})
+    """
+    start_time = time.perf_counter()
+    params = {'Bucket': bucket, 'Key': key}
+    if preview_bytes:
+        params['Range'] = f"bytes=0-{preview_bytes - 1}"
+    
+    s3_client = s3_client or get_client('s3')
+    try:
+        response = s3_client.get_object(**params)
+    except Exception as e:
+        # 빈 객체에 Range 요청을 보내면 416(InvalidRange)이 반환되므로 Range 없이 다시 읽음
+        if 'Range' not in params or _error_code(e) != 'InvalidRange':
+            raise
+        del params['Range']
+        response = s3_client.get_object(**params)
+    body = response['Body']
+    
+    # 전체 크기를 알 수 있으면 읽기 전에 바로 거절
+    content_length = response.get('ContentLength')
+    total_size = content_length
+    if preview_bytes and response.get('ContentRange'):
+        # 'bytes 0-1023/52344' -> 52344
+        total_size = int(response['ContentRange'].rsplit('/', 1)[1])
+    if content_length is not None and content_length > max_bytes:
+        body.close()
+        raise PayloadTooLargeError(key, content_length, max_bytes)
+    
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parts = []
+    read_bytes = 0
+    try:
+        while True:
+            chunk = body.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            read_bytes += len(chunk)
+            if read_bytes > max_bytes:
+                raise PayloadTooLargeError(key, read_bytes, max_bytes)
+            parts.append(decoder.decode(chunk))
+    finally:
+        body.close()
+    
+    truncated = bool(preview_bytes) and total_size is not None and total_size > read_bytes
+    # 미리보기로 잘린 경우 마지막 불완전한 문자는 버리고, 전체를 읽은 경우에는 남은 바이트를 검증
+    parts.append(decoder.decode(b'', final=not truncated))
+    
+    return ''.join(parts), {
+        'bytes': read_bytes,
+        'contentLength': total_size,
+        'truncated': truncated,
+        'latencyMs': round((time.perf_counter() - start_time) * 1000, 1)
+    }
+
+def _record_fetch_stats(title_stats, data_stats):
+    """읽은 바이트 수를 지표에 기록"""
+    metrics.add('S3BytesRead', title_stats['bytes'] + data_stats['bytes'], 'Bytes')
+    metrics.add('S3Objects', 2)
+
+def _timed_ref(bucket, key, inline_bytes, max_bytes):
+    """claim-check 참조를 만들고 소요 시간 기록 (다음 단계가 읽을 본문도 max_bytes 이하여야 함)"""
+    start_time = time.perf_counter()
+    ref = claim_check.ref_for_object(bucket, key, inline_bytes)
+    if ref['size'] > max_bytes:
+        raise PayloadTooLargeError(key, ref['size'], max_bytes)
+    return ref, {'bytes': ref['size'], 'latencyMs': round((time.perf_counter() - start_time) * 1000, 1)}
+
+def _timed_preview_ref(bucket, key, preview_bytes, inline_bytes, max_bytes):
+    """
+    앞부분만 Range 요청으로 읽은 뒤 claim-check 참조 생성
+
+    원본 객체를 가리키는 참조는 다음 단계가 전체를 읽게 되므로, inline_bytes보다 큰 미리보기는
+    PREVIEW_PREFIX 아래에 따로 저장하고 그 객체를 가리킵니다.
+    """
+    start_time = time.perf_counter()
+    text, stats = read_text(bucket, key, max_bytes, preview_bytes)
+    ref = claim_check.write_ref(text, bucket, f"{PREVIEW_PREFIX}{key}", inline_bytes)
+    return ref, dict(stats, latencyMs=round((time.perf_counter() - start_time) * 1000, 1))
+
+@metrics.instrument
 def lambda_handler(event, context):
-    """S3에서 데이터를 가져오는 Lambda 함수"""
+    """S3에서 데이터를 가져오는 Lambda 함수
+    
+    claimCheck가 true이면 본문 대신 S3 참조(titleRef, dataRef)를 반환합니다.
+    제목과 데이터 파일은 동시에 읽고, 객체별 소요 시간은 fetchStats로 반환합니다.
+    
+    이벤트 옵션:
+        maxBytes: 객체 하나의 최대 바이트 수 (넘으면 PayloadTooLargeError)
+        previewBytes: 데이터 파일은 앞부분만 이 바이트 수만큼 읽음 (Range 요청, claimCheck와 함께 쓰면
+            미리보기 본문을 참조로 전달)
+    """
     
     bucket = event['bucket']
     title_key = event['titleKey']
     data_key = event['dataKey']
+    max_bytes = int(event.get('maxBytes') or MAX_OBJECT_BYTES)
+    preview_bytes = event.get('previewBytes')
+    
+    with metrics.stage('S3Read'), ThreadPoolExecutor(max_workers=2) as executor:
+        if event.get('claimCheck'):
+            # 본문을 상태에 싣지 않고 참조만 전달 (inlineBytes 이하의 작은 본문은 그대로 포함)
+            inline_bytes = claim_check.inline_bytes_from_event(event)
+            title_future = executor.submit(_timed_ref, bucket, title_key, inline_bytes, max_bytes)
+            if preview_bytes:
+                # 참조를 고르기 전에 Range 읽기를 적용해 다음 단계도 미리보기만 받음
+                data_future = executor.submit(_timed_preview_ref, bucket, data_key, int(preview_bytes),
+                                              inline_bytes, max_bytes)
+            else:
+                data_future = executor.submit(_timed_ref, bucket, data_key, inline_bytes, max_bytes)
+            (title_ref, title_stats), (data_ref, data_stats) = title_future.result(), data_future.result()
+            _record_fetch_stats(title_stats, data_stats)
+    
+            return {
+                'bucket': bucket,
+                'titleKey': title_key,
+                'dataKey': data_key,
+                'titleRef': title_ref,
+                'dataRef': data_ref,
+                'fetchStats': {'title': title_stats, 'data': data_stats}
+            }
     
-    # S3에서 제목 파일 읽기
-    title_response = s3_client.get_object(Bucket=bucket, Key=title_key)
-    title_content = title_response['Body'].read().decode('utf-8')
+        # S3에서 제목 파일과 데이터 파일을 동시에 읽기
+        title_future = executor.submit(read_text, bucket, title_key, max_bytes)
+        data_future = executor.submit(read_text, bucket, data_key, max_bytes, int(preview_bytes) if preview_bytes else None)
+        title_content, title_stats = title_future.result()
+        data_content, data_stats = data_future.result()
+        _record_fetch_stats(title_stats, data_stats)
     
-    # S3에서 데이터 파일 읽기
-    data_response = s3_client.get_object(Bucket=bucket, Key=data_key)
-    data_content = data_response['Body'].read().decode('utf-8')
+    print(f"S3 읽기 완료: 제목 {title_stats['bytes']} bytes ({title_stats['latencyMs']} ms), "
+          f"데이터 {data_stats['bytes']} bytes ({data_stats['latencyMs']} ms)")
     
     return {
         'bucket': bucket,
         'titleKey': title_key,
         'dataKey': data_key,
         'title': title_content,
-        'data': data_content
-    } 
\ No newline at end of file
+        'data': data_content,
+        'fetchStats': {'title': title_stats, 'data': data_stats}
+    }
@@ -1,175 +1,311 @@
-import boto3
-import json
+import time
 
-# AWS 서비스 클라이언트 초기화
-bedrock_runtime = boto3.client('bedrock-runtime')
-bedrock_agent_runtime = boto3.client('bedrock-agent-runtime')
+import chunking
+import claim_check
+import metrics
+import model_adapters
+import model_catalog
+import rate_limiter
+import response_cache
+import retrieval
+import streaming
+from aws_clients import get_client
+from output_keys import build_output_key
+from prompts import PROMPT_TEMPLATE_VERSION, CURRICULUM_SYSTEM_PROMPT, build_prompt, build_user_prompt
 
+# 응답 캐시 (CACHE_BACKEND 환경 변수로 memory/disk/s3/none 선택)
+cache = response_cache.create_cache()
+
+# 모델별 호출 한도 (RATE_LIMIT_BACKEND 환경 변수로 memory/dynamodb/none 선택)
+limiter = rate_limiter.create_limiter()
+
+@metrics.instrument
 def lambda_handler(event, context):
-    """Bedrock을 사용하여 커리큘럼을 생성하는 Lambda 함수"""
+    """Bedrock을 사용하여 커리큘럼을 생성하는 Lambda 함수
     
-    title = event['title']
-    data = event['data']
+    titleRef/dataRef 참조가 있으면 S3에서 본문을 직접 읽고, claimCheck가 true이면
+    생성한 커리큘럼을 출력 파일에 바로 저장한 뒤 참조(curriculumRef)만 반환합니다.
+    """
+    
+    with metrics.stage('S3Read'):
+        title = claim_check.resolve(event, 'title')
+        data = claim_check.resolve(event, 'data')
     bucket = event['bucket']
     title_key = event['titleKey']
     model_id = event.get('modelId', 'anthropic.claude-3-sonnet-20240229-v1:0')
+    metrics.set_property('modelId', model_id)
     
     # Knowledge Base ID가 있는지 확인
     knowledge_base_id = event.get('knowledgeBaseId')
     
+    # 검색 설정 (retrievalBackend가 'local'이면 Knowledge Base 없이 로컬 벡터 인덱스로 RAG 수행)
+    retrieval_options = retrieval.options_from_event(event)
+    use_local_index = retrieval_options['retrievalBackend'] == 'local'
+    
+    # 캐시를 건너뛰고 항상 새로 생성할지 여부
+    bypass_cache = event.get('bypassCache', False)
+    
+    # 긴 데이터를 나눠 처리할 때의 설정 (chunkTokens, fanOut, tokenBudget 등)
+    chunk_options = chunking.options_from_event(event)
+    hits_before = cache.hits if cache else 0
+    
+    # 스트리밍 모드: 생성되는 대로 출력 파일에 바로 저장 (Knowledge Base 미사용 시)
+    stream = event.get('stream', False) and not knowledge_base_id and not use_local_index
+    output_key = None
+    
+    # claim-check 모드: 커리큘럼 본문 대신 참조를 상태로 전달
+    use_claim_check = event.get('claimCheck', False)
+    inline_bytes = claim_check.inline_bytes_from_event(event)
+    
     try:
-        if knowledge_base_id:
-            # Knowledge Base가 있으면 RAG 사용
-            print(f"Knowledge Base ID {knowledge_base_id}를 사용하여 RAG 수행")
-            curriculum = generate_with_kb(knowledge_base_id, title, data, model_id)
+        if stream:
+            output_key = build_output_key(title_key)
+            print(f"스트리밍 모드로 생성하여 s3://{bucket}/{output_key}에 저장")
+            sink = streaming.S3MultipartSink(get_client('s3'), bucket, output_key)
+            generate_without_kb_stream(title, data, model_id, [sink], bypass_cache, chunk_options)
+            curriculum = None
+        elif knowledge_base_id or use_local_index:
+            # Knowledge Base나 로컬 벡터 인덱스가 있으면 RAG 사용
+            if use_local_index:
+                print("로컬 벡터 인덱스를 사용하여 RAG 수행")
+            else:
+                print(f"Knowledge Base ID {knowledge_base_id}를 사용하여 RAG 수행")
+            subject = retrieval.subject_from_keys(title_key, event.get('dataKey'))
+            curriculum = generate_with_kb(knowledge_base_id, title, data, model_id, bypass_cache, chunk_options,
+                                          retrieval_options, subject)
         else:
             # Knowledge Base가 없으면 일반 Bedrock 호출
             print("Knowledge Base 없이 Bedrock 직접 호출")
-            curriculum = generate_without_kb(title, data, model_id)
+            curriculum = generate_without_kb(title, data, model_id, bypass_cache, chunk_options)
+        
+        metrics.add('CacheHits', 1 if cache and cache.hits > hits_before else 0)
+        
+        curriculum_ref = None
+        if use_claim_check:
+            if stream:
+                curriculum_ref = claim_check.ref_for_object(bucket, output_key, inline_bytes=0)
+            else:
+                # 출력 파일에 바로 저장하면 SaveCurriculum은 다시 쓰지 않음
+                with metrics.stage('S3Write'):
+                    curriculum_ref = claim_check.write_ref(curriculum, bucket, build_output_key(title_key), inline_bytes)
+                output_key = curriculum_ref.get('key')
+            curriculum = None
         
         return {
             'bucket': bucket,
             'titleKey': title_key,
-            'curriculum': curriculum
+            'curriculum': curriculum,
+            'curriculumRef': curriculum_ref,
+            'outputKey': output_key,
+            'usage': metrics.usage(),  # 모델 호출별 토큰 수와 소요 시간 (실행별 비용 장부에 사용)
+            'cache': {
+                'hit': bool(cache) and cache.hits > hits_before,
+                **(cache.stats() if cache else {'hits': 0, 'misses': 0})
+            }
         }
+    except rate_limiter.BedrockThrottledError as e:
+        # 호출 한도 초과는 기본 커리큘럼으로 저장하지 않고 Step Functions의 Retry(BedrockThrottledError)에 맡김
+        print(f"Bedrock 호출 한도 초과: {str(e)}")
+        raise
     except Exception as e:
         print(f"Error generating curriculum: {str(e)}")
+        metrics.add('GenerationErrors', 1)
         # 오류 발생 시 기본 응답 반환
+        fallback = f"# 커리큘럼 생성 중 오류가 발생했습니다\n\n오류 메시지: {str(e)}\n\n## 기본 커리큘럼\n\n1. 소개\n2. 기본 개념\n3. 심화 학습\n4. 실습\n5. 평가"
         return {
             'bucket': bucket,
             'titleKey': title_key,
-            'curriculum': f"# 커리큘럼 생성 중 오류가 발생했습니다\n\n오류 메시지: {str(e)}\n\n## 기본 커리큘럼\n\n1. 소개\n2. 기본 개념\n3. 심화 학습\n4. 실습\n5. 평가",
+            'curriculum': None if use_claim_check else fallback,
+            'curriculumRef': claim_check.inline_ref(fallback) if use_claim_check else None,
+            'outputKey': None,
+            'usage': metrics.usage(),
             'error': str(e)
         }
 
-def generate_with_kb(knowledge_base_id, title, data, model_id):
-    """Knowledge Base를 사용하여 RAG로 커리큘럼 생성"""
-    
-    # 검색 쿼리 구성 (제목과 데이터를 결합)
-    retrieval_query = f"주제: {title}\n\n참고 데이터: {data}\n\n이 주제와 데이터를 바탕으로 체계적인 교육 커리큘럼을 생성해주세요."
-    
-    # Bedrock Knowledge Base를 사용하여 RAG 수행
-    response = bedrock_agent_runtime.retrieve_and_generate(
-        knowledgeBaseId=knowledge_base_id,
-        retrievalQuery=retrieval_query,
-        generationConfiguration={
-            "modelId": model_id,
-            "promptTemplate": "당신은 교육 커리큘럼 전문가입니다. 제공된 주제와 데이터를 바탕으로 체계적인 커리큘럼을 생성해주세요.\n\n{retrievalResults}\n\n주제: {title}\n\n참고 데이터: {data}"
-        }
-    )
+def _cache_get(cache_key, bypass_cache):
+    """캐시에서 생성 결과 조회 (캐시가 없거나 우회하면 None)"""
+    if not cache or bypass_cache:
+        return None
     
-    # 생성된 커리큘럼 추출
-    return response['output']['text']
+    cached = cache.get(cache_key)
+    if cached is not None:
+        print(f"캐시된 커리큘럼을 사용합니다. (key: {cache_key[:12]})")
+    return cached
 
-def generate_without_kb(title, data, model_id):
-    """일반 Bedrock 모델을 사용하여 커리큘럼 생성"""
+def _cache_put(cache_key, curriculum):
+    """생성 결과를 캐시에 저장"""
+    if cache:
+        cache.put(cache_key, curriculum)
+
+def generate_with_kb(knowledge_base_id, title, data, model_id, bypass_cache=False, chunk_options=None,
+                     retrieval_options=None, subject=None):
+    """
+    Knowledge Base(또는 로컬 벡터 인덱스)를 사용하여 RAG로 커리큘럼 생성
     
-    # 사용 가능한 모델 확인 및 선택
-    try:
-        # 사용 가능한 모델 목록 가져오기
-        bedrock = boto3.client('bedrock')
-        models = bedrock.list_foundation_models()
-        available_models = [model['modelId'] for model in models['modelSummaries']]
-        
-        print(f"사용 가능한 모델: {available_models}")
-        
-        # 지정된 모델이 사용 가능한지 확인
-        if model_id not in available_models:
-            print(f"지정된 모델 '{model_id}'을(를) 사용할 수 없습니다. 대체 모델을 사용합니다.")
-            
-            # 사용 가능한 모델 중 하나 선택
-            if available_models:
-                model_id = available_models[0]
-                print(f"대체 모델로 '{model_id}'을(를) 사용합니다.")
-            else:
-                raise Exception("사용 가능한 모델이 없습니다.")
-    except Exception as e:
-        print(f"모델 목록 가져오기 실패: {str(e)}")
-        # 기본 모델 사용 (Amazon Titan Text)
-        model_id = 'amazon.titan-text-express-v1'
-        print(f"기본 모델 '{model_id}'을(를) 사용합니다.")
+    검색(retrieve)과 생성을 나눠, 제목과 핵심어로 만든 짧은 쿼리로 검색한 문단을 프롬프트에 붙여 생성합니다.
+    검색 결과는 retrieval 모듈이 쿼리 해시로 캐시하므로 같은 주제의 재시도는 검색을 다시 하지 않습니다.
+    subject는 filterBySubject일 때 메타데이터 필터에 쓰는 주제입니다 (입력 파일 이름에서 추출).
+    """
+    
+    chunk_options = chunk_options or dict(chunking.DEFAULT_CHUNK_OPTIONS)
+    retrieval_options = retrieval_options or retrieval.options_from_event({})
+    model_id = model_catalog.resolve_model_id(model_id)
+    
+    cache_key = response_cache.make_cache_key(model_id, PROMPT_TEMPLATE_VERSION, title, data, knowledge_base_id,
+                                              chunk_options, retrieval_options)
+    cached = _cache_get(cache_key, bypass_cache)
+    if cached is not None:
+        return cached
     
-    # 프롬프트 구성
-    prompt = f"""당신은 교육 커리큘럼 전문가입니다. 제공된 주제와 데이터를 바탕으로 체계적인 커리큘럼을 생성해주세요.
+    # 제목과 핵심어로 검색 (데이터 전체를 검색 쿼리로 임베딩하지 않음)
+    query = retrieval.build_query(title, data, retrieval_options['queryMaxTerms'])
+    print(f"검색 쿼리: {query}")
+    passages = retrieval.retrieve(knowledge_base_id, query, retrieval_options,
+                                  retrieval.build_filter(subject, retrieval_options), bypass_cache)
+    print(f"검색된 문단: {len(passages)}개")
+    references = retrieval.format_passages(passages, retrieval_options['passageTokenBudget'])
+    
+    if chunking.estimate_tokens(build_prompt(title, data)) > chunk_options['tokenBudget']:
+        # 데이터가 길면 개요를 합친 프롬프트에 검색 결과를 붙임
+        prompt = _reduce_prompt(title, data, model_id, chunk_options)
+        system = None
+    else:
+        prompt = build_user_prompt(title, data)
+        system = CURRICULUM_SYSTEM_PROMPT
+    if references:
+        prompt = f"{prompt}\n\n검색된 참고 자료:\n{references}"
+    
+    curriculum = invoke_text_model(model_id, prompt, chunk_options['maxOutputTokens'], system)
+    _cache_put(cache_key, curriculum)
+    return curriculum
 
-주제: {title}
+def generate_without_kb(title, data, model_id, bypass_cache=False, chunk_options=None):
+    """일반 Bedrock 모델을 사용하여 커리큘럼 생성"""
+    
+    chunk_options = chunk_options or dict(chunking.DEFAULT_CHUNK_OPTIONS)
+    
+    # 사용 가능한 모델 확인 및 선택 (컨테이너 단위로 캐시된 카탈로그 사용)
+    model_id = model_catalog.resolve_model_id(model_id)
+    
+    # 프롬프트 길이 확인 (토큰 예산을 넘으면 데이터를 나눠 처리)
+    prompt = build_prompt(title, data)
+    prompt_tokens = chunking.estimate_tokens(prompt)
+    print(f"프롬프트 길이: {len(prompt)}자 (추정 {prompt_tokens} 토큰)")
+    
+    cache_key = _generation_cache_key(model_id, title, data, prompt_tokens, chunk_options)
+    cached = _cache_get(cache_key, bypass_cache)
+    if cached is not None:
+        return cached
+    
+    # 모델 호출 오류는 핸들러가 기본 커리큘럼과 오류 표시(error)로 바꿔 반환 (일괄 처리에서 실패로 기록)
+    if prompt_tokens > chunk_options['tokenBudget']:
+        # 토큰 예산을 넘으면 섹션별 개요를 만든 뒤 하나의 커리큘럼으로 합침
+        print(f"토큰 예산({chunk_options['tokenBudget']})을 넘어 데이터를 나눠 처리합니다.")
+        curriculum = invoke_text_model(model_id, _reduce_prompt(title, data, model_id, chunk_options),
+                                       chunk_options['maxOutputTokens'])
+    else:
+        curriculum = invoke_text_model(model_id, build_user_prompt(title, data), chunk_options['maxOutputTokens'],
+                                       CURRICULUM_SYSTEM_PROMPT)
+    _cache_put(cache_key, curriculum)
+    return curriculum
 
-참고 데이터: {data}
+def _generation_cache_key(model_id, title, data, prompt_tokens, chunk_options):
+    """생성 결과 캐시 키 (데이터를 나눠 처리하면 결과가 달라지므로 청크 설정도 포함)"""
+    
+    if prompt_tokens > chunk_options['tokenBudget']:
+        chunk_key = (chunk_options['chunkTokens'], chunk_options['chunkOverlapTokens'], chunk_options['tokenBudget'])
+        return response_cache.make_cache_key(model_id, PROMPT_TEMPLATE_VERSION, title, data, None, chunk_key)
+    return response_cache.make_cache_key(model_id, PROMPT_TEMPLATE_VERSION, title, data, None)
 
-다음 형식으로 커리큘럼을 작성해주세요:
+def _reduce_prompt(title, data, model_id, chunk_options):
+    """긴 데이터의 섹션별 개요를 병렬로 생성하고, 개요를 합친 최종 프롬프트 반환"""
+    
+    outline_tokens = max(256, chunk_options['maxOutputTokens'] // 4)
+    # 개요 생성은 작업 스레드에서 실행되므로 토큰 사용량이 현재 호출의 지표에 합산되도록 기록기를 전달
+    with metrics.stage('Outline'):
+        outlines = chunking.map_outlines(
+            title,
+            data,
+            metrics.bind(lambda outline_prompt: invoke_text_model(model_id, outline_prompt, outline_tokens,
+                                                                  chunking.OUTLINE_SYSTEM_PROMPT)),
+            chunk_options
+        )
+    return chunking.build_reduce_prompt(title, outlines)
 
-1. 주제 소개 (주제에 대한 간략한 설명)
-2. 교수진 소개 (이 주제를 가르칠 가상의 교수 3명의 이름, 전공, 경력 등)
-3. 교수별 대표 강의 (각 교수가 담당할 주요 강의 내용)
-4. 교수별 주요 컬럼 (각 교수가 작성한 주요 컬럼이나 연구 내용)
-5. 평가 방식 (학생들의 성취도를 평가하는 방법)
+def generate_without_kb_stream(title, data, model_id, sinks, bypass_cache=False, chunk_options=None):
+    """
+    일반 Bedrock 모델의 스트리밍 응답을 생성되는 대로 싱크에 전달
+    
+    Args:
+        title (str): 커리큘럼 제목
+        data (str): 참고 데이터
+        model_id (str): 요청한 모델 ID
+        sinks (list): streaming 모듈의 싱크 목록 (StdoutSink, FileSink, S3MultipartSink)
+        bypass_cache (bool): True이면 캐시를 확인하지 않음
+        chunk_options (dict, optional): 긴 데이터를 나눠 처리할 때의 설정
+    
+    Returns:
+        int: 생성된 문자 수
+    """
+    chunk_options = chunk_options or dict(chunking.DEFAULT_CHUNK_OPTIONS)
+    model_id = model_catalog.resolve_model_id(model_id)
+    prompt = build_prompt(title, data)
+    prompt_tokens = chunking.estimate_tokens(prompt)
+    
+    # 캐시에 있으면 한 번에 전달 (스트리밍 결과는 메모리에 모으지 않으므로 캐시에 저장하지 않음)
+    cache_key = _generation_cache_key(model_id, title, data, prompt_tokens, chunk_options)
+    cached = _cache_get(cache_key, bypass_cache)
+    if cached is not None:
+        return streaming.stream_to_sinks([cached], sinks)
+    
+    # 긴 데이터는 섹션별 개요를 먼저 만들고, 최종 합치기 단계만 스트리밍
+    if prompt_tokens > chunk_options['tokenBudget']:
+        request = model_adapters.get_adapter(model_id).build_request(
+            _reduce_prompt(title, data, model_id, chunk_options), None, chunk_options['maxOutputTokens'])
+    else:
+        request = model_adapters.get_adapter(model_id).build_request(
+            build_user_prompt(title, data), CURRICULUM_SYSTEM_PROMPT, chunk_options['maxOutputTokens'])
+    
+    estimated_tokens = _estimate_request_tokens(request)
+    with limiter.slot(model_id, estimated_tokens), metrics.stage('Generation'):
+        response = get_client('bedrock-runtime', **limiter.client_options).converse_stream(**request)
+        metrics.add('ModelCalls', 1)
+        return streaming.stream_to_sinks(streaming.iter_stream_text(response, model_id), sinks)
 
-체계적이고 교육적으로 가치 있는 커리큘럼을 작성해주세요."""
-    print(f"prompt 교슈내용: {prompt}")
-    try:
-        # 모델 ID에 따라 요청 형식 조정
-        if 'claude' in model_id.lower():
-            # Claude 모델용 요청
-            response = bedrock_runtime.invoke_model(
-                modelId=model_id,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 4000,
-                    "temperature": 0.6,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                })
-            )
-            
-            # 응답 파싱
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
-        
-        elif 'titan' in model_id.lower():
-            # Titan 모델용 요청
-            response = bedrock_runtime.invoke_model(
-                modelId=model_id,
-                body=json.dumps({
-                    "inputText": prompt,
-                    "textGenerationConfig": {
-                        "maxTokenCount": 4000,
-                        "temperature": 0.6,
-                        "topP": 0.9
-                    }
-                })
-            )
-            
-            # 응답 파싱
-            response_body = json.loads(response['body'].read())
-            return response_body['results'][0]['outputText']
-        
-        else:
-            # 기타 모델용 기본 요청
-            response = bedrock_runtime.invoke_model(
-                modelId=model_id,
-                body=json.dumps({
-                    "prompt": prompt,
-                    "max_tokens": 4000,
-                    "temperature": 0.7
-                })
-            )
-            
-            # 응답 파싱 (모델에 따라 다를 수 있음)
-            response_body = json.loads(response['body'].read())
-            if 'completion' in response_body:
-                return response_body['completion']
-            elif 'generated_text' in response_body:
-                return response_body['generated_text']
-            else:
-                return str(response_body)  # 응답 구조를 알 수 없는 경우
+def _estimate_request_tokens(request):
+    """converse 요청의 예상 토큰 수 (입력 추정치 + 최대 출력 토큰 수, 호출 한도 계산용)"""
     
-    except Exception as e:
-        print(f"모델 호출 중 오류 발생: {str(e)}")
-        # 오류 발생 시 기본 커리큘럼 반환
-        return f"""# 기본 커리큘럼
+    texts = [block.get('text', '') for block in request.get('system', [])]
+    texts += [block.get('text', '') for message in request['messages'] for block in message['content']]
+    return chunking.estimate_tokens('\n'.join(texts)) + request['inferenceConfig']['maxTokens']
 
-오류로 인해 자동 생성된 기본 커리큘럼입니다. 오류: {str(e)}""" 
\ No newline at end of file
+def invoke_text_model(model_id, prompt, max_tokens=4000, system=None):
+    """
+    Converse API로 Bedrock 모델을 호출하여 생성된 텍스트 반환
+    
+    모델 계열별 차이(시스템 프롬프트 지원, 캐시 지점, 추론 설정)는 model_adapters가 처리합니다.
+    
+    Args:
+        model_id (str): 모델 ID
+        prompt (str): 사용자 메시지
+        max_tokens (int): 최대 출력 토큰 수
+        system (str, optional): 시스템 프롬프트 (지원하는 모델에서는 프롬프트 캐시 대상)
+    
+    Returns:
+        str: 생성된 텍스트
+    """
+    
+    adapter = model_adapters.get_adapter(model_id)
+    request = adapter.build_request(prompt, system, max_tokens)
+    
+    # 호출 한도를 넘으면 기다리거나 BedrockThrottledError 발생 (실제 토큰 수로 한도를 보정)
+    start_time = time.perf_counter()
+    with limiter.slot(model_id, _estimate_request_tokens(request)) as slot_usage, metrics.stage('Generation'):
+        response = get_client('bedrock-runtime', **limiter.client_options).converse(**request)
+        usage = model_adapters.usage_from(response)
+        if usage['inputTokens'] is not None and usage['outputTokens'] is not None:
+            slot_usage['tokens'] = usage['inputTokens'] + usage['outputTokens']
+    metrics.add('ModelCalls', 1)
+    model_adapters.record_usage(model_id, usage, round((time.perf_counter() - start_time) * 1000, 1))
+    
+    return adapter.parse_response(response)
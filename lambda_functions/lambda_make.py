@@ -1,10 +1,53 @@
-import boto3
 import json
 import os
 import time
 import argparse
-import zipfile
-import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    # 저장소 루트의 스크립트와 Lambda 핸들러가 같은 클라이언트 레지스트리를 쓰도록 'aws_clients'로 가져옴
+    from aws_clients import get_client
+except ImportError:
+    # lambda_functions 디렉토리를 경로에 추가하지 않고 패키지로 가져올 때
+    from lambda_functions.aws_clients import get_client
+
+try:
+    from lambda_functions import packaging
+except ImportError:
+    # lambda_functions 디렉토리에서 직접 실행할 때
+    import packaging
+
+# Lambda 소스 디렉토리
+LAMBDA_SOURCE_DIR = packaging.LAMBDA_SOURCE_DIR
+
+# 모든 함수에 적용할 구성 (배포된 구성과 다를 때만 update_function_configuration 호출)
+FUNCTION_CONFIG = {
+    'Runtime': packaging.LAMBDA_RUNTIME,
+    'Handler': 'lambda_function.lambda_handler',
+    'Timeout': 300,  # 타임아웃을 5분(300초)으로 설정
+    'MemorySize': 512,  # 메모리 크기를 512MB로 설정
+}
+
+# 함수별로 FUNCTION_CONFIG에 더할 구성
+FUNCTION_CONFIG_OVERRIDES = {
+    # 모든 컨테이너가 모델별 호출 한도를 DynamoDB 테이블(curriculum-rate-limits)에서 나눠 씀
+    'generate-curriculum-kb': {
+        'Environment': {'Variables': {'RATE_LIMIT_BACKEND': 'dynamodb'}}
+    },
+}
+
+# 공용 의존성 레이어가 있어야 동작하는 함수 (레이어를 지정하지 않고 배포해도 레이어를 게시해 연결)
+LAYER_REQUIRED_FUNCTIONS = (
+    'generate-curriculum-kb',  # 로컬 벡터 인덱스 검색과 임베딩 캐시가 numpy를 씀
+)
+
+# 마지막 배포 해시를 기록하는 매니페스트
+DEPLOY_MANIFEST_PATH = os.path.join(LAMBDA_SOURCE_DIR, '.deploy_manifest.json')
+
+# 동시에 배포할 최대 함수 수 (함수별 업데이트는 순차 진행되므로 함수 간 충돌은 없음)
+DEFAULT_DEPLOY_CONCURRENCY = 3
 
 # class로 만들어줘 
 # 인자값은 function_name, source_file
@@ -18,20 +61,54 @@ class LambdaFunctionManager:
         lambda_client: AWS Lambda 클라이언트
         iam_client: AWS IAM 클라이언트
         lambda_role_name: Lambda 함수 실행 역할 이름
+        manifest_path: 마지막 배포 해시를 기록하는 매니페스트 파일 경로
+        function_config: 모든 함수에 적용할 구성 (FUNCTION_CONFIG + 레이어, 함수별 구성은 config_for)
     """
     
-    def __init__(self, lambda_role_name='LambdaExecutionRole'):
+    def __init__(self, lambda_role_name='LambdaExecutionRole', manifest_path=DEPLOY_MANIFEST_PATH,
+                 layer_arns=None, compile_bytecode=True):
         """
         LambdaFunctionManager 초기화
         
         Args:
             lambda_role_name (str): Lambda 함수 실행 역할 이름
+            manifest_path (str): 마지막으로 배포한 코드 해시와 구성을 기록하는 파일 경로
+            layer_arns (list, optional): 모든 함수에 연결할 레이어 버전 ARN 목록
+            compile_bytecode (bool): 번들에 미리 컴파일한 바이트코드를 포함할지 여부
         """
-        self.lambda_client = boto3.client('lambda')
-        self.iam_client = boto3.client('iam')
+        self.lambda_client = get_client('lambda')
+        self.iam_client = get_client('iam')
         self.lambda_role_name = lambda_role_name
+        self.manifest_path = manifest_path
+        self.compile_bytecode = compile_bytecode
+        self.function_config = dict(FUNCTION_CONFIG)
+        if layer_arns:
+            self.function_config['Layers'] = list(layer_arns)
+        self._manifest = self._load_manifest()
+        self._manifest_lock = threading.Lock()
+        self._layer_arn = None
+        self._layer_lock = threading.Lock()
+    
+    def config_for(self, function_name):
+        """
+        함수에 적용할 구성 (공통 구성 + FUNCTION_CONFIG_OVERRIDES)
+        
+        LAYER_REQUIRED_FUNCTIONS의 함수는 레이어가 지정되지 않았으면 공용 의존성 레이어를 게시해 연결합니다.
+        레이어를 게시하지 못하면 예외가 발생해 해당 함수의 배포가 실패합니다.
+        """
+        config = dict(self.function_config, **FUNCTION_CONFIG_OVERRIDES.get(function_name, {}))
+        if function_name in LAYER_REQUIRED_FUNCTIONS and not config.get('Layers'):
+            config['Layers'] = [self._dependency_layer()]
+        return config
+    
+    def _dependency_layer(self):
+        """공용 의존성 레이어 버전 ARN (여러 함수를 동시에 배포해도 한 번만 게시)"""
+        with self._layer_lock:
+            if self._layer_arn is None:
+                self._layer_arn = packaging.ensure_layer(self.lambda_client, compile_bytecode=self.compile_bytecode)
+            return self._layer_arn
     
-    def create_or_update_function(self, function_name, source_file=None, max_retries=5):
+    def create_or_update_function(self, function_name, source_file=None, max_retries=5, force=False):
         """
         Lambda 함수를 생성하거나 업데이트
         
@@ -39,111 +116,180 @@ class LambdaFunctionManager:
             function_name (str): 생성할 Lambda 함수 이름
             source_file (str, optional): Lambda 함수 소스 코드 파일 경로
             max_retries (int): 최대 재시도 횟수
+            force (bool): True이면 변경 여부와 관계없이 코드와 구성을 업데이트
         
         Returns:
             str: 생성된 Lambda 함수의 ARN
         """
-        # 소스 파일 경로 결정
-        if source_file is None:
-            source_file = os.path.join(os.path.dirname(__file__), f"{function_name}.py")
+        report = self.deploy_function(function_name, source_file, max_retries, force)
+        if report['error']:
+            raise report['exception']
+        return report['arn']
+    
+    def deploy_function(self, function_name, source_file=None, max_retries=5, force=False):
+        """
+        Lambda 함수를 생성하거나 업데이트하고 단계별 소요 시간을 기록
         
-        # 소스 파일 존재 확인
-        if not os.path.exists(source_file):
-            raise FileNotFoundError(f"소스 파일을 찾을 수 없습니다: {source_file}")
+        코드 해시(CodeSha256)와 구성이 배포된 함수와 같으면 업데이트를 건너뛰고,
+        매니페스트에 기록된 해시와도 같으면 API를 전혀 호출하지 않습니다.
         
-        # 소스 코드 읽기
-        with open(source_file, 'r') as f:
-            lambda_code = f.read()
+        Args:
+            function_name (str): 생성할 Lambda 함수 이름
+            source_file (str, optional): Lambda 함수 소스 코드 파일 경로
+            max_retries (int): 구성 업데이트 충돌 시 최대 재시도 횟수
+            force (bool): True이면 변경 여부와 관계없이 코드와 구성을 업데이트
         
-        print(f"Lambda 함수 '{function_name}' 생성/업데이트 중...")
+        Returns:
+            dict: {'functionName', 'arn', 'action', 'state', 'timings', 'error', 'exception'}
+                  action은 CREATE, UPDATE, UNCHANGED 중 하나
+                  state는 PENDING → PACKAGING → CREATING/UPDATING_CODE → ... → DONE 또는 FAILED
+        """
+        report = {
+            'functionName': function_name,
+            'arn': None,
+            'action': None,
+            'state': 'PENDING',
+            'timings': {},
+            'error': None,
+            'exception': None
+        }
+        start_time = time.perf_counter()
         
-        # 이미 존재하는 함수인지 확인
         try:
-            lambda_response = self.lambda_client.get_function(FunctionName=function_name)
-            print(f"Lambda 함수 '{function_name}'이(가) 이미 존재합니다.")
-            print(f"함수 ARN: {lambda_response['Configuration']['FunctionArn']}")
+            # 소스 파일 경로 결정
+            if source_file is None:
+                source_file = os.path.join(os.path.dirname(__file__), f"{function_name}.py")
             
-            # 함수 코드 업데이트
-            print(f"Lambda 함수 '{function_name}' 코드 업데이트 중...")
+            # 소스 파일 존재 확인
+            if not os.path.exists(source_file):
+                raise FileNotFoundError(f"소스 파일을 찾을 수 없습니다: {source_file}")
             
-            # 소스 코드를 ZIP 파일로 압축
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.writestr('lambda_function.py', lambda_code)
+            print(f"Lambda 함수 '{function_name}' 생성/업데이트 중...")
             
-            zip_buffer.seek(0)
+            # 핸들러와 핸들러가 가져오는 로컬 모듈을 ZIP 파일로 압축
+            with _timed(report, 'PACKAGING'):
+                zip_bytes = packaging.build_function_bundle(source_file, self.compile_bytecode)
+            local_sha = packaging.code_sha256(zip_bytes)
+            function_config = self.config_for(function_name)
             
-            # 함수 코드 업데이트
-            self.lambda_client.update_function_code(
-                FunctionName=function_name,
-                ZipFile=zip_buffer.read()
-            )
+            # 마지막 배포 이후 바뀐 것이 없으면 API 호출 없이 종료
+            deployed = self._manifest.get(function_name)
+            if (not force and deployed and deployed.get('codeSha256') == local_sha
+                    and deployed.get('config') == function_config):
+                report['action'] = 'UNCHANGED'
+                report['arn'] = deployed['arn']
+                report['state'] = 'DONE'
+                report['timings']['TOTAL'] = round(time.perf_counter() - start_time, 3)
+                print(f"Lambda 함수 '{function_name}'은(는) 변경 사항이 없습니다. (매니페스트 기준)")
+                return report
             
-            # 함수가 업데이트될 때까지 대기
-            print(f"Lambda 함수 '{function_name}' 코드 업데이트 완료. 상태 확인 중...")
-            self._wait_for_function_update(function_name)
+            # 이미 존재하는 함수인지 확인
+            try:
+                lambda_response = self.lambda_client.get_function(FunctionName=function_name)
+            except self.lambda_client.exceptions.ResourceNotFoundException:
+                lambda_response = None
             
-            # 함수 구성 업데이트 (타임아웃 증가) - 재시도 로직 추가
-            for attempt in range(max_retries):
-                try:
-                    self.lambda_client.update_function_configuration(
+            if lambda_response:
+                configuration = lambda_response['Configuration']
+                report['arn'] = configuration['FunctionArn']
+                code_changed = force or configuration.get('CodeSha256') != local_sha
+                config_changes = function_config if force else config_differences(configuration, function_config)
+                report['action'] = 'UPDATE' if code_changed or config_changes else 'UNCHANGED'
+                
+                if code_changed:
+                    print(f"Lambda 함수 '{function_name}' 코드 업데이트 중...")
+                    with _timed(report, 'UPDATING_CODE'):
+                        self.lambda_client.update_function_code(
+                            FunctionName=function_name,
+                            ZipFile=zip_bytes
+                        )
+                    
+                    # 코드 업데이트가 끝나야 구성을 바꿀 수 있음
+                    with _timed(report, 'WAITING_CODE'):
+                        self._wait_for_function_update(function_name)
+                else:
+                    print(f"Lambda 함수 '{function_name}' 코드가 배포된 버전과 같습니다. 코드 업데이트를 건너뜁니다.")
+                
+                if config_changes:
+                    print(f"Lambda 함수 '{function_name}' 구성 업데이트 중: {config_changes}")
+                    # 함수 구성 업데이트 - 충돌 시 재시도
+                    with _timed(report, 'UPDATING_CONFIG'):
+                        for attempt in range(max_retries):
+                            try:
+                                self.lambda_client.update_function_configuration(
+                                    FunctionName=function_name,
+                                    **config_changes
+                                )
+                                print(f"Lambda 함수 '{function_name}' 구성 업데이트 완료")
+                                break
+                            except self.lambda_client.exceptions.ResourceConflictException as e:
+                                if attempt < max_retries - 1:
+                                    print(f"Lambda 함수 '{function_name}' 업데이트 충돌 발생. 재시도 ({attempt+1}/{max_retries})...")
+                                    self._wait_for_function_update(function_name)
+                                else:
+                                    print(f"최대 재시도 횟수 초과. 구성 업데이트에 실패했습니다.")
+                                    # 적용되지 않은 구성이 매니페스트에 기록되지 않도록 실패로 처리
+                                    raise
+                    
+                    with _timed(report, 'WAITING_CONFIG'):
+                        self._wait_for_function_update(function_name)
+            else:
+                report['action'] = 'CREATE'
+                print(f"Lambda 함수 '{function_name}'이(가) 존재하지 않습니다. 새로 생성합니다.")
+                
+                # Lambda 실행 역할 가져오기
+                lambda_role_arn = self._get_or_create_role()
+                
+                with _timed(report, 'CREATING'):
+                    response = self.lambda_client.create_function(
                         FunctionName=function_name,
-                        Timeout=300,  # 타임아웃을 5분(300초)으로 설정
-                        MemorySize=512  # 메모리 크기를 512MB로 설정
+                        Role=lambda_role_arn,
+                        Code={
+                            'ZipFile': zip_bytes
+                        },
+                        Description=f'Lambda function for {function_name}',
+                        **function_config
                     )
-                    print(f"Lambda 함수 '{function_name}' 구성 업데이트 완료")
-                    break
-                except self.lambda_client.exceptions.ResourceConflictException as e:
-                    if attempt < max_retries - 1:
-                        wait_time = 5 * (attempt + 1)  # 점진적으로 대기 시간 증가
-                        print(f"업데이트 충돌 발생. {wait_time}초 후 재시도 ({attempt+1}/{max_retries})...")
-                        time.sleep(wait_time)
-                    else:
-                        print(f"최대 재시도 횟수 초과. 구성 업데이트를 건너뜁니다.")
-                        print(f"오류: {str(e)}")
-            
-            # 함수가 업데이트될 때까지 대기
-            self._wait_for_function_update(function_name)
-            
-            print(f"Lambda 함수 '{function_name}' 업데이트 완료")
+                report['arn'] = response['FunctionArn']
+                
+                # 함수가 활성화될 때까지 대기
+                with _timed(report, 'WAITING_ACTIVE'):
+                    self._wait_for_function_active(function_name)
             
-            return lambda_response['Configuration']['FunctionArn']
+            report['state'] = 'DONE'
+            self._record_deployment(function_name, report['arn'], local_sha, function_config)
+            print(f"Lambda 함수 '{function_name}' 처리 완료 (ARN: {report['arn']})")
         
-        except self.lambda_client.exceptions.ResourceNotFoundException:
-            # 함수가 존재하지 않으면 새로 생성
-            print(f"Lambda 함수 '{function_name}'이(가) 존재하지 않습니다. 새로 생성합니다.")
-            
-            # Lambda 실행 역할 가져오기
-            lambda_role_arn = self._get_or_create_role()
-            
-            # 소스 코드를 ZIP 파일로 압축
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.writestr('lambda_function.py', lambda_code)
-            
-            zip_buffer.seek(0)
-            
-            # 함수 생성
-            response = self.lambda_client.create_function(
-                FunctionName=function_name,
-                Runtime='python3.9',
-                Role=lambda_role_arn,
-                Handler='lambda_function.lambda_handler',
-                Code={
-                    'ZipFile': zip_buffer.read()
-                },
-                Description=f'Lambda function for {function_name}',
-                Timeout=300,  # 타임아웃을 5분(300초)으로 설정
-                MemorySize=512  # 메모리 크기를 512MB로 설정
-            )
-            
-            # 함수가 활성화될 때까지 대기
-            self._wait_for_function_active(function_name)
-            
-            print(f"Lambda 함수 '{function_name}' 생성 완료")
-            print(f"함수 ARN: {response['FunctionArn']}")
-            
-            return response['FunctionArn']
+        except Exception as e:
+            report['state'] = 'FAILED'
+            report['error'] = str(e)
+            report['exception'] = e
+            print(f"함수 '{function_name}' 생성/업데이트 중 오류 발생: {str(e)}")
+        
+        report['timings']['TOTAL'] = round(time.perf_counter() - start_time, 3)
+        return report
+    
+    def _load_manifest(self):
+        """배포 매니페스트 읽기 (없으면 빈 딕셔너리)"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _record_deployment(self, function_name, arn, local_sha, function_config):
+        """배포가 끝난 함수의 코드 해시와 구성을 매니페스트에 기록"""
+        with self._manifest_lock:
+            self._manifest[function_name] = {
+                'arn': arn,
+                'codeSha256': local_sha,
+                'config': function_config
+            }
+            try:
+                with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._manifest, f, indent=2, sort_keys=True)
+            except OSError as e:
+                print(f"배포 매니페스트 저장 실패: {str(e)}")
     
     def _get_or_create_role(self):
         """
@@ -161,104 +307,122 @@ class LambdaFunctionManager:
             # 역할 생성
             return create_lambda_role(self.lambda_role_name)
     
-    def create_or_update_functions(self, lambda_list):
+    def deploy_functions(self, lambda_list, max_workers=DEFAULT_DEPLOY_CONCURRENCY, force=False):
         """
-        여러 Lambda 함수를 한 번에 생성하거나 업데이트
+        여러 Lambda 함수를 동시에 생성하거나 업데이트
+        
+        함수마다 업데이트는 순서대로 진행되므로 함수 사이에는 충돌이 없고,
+        max_workers로 동시에 처리할 함수 수를 제한합니다.
         
         Args:
             lambda_list (dict): 함수 이름과 소스 파일 경로를 매핑한 딕셔너리
-                               예: {'save-curriculum': 'save_curriculum.py'}
+            max_workers (int): 동시에 배포할 최대 함수 수
+            force (bool): True이면 변경 여부와 관계없이 모두 업데이트
         
         Returns:
-            dict: 함수 이름과 ARN을 매핑한 딕셔너리
+            dict: 함수 이름 -> deploy_function 보고서
         """
-        result = {}
+        start_time = time.perf_counter()
         
-        for function_name, source_file in lambda_list.items():
-            try:
-                print(f"\n=== Lambda 함수 '{function_name}' 처리 시작 ===")
-                arn = self.create_or_update_function(function_name, source_file)
-                result[function_name] = arn
-                print(f"=== Lambda 함수 '{function_name}' 처리 완료 ===\n")
-                
-                # 다음 함수 처리 전에 잠시 대기
-                time.sleep(3)
-                
-            except Exception as e:
-                print(f"함수 '{function_name}' 생성/업데이트 중 오류 발생: {str(e)}")
-                import traceback
-                traceback.print_exc()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                function_name: executor.submit(self.deploy_function, function_name, source_file, force=force)
+                for function_name, source_file in lambda_list.items()
+            }
+            reports = {function_name: future.result() for function_name, future in futures.items()}
+        
+        print(f"\n=== Lambda 배포 보고서 (총 {time.perf_counter() - start_time:.1f}초) ===")
+        for function_name, report in reports.items():
+            phases = ', '.join(f"{phase}={seconds:.1f}s" for phase, seconds in report['timings'].items())
+            print(f"  {function_name}: {report['state']} ({report['action']}) {phases}")
+            if report['error']:
+                print(f"    오류: {report['error']}")
+        
+        return reports
+    
+    def create_or_update_functions(self, lambda_list, max_workers=DEFAULT_DEPLOY_CONCURRENCY, force=False):
+        """
+        여러 Lambda 함수를 한 번에 생성하거나 업데이트
+        
+        Args:
+            lambda_list (dict): 함수 이름과 소스 파일 경로를 매핑한 딕셔너리
+                               예: {'save-curriculum': 'save_curriculum.py'}
+            max_workers (int): 동시에 배포할 최대 함수 수
+            force (bool): True이면 변경 여부와 관계없이 모두 업데이트
         
-        return result
+        Returns:
+            dict: 함수 이름과 ARN을 매핑한 딕셔너리 (실패한 함수는 제외)
+        """
+        reports = self.deploy_functions(lambda_list, max_workers, force)
+        return {
+            function_name: report['arn']
+            for function_name, report in reports.items()
+            if report['state'] == 'DONE'
+        }
 
-    def _wait_for_function_update(self, function_name, max_wait_time=60, check_interval=5):
+    def _wait_for_function_update(self, function_name, max_wait_time=300, check_interval=1):
         """
-        Lambda 함수 업데이트가 완료될 때까지 대기
+        Lambda 함수 업데이트가 완료될 때까지 대기 (function_updated_v2 waiter 사용)
         
         Args:
             function_name (str): Lambda 함수 이름
             max_wait_time (int): 최대 대기 시간(초)
             check_interval (int): 상태 확인 간격(초)
         """
-        print(f"Lambda 함수 '{function_name}' 업데이트 완료 대기 중...")
-        start_time = time.time()
-        
-        while True:
-            try:
-                response = self.lambda_client.get_function(FunctionName=function_name)
-                state = response['Configuration']['State']
-                last_update = response['Configuration'].get('LastUpdateStatus', 'Successful')
-                
-                if state == 'Active' and last_update in ['Successful', None]:
-                    print(f"Lambda 함수 '{function_name}' 상태: {state}, 업데이트 상태: {last_update}")
-                    return
-                
-                print(f"Lambda 함수 '{function_name}' 상태: {state}, 업데이트 상태: {last_update}")
-                
-                # 최대 대기 시간 초과 확인
-                if time.time() - start_time > max_wait_time:
-                    print(f"최대 대기 시간({max_wait_time}초)이 초과되었습니다. 계속 진행합니다.")
-                    return
-                
-                time.sleep(check_interval)
-            
-            except Exception as e:
-                print(f"함수 상태 확인 중 오류 발생: {str(e)}")
-                return
+        self._wait(function_name, 'function_updated_v2', max_wait_time, check_interval)
 
-    def _wait_for_function_active(self, function_name, max_wait_time=60, check_interval=5):
+    def _wait_for_function_active(self, function_name, max_wait_time=300, check_interval=1):
         """
-        Lambda 함수가 활성화될 때까지 대기
+        Lambda 함수가 활성화될 때까지 대기 (function_active_v2 waiter 사용)
         
         Args:
             function_name (str): Lambda 함수 이름
             max_wait_time (int): 최대 대기 시간(초)
             check_interval (int): 상태 확인 간격(초)
         """
-        print(f"Lambda 함수 '{function_name}' 활성화 대기 중...")
-        start_time = time.time()
+        self._wait(function_name, 'function_active_v2', max_wait_time, check_interval)
+    
+    def _wait(self, function_name, waiter_name, max_wait_time, check_interval):
+        """
+        botocore waiter로 대기
         
-        while True:
-            try:
-                response = self.lambda_client.get_function(FunctionName=function_name)
-                state = response['Configuration']['State']
-                
-                if state == 'Active':
-                    print(f"Lambda 함수 '{function_name}' 상태: {state}")
-                    return
-                
-                print(f"Lambda 함수 '{function_name}' 상태: {state}")
-                
-                # 최대 대기 시간 초과 확인
-                if time.time() - start_time > max_wait_time:
-                    print(f"최대 대기 시간({max_wait_time}초)이 초과되었습니다. 계속 진행합니다.")
-                    return
-                
-                time.sleep(check_interval)
-            
-            except Exception as e:
-                print(f"함수 상태 확인 중 오류 발생: {str(e)}")
-                return
+        업데이트가 실패했거나 시간이 초과되면 WaiterError를 그대로 올려,
+        확인되지 않은 배포가 DONE으로 기록되지 않도록 합니다.
+        """
+        from botocore.exceptions import WaiterError
+        
+        try:
+            self.lambda_client.get_waiter(waiter_name).wait(
+                FunctionName=function_name,
+                WaiterConfig={
+                    'Delay': check_interval,
+                    'MaxAttempts': max(1, max_wait_time // check_interval)
+                }
+            )
+        except WaiterError as e:
+            print(f"Lambda 함수 '{function_name}' 대기 중 문제 발생 ({waiter_name}): {str(e)}")
+            raise
+
+def config_differences(configuration, desired=FUNCTION_CONFIG):
+    """배포된 구성과 원하는 구성(FUNCTION_CONFIG)의 차이. 같으면 빈 딕셔너리"""
+    deployed = dict(configuration)
+    # get_function은 레이어를 [{'Arn': ..., 'CodeSize': ...}] 형태로 반환
+    deployed['Layers'] = [layer['Arn'] for layer in configuration.get('Layers', [])]
+    return {
+        name: value
+        for name, value in desired.items()
+        if deployed.get(name) != value
+    }
+
+@contextmanager
+def _timed(report, phase):
+    """배포 보고서에 현재 단계를 기록하고 소요 시간(초)을 저장"""
+    report['state'] = phase
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        report['timings'][phase] = round(time.perf_counter() - start_time, 3)
 
 def create_lambda_role(role_name='LambdaExecutionRole', additional_policies=None):
     """
@@ -271,7 +435,7 @@ def create_lambda_role(role_name='LambdaExecutionRole', additional_policies=None
     Returns:
         str: 생성된 역할의 ARN
     """
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
     
     # 역할이 이미 존재하는지 확인
     try:
@@ -372,7 +536,7 @@ def get_lambda_role(role_name='LambdaExecutionRole'):
     Returns:
         dict: 역할 정보
     """
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
     
     try:
         lambda_role = iam_client.get_role(RoleName=role_name)
@@ -412,7 +576,7 @@ def add_bedrock_permissions_to_role(role_name='LambdaExecutionRole'):
     """Lambda 실행 역할에 Bedrock 권한 추가"""
     try:
         # IAM 클라이언트 생성
-        iam_client = boto3.client('iam')
+        iam_client = get_client('iam')
         
         # Bedrock 권한 정책 문서
         bedrock_policy = {
@@ -426,6 +590,15 @@ def add_bedrock_permissions_to_role(role_name='LambdaExecutionRole'):
                         "bedrock-agent-runtime:*"
                     ],
                     "Resource": "*"
+                },
+                {
+                    # 컨테이너 간에 모델별 호출 한도를 나눠 쓰는 상태 테이블 (RATE_LIMIT_BACKEND=dynamodb)
+                    "Effect": "Allow",
+                    "Action": [
+                        "dynamodb:GetItem",
+                        "dynamodb:PutItem"
+                    ],
+                    "Resource": "arn:aws:dynamodb:*:*:table/curriculum-rate-limits"
                 }
             ]
         }
@@ -457,6 +630,11 @@ def main():
     parser.add_argument('--create-role', action='store_true', help='Lambda 실행 역할 생성')
     parser.add_argument('--role-name', default='LambdaExecutionRole', help='Lambda 실행 역할 이름 (기본값: LambdaExecutionRole)')
     parser.add_argument('--get-role', action='store_true', help='Lambda 실행 역할 정보 가져오기')
+    parser.add_argument('--force', action='store_true', help='변경 여부와 관계없이 코드와 구성 업데이트')
+    parser.add_argument('--with-layer', action='store_true', help='requirements의 의존성을 공용 레이어로 게시하고 모든 함수에 연결')
+    parser.add_argument('--layer-name', default=packaging.DEFAULT_LAYER_NAME, help='공용 레이어 이름')
+    parser.add_argument('--no-compile', action='store_true', help='미리 컴파일한 바이트코드 없이 패키징')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_DEPLOY_CONCURRENCY, help='동시에 배포할 최대 함수 수')
     
     args = parser.parse_args()
     
@@ -470,7 +648,13 @@ def main():
         get_lambda_role(args.role_name)
         return
     
-    manager = LambdaFunctionManager(args.role_name)
+    layer_arns = None
+    if args.with_layer:
+        layer_arns = [packaging.ensure_layer(get_client('lambda'), args.layer_name,
+                                             compile_bytecode=not args.no_compile)]
+    
+    manager = LambdaFunctionManager(args.role_name, layer_arns=layer_arns,
+                                    compile_bytecode=not args.no_compile)
     
     if args.all:
         # 모든 Lambda 함수 생성/업데이트
@@ -479,7 +663,7 @@ def main():
             # 필요한 다른 함수들 추가
         }
         
-        result = manager.create_or_update_functions(lambda_list)
+        result = manager.create_or_update_functions(lambda_list, args.max_workers, args.force)
         print("생성/업데이트된 Lambda 함수 ARN:")
         for name, arn in result.items():
             print(f"  {name}: {arn}")
@@ -487,7 +671,7 @@ def main():
     elif args.function:
         # 단일 Lambda 함수 생성/업데이트
         try:
-            function_arn = manager.create_or_update_function(args.function, args.source)
+            function_arn = manager.create_or_update_function(args.function, args.source, force=args.force)
             print(f"Lambda 함수 ARN: {function_arn}")
         except Exception as e:
             print(f"오류 발생: {str(e)}")
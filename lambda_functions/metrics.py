@@ -0,0 +1,326 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# CloudWatch 지표 네임스페이스와 출력 대상 (Lambda 환경 변수로 변경 가능)
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'CurriculumGenerator')
+METRICS_SINK = os.environ.get('METRICS_SINK', 'stdout')  # stdout | memory | none
+
+# 지표에 붙는 차원 (상관관계 ID처럼 값이 매번 바뀌는 항목은 차원이 아닌 속성으로 기록)
+METRICS_DIMENSIONS = [['FunctionName']]
+
+_current = contextvars.ContextVar('metrics_recorder', default=None)
+# 이미 호출된 함수 이름 (Lambda 컨테이너는 함수 하나만 실행하지만, 로컬 실행에서는 여러 함수가 한 프로세스를 공유)
+_warm_functions = set()
+_cold_start_lock = threading.Lock()
+
+
+class StdoutSink:
+    """CloudWatch Logs가 지표로 추출하도록 EMF 레코드를 한 줄 JSON으로 출력"""
+
+    def emit(self, record):
+        print(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+
+class MemorySink:
+    """EMF 레코드를 메모리에 모으는 싱크 (로컬 실행, 테스트, 벤치마크용)"""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+class NullSink:
+    """지표를 버리는 싱크"""
+
+    def emit(self, record):
+        pass
+
+
+def create_sink(kind=METRICS_SINK):
+    """
+    설정에 맞는 싱크 생성
+
+    Args:
+        kind (str): 'stdout', 'memory', 'none' 중 하나
+
+    Returns:
+        싱크 객체 (emit(record) 메서드를 가짐)
+    """
+    if kind == 'memory':
+        return MemorySink()
+    if kind == 'none':
+        return NullSink()
+    return StdoutSink()
+
+
+_sink = create_sink()
+
+
+def set_sink(sink):
+    """지표 싱크 교체 (None이면 환경 설정의 기본 싱크로 되돌림)"""
+    global _sink
+    _sink = sink if sink is not None else create_sink()
+
+
+def get_sink():
+    """현재 지표 싱크"""
+    return _sink
+
+
+def payload_bytes(value):
+    """이벤트/응답을 JSON으로 직렬화했을 때의 바이트 수 (Step Functions 상태 크기와 같은 기준)"""
+    if value is None:
+        return 0
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class MetricsRecorder:
+    """
+    호출 하나의 지표 모음
+
+    Attributes:
+        function_name: Lambda 함수 이름 (차원)
+        correlation_id: 실행 전체를 묶는 상관관계 ID (속성)
+        cold_start: 컨테이너의 첫 호출 여부
+        metrics: 지표 이름 -> [값, 단위]
+        properties: 지표가 아닌 추가 속성 (모델 ID 등)
+        model_calls: 모델 호출별 사용량 [{'modelId', 'inputTokens', 'outputTokens', 'latencyMs'}, ...]
+    """
+
+    def __init__(self, function_name, correlation_id, cold_start=False, request_id=None):
+        self.function_name = function_name
+        self.correlation_id = correlation_id
+        self.cold_start = cold_start
+        self.request_id = request_id
+        self.metrics = {}
+        self.properties = {}
+        self.model_calls = []
+        self._lock = threading.Lock()
+
+    def put(self, name, value, unit='None'):
+        """지표 값 지정 (이전 값을 덮어씀)"""
+        with self._lock:
+            self.metrics[name] = [value, unit]
+
+    def add(self, name, value, unit='Count'):
+        """지표 값 누적 (같은 지표를 여러 번 기록하면 합산)"""
+        with self._lock:
+            current = self.metrics.get(name)
+            self.metrics[name] = [(current[0] if current else 0) + value, unit]
+
+    def set_property(self, name, value):
+        """지표가 아닌 속성 기록 (로그 검색용)"""
+        with self._lock:
+            self.properties[name] = value
+
+    def record_model_call(self, model_id, input_tokens, output_tokens, latency_ms,
+                          cache_read_tokens=0, cache_write_tokens=0):
+        """모델 호출 하나의 사용량 기록 (토큰 수는 지표에도 합산)"""
+        with self._lock:
+            self.model_calls.append({
+                'modelId': model_id,
+                'inputTokens': input_tokens,
+                'outputTokens': output_tokens,
+                'cacheReadInputTokens': cache_read_tokens,
+                'cacheWriteInputTokens': cache_write_tokens,
+                'latencyMs': latency_ms
+            })
+        if input_tokens is not None:
+            self.add('InputTokens', int(input_tokens))
+        if output_tokens is not None:
+            self.add('OutputTokens', int(output_tokens))
+        if cache_read_tokens:
+            self.add('CacheReadInputTokens', int(cache_read_tokens))
+        if cache_write_tokens:
+            self.add('CacheWriteInputTokens', int(cache_write_tokens))
+
+    def usage(self):
+        """
+        상태 출력에 붙일 사용량 요약
+
+        Returns:
+            dict: {'calls': [...], 'inputTokens', 'outputTokens', 'latencyMs'}
+        """
+        with self._lock:
+            calls = list(self.model_calls)
+        return {
+            'calls': calls,
+            'inputTokens': sum(call['inputTokens'] or 0 for call in calls),
+            'outputTokens': sum(call['outputTokens'] or 0 for call in calls),
+            'latencyMs': round(sum(call['latencyMs'] or 0 for call in calls), 1)
+        }
+
+    @contextmanager
+    def stage(self, name):
+        """블록의 소요 시간을 '<name>Time' 지표(밀리초)에 누적"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(f"{name}Time", round((time.perf_counter() - start_time) * 1000, 1), 'Milliseconds')
+
+    def to_emf(self):
+        """CloudWatch Embedded Metric Format 레코드"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            properties = dict(self.properties)
+
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': METRICS_DIMENSIONS,
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()]
+                }]
+            },
+            'FunctionName': self.function_name,
+            'correlationId': self.correlation_id,
+            'requestId': self.request_id,
+            **properties
+        }
+        record.update({name: value for name, (value, _) in metrics.items()})
+        return record
+
+    def flush(self):
+        """레코드를 싱크로 내보냄"""
+        get_sink().emit(self.to_emf())
+
+
+def current():
+    """현재 호출의 기록기 (instrument 밖에서 호출되면 None)"""
+    return _current.get()
+
+
+def add(name, value, unit='Count'):
+    """현재 호출의 지표 값 누적 (기록기가 없으면 무시)"""
+    recorder = current()
+    if recorder is not None:
+        recorder.add(name, value, unit)
+
+
+def set_property(name, value):
+    """현재 호출의 속성 기록 (기록기가 없으면 무시)"""
+    recorder = current()
+    if recorder is not None:
+        recorder.set_property(name, value)
+
+
+@contextmanager
+def stage(name):
+    """현재 호출의 단계 소요 시간 측정 (기록기가 없으면 측정하지 않음)"""
+    recorder = current()
+    if recorder is None:
+        yield
+        return
+    with recorder.stage(name):
+        yield
+
+
+def record_usage(model_id, input_tokens, output_tokens, latency_ms=None, cache_read_tokens=0, cache_write_tokens=0):
+    """
+    Bedrock 모델 호출 하나의 사용량 기록 (기록기가 없으면 무시)
+
+    Args:
+        model_id (str): 호출한 모델 ID
+        input_tokens (int): 입력 토큰 수 (알 수 없으면 None)
+        output_tokens (int): 출력 토큰 수 (알 수 없으면 None)
+        latency_ms (float, optional): 호출 소요 시간(밀리초)
+        cache_read_tokens (int): 프롬프트 캐시에서 읽은 입력 토큰 수
+        cache_write_tokens (int): 프롬프트 캐시에 쓴 입력 토큰 수
+    """
+    recorder = current()
+    if recorder is not None:
+        recorder.record_model_call(model_id, input_tokens, output_tokens, latency_ms,
+                                   cache_read_tokens, cache_write_tokens)
+
+
+def usage():
+    """현재 호출의 사용량 요약 (기록기가 없으면 None)"""
+    recorder = current()
+    return recorder.usage() if recorder is not None else None
+
+
+def bind(func):
+    """
+    현재 기록기를 다른 스레드에서도 쓰도록 함수 감싸기
+
+    ThreadPoolExecutor의 작업 스레드는 contextvars를 물려받지 않으므로, 병렬 호출에서 기록한
+    토큰 사용량 등이 현재 호출의 지표에 합산되도록 기록기를 전달합니다.
+    """
+    recorder = current()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current.set(recorder)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+def correlation_id_from(event):
+    """이벤트의 상관관계 ID (없으면 새로 생성)"""
+    if isinstance(event, dict) and event.get('correlationId'):
+        return event['correlationId']
+    return uuid.uuid4().hex
+
+
+def instrument(handler):
+    """
+    lambda_handler를 감싸 호출마다 지표 레코드 하나를 내보내는 데코레이터
+
+    기록 항목: Duration, ColdStart, InputBytes, OutputBytes, Errors와 핸들러 안에서
+    stage()/add()/record_usage()로 기록한 단계별 시간, 바이트 수, 토큰 사용량
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        function_name = getattr(context, 'function_name', None) or handler.__module__
+        with _cold_start_lock:
+            cold_start = function_name not in _warm_functions
+            _warm_functions.add(function_name)
+
+        recorder = MetricsRecorder(
+            function_name,
+            correlation_id_from(event),
+            cold_start,
+            getattr(context, 'aws_request_id', None)
+        )
+        recorder.put('ColdStart', 1 if cold_start else 0, 'Count')
+        recorder.put('InputBytes', payload_bytes(event), 'Bytes')
+
+        token = _current.set(recorder)
+        start_time = time.perf_counter()
+        try:
+            result = handler(event, context)
+            recorder.put('OutputBytes', payload_bytes(result), 'Bytes')
+            recorder.put('Errors', 0, 'Count')
+            return result
+        except Exception:
+            recorder.put('Errors', 1, 'Count')
+            raise
+        finally:
+            recorder.put('Duration', round((time.perf_counter() - start_time) * 1000, 1), 'Milliseconds')
+            _current.reset(token)
+            try:
+                recorder.flush()
+            except Exception as e:
+                print(f"지표 내보내기 실패: {str(e)}")
+
+    return wrapper
@@ -0,0 +1,162 @@
+import os
+
+import metrics
+
+# 프롬프트 캐시 사용 여부 (Lambda 환경 변수로 끌 수 있음)
+PROMPT_CACHE_ENABLED = os.environ.get('PROMPT_CACHE_ENABLED', 'true').lower() == 'true'
+
+# 시스템 프롬프트 뒤에 붙이는 캐시 지점 (이 앞부분을 Bedrock이 호출 사이에 캐시)
+CACHE_POINT = {'cachePoint': {'type': 'default'}}
+
+# 모델 계열과 상관없이 쓰는 기본 추론 설정
+DEFAULT_INFERENCE_CONFIG = {'temperature': 0.7}
+
+
+class ModelAdapter:
+    """
+    Converse API 요청/응답 어댑터 (특별한 처리가 필요 없는 모델의 기본값)
+
+    Attributes:
+        model_id: 호출할 모델 ID
+        supports_system: 시스템 프롬프트 지원 여부 (없으면 사용자 메시지 앞에 붙임)
+        supports_prompt_cache: 캐시 지점(cachePoint) 지원 여부
+        inference_config: 모델 계열의 추론 설정 (maxTokens는 호출마다 지정)
+    """
+
+    supports_system = True
+    supports_prompt_cache = False
+    inference_config = DEFAULT_INFERENCE_CONFIG
+
+    def __init__(self, model_id):
+        self.model_id = model_id
+
+    def build_request(self, prompt, system=None, max_tokens=4000, cache=PROMPT_CACHE_ENABLED):
+        """
+        converse/converse_stream 호출 인자 구성
+
+        Args:
+            prompt (str): 사용자 메시지
+            system (str, optional): 시스템 프롬프트 (호출 사이에 바뀌지 않는 지시문)
+            max_tokens (int): 최대 출력 토큰 수
+            cache (bool): 시스템 프롬프트 뒤에 캐시 지점을 둘지 여부
+
+        Returns:
+            dict: converse 호출 인자
+        """
+        if system and not self.supports_system:
+            prompt = f"{system}\n\n{prompt}"
+            system = None
+
+        request = {
+            'modelId': self.model_id,
+            'messages': [{'role': 'user', 'content': [{'text': prompt}]}],
+            'inferenceConfig': dict(self.inference_config, maxTokens=max_tokens)
+        }
+        if system:
+            request['system'] = [{'text': system}]
+            if cache and self.supports_prompt_cache:
+                request['system'].append(CACHE_POINT)
+        return request
+
+    def parse_response(self, response):
+        """converse 응답에서 생성된 텍스트 추출"""
+        content = response['output']['message']['content']
+        return ''.join(block.get('text', '') for block in content)
+
+
+class AnthropicAdapter(ModelAdapter):
+    """Claude 모델 (최신 모델은 temperature와 topP를 함께 지정할 수 없으므로 temperature만 사용)"""
+
+    inference_config = {'temperature': 0.6}
+    # 프롬프트 캐시를 지원하는 모델 (모델 ID에 포함된 이름)
+    prompt_cache_models = ('claude-3-5-haiku', 'claude-3-7-sonnet', 'claude-sonnet-4', 'claude-opus-4')
+
+    @property
+    def supports_prompt_cache(self):
+        return any(name in self.model_id for name in self.prompt_cache_models)
+
+
+class TitanTextAdapter(ModelAdapter):
+    """Titan Text 모델 (시스템 프롬프트를 지원하지 않음)"""
+
+    supports_system = False
+    inference_config = {'temperature': 0.6, 'topP': 0.9}
+
+
+class NovaAdapter(ModelAdapter):
+    """Amazon Nova 모델 (시스템 프롬프트 캐시 지원)"""
+
+    supports_prompt_cache = True
+    inference_config = {'temperature': 0.6, 'topP': 0.9}
+
+
+# 모델 ID 접두사 -> 어댑터 (먼저 일치하는 항목 사용, 없으면 ModelAdapter)
+ADAPTERS = [
+    ('anthropic.', AnthropicAdapter),
+    ('amazon.titan-text', TitanTextAdapter),
+    ('amazon.nova', NovaAdapter),
+]
+
+
+def register_adapter(prefix, adapter_class):
+    """특별한 처리가 필요한 모델 계열의 어댑터 등록 (기존 항목보다 먼저 확인)"""
+    ADAPTERS.insert(0, (prefix, adapter_class))
+
+
+def base_model_id(model_id):
+    """ARN이나 교차 리전 추론 프로필(us./eu./apac. 접두사)에서 기본 모델 ID 추출"""
+    model_id = model_id.rsplit('/', 1)[-1]
+    prefix, _, rest = model_id.partition('.')
+    if prefix in ('us', 'eu', 'apac') and rest:
+        return rest
+    return model_id
+
+
+def get_adapter(model_id):
+    """
+    모델 ID에 맞는 어댑터 반환
+
+    Args:
+        model_id (str): 모델 ID, 추론 프로필 ID 또는 ARN
+
+    Returns:
+        ModelAdapter: 어댑터 (요청에는 전달받은 model_id를 그대로 사용)
+    """
+    base_id = base_model_id(model_id)
+    for prefix, adapter_class in ADAPTERS:
+        if base_id.startswith(prefix):
+            return adapter_class(model_id)
+    return ModelAdapter(model_id)
+
+
+def usage_from(payload):
+    """
+    converse 응답 또는 converse_stream의 metadata 이벤트에서 사용량 추출
+
+    Returns:
+        dict: {'inputTokens', 'outputTokens', 'cacheReadInputTokens', 'cacheWriteInputTokens', 'latencyMs'}
+              (알 수 없는 값은 None)
+    """
+    usage = payload.get('usage') or {}
+    return {
+        'inputTokens': usage.get('inputTokens'),
+        'outputTokens': usage.get('outputTokens'),
+        'cacheReadInputTokens': usage.get('cacheReadInputTokens', 0),
+        'cacheWriteInputTokens': usage.get('cacheWriteInputTokens', 0),
+        'latencyMs': (payload.get('metrics') or {}).get('latencyMs')
+    }
+
+
+def record_usage(model_id, usage, latency_ms=None):
+    """
+    사용량을 현재 호출의 지표에 기록 (프롬프트 캐시에서 읽은/쓴 토큰 수 포함)
+
+    Args:
+        model_id (str): 모델 ID
+        usage (dict): usage_from의 반환값
+        latency_ms (float, optional): 응답에 소요 시간이 없을 때 쓸 측정값
+    """
+    if usage['latencyMs'] is not None:
+        latency_ms = usage['latencyMs']
+    metrics.record_usage(model_id, usage['inputTokens'], usage['outputTokens'], latency_ms,
+                         usage['cacheReadInputTokens'], usage['cacheWriteInputTokens'])
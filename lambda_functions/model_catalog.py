@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+
+from aws_clients import get_client
+from model_adapters import base_model_id
+
+# 카탈로그 설정 (Lambda 환경 변수로 변경 가능)
+MODEL_CATALOG_TTL_SECONDS = int(os.environ.get('MODEL_CATALOG_TTL_SECONDS', str(24 * 3600)))
+# 목록 조회에 실패하면 이 시간 동안 다시 조회하지 않음 (호출마다 실패한 조회를 반복하지 않도록)
+MODEL_CATALOG_RETRY_SECONDS = int(os.environ.get('MODEL_CATALOG_RETRY_SECONDS', '300'))
+MODEL_CATALOG_PATH = os.environ.get('MODEL_CATALOG_PATH', '/tmp/model-catalog.json')
+MODEL_CATALOG_BUCKET = os.environ.get('MODEL_CATALOG_BUCKET')  # 지정하면 S3에도 저장
+MODEL_CATALOG_KEY = os.environ.get('MODEL_CATALOG_KEY', 'cache/model-catalog.json')
+
+# 대체 모델 순서: 요청한 모델 → Claude → Titan
+DEFAULT_CLAUDE_MODEL_ID = 'anthropic.claude-3-sonnet-20240229-v1:0'
+DEFAULT_TITAN_MODEL_ID = 'amazon.titan-text-express-v1'
+
+# 컨테이너(모듈) 범위 캐시 (profilesListed: 교차 리전 추론 프로필 ID도 목록에 포함했는지 여부)
+_catalog = {'modelIds': None, 'fetchedAt': 0.0, 'retryAfter': 0.0, 'profilesListed': False}
+_resolved = {}
+_lock = threading.Lock()
+
+
+def fallback_chain(model_id):
+    """
+    모델의 대체 순서 반환
+
+    Args:
+        model_id (str): 요청한 모델 ID
+
+    Returns:
+        tuple: (요청한 모델, Claude 기본 모델, Titan 기본 모델) 중복 제거
+    """
+    chain = []
+    for candidate in (model_id, DEFAULT_CLAUDE_MODEL_ID, DEFAULT_TITAN_MODEL_ID):
+        if candidate and candidate not in chain:
+            chain.append(candidate)
+    return tuple(chain)
+
+
+def _is_fresh(fetched_at):
+    return time.time() - fetched_at < MODEL_CATALOG_TTL_SECONDS
+
+
+def _load_persisted(s3_client=None):
+    """/tmp 또는 S3에 저장된 카탈로그 읽기. 없거나 만료되었으면 None"""
+    try:
+        with open(MODEL_CATALOG_PATH, 'r', encoding='utf-8') as f:
+            persisted = json.load(f)
+        if _is_fresh(persisted['fetchedAt']):
+            return persisted
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if MODEL_CATALOG_BUCKET:
+        try:
+            s3_client = s3_client or get_client('s3')
+            response = s3_client.get_object(Bucket=MODEL_CATALOG_BUCKET, Key=MODEL_CATALOG_KEY)
+            persisted = json.loads(response['Body'].read().decode('utf-8'))
+            if _is_fresh(persisted['fetchedAt']):
+                return persisted
+        except Exception as e:
+            print(f"S3 모델 카탈로그 읽기 실패: {str(e)}")
+
+    return None
+
+
+def _persist(catalog, s3_client=None):
+    """카탈로그를 /tmp와 (설정된 경우) S3에 저장"""
+    body = json.dumps(catalog)
+    try:
+        with open(MODEL_CATALOG_PATH, 'w', encoding='utf-8') as f:
+            f.write(body)
+    except OSError as e:
+        print(f"모델 카탈로그 저장 실패: {str(e)}")
+
+    if MODEL_CATALOG_BUCKET:
+        try:
+            s3_client = s3_client or get_client('s3')
+            s3_client.put_object(
+                Bucket=MODEL_CATALOG_BUCKET,
+                Key=MODEL_CATALOG_KEY,
+                Body=body.encode('utf-8'),
+                ContentType='application/json'
+            )
+        except Exception as e:
+            print(f"S3 모델 카탈로그 저장 실패: {str(e)}")
+
+
+def _list_inference_profile_ids(bedrock_client):
+    """
+    시스템 정의 추론 프로필 ID 목록 (us./eu./apac. 접두사, 조회에 실패하면 None)
+
+    최신 Claude 모델처럼 추론 프로필로만 호출할 수 있는 모델은 list_foundation_models의
+    ON_DEMAND 목록에 나오지 않으므로 프로필 목록을 따로 가져옵니다.
+    """
+    try:
+        profile_ids = []
+        params = {'typeEquals': 'SYSTEM_DEFINED', 'maxResults': 1000}
+        while True:
+            response = bedrock_client.list_inference_profiles(**params)
+            profile_ids.extend(profile['inferenceProfileId'] for profile in response.get('inferenceProfileSummaries', []))
+            if not response.get('nextToken'):
+                return profile_ids
+            params['nextToken'] = response['nextToken']
+    except Exception as e:
+        print(f"추론 프로필 목록 가져오기 실패: {str(e)}")
+        return None
+
+
+def get_catalog(bedrock_client=None, s3_client=None):
+    """
+    사용 가능한 텍스트 모델 ID와 추론 프로필 ID 집합 반환 (TTL 동안 컨테이너에서 재사용)
+
+    Args:
+        bedrock_client: AWS Bedrock 클라이언트 (지정하지 않으면 필요할 때 생성)
+        s3_client: 카탈로그를 S3에 저장할 때 사용할 클라이언트
+
+    Returns:
+        frozenset: 모델/추론 프로필 ID 집합 (조회에 실패하면 만료된 카탈로그, 그것도 없으면 None)
+    """
+    with _lock:
+        if _catalog['modelIds'] is not None and _is_fresh(_catalog['fetchedAt']):
+            return _catalog['modelIds']
+        if time.time() < _catalog['retryAfter']:
+            # 최근에 조회가 실패했으면 다시 시도하지 않고 가지고 있는 카탈로그 사용
+            return _catalog['modelIds']
+
+        persisted = _load_persisted(s3_client)
+        if persisted is None:
+            try:
+                bedrock_client = bedrock_client or get_client('bedrock')
+                response = bedrock_client.list_foundation_models(
+                    byOutputModality='TEXT',
+                    byInferenceType='ON_DEMAND'
+                )
+                model_ids = [model['modelId'] for model in response['modelSummaries']]
+                profile_ids = _list_inference_profile_ids(bedrock_client)
+                persisted = {
+                    'modelIds': sorted(set(model_ids + (profile_ids or []))),
+                    'fetchedAt': time.time(),
+                    'profilesListed': profile_ids is not None
+                }
+                print(f"모델 카탈로그 갱신: 모델 {len(model_ids)}개, 추론 프로필 {len(profile_ids or [])}개")
+                _persist(persisted, s3_client)
+            except Exception as e:
+                print(f"모델 목록 가져오기 실패: {str(e)}")
+                _catalog['retryAfter'] = time.time() + MODEL_CATALOG_RETRY_SECONDS
+                if _catalog['modelIds'] is not None:
+                    print("만료된 모델 카탈로그를 계속 사용합니다.")
+                return _catalog['modelIds']
+
+        _catalog['modelIds'] = frozenset(persisted['modelIds'])
+        _catalog['fetchedAt'] = persisted['fetchedAt']
+        _catalog['profilesListed'] = persisted.get('profilesListed', False)
+        _resolved.clear()
+        return _catalog['modelIds']
+
+
+def _is_available(model_id, model_ids):
+    """모델 ID를 카탈로그로 사용 가능하다고 볼 수 있는지 여부"""
+    if model_id in model_ids:
+        return True
+    base_id = base_model_id(model_id)
+    if base_id == model_id:
+        return False
+    # 기본 모델을 온디맨드로 쓸 수 있으면 그 모델의 추론 프로필/ARN도 사용 가능하다고 봄,
+    # 프로필 목록이 없는 카탈로그로는 확인할 수 없으므로 요청을 그대로 믿음
+    return base_id in model_ids or not _catalog['profilesListed']
+
+
+def resolve_model_id(model_id, bedrock_client=None):
+    """
+    요청한 모델 ID를 실제로 사용할 모델 ID로 변환
+
+    대체 순서(요청한 모델 → Claude → Titan) 중 카탈로그에 있는 첫 모델을 사용합니다.
+    카탈로그를 가져올 수 없으면 요청한 모델을 그대로 사용하고, 추론 프로필 목록을 가져오지 못했으면
+    확인할 수 없는 추론 프로필 ID(us./eu./apac. 접두사)와 ARN도 그대로 사용합니다.
+
+    Args:
+        model_id (str): 요청한 모델 ID
+        bedrock_client: AWS Bedrock 클라이언트 (선택 사항)
+
+    Returns:
+        str: 사용할 모델 ID
+    """
+    model_ids = get_catalog(bedrock_client)
+    if model_ids is None:
+        return model_id
+
+    resolved = _resolved.get(model_id)
+    if resolved is None:
+        resolved = next((candidate for candidate in fallback_chain(model_id) if _is_available(candidate, model_ids)),
+                        DEFAULT_TITAN_MODEL_ID)
+        if resolved != model_id:
+            print(f"지정된 모델 '{model_id}'을(를) 사용할 수 없어 '{resolved}'을(를) 사용합니다.")
+        _resolved[model_id] = resolved
+
+    return resolved
@@ -0,0 +1,32 @@
+import os
+from datetime import datetime
+
+OUTPUT_PREFIX = 'curriculum/'
+
+
+def build_output_key(title_key, timestamp=None):
+    """
+    제목 파일 키로부터 커리큘럼 출력 파일 키 생성
+
+    예: input/title-A-20250331.txt -> curriculum/A-20250331-20250401120000.txt
+
+    Args:
+        title_key (str): 제목 파일 S3 키
+        timestamp (str, optional): 파일명에 붙일 시각 (기본값: 현재 시각)
+
+    Returns:
+        str: 출력 파일 S3 키
+    """
+    if timestamp is None:
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+
+    # title_key에서 파일명 추출 (예: input/title-A-20250331.txt -> A-20250331)
+    if title_key:
+        file_name = os.path.basename(title_key)
+        prefix = file_name.split('.')[0]
+        if prefix.startswith('title-'):
+            prefix = prefix[6:]  # 'title-' 제거
+    else:
+        prefix = 'curriculum'
+
+    return f"{OUTPUT_PREFIX}{prefix}-{timestamp}.txt"
@@ -0,0 +1,343 @@
+import ast
+import base64
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+# Lambda 소스 디렉토리와 빌드 결과(번들/레이어 ZIP) 캐시 디렉토리
+LAMBDA_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_CACHE_DIR = os.environ.get('LAMBDA_BUILD_CACHE_DIR', os.path.join(LAMBDA_SOURCE_DIR, '.build'))
+DEFAULT_REQUIREMENTS_PATH = os.path.join(os.path.dirname(LAMBDA_SOURCE_DIR), 'requirements')
+
+# 대상 Lambda 런타임 (pyc 매직 넘버와 레이어 wheel 플랫폼을 맞추는 데 사용)
+LAMBDA_RUNTIME = 'python3.9'
+LAMBDA_PYTHON_VERSION = '3.9'
+LAMBDA_PLATFORM = 'manylinux2014_x86_64'
+
+# 공용 레이어 이름과, 레이어에 넣지 않을 패키지 (Lambda 런타임에 포함되거나 표준 라이브러리와 겹치는 것)
+DEFAULT_LAYER_NAME = 'curriculum-dependencies'
+LAYER_EXCLUDED_PACKAGES = {'argparse'}
+
+# 번들과 레이어에서 제거할 디렉토리/파일
+STRIPPED_DIRS = {'__pycache__', 'tests', 'test'}
+STRIPPED_SUFFIXES = ('.pyc', '.pyo')
+
+# 재현 가능한 ZIP을 만들기 위한 고정 타임스탬프
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+# 빌드 방식이 바뀌면 올려서 캐시를 무효화
+BUILD_FORMAT_VERSION = '1'
+
+
+def build_deterministic_zip(entries):
+    """
+    항목 순서, 타임스탬프, 권한을 고정한 ZIP 파일 생성
+
+    Args:
+        entries (dict): ZIP 내 경로 -> 파일 내용(bytes)
+
+    Returns:
+        io.BytesIO: ZIP 파일 버퍼
+    """
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name in sorted(entries):
+            info = zipfile.ZipInfo(name, date_time=ZIP_TIMESTAMP)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            info.create_system = 3  # Unix
+            zip_file.writestr(info, entries[name])
+
+    zip_buffer.seek(0)
+    return zip_buffer
+
+
+def code_sha256(zip_bytes):
+    """Lambda의 CodeSha256과 같은 형식(base64 인코딩된 SHA-256)의 해시"""
+    return base64.b64encode(hashlib.sha256(zip_bytes).digest()).decode('ascii')
+
+
+def content_hash(entries, *extra):
+    """ZIP 항목(경로와 내용)과 추가 값으로 만든 16진수 SHA-256 (빌드 캐시 키)"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([BUILD_FORMAT_VERSION] + list(extra)).encode('utf-8'))
+    for name in sorted(entries):
+        digest.update(name.encode('utf-8') + b'\0')
+        digest.update(hashlib.sha256(entries[name]).digest())
+    return digest.hexdigest()
+
+
+def _imported_names(source):
+    """소스에서 가져오는 최상위 모듈 이름 집합 (상대 가져오기 제외)"""
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return names
+
+
+def discover_local_modules(source_file, search_dirs=None):
+    """
+    핸들러가 (간접적으로라도) 가져오는 로컬 모듈 파일 찾기
+
+    import 문을 AST로 분석해, search_dirs에 같은 이름의 .py 파일이 있는 모듈만 따라갑니다.
+
+    Args:
+        source_file (str): 핸들러 소스 파일 경로
+        search_dirs (list, optional): 로컬 모듈을 찾을 디렉토리 (기본값: 소스 파일 디렉토리, lambda_functions)
+
+    Returns:
+        dict: 모듈 파일 이름(예: 'aws_clients.py') -> 파일 경로
+    """
+    if search_dirs is None:
+        search_dirs = [os.path.dirname(os.path.abspath(source_file)), LAMBDA_SOURCE_DIR]
+
+    handler_name = os.path.basename(source_file)
+    modules = {}
+    pending = [source_file]
+    while pending:
+        with open(pending.pop(), 'r', encoding='utf-8') as f:
+            source = f.read()
+        for name in sorted(_imported_names(source)):
+            file_name = f"{name}.py"
+            if file_name in modules or file_name == handler_name:
+                continue
+            for directory in search_dirs:
+                path = os.path.join(directory, file_name)
+                if os.path.isfile(path):
+                    modules[file_name] = path
+                    pending.append(path)
+                    break
+    return modules
+
+
+def find_runtime_interpreter():
+    """Lambda 런타임과 같은 버전의 Python 실행 파일 경로 (없으면 None)"""
+    if '%d.%d' % sys.version_info[:2] == LAMBDA_PYTHON_VERSION:
+        return sys.executable
+
+    interpreter = shutil.which(f"python{LAMBDA_PYTHON_VERSION}")
+    if interpreter is None:
+        return None
+    # pyenv shim처럼 경로만 있고 실행되지 않는 경우를 걸러냄
+    try:
+        result = subprocess.run(
+            [interpreter, '-c', 'import sys; print("%d.%d" % sys.version_info[:2])'],
+            capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return interpreter if result.returncode == 0 and result.stdout.strip() == LAMBDA_PYTHON_VERSION else None
+
+
+def precompile(entries, interpreter):
+    """
+    .py 항목을 Lambda 런타임과 같은 버전으로 미리 컴파일해 __pycache__ 항목을 추가
+
+    /var/task는 읽기 전용이라 Lambda는 콜드 스타트마다 바이트코드를 다시 컴파일합니다.
+    고정 타임스탬프 ZIP에서도 유효하도록 소스 해시를 확인하지 않는(unchecked-hash) pyc를 만듭니다.
+
+    Args:
+        entries (dict): ZIP 내 경로 -> 파일 내용(bytes)
+        interpreter (str): 컴파일에 사용할 Python 실행 파일
+
+    Returns:
+        dict: pyc 항목이 추가된 새 딕셔너리
+    """
+    sources = [name for name in entries if name.endswith('.py')]
+    compiled = dict(entries)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in sources:
+            path = os.path.join(work_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(entries[name])
+
+        # dfile을 ZIP 내 경로로 지정해 임시 디렉토리 경로가 pyc에 남지 않게 함 (같은 입력 → 같은 pyc)
+        script = (
+            "import os, py_compile, sys\n"
+            "for name in sys.argv[2:]:\n"
+            "    py_compile.compile(os.path.join(sys.argv[1], name), dfile=name, doraise=True,\n"
+            "                       invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)\n"
+        )
+        subprocess.run([interpreter, '-c', script, work_dir] + sources, check=True)
+
+        for root, dirs, files in os.walk(work_dir):
+            if os.path.basename(root) != '__pycache__':
+                continue
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                with open(path, 'rb') as f:
+                    compiled[os.path.relpath(path, work_dir).replace(os.sep, '/')] = f.read()
+    return compiled
+
+
+def _cached_build(cache_key, build):
+    """BUILD_CACHE_DIR에 cache_key.zip이 있으면 읽고, 없으면 build()로 만들어 저장"""
+    path = os.path.join(BUILD_CACHE_DIR, f"{cache_key}.zip")
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    zip_bytes = build()
+    try:
+        os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(zip_bytes)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"빌드 캐시 저장 실패: {str(e)}")
+    return zip_bytes
+
+
+def build_function_bundle(source_file, compile_bytecode=True):
+    """
+    Lambda 함수 배포 번들(ZIP) 생성
+
+    핸들러는 lambda_function.py로, 핸들러가 가져오는 로컬 모듈은 같은 이름으로 포함합니다.
+    같은 내용이면 같은 바이트가 나오며, 결과는 내용 해시로 BUILD_CACHE_DIR에 캐시합니다.
+
+    Args:
+        source_file (str): 핸들러 소스 파일 경로
+        compile_bytecode (bool): 런타임과 같은 버전의 Python이 있으면 pyc를 함께 포함
+
+    Returns:
+        bytes: ZIP 파일 내용
+    """
+    with open(source_file, 'rb') as f:
+        entries = {'lambda_function.py': f.read()}
+    for file_name, path in discover_local_modules(source_file).items():
+        with open(path, 'rb') as f:
+            entries[file_name] = f.read()
+
+    interpreter = find_runtime_interpreter() if compile_bytecode else None
+    if compile_bytecode and interpreter is None:
+        print(f"python{LAMBDA_PYTHON_VERSION}을(를) 찾을 수 없어 바이트코드 없이 패키징합니다.")
+
+    cache_key = content_hash(entries, 'function', bool(interpreter))
+    return _cached_build(
+        cache_key,
+        lambda: build_deterministic_zip(precompile(entries, interpreter) if interpreter else entries).read()
+    )
+
+
+def read_requirements(requirements_path=DEFAULT_REQUIREMENTS_PATH):
+    """
+    레이어에 넣을 고정(pinned) 의존성 목록
+
+    Returns:
+        list: 'name==version' 문자열 목록 (정렬, LAYER_EXCLUDED_PACKAGES 제외)
+    """
+    requirements = []
+    with open(requirements_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            name = line.split('==')[0].strip().lower()
+            if name not in LAYER_EXCLUDED_PACKAGES:
+                requirements.append(line)
+    return sorted(requirements)
+
+
+def _collect_tree(root_dir, prefix):
+    """디렉토리의 파일을 ZIP 항목으로 읽기 (STRIPPED_DIRS, pyc 제외)"""
+    entries = {}
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = sorted(d for d in dirs if d not in STRIPPED_DIRS)
+        for file_name in files:
+            if file_name.endswith(STRIPPED_SUFFIXES):
+                continue
+            path = os.path.join(root, file_name)
+            name = prefix + os.path.relpath(path, root_dir).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                entries[name] = f.read()
+    return entries
+
+
+def build_layer_zip(requirements, compile_bytecode=True):
+    """
+    의존성을 Lambda 레이어 구조(python/...)로 설치해 ZIP 생성
+
+    Lambda 런타임과 같은 플랫폼의 wheel만 받도록 pip에 플랫폼/버전을 지정합니다.
+    결과는 의존성 목록의 해시로 BUILD_CACHE_DIR에 캐시합니다.
+
+    Args:
+        requirements (list): 'name==version' 문자열 목록
+        compile_bytecode (bool): 런타임과 같은 버전의 Python이 있으면 pyc를 함께 포함
+
+    Returns:
+        tuple: (ZIP 파일 내용, 의존성 해시)
+    """
+    requirements_hash = hashlib.sha256('\n'.join(requirements).encode('utf-8')).hexdigest()
+    interpreter = find_runtime_interpreter() if compile_bytecode else None
+
+    def build():
+        with tempfile.TemporaryDirectory() as work_dir:
+            target = os.path.join(work_dir, 'python')
+            print(f"레이어 의존성 설치 중: {', '.join(requirements)}")
+            subprocess.run(
+                [sys.executable, '-m', 'pip', 'install', '--quiet', '--no-compile',
+                 '--target', target,
+                 '--platform', LAMBDA_PLATFORM,
+                 '--implementation', 'cp',
+                 '--python-version', LAMBDA_PYTHON_VERSION,
+                 '--only-binary=:all:'] + requirements,
+                check=True
+            )
+            entries = _collect_tree(target, 'python/')
+        if interpreter:
+            entries = precompile(entries, interpreter)
+        return build_deterministic_zip(entries).read()
+
+    cache_key = content_hash({}, 'layer', requirements_hash, bool(interpreter))
+    return _cached_build(cache_key, build), requirements_hash
+
+
+def ensure_layer(lambda_client, layer_name=DEFAULT_LAYER_NAME, requirements_path=DEFAULT_REQUIREMENTS_PATH,
+                 compile_bytecode=True):
+    """
+    requirements에 맞는 레이어 버전을 찾거나 새로 게시
+
+    레이어 설명에 의존성 해시를 기록해 두고, 같은 해시의 버전이 이미 있으면 다시 게시하지 않습니다.
+
+    Args:
+        lambda_client: AWS Lambda 클라이언트
+        layer_name (str): 레이어 이름
+        requirements_path (str): 의존성 파일 경로
+        compile_bytecode (bool): 레이어에 pyc를 함께 포함할지 여부
+
+    Returns:
+        str: 레이어 버전 ARN
+    """
+    requirements = read_requirements(requirements_path)
+    requirements_hash = hashlib.sha256('\n'.join(requirements).encode('utf-8')).hexdigest()
+    description = f"requirements sha256:{requirements_hash}"
+
+    paginator = lambda_client.get_paginator('list_layer_versions')
+    for page in paginator.paginate(LayerName=layer_name, CompatibleRuntime=LAMBDA_RUNTIME):
+        for version in page['LayerVersions']:
+            if version.get('Description') == description:
+                print(f"기존 레이어 버전을 사용합니다: {version['LayerVersionArn']}")
+                return version['LayerVersionArn']
+
+    zip_bytes, _ = build_layer_zip(requirements, compile_bytecode)
+    response = lambda_client.publish_layer_version(
+        LayerName=layer_name,
+        Description=description,
+        Content={'ZipFile': zip_bytes},
+        CompatibleRuntimes=[LAMBDA_RUNTIME]
+    )
+    print(f"레이어 '{layer_name}' 버전 {response['Version']} 게시 완료 ({len(zip_bytes)} bytes)")
+    return response['LayerVersionArn']
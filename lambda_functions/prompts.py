@@ -0,0 +1,68 @@
+# 커리큘럼 생성 프롬프트와 invoke_model 요청 본문 (생성 Lambda, 직접 통합 워크플로우, 배치 추론이 함께 씀)
+# 클라이언트나 캐시를 만들지 않으므로 어디서 가져와도 부작용이 없음
+
+# 프롬프트 템플릿을 바꾸면 이 값을 올려서 이전 캐시 항목을 무효화
+PROMPT_TEMPLATE_VERSION = 'v2'
+
+# 커리큘럼 생성 지시문 (호출마다 같으므로 시스템 프롬프트로 보내 프롬프트 캐시 대상이 됨)
+CURRICULUM_SYSTEM_PROMPT = """당신은 교육 커리큘럼 전문가입니다. 제공된 주제와 데이터를 바탕으로 체계적인 커리큘럼을 생성해주세요.
+
+다음 형식으로 커리큘럼을 작성해주세요:
+
+1. 주제 소개 (주제에 대한 간략한 설명)
+2. 교수진 소개 (이 주제를 가르칠 가상의 교수 3명의 이름, 전공, 경력 등)
+3. 교수별 대표 강의 (각 교수가 담당할 주요 강의 내용)
+4. 교수별 주요 컬럼 (각 교수가 작성한 주요 컬럼이나 연구 내용)
+5. 평가 방식 (학생들의 성취도를 평가하는 방법)
+
+체계적이고 교육적으로 가치 있는 커리큘럼을 작성해주세요."""
+
+
+def build_user_prompt(title, data):
+    """커리큘럼 생성 요청의 사용자 메시지 (지시문은 CURRICULUM_SYSTEM_PROMPT)"""
+    
+    return f"""주제: {title}
+
+참고 데이터: {data}"""
+
+
+def build_prompt(title, data):
+    """지시문과 사용자 메시지를 합친 단일 프롬프트 (토큰 수 추정, bedrock:invokeModel 직접 통합용)"""
+    
+    return f"{CURRICULUM_SYSTEM_PROMPT}\n\n{build_user_prompt(title, data)}"
+
+
+def build_request_body(model_id, prompt, max_tokens=4000):
+    """모델 ID에 맞는 invoke_model 요청 본문 구성 (Step Functions의 bedrock:invokeModel 직접 통합, 배치 추론용)"""
+    
+    if 'claude' in model_id.lower():
+        # Claude 모델용 요청
+        return {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "temperature": 0.6,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+    
+    if 'titan' in model_id.lower():
+        # Titan 모델용 요청
+        return {
+            "inputText": prompt,
+            "textGenerationConfig": {
+                "maxTokenCount": max_tokens,
+                "temperature": 0.6,
+                "topP": 0.9
+            }
+        }
+    
+    # 기타 모델용 기본 요청
+    return {
+        "prompt": prompt,
+        "max_tokens": max_tokens,
+        "temperature": 0.7
+    }
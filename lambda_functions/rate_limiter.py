@@ -0,0 +1,309 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import metrics
+from aws_clients import get_client
+
+# 모델별 호출 한도 (Lambda 환경 변수로 변경 가능)
+# 배포된 생성 Lambda는 dynamodb를 씀 (lambda_make.FUNCTION_CONFIG_OVERRIDES), memory는 컨테이너마다 따로 제한
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory | dynamodb | none
+RATE_LIMIT_TABLE = os.environ.get('RATE_LIMIT_TABLE', 'curriculum-rate-limits')
+RATE_LIMIT_RPM = float(os.environ.get('RATE_LIMIT_RPM', '50'))  # 분당 요청 수
+RATE_LIMIT_TPM = float(os.environ.get('RATE_LIMIT_TPM', '200000'))  # 분당 토큰 수 (입력 + 출력)
+RATE_LIMIT_MAX_CONCURRENCY = float(os.environ.get('RATE_LIMIT_MAX_CONCURRENCY', '8'))
+RATE_LIMIT_MIN_CONCURRENCY = 1.0
+# 한도를 넘었을 때 Lambda 안에서 기다릴 최대 시간 (넘으면 BedrockThrottledError로 Step Functions Retry에 맡김)
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.environ.get('RATE_LIMIT_MAX_WAIT_SECONDS', '5'))
+# 모델별 한도 덮어쓰기: {"모델 ID": {"rpm": 100, "tpm": 400000, "maxConcurrency": 16}}
+RATE_LIMITS = json.loads(os.environ.get('RATE_LIMITS', '{}'))
+
+# 호출 하나가 동시 실행 슬롯을 붙잡을 수 있는 최대 시간 (Lambda가 중간에 종료되어 반납하지 못한 슬롯 회수용)
+LEASE_SECONDS = 15 * 60
+# AIMD: 성공하면 동시 실행 한도를 1/한도씩 늘리고(대략 한 바퀴에 +1), 제한되면 절반으로 줄임
+DECREASE_FACTOR = 0.5
+# Bedrock이 요청 한도 초과로 돌려주는 오류 코드
+THROTTLE_ERROR_CODES = ('ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException')
+
+
+class BedrockThrottledError(Exception):
+    """Bedrock 호출 한도를 넘은 경우 (재시도 가능)
+
+    Step Functions에서는 오류 이름 'BedrockThrottledError'로 Retry할 수 있습니다.
+    """
+
+    def __init__(self, model_id, message):
+        super().__init__(f"모델 '{model_id}'의 호출 한도 초과: {message}")
+        self.model_id = model_id
+
+
+def is_throttle_error(error):
+    """botocore ClientError(또는 같은 모양의 오류)가 호출 한도 초과인지 확인"""
+    code = (getattr(error, 'response', None) or {}).get('Error', {}).get('Code')
+    return code in THROTTLE_ERROR_CODES or type(error).__name__ in THROTTLE_ERROR_CODES
+
+
+def limits_for(model_id):
+    """모델의 한도 설정 {'rpm', 'tpm', 'maxConcurrency'}"""
+    limits = {'rpm': RATE_LIMIT_RPM, 'tpm': RATE_LIMIT_TPM, 'maxConcurrency': RATE_LIMIT_MAX_CONCURRENCY}
+    limits.update(RATE_LIMITS.get(model_id, {}))
+    return limits
+
+
+class MemoryStore:
+    """프로세스 메모리에 상태를 두는 저장소 (로컬 실행, 테스트용)"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, func):
+        """
+        상태를 원자적으로 읽고 고침
+
+        Args:
+            key (str): 상태 키 (모델 ID)
+            func (callable): 상태(dict 또는 None) -> (새 상태, 반환값)
+
+        Returns:
+            func의 반환값
+        """
+        with self._lock:
+            state, result = func(self._states.get(key))
+            self._states[key] = state
+            return result
+
+
+class DynamoDBStore:
+    """DynamoDB 항목 하나에 모델별 상태를 두는 저장소 (여러 Lambda 컨테이너가 공유)
+
+    테이블은 문자열 파티션 키 'pk'(모델 ID)만 있으면 되고(create_bedrock_role.create_rate_limit_table이 생성),
+    항목에는 상태 JSON 'state'(S)와 버전 번호 'version'(N)을 두어 버전을 조건으로 쓰는 낙관적 잠금으로 갱신합니다.
+    """
+
+    def __init__(self, table_name=RATE_LIMIT_TABLE, dynamodb_client=None, max_attempts=10):
+        self.table_name = table_name
+        self._dynamodb_client = dynamodb_client
+        self.max_attempts = max_attempts
+
+    @property
+    def dynamodb_client(self):
+        return self._dynamodb_client or get_client('dynamodb')
+
+    def update(self, key, func):
+        client = self.dynamodb_client
+        for attempt in range(self.max_attempts):
+            item = client.get_item(TableName=self.table_name, Key={'pk': {'S': key}}, ConsistentRead=True).get('Item')
+            version = int(item['version']['N']) if item else 0
+            state, result = func(json.loads(item['state']['S']) if item else None)
+
+            condition = {'ConditionExpression': 'attribute_not_exists(pk)'} if item is None else {
+                'ConditionExpression': 'version = :version',
+                'ExpressionAttributeValues': {':version': {'N': str(version)}}
+            }
+            try:
+                client.put_item(
+                    TableName=self.table_name,
+                    Item={'pk': {'S': key}, 'state': {'S': json.dumps(state)}, 'version': {'N': str(version + 1)}},
+                    **condition
+                )
+                return result
+            except client.exceptions.ConditionalCheckFailedException:
+                # 다른 컨테이너가 먼저 갱신했으면 잠시 쉬고 다시 읽음
+                time.sleep(random.uniform(0, 0.01 * (attempt + 1)))
+        raise RuntimeError(f"호출 한도 상태 갱신 충돌이 계속됩니다: {key}")
+
+
+class RateLimiter:
+    """
+    모델별 호출 한도 관리
+
+    분당 요청 수(rpm)와 분당 토큰 수(tpm) 토큰 버킷으로 호출 속도를 제한하고, 동시 실행 수는
+    AIMD(성공하면 조금씩 늘리고 호출 한도 초과가 보이면 절반으로 줄임)로 조절합니다.
+    상태는 저장소에 두므로 DynamoDBStore를 쓰면 모든 Lambda 컨테이너가 같은 한도를 나눠 씁니다.
+
+    Attributes:
+        store: 상태 저장소 (MemoryStore, DynamoDBStore)
+        max_wait: 슬롯을 기다릴 최대 시간(초)
+        clock: 현재 시각 함수 (테스트에서 교체 가능)
+    """
+
+    # Bedrock 클라이언트에 줄 botocore 설정: 호출 한도 초과를 botocore가 조용히 재시도하면 AIMD가
+    # 제한을 보지 못하므로 재시도 없이 바로 오류를 받아 slot()에서 처리
+    client_options = {'retries': {'mode': 'standard', 'max_attempts': 1}}
+
+    def __init__(self, store, max_wait=RATE_LIMIT_MAX_WAIT_SECONDS, clock=time.time, sleep=time.sleep):
+        self.store = store
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+
+    def _refill(self, state, limits, now):
+        """경과 시간만큼 버킷을 채우고 만료된 슬롯을 회수한 상태 반환"""
+        if state is None:
+            return {
+                'requests': limits['rpm'],
+                'tokens': limits['tpm'],
+                'concurrency': limits['maxConcurrency'],
+                'leases': {},
+                'updatedAt': now
+            }
+        elapsed = max(0.0, now - state['updatedAt'])
+        state['requests'] = min(limits['rpm'], state['requests'] + elapsed * limits['rpm'] / 60)
+        state['tokens'] = min(limits['tpm'], state['tokens'] + elapsed * limits['tpm'] / 60)
+        state['concurrency'] = min(limits['maxConcurrency'], state['concurrency'])
+        state['leases'] = {lease: expires for lease, expires in state['leases'].items() if expires > now}
+        state['updatedAt'] = now
+        return state
+
+    def try_acquire(self, model_id, estimated_tokens):
+        """
+        슬롯 하나를 바로 얻어 봄
+
+        Returns:
+            tuple: (슬롯 ID 또는 None, 다시 시도할 때까지 기다릴 시간(초))
+        """
+        limits = limits_for(model_id)
+        # 버킷보다 큰 요청은 가득 찬 버킷으로 통과시킴 (영원히 기다리지 않도록)
+        needed_tokens = min(float(estimated_tokens), limits['tpm'])
+
+        def acquire(state):
+            now = self.clock()
+            state = self._refill(state, limits, now)
+            if len(state['leases']) >= int(state['concurrency']):
+                return state, (None, 0.05)
+            if state['requests'] < 1:
+                return state, (None, (1 - state['requests']) * 60 / limits['rpm'])
+            if state['tokens'] < needed_tokens:
+                return state, (None, (needed_tokens - state['tokens']) * 60 / limits['tpm'])
+
+            lease = uuid.uuid4().hex
+            state['requests'] -= 1
+            state['tokens'] -= needed_tokens
+            state['leases'][lease] = now + LEASE_SECONDS
+            return state, (lease, 0.0)
+
+        return self.store.update(model_id, acquire)
+
+    def acquire(self, model_id, estimated_tokens):
+        """
+        슬롯을 얻을 때까지 max_wait 이내에서 기다림
+
+        Returns:
+            str: 슬롯 ID (release에 전달)
+
+        Raises:
+            BedrockThrottledError: max_wait 안에 슬롯을 얻지 못한 경우
+        """
+        deadline = self.clock() + self.max_wait
+        waited = 0.0
+        while True:
+            lease, wait = self.try_acquire(model_id, estimated_tokens)
+            if lease:
+                if waited:
+                    metrics.add('RateLimitWaitTime', round(waited * 1000, 1), 'Milliseconds')
+                return lease
+            remaining = deadline - self.clock()
+            if wait > remaining:
+                metrics.add('RateLimited', 1)
+                raise BedrockThrottledError(model_id, f"{self.max_wait}초 안에 호출 슬롯을 얻지 못했습니다.")
+            # 여러 컨테이너가 같은 순간에 다시 시도하지 않도록 지터를 더함
+            delay = wait + random.uniform(0, min(wait, 0.1) + 0.01)
+            self.sleep(delay)
+            waited += delay
+
+    def release(self, model_id, lease, estimated_tokens, actual_tokens=None, throttled=False):
+        """
+        슬롯 반납 및 동시 실행 한도 조절
+
+        Args:
+            model_id (str): 모델 ID
+            lease (str): acquire가 돌려준 슬롯 ID
+            estimated_tokens (int): acquire할 때 예상한 토큰 수
+            actual_tokens (int, optional): 실제 사용한 토큰 수 (예상과의 차이만큼 버킷을 보정)
+            throttled (bool): Bedrock이 호출 한도 초과로 거절했는지 여부
+        """
+        limits = limits_for(model_id)
+
+        def release(state):
+            state = self._refill(state, limits, self.clock())
+            state['leases'].pop(lease, None)
+            if actual_tokens is not None:
+                correction = min(float(estimated_tokens), limits['tpm']) - actual_tokens
+                state['tokens'] = max(-limits['tpm'], min(limits['tpm'], state['tokens'] + correction))
+            if throttled:
+                state['concurrency'] = max(RATE_LIMIT_MIN_CONCURRENCY, state['concurrency'] * DECREASE_FACTOR)
+                # 서버 쪽 한도가 더 낮다는 뜻이므로 남은 요청 버킷도 비움
+                state['requests'] = min(state['requests'], 0.0)
+            else:
+                state['concurrency'] = min(limits['maxConcurrency'],
+                                           state['concurrency'] + 1 / max(state['concurrency'], 1))
+            return state, state['concurrency']
+
+        concurrency = self.store.update(model_id, release)
+        metrics.set_property('concurrencyLimit', round(concurrency, 2))
+
+    @contextmanager
+    def slot(self, model_id, estimated_tokens):
+        """
+        Bedrock 호출 하나를 감싸는 컨텍스트 (호출 한도 초과는 BedrockThrottledError로 바꿈)
+
+        with 블록에서 실제 토큰 수를 알면 usage['tokens']에 넣어 버킷을 보정합니다.
+
+        사용 예:
+            with limiter.slot(model_id, estimated_tokens) as usage:
+                response = client.converse(...)
+                usage['tokens'] = input_tokens + output_tokens
+        """
+        lease = self.acquire(model_id, estimated_tokens)
+        usage = {'tokens': None}
+        try:
+            yield usage
+        except Exception as e:
+            if is_throttle_error(e):
+                self.release(model_id, lease, estimated_tokens, throttled=True)
+                metrics.add('Throttles', 1)
+                raise BedrockThrottledError(model_id, str(e)) from e
+            self.release(model_id, lease, estimated_tokens)
+            raise
+        self.release(model_id, lease, estimated_tokens, usage['tokens'])
+
+
+class NullLimiter:
+    """한도를 적용하지 않는 기본값 (호출 한도 초과 오류 변환만 수행)"""
+
+    # 한도를 관리하지 않으므로 botocore의 기본 재시도(adaptive)를 그대로 사용
+    client_options = {}
+
+    @contextmanager
+    def slot(self, model_id, estimated_tokens):
+        usage = {'tokens': None}
+        try:
+            yield usage
+        except Exception as e:
+            if is_throttle_error(e):
+                metrics.add('Throttles', 1)
+                raise BedrockThrottledError(model_id, str(e)) from e
+            raise
+
+
+def create_limiter(backend=RATE_LIMIT_BACKEND, dynamodb_client=None):
+    """
+    설정에 맞는 호출 한도 관리자 생성
+
+    Args:
+        backend (str): 'memory', 'dynamodb', 'none'
+        dynamodb_client: DynamoDB 저장소 사용 시 클라이언트 (기본값: 공용 클라이언트)
+
+    Returns:
+        RateLimiter 또는 NullLimiter
+    """
+    if backend == 'memory':
+        return RateLimiter(MemoryStore())
+    if backend == 'dynamodb':
+        return RateLimiter(DynamoDBStore(dynamodb_client=dynamodb_client))
+    return NullLimiter()
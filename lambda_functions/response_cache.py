@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from aws_clients import get_client
+
+# 캐시 설정 (Lambda 환경 변수로 변경 가능)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # memory | disk | s3 | none
+CACHE_TTL_SECONDS = int(os.environ.get('CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '128'))
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_DIR = os.environ.get('CACHE_DIR', '/tmp/curriculum-cache')
+CACHE_BUCKET = os.environ.get('CACHE_BUCKET', 'curriculum-bucket-20250331')
+CACHE_PREFIX = os.environ.get('CACHE_PREFIX', 'cache/')
+
+
+def make_cache_key(*parts):
+    """
+    캐시 키 생성 (구성 요소의 SHA-256 해시)
+
+    Args:
+        parts: 키를 구성하는 값들 (예: model_id, 프롬프트 템플릿 버전, title, data, KB ID)
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    payload = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryBackend:
+    """프로세스 메모리에 저장하는 LRU 백엔드 (Lambda 컨테이너가 재사용되는 동안 유지)"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry['value'].encode('utf-8'))
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)['size']
+            entry = dict(entry, size=size)
+            self._entries[key] = entry
+            self._size += size
+
+            # 항목 수와 전체 크기 제한을 넘으면 가장 오래 사용하지 않은 항목부터 제거
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted['size']
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._size -= entry['size']
+
+
+class DiskBackend:
+    """로컬 디스크(/tmp 등)에 항목별 JSON 파일로 저장하는 백엔드"""
+
+    def __init__(self, directory=CACHE_DIR, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # LRU 순서를 위해 접근 시간 갱신
+        os.utime(path, None)
+        return entry
+
+    def put(self, key, entry):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """항목 수와 전체 크기 제한을 넘으면 가장 오래 사용하지 않은 파일부터 삭제"""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        while files and (len(files) > self.max_entries or total > self.max_bytes):
+            _, size, path = files.pop(0)
+            total -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class S3Backend:
+    """S3 접두사(cache/) 아래에 저장하는 백엔드 (여러 Lambda 컨테이너가 공유)
+
+    크기 제한은 S3 수명 주기 규칙으로 관리하고, 여기서는 TTL만 확인합니다.
+    """
+
+    def __init__(self, s3_client=None, bucket=CACHE_BUCKET, prefix=CACHE_PREFIX):
+        self._s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    @property
+    def s3_client(self):
+        # 캐시를 실제로 사용할 때 클라이언트 생성
+        return self._s3_client or get_client('s3')
+
+    def _key(self, key):
+        return f"{self.prefix}{key}.json"
+
+    def get(self, key):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self._key(key))
+            return json.loads(response['Body'].read().decode('utf-8'))
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+
+    def put(self, key, entry):
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(key),
+            Body=json.dumps(entry, ensure_ascii=False).encode('utf-8'),
+            ContentType='application/json; charset=utf-8'
+        )
+
+    def delete(self, key):
+        self.s3_client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+class ResponseCache:
+    """
+    모델 응답 캐시
+
+    Attributes:
+        backend: 저장소 백엔드 (MemoryBackend, DiskBackend, S3Backend)
+        ttl: 항목 유효 시간(초)
+        hits: 캐시 적중 횟수
+        misses: 캐시 실패 횟수
+    """
+
+    def __init__(self, backend, ttl=CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """캐시된 값을 반환. 없거나 만료되었으면 None"""
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            print(f"캐시 조회 실패: {str(e)}")
+            entry = None
+
+        if entry is not None and self.ttl and time.time() - entry['createdAt'] > self.ttl:
+            entry = None
+            try:
+                self.backend.delete(key)
+            except Exception as e:
+                print(f"만료된 캐시 항목 삭제 실패: {str(e)}")
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry['value']
+
+    def put(self, key, value):
+        """값을 캐시에 저장 (저장 실패는 무시)"""
+        try:
+            self.backend.put(key, {'value': value, 'createdAt': time.time()})
+        except Exception as e:
+            print(f"캐시 저장 실패: {str(e)}")
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def create_cache(backend=CACHE_BACKEND, s3_client=None, ttl=CACHE_TTL_SECONDS, namespace=None):
+    """
+    설정에 맞는 ResponseCache 생성
+
+    Args:
+        backend (str): 'memory', 'disk', 's3', 'none'
+        s3_client: S3 백엔드 사용 시 S3 클라이언트 (기본값: 공용 클라이언트)
+        ttl (int): 항목 유효 시간(초)
+        namespace (str, optional): 다른 캐시와 저장 위치를 나눌 이름 (disk는 하위 디렉터리, s3는 하위 접두사)
+
+    Returns:
+        ResponseCache: 캐시 객체 ('none'이면 None)
+    """
+    if backend == 'memory':
+        return ResponseCache(MemoryBackend(), ttl)
+    if backend == 'disk':
+        return ResponseCache(DiskBackend(os.path.join(CACHE_DIR, namespace) if namespace else CACHE_DIR), ttl)
+    if backend == 's3':
+        return ResponseCache(S3Backend(s3_client, prefix=f"{CACHE_PREFIX}{namespace}/" if namespace else CACHE_PREFIX), ttl)
+    return None
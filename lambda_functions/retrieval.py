@@ -0,0 +1,223 @@
+import json
+import os
+import re
+from collections import Counter
+
+import chunking
+import metrics
+import response_cache
+import vector_index
+from aws_clients import get_client
+
+# 기본 설정 (이벤트의 numberOfResults, queryMaxTerms, passageTokenBudget으로 변경 가능)
+DEFAULT_RETRIEVAL_OPTIONS = {
+    'numberOfResults': 5,         # 검색할 문단 수
+    'queryMaxTerms': 16,          # 검색 쿼리에 넣을 핵심어 수
+    'passageTokenBudget': 2000,   # 프롬프트에 넣을 검색 결과의 최대 토큰 수
+}
+
+# 검색 결과 캐시 (같은 주제의 재시도나 프롬프트 변형이 검색 한 번을 공유)
+RETRIEVAL_CACHE_BACKEND = os.environ.get('RETRIEVAL_CACHE_BACKEND', os.environ.get('CACHE_BACKEND', 'memory'))
+RETRIEVAL_CACHE_TTL_SECONDS = int(os.environ.get('RETRIEVAL_CACHE_TTL_SECONDS', '3600'))
+
+# 주제별 메타데이터 필터에 쓰는 키 (upload_files가 데이터 파일 옆에 쓰는 <파일>.metadata.json에 지정)
+SUBJECT_METADATA_KEY = os.environ.get('SUBJECT_METADATA_KEY', 'subject')
+
+# 검색 쿼리 최대 길이 (문자)
+QUERY_MAX_CHARS = 500
+
+# 검색 쿼리에 넣을 제목의 최대 길이 (문자, 긴 제목이 핵심어를 밀어내지 않도록 제한)
+QUERY_TITLE_MAX_CHARS = 100
+
+# 핵심어 끝에서 떼어낼 조사
+PARTICLES = ('에서', '으로', '은', '는', '이', '가', '을', '를', '의', '에', '로', '와', '과', '도')
+
+# 검색에 도움이 되지 않는 흔한 단어
+STOPWORDS = frozenset(('있다', '있는', '있으며', '하는', '한다', '하여', '이다', '및', '등', '대한', '위한', '통해', '또한', '그리고'))
+
+cache = response_cache.create_cache(RETRIEVAL_CACHE_BACKEND, ttl=RETRIEVAL_CACHE_TTL_SECONDS, namespace='retrieval')
+
+
+def options_from_event(event):
+    """
+    이벤트에서 검색 설정을 읽어 기본값과 합침
+
+    숫자 설정 외에 retrievalFilter(Knowledge Base 메타데이터 필터), filterBySubject(주제 메타데이터로 제한),
+    searchType('HYBRID' 또는 'SEMANTIC'), retrievalBackend('kb' 또는 로컬 벡터 인덱스를 쓰는 'local'),
+    vectorIndexPath/vectorIndexKey(로컬 인덱스 파일 경로와 S3 키)를 지원합니다.
+    """
+    options = dict(DEFAULT_RETRIEVAL_OPTIONS)
+    for name in DEFAULT_RETRIEVAL_OPTIONS:
+        if event.get(name) is not None:
+            options[name] = int(event[name])
+    options['retrievalFilter'] = event.get('retrievalFilter')
+    options['filterBySubject'] = bool(event.get('filterBySubject', False))
+    options['searchType'] = event.get('searchType')
+    options['retrievalBackend'] = event.get('retrievalBackend', 'kb')
+    options['vectorIndexPath'] = event.get('vectorIndexPath')
+    options['vectorIndexKey'] = event.get('vectorIndexKey')
+    return options
+
+
+def extract_key_terms(text, max_terms, exclude=()):
+    """
+    데이터에서 자주 나오는 핵심어 추출 (등장 횟수 순, 같으면 먼저 나온 순)
+
+    Args:
+        text (str): 원본 데이터
+        max_terms (int): 최대 핵심어 수
+        exclude (iterable): 제외할 단어 (예: 제목에 이미 있는 단어)
+
+    Returns:
+        list: 핵심어 목록
+    """
+    exclude = set(exclude)
+    counts = Counter()
+    first_seen = {}
+    for word in re.findall(r'\w+', text):
+        if word.isdigit():
+            continue
+        for particle in PARTICLES:
+            if len(word) > len(particle) + 1 and word.endswith(particle):
+                word = word[:-len(particle)]
+                break
+        if len(word) < 2 or word in exclude or word in STOPWORDS:
+            continue
+        counts[word] += 1
+        first_seen.setdefault(word, len(first_seen))
+    ranked = sorted(counts, key=lambda word: (-counts[word], first_seen[word]))
+    return ranked[:max_terms]
+
+
+def build_query(title, data, max_terms=DEFAULT_RETRIEVAL_OPTIONS['queryMaxTerms']):
+    """
+    제목과 핵심어로 짧은 검색 쿼리 구성 (데이터 전체를 임베딩하지 않음)
+
+    Returns:
+        str: 검색 쿼리
+    """
+    lines = [line.strip() for line in title.splitlines() if line.strip()]
+    title = lines[0][:QUERY_TITLE_MAX_CHARS] if lines else ''
+    terms = extract_key_terms(data, max_terms, exclude=re.findall(r'\w+', title))
+    query = f"{title}: {' '.join(terms)}" if terms else title
+    return query[:QUERY_MAX_CHARS]
+
+
+def subject_from_keys(title_key=None, data_key=None):
+    """
+    입력 파일 키에서 주제 추출 (로컬 인덱스와 upload_files의 메타데이터 파일이 쓰는 값과 같음)
+
+    데이터 파일 이름(data-<주제>-<날짜>.txt)을 먼저 보고, 없으면 제목 파일 이름(title-<주제>-<날짜>.txt)을 봅니다.
+
+    Returns:
+        str: 주제 (파일 이름 형식이 다르면 None)
+    """
+    if data_key:
+        subject = vector_index.subject_from_source(data_key)
+        if subject:
+            return subject
+    if title_key:
+        file_name = os.path.basename(title_key)
+        if file_name.startswith('title-'):
+            return vector_index.subject_from_source('data-' + file_name[len('title-'):])
+    return None
+
+
+def build_filter(subject, options):
+    """
+    검색 설정의 메타데이터 필터 구성 (없으면 None)
+
+    Args:
+        subject (str): subject_from_keys로 구한 주제 (None이면 주제 필터를 적용하지 않음)
+        options (dict): options_from_event의 반환값
+    """
+    filters = []
+    if options.get('retrievalFilter'):
+        filters.append(options['retrievalFilter'])
+    if options.get('filterBySubject'):
+        if subject:
+            filters.append({'equals': {'key': SUBJECT_METADATA_KEY, 'value': subject}})
+        else:
+            print("입력 파일 이름에서 주제를 찾지 못해 주제 필터 없이 검색합니다.")
+    if not filters:
+        return None
+    return filters[0] if len(filters) == 1 else {'andAll': filters}
+
+
+def retrieve(knowledge_base_id, query, options, retrieval_filter=None, bypass_cache=False):
+    """
+    Knowledge Base 또는 로컬 벡터 인덱스에서 관련 문단 검색 (같은 쿼리와 설정이면 TTL 동안 캐시된 결과 사용)
+
+    Args:
+        knowledge_base_id (str): Knowledge Base ID (로컬 인덱스를 쓰면 None 가능)
+        query (str): 검색 쿼리
+        options (dict): options_from_event의 반환값
+        retrieval_filter (dict, optional): 메타데이터 필터
+        bypass_cache (bool): 캐시를 건너뛰고 항상 새로 검색
+
+    Returns:
+        list: [{'text', 'score', 'source'}] (점수 순)
+    """
+    vector_config = {'numberOfResults': options['numberOfResults']}
+    if retrieval_filter:
+        vector_config['filter'] = retrieval_filter
+    if options.get('searchType'):
+        vector_config['overrideSearchType'] = options['searchType']
+
+    local = options.get('retrievalBackend') == 'local'
+    if local:
+        index = vector_index.load_index(options.get('vectorIndexPath'), options.get('vectorIndexKey'))
+        source_id = index.index_id
+    else:
+        source_id = knowledge_base_id
+
+    cache_key = response_cache.make_cache_key(source_id, query, vector_config)
+    if cache and not bypass_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            print(f"캐시된 검색 결과를 사용합니다. (key: {cache_key[:12]})")
+            metrics.add('RetrievalCacheHits', 1)
+            return json.loads(cached)
+
+    with metrics.stage('Retrieve'):
+        if local:
+            passages = index.search(query, options['numberOfResults'], retrieval_filter)
+        else:
+            response = get_client('bedrock-agent-runtime').retrieve(
+                knowledgeBaseId=knowledge_base_id,
+                retrievalQuery={'text': query},
+                retrievalConfiguration={'vectorSearchConfiguration': vector_config}
+            )
+            passages = [
+                {
+                    'text': result['content']['text'],
+                    'score': result.get('score'),
+                    'source': result.get('location', {}).get('s3Location', {}).get('uri')
+                }
+                for result in response.get('retrievalResults', [])
+            ]
+    metrics.add('RetrievalCacheHits', 0)
+    metrics.add('RetrievedPassages', len(passages))
+
+    if cache:
+        cache.put(cache_key, json.dumps(passages, ensure_ascii=False))
+    return passages
+
+
+def format_passages(passages, token_budget=DEFAULT_RETRIEVAL_OPTIONS['passageTokenBudget']):
+    """
+    검색 결과를 프롬프트에 넣을 형식으로 변환 (토큰 예산을 넘는 문단은 제외)
+
+    Returns:
+        str: 번호와 출처가 붙은 문단 목록
+    """
+    lines = []
+    used_tokens = 0
+    for index, passage in enumerate(passages, 1):
+        tokens = chunking.estimate_tokens(passage['text'])
+        if lines and used_tokens + tokens > token_budget:
+            break
+        source = passage['source'].rsplit('/', 1)[-1] if passage.get('source') else '알 수 없음'
+        lines.append(f"[{index}] (출처: {source})\n{passage['text'].strip()}")
+        used_tokens += tokens
+    return '\n\n'.join(lines)
@@ -1,38 +1,48 @@
-import boto3
 import json
-import os
-from datetime import datetime
 
-s3_client = boto3.client('s3')
+import claim_check
+import metrics
+from aws_clients import get_client
+from output_keys import build_output_key
 
+@metrics.instrument
 def lambda_handler(event, context):
-    """커리큘럼을 S3에 저장하는 Lambda 함수"""
+    """커리큘럼을 S3에 저장하는 Lambda 함수
+    
+    curriculumRef 참조가 있으면 참조가 가리키는 본문을 저장합니다.
+    """
     
     bucket = event['bucket']
-    curriculum = event['curriculum']
     title_key = event.get('titleKey', 'default-title')
     
-    # 출력 파일 이름 생성
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    # 스트리밍/claim-check 생성 단계에서 이미 저장한 경우 다시 쓰지 않음
+    if event.get('outputKey'):
+        output_key = event['outputKey']
+        print(f"커리큘럼이 이미 S3에 저장되어 있습니다: s3://{bucket}/{output_key}")
+        
+        return {
+            'statusCode': 200,
+            'bucket': bucket,
+            'outputKey': output_key,
+            'message': f"커리큘럼이 S3에 저장되었습니다: {output_key}"
+        }
     
-    # title_key에서 파일명 추출 (예: input/title-A-20250331.txt -> A-20250331)
-    if title_key:
-        file_name = os.path.basename(title_key)
-        prefix = file_name.split('.')[0]
-        if prefix.startswith('title-'):
-            prefix = prefix[6:]  # 'title-' 제거
-    else:
-        prefix = 'curriculum'
+    with metrics.stage('S3Read'):
+        curriculum = claim_check.resolve(event, 'curriculum')
+    body = curriculum.encode('utf-8')  # UTF-8로 명시적 인코딩
     
-    output_key = f"curriculum/{prefix}-{timestamp}.txt"
+    # 출력 파일 이름 생성
+    output_key = build_output_key(title_key)
     
     # UTF-8로 명시적 인코딩하여 S3에 저장
-    s3_client.put_object(
-        Bucket=bucket,
-        Key=output_key,
-        Body=curriculum.encode('utf-8'),  # UTF-8로 명시적 인코딩
-        ContentType='text/plain; charset=utf-8'  # 콘텐츠 타입에 문자셋 지정
-    )
+    with metrics.stage('S3Write'):
+        get_client('s3').put_object(
+            Bucket=bucket,
+            Key=output_key,
+            Body=body,
+            ContentType='text/plain; charset=utf-8'  # 콘텐츠 타입에 문자셋 지정
+        )
+    metrics.add('S3BytesWritten', len(body), 'Bytes')
     
     print(f"커리큘럼이 S3에 저장되었습니다: s3://{bucket}/{output_key}")
     
@@ -41,4 +51,4 @@ def lambda_handler(event, context):
         'bucket': bucket,
         'outputKey': output_key,
         'message': f"커리큘럼이 S3에 저장되었습니다: {output_key}"
-    } 
\ No newline at end of file
+    } 
@@ -0,0 +1,177 @@
+import sys
+
+import model_adapters
+
+# S3 멀티파트 업로드의 최소 파트 크기 (마지막 파트 제외)
+MIN_PART_SIZE = 5 * 1024 * 1024
+# 텍스트나 오류가 아닌 converse_stream 이벤트
+STREAM_CONTROL_EVENTS = {'messageStart', 'contentBlockStart', 'contentBlockStop', 'messageStop'}
+
+
+class StreamEventError(RuntimeError):
+    """스트림 중간에 전달된 오류 이벤트 (botocore ClientError처럼 response['Error']['Code']를 가짐)"""
+
+    def __init__(self, event_name, message):
+        super().__init__(f"{event_name}: {message}")
+        # 'throttlingException' -> 'ThrottlingException' (converse 오류 코드와 같은 이름)
+        self.response = {'Error': {'Code': event_name[:1].upper() + event_name[1:], 'Message': str(message)}}
+
+
+def iter_stream_text(response, model_id):
+    """
+    converse_stream 응답에서 생성된 텍스트 조각을 순서대로 반환
+
+    마지막 metadata 이벤트의 사용량(입력/출력 토큰 수, 캐시 토큰 수, 소요 시간)은 지표에 기록합니다.
+
+    Args:
+        response (dict): converse_stream 응답
+        model_id (str): 호출한 모델 ID (지표 기록용)
+
+    Yields:
+        str: 생성된 텍스트 조각
+    """
+    for event in response['stream']:
+        if 'contentBlockDelta' in event:
+            text = event['contentBlockDelta'].get('delta', {}).get('text')
+            if text:
+                yield text
+        elif 'metadata' in event:
+            model_adapters.record_usage(model_id, model_adapters.usage_from(event['metadata']))
+        elif not STREAM_CONTROL_EVENTS.intersection(event):
+            # 스트림 중간 오류 (throttlingException, modelStreamErrorException 등)
+            for error_name, error in event.items():
+                raise StreamEventError(error_name, error.get('message', error))
+
+
+class StdoutSink:
+    """생성된 텍스트를 바로 표준 출력으로 내보내는 싱크 (CLI용)"""
+
+    def write(self, text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def close(self):
+        sys.stdout.write('\n')
+        sys.stdout.flush()
+
+    def abort(self):
+        self.close()
+
+
+class FileSink:
+    """
+    생성된 텍스트를 로컬 파일에 이어 쓰는 싱크
+
+    파일은 첫 조각을 쓸 때 엽니다. 스트리밍을 시작하기 전에 실패하면 파일을 만들지 않습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def write(self, text):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(text)
+
+    def close(self):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.close()
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class S3MultipartSink:
+    """
+    생성된 텍스트를 S3 멀티파트 업로드로 저장하는 싱크
+
+    파트 크기만큼 모일 때마다 업로드하므로 메모리 사용량이 출력 길이와 무관하게 일정합니다.
+    멀티파트 업로드는 첫 파트를 올릴 때 시작하므로, 그 전에 실패하면 중단할 업로드가 남지 않습니다.
+    """
+
+    def __init__(self, s3_client, bucket, key, content_type='text/plain; charset=utf-8', part_size=MIN_PART_SIZE):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._parts = []
+        self.content_type = content_type
+        self._upload_id = None
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self._buffer.extend(data)
+        self.bytes_written += len(data)
+        if len(self._buffer) >= self.part_size:
+            self._flush()
+
+    def _flush(self):
+        if self._upload_id is None:
+            self._upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                ContentType=self.content_type
+            )['UploadId']
+        part_number = len(self._parts) + 1
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=bytes(self._buffer)
+        )
+        self._parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+        self._buffer.clear()
+
+    def close(self):
+        # 마지막 파트는 최소 크기보다 작아도 되며, 빈 출력도 파트 하나로 저장
+        if self._buffer or not self._parts:
+            self._flush()
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={'Parts': self._parts}
+        )
+
+    def abort(self):
+        self._buffer.clear()
+        if self._upload_id is not None:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+
+def stream_to_sinks(chunks, sinks):
+    """
+    텍스트 조각을 모든 싱크에 전달하고 싱크를 닫음
+
+    오류가 발생하면 모든 싱크를 중단(abort)하고 예외를 다시 발생시킵니다.
+
+    Args:
+        chunks (iterable): 텍스트 조각
+        sinks (list): write/close/abort 메서드를 가진 싱크 목록
+
+    Returns:
+        int: 전달한 문자 수
+    """
+    total = 0
+    try:
+        for text in chunks:
+            for sink in sinks:
+                sink.write(text)
+            total += len(text)
+    except Exception:
+        for sink in sinks:
+            try:
+                sink.abort()
+            except Exception as abort_err:
+                print(f"싱크 중단 실패: {str(abort_err)}")
+        raise
+
+    for sink in sinks:
+        sink.close()
+    return total
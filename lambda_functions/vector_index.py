@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+로컬 벡터 인덱스 (OpenSearch Serverless 없이 data-*.txt에 대한 RAG 검색)
+
+data-*.txt를 청크로 나눠 임베딩하고, 벡터를 하나의 파일에 float32 행렬로 저장합니다.
+검색할 때는 파일을 메모리 매핑(numpy.memmap)해서 행렬-벡터 곱 한 번으로 코사인 유사도 top-k를 구하므로
+인덱스 전체를 메모리에 올리지 않고 Lambda 컨테이너 사이에서도 /tmp나 레이어(/opt)의 파일을 그대로 씁니다.
+
+파일 형식:
+    'CVIX' | 버전(uint32) | 헤더 길이(uint64) | 헤더 JSON (임베더, 차원, 청크 목록) | 패딩 | float32 행렬
+
+임베더:
+    hashing  토큰 해시로 만드는 결정적인 로컬 임베더 (API 호출 없음, 테스트/오프라인용)
+    titan    Bedrock Titan Text Embeddings (amazon.titan-embed-text-v2:0)
+
+사용 예:
+    python lambda_functions/vector_index.py build --data-dir data --output /tmp/curriculum-index.cvix
+    python lambda_functions/vector_index.py build --s3-prefix input/ --embedder titan --upload
+    python lambda_functions/vector_index.py query --index /tmp/curriculum-index.cvix --query "천문학 관측" -k 3
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy는 공용 레이어(requirements)에 포함. 설치하지 않은 로컬 환경에서는 인덱스 기능만 쓸 수 없음
+    np = None
+
+try:
+    # Lambda와 같이 lambda_functions 디렉토리가 경로에 있을 때 (핸들러와 같은 모듈을 공유)
+    from aws_clients import get_client
+    import chunking
+    import embedding_cache
+except ImportError:
+    # 저장소 루트에서 패키지로 가져올 때
+    from lambda_functions.aws_clients import get_client
+    from lambda_functions import chunking
+    from lambda_functions import embedding_cache
+
+# 인덱스 파일 위치 (Lambda 환경 변수로 변경 가능)
+VECTOR_INDEX_PATH = os.environ.get('VECTOR_INDEX_PATH', '/tmp/curriculum-index.cvix')
+LAYER_INDEX_PATH = '/opt/vector-index/curriculum-index.cvix'  # 레이어로 배포한 인덱스
+VECTOR_INDEX_BUCKET = os.environ.get('VECTOR_INDEX_BUCKET', 'curriculum-bucket-20250331')
+VECTOR_INDEX_S3_KEY = os.environ.get('VECTOR_INDEX_S3_KEY', 'vector-index/curriculum-index.cvix')
+
+# 파일 형식
+INDEX_MAGIC = b'CVIX'
+INDEX_FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<4sIQ')
+DATA_ALIGNMENT = 64
+
+# 청크와 임베딩 설정
+INDEX_CHUNK_TOKENS = 400
+INDEX_CHUNK_OVERLAP_TOKENS = 50
+HASHING_DIMENSIONS = 512
+TITAN_EMBED_MODEL_ID = 'amazon.titan-embed-text-v2:0'
+TITAN_DIMENSIONS = 512
+EMBED_CONCURRENCY = 8  # Titan 임베딩은 호출 하나에 텍스트 하나이므로 병렬로 호출
+EMBED_BATCH_SIZE = 64
+
+# data-<주제>-<날짜>.txt
+SUBJECT_PATTERN = re.compile(r'data-(.+?)(?:-\d{8})?\.txt$')
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("로컬 벡터 인덱스에는 numpy가 필요합니다. (pip install numpy)")
+
+
+def hashed_features(text, dimensions=HASHING_DIMENSIONS):
+    """
+    텍스트의 해시 특징 (단어와 단어 안의 글자 bigram을 차원에 해시, 부호도 해시로 결정)
+
+    한국어는 조사가 붙어 단어 형태가 달라지므로 bigram으로 부분 일치를 살립니다.
+
+    Returns:
+        dict: 차원 -> 가중치 (정규화 전)
+    """
+    counts = {}
+    for word in re.findall(r'\w+', text.lower()):
+        tokens = [word] + [word[i:i + 2] for i in range(len(word) - 1)]
+        for token in tokens:
+            digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            index = value % dimensions
+            sign = 1.0 if (value >> 63) & 1 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign
+    return {index: math.copysign(1 + math.log(abs(weight)), weight) for index, weight in counts.items() if weight}
+
+
+class HashingEmbedder:
+    """토큰 해시 임베더 (결정적, API 호출 없음)"""
+
+    name = 'hashing'
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS, **kwargs):
+        self.dimensions = dimensions
+        self.model_id = f"hashing-{dimensions}"
+
+    def embed(self, texts):
+        _require_numpy()
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, weight in hashed_features(text, self.dimensions).items():
+                vectors[row, index] = weight
+        return _normalize(vectors)
+
+    def config(self):
+        return {'embedder': self.name, 'dimensions': self.dimensions}
+
+
+class TitanEmbedder:
+    """Bedrock Titan Text Embeddings 임베더"""
+
+    name = 'titan'
+
+    def __init__(self, model_id=TITAN_EMBED_MODEL_ID, dimensions=TITAN_DIMENSIONS, concurrency=EMBED_CONCURRENCY,
+                 **kwargs):
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.concurrency = concurrency
+
+    def _embed_one(self, text):
+        response = get_client('bedrock-runtime').invoke_model(
+            modelId=self.model_id,
+            body=json.dumps({'inputText': text, 'dimensions': self.dimensions, 'normalize': True}),
+            contentType='application/json',
+            accept='application/json'
+        )
+        return json.loads(response['body'].read())['embedding']
+
+    def embed(self, texts):
+        _require_numpy()
+        if len(texts) == 1:
+            embeddings = [self._embed_one(texts[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                embeddings = list(executor.map(self._embed_one, texts))
+        return _normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(texts), self.dimensions))
+
+    def config(self):
+        return {'embedder': self.name, 'modelId': self.model_id, 'dimensions': self.dimensions}
+
+
+# 임베더 이름 -> 클래스
+EMBEDDERS = {
+    'hashing': HashingEmbedder,
+    'titan': TitanEmbedder,
+}
+
+
+def create_embedder(name='hashing', cache_backend=embedding_cache.EMBEDDING_CACHE_BACKEND, **kwargs):
+    """
+    이름으로 임베더 생성
+
+    API를 호출하는 임베더(titan)에는 임베딩 캐시를 붙여, 내용이 같은 청크는 다시 임베딩하지 않습니다.
+
+    Args:
+        name (str): 'hashing' 또는 'titan'
+        cache_backend (str): 임베딩 캐시 ('disk', 's3', 'none')
+        kwargs: 임베더 설정 (dimensions, model_id 등)
+
+    Returns:
+        임베더 객체 (embed(texts) -> float32 행렬, 행은 단위 벡터)
+    """
+    if name not in EMBEDDERS:
+        raise ValueError(f"지원하지 않는 임베더입니다: {name} (사용 가능: {', '.join(EMBEDDERS)})")
+    embedder = EMBEDDERS[name](**kwargs)
+    if name == 'hashing':
+        return embedder
+    return embedding_cache.cached(embedder, cache_backend)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def subject_from_source(source):
+    """데이터 파일 이름에서 주제 추출 (형식이 다르면 None)"""
+    match = SUBJECT_PATTERN.search(source)
+    return match.group(1) if match else None
+
+
+def build_index(documents, output_path, embedder=None, chunk_tokens=INDEX_CHUNK_TOKENS,
+                overlap_tokens=INDEX_CHUNK_OVERLAP_TOKENS, batch_size=EMBED_BATCH_SIZE):
+    """
+    문서를 청크로 나눠 임베딩하고 인덱스 파일 생성
+
+    벡터는 batch_size개씩 임베딩해 바로 파일에 쓰므로 전체 행렬을 메모리에 올리지 않습니다.
+    임시 파일에 쓴 뒤 교체하므로 같은 경로의 인덱스를 쓰는 프로세스가 반쯤 쓴 파일을 읽지 않습니다.
+
+    Args:
+        documents (iterable): (출처, 본문) 튜플
+        output_path (str): 인덱스 파일 경로
+        embedder: 임베더 (기본값: HashingEmbedder)
+        chunk_tokens (int): 청크 하나의 최대 토큰 수
+        overlap_tokens (int): 이웃한 청크 사이에 겹치는 토큰 수
+        batch_size (int): 한 번에 임베딩할 청크 수
+
+    Returns:
+        dict: 인덱스 헤더 (청크 목록 제외)
+    """
+    _require_numpy()
+    embedder = embedder or HashingEmbedder()
+    cache = embedder.cache if isinstance(embedder, embedding_cache.CachedEmbedder) else None
+    hits_before, misses_before = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+    chunks = []
+    for source, text in documents:
+        subject = subject_from_source(source)
+        for chunk in chunking.build_chunks(text, chunk_tokens, overlap_tokens):
+            if chunk.strip():
+                chunks.append({'text': chunk.strip(), 'source': source, 'metadata': {'subject': subject, 'source': source}})
+
+    header = dict(embedder.config(), count=len(chunks), builtAt=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                  chunkTokens=chunk_tokens, chunkOverlapTokens=overlap_tokens)
+    header_bytes = json.dumps(dict(header, chunks=chunks), ensure_ascii=False).encode('utf-8')
+    data_offset = PREAMBLE.size + len(header_bytes)
+    padding = (-data_offset) % DATA_ALIGNMENT
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    start_time = time.perf_counter()
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(PREAMBLE.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, len(header_bytes) + padding))
+            f.write(header_bytes + b' ' * padding)
+            for start in range(0, len(chunks), batch_size):
+                vectors = embedder.embed([chunk['text'] for chunk in chunks[start:start + batch_size]])
+                f.write(vectors.astype('<f4').tobytes())
+        os.replace(temp_path, output_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    print(f"인덱스 생성 완료: {output_path} (청크 {len(chunks)}개, {embedder.dimensions}차원, "
+          f"{os.path.getsize(output_path) / 1024:.1f}KB, {time.perf_counter() - start_time:.2f}초)")
+    if cache is not None:
+        hits, misses = cache.hits - hits_before, cache.misses - misses_before
+        print(f"임베딩 캐시: 적중 {hits}개, 실패 {misses}개 (적중률 {hits / max(1, hits + misses):.1%}, "
+              f"항목 {len(cache)}개)")
+        embedder.flush()
+    return header
+
+
+def matches_filter(metadata, condition):
+    """
+    청크 메타데이터가 Knowledge Base 형식의 필터 조건을 만족하는지 확인
+
+    equals, notEquals, in, notIn, startsWith, andAll, orAll을 지원합니다.
+    """
+    if not condition:
+        return True
+    if 'andAll' in condition:
+        return all(matches_filter(metadata, item) for item in condition['andAll'])
+    if 'orAll' in condition:
+        return any(matches_filter(metadata, item) for item in condition['orAll'])
+
+    operator, operand = next(iter(condition.items()))
+    value = metadata.get(operand['key'])
+    if operator == 'equals':
+        return value == operand['value']
+    if operator == 'notEquals':
+        return value != operand['value']
+    if operator == 'in':
+        return value in operand['value']
+    if operator == 'notIn':
+        return value not in operand['value']
+    if operator == 'startsWith':
+        return isinstance(value, str) and value.startswith(operand['value'])
+    raise ValueError(f"로컬 인덱스에서 지원하지 않는 필터입니다: {operator}")
+
+
+class VectorIndex:
+    """
+    메모리 매핑된 벡터 인덱스
+
+    Attributes:
+        path: 인덱스 파일 경로
+        header: 헤더 (임베더 설정, 청크 수, 생성 시각)
+        chunks: 청크 목록 ({'text', 'source', 'metadata'})
+        vectors: (청크 수, 차원) float32 memmap (행은 단위 벡터)
+        embedder: 인덱스를 만들 때와 같은 설정의 임베더 (쿼리 임베딩용)
+    """
+
+    def __init__(self, path):
+        _require_numpy()
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+            if magic != INDEX_MAGIC or version != INDEX_FORMAT_VERSION:
+                raise ValueError(f"벡터 인덱스 파일이 아닙니다: {path}")
+            header = json.loads(f.read(header_length).decode('utf-8'))
+
+        self.chunks = header.pop('chunks')
+        self.header = header
+        self.vectors = np.memmap(path, dtype='<f4', mode='r', offset=PREAMBLE.size + header_length,
+                                 shape=(header['count'], header['dimensions']))
+        config = {'dimensions': header['dimensions']}
+        if header.get('modelId'):
+            config['model_id'] = header['modelId']
+        self.embedder = create_embedder(header['embedder'], **config)
+
+    @property
+    def index_id(self):
+        """인덱스 내용 식별자 (검색 결과 캐시 키에 사용)"""
+        return f"{self.header['embedder']}:{self.header['builtAt']}:{self.header['count']}"
+
+    def search(self, query, k=5, retrieval_filter=None):
+        """
+        쿼리와 코사인 유사도가 높은 청크 top-k 검색
+
+        Args:
+            query (str): 검색 쿼리
+            k (int): 반환할 청크 수
+            retrieval_filter (dict, optional): 메타데이터 필터 (Knowledge Base 형식)
+
+        Returns:
+            list: [{'text', 'score', 'source'}] (점수 순, retrieval.retrieve와 같은 형식)
+        """
+        if not self.chunks or k <= 0:
+            return []
+        query_vector = self.embedder.embed([query])[0]
+
+        if retrieval_filter:
+            candidates = np.array([i for i, chunk in enumerate(self.chunks)
+                                   if matches_filter(chunk['metadata'], retrieval_filter)], dtype=np.int64)
+            if candidates.size == 0:
+                return []
+            scores = self.vectors[candidates] @ query_vector
+        else:
+            candidates = None
+            scores = np.asarray(self.vectors @ query_vector)
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k] if k < scores.shape[0] else np.arange(scores.shape[0])
+        top = top[np.argsort(-scores[top], kind='stable')]
+        results = []
+        for position in top:
+            chunk = self.chunks[int(candidates[position]) if candidates is not None else int(position)]
+            results.append({'text': chunk['text'], 'score': round(float(scores[position]), 4), 'source': chunk['source']})
+        return results
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _download_index(bucket, key, path):
+    """S3의 인덱스 파일을 path로 내려받기 (임시 파일에 쓴 뒤 교체)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.download"
+    body = get_client('s3').get_object(Bucket=bucket, Key=key)['Body']
+    try:
+        with open(temp_path, 'wb') as f:
+            for chunk in iter(lambda: body.read(1024 * 1024), b''):
+                f.write(chunk)
+        os.replace(temp_path, path)
+    finally:
+        body.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    print(f"벡터 인덱스 다운로드: s3://{bucket}/{key} -> {path}")
+
+
+def load_index(path=None, s3_key=None, bucket=VECTOR_INDEX_BUCKET):
+    """
+    인덱스 로드 (컨테이너 안에서 경로별로 한 번만 로드)
+
+    path가 없으면 VECTOR_INDEX_PATH, 레이어(LAYER_INDEX_PATH) 순서로 찾고,
+    둘 다 없으면 S3(s3_key, 기본값 VECTOR_INDEX_S3_KEY)에서 VECTOR_INDEX_PATH로 내려받습니다.
+
+    Returns:
+        VectorIndex: 인덱스
+    """
+    if path is None:
+        path = VECTOR_INDEX_PATH if os.path.exists(VECTOR_INDEX_PATH) or not os.path.exists(LAYER_INDEX_PATH) \
+            else LAYER_INDEX_PATH
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            if not os.path.exists(path):
+                _download_index(bucket, s3_key or VECTOR_INDEX_S3_KEY, path)
+            index = VectorIndex(path)
+            _indexes[path] = index
+    return index
+
+
+def iter_local_documents(data_dir):
+    """디렉토리의 data-*.txt (출처, 본문)"""
+    for file_name in sorted(os.listdir(data_dir)):
+        if file_name.startswith('data-') and file_name.endswith('.txt'):
+            with open(os.path.join(data_dir, file_name), 'r', encoding='utf-8') as f:
+                yield file_name, f.read()
+
+
+def iter_s3_documents(prefix, bucket=VECTOR_INDEX_BUCKET):
+    """S3 접두사 아래의 data-*.txt (출처, 본문)"""
+    s3_client = get_client('s3')
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            file_name = obj['Key'].rsplit('/', 1)[-1]
+            if file_name.startswith('data-') and file_name.endswith('.txt'):
+                body = s3_client.get_object(Bucket=bucket, Key=obj['Key'])['Body'].read()
+                yield obj['Key'], body.decode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 벡터 인덱스 생성/검색')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='data-*.txt로 인덱스 생성')
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data-dir', help='data-*.txt가 있는 로컬 디렉토리')
+    source.add_argument('--s3-prefix', help='data-*.txt가 있는 S3 접두사 (예: input/)')
+    build.add_argument('--bucket', default=VECTOR_INDEX_BUCKET, help='S3 버킷 이름')
+    build.add_argument('--output', default=VECTOR_INDEX_PATH, help='인덱스 파일 경로')
+    build.add_argument('--embedder', choices=sorted(EMBEDDERS), default='hashing', help='임베더')
+    build.add_argument('--embedding-cache', choices=['disk', 's3', 'none'],
+                       default=embedding_cache.EMBEDDING_CACHE_BACKEND, help='임베딩 캐시 (titan 임베더에 적용)')
+    build.add_argument('--dimensions', type=int, help='임베딩 차원')
+    build.add_argument('--chunk-tokens', type=int, default=INDEX_CHUNK_TOKENS, help='청크 하나의 최대 토큰 수')
+    build.add_argument('--upload', action='store_true', help=f"생성한 인덱스를 s3://<버킷>/{VECTOR_INDEX_S3_KEY}에 업로드")
+
+    query = subparsers.add_parser('query', help='인덱스 검색')
+    query.add_argument('--index', default=VECTOR_INDEX_PATH, help='인덱스 파일 경로')
+    query.add_argument('--query', required=True, help='검색 쿼리')
+    query.add_argument('-k', type=int, default=5, help='반환할 청크 수')
+    query.add_argument('--subject', help='주제 메타데이터로 제한')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        embedder = create_embedder(args.embedder, args.embedding_cache,
+                                   **({'dimensions': args.dimensions} if args.dimensions else {}))
+        documents = iter_local_documents(args.data_dir) if args.data_dir else iter_s3_documents(args.s3_prefix, args.bucket)
+        build_index(documents, args.output, embedder, args.chunk_tokens)
+        if args.upload:
+            with open(args.output, 'rb') as f:
+                get_client('s3').put_object(Bucket=args.bucket, Key=VECTOR_INDEX_S3_KEY, Body=f.read(),
+                                            ContentType='application/octet-stream')
+            print(f"업로드 완료: s3://{args.bucket}/{VECTOR_INDEX_S3_KEY}")
+        return
+
+    index = VectorIndex(args.index)
+    retrieval_filter = {'equals': {'key': 'subject', 'value': args.subject}} if args.subject else None
+    start_time = time.perf_counter()
+    results = index.search(args.query, args.k, retrieval_filter)
+    print(f"검색 시간: {(time.perf_counter() - start_time) * 1000:.2f}ms (청크 {len(index.chunks)}개)")
+    for rank, result in enumerate(results, 1):
+        print(f"[{rank}] {result['score']:.4f} {result['source']}\n    {result['text'][:120]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1669 @@
+#!/usr/bin/env python3
+"""
+로컬 워크플로우 에뮬레이터
+
+Step Functions(ASL) 정의를 프로세스 안에서 해석하고, Task 상태는 lambda_functions의 핸들러를
+직접 호출해 실행합니다. S3/Bedrock은 메모리 안의 가짜 클라이언트(aws_clients.set_client로 등록)로
+대체하므로 AWS 계정 없이 워크플로우 전체를 실행하고 상태별 소요 시간을 측정할 수 있습니다.
+
+지원 범위:
+- 상태: Task, Pass, Choice, Map(ItemsPath/ItemReader, ItemSelector, MaxConcurrency, ResultWriter), Parallel,
+  Wait, Succeed, Fail
+- Choice 규칙: And, Or, Not, IsPresent, IsNull, BooleanEquals, StringEquals, NumericEquals,
+  NumericGreaterThan(Equals), NumericLessThan(Equals)
+- 경로 처리: InputPath, Parameters/ItemSelector('.$' 키), ResultSelector, ResultPath, OutputPath
+- JSONPath: $, $$(컨텍스트 객체), 점 표기와 [n] 인덱스
+- 내장 함수: States.Format, States.StringToJson, States.JsonToString, States.Array,
+  States.ArrayGetItem, States.ArrayLength, States.MathAdd, States.UUID
+- 오류 처리: Retry(ErrorEquals, IntervalSeconds, BackoffRate, MaxAttempts, MaxDelaySeconds, JitterStrategy), Catch
+- Task 리소스: lambda:invoke, Lambda ARN, aws-sdk:<서비스>:<작업>, bedrock:invokeModel
+
+사용 예:
+    python local_runner.py --title-file data/title-A-20250331.txt --data-file data/data-A-20250331.txt
+    python local_runner.py --workflow direct --strategies fetch=direct,generate=lambda --latency 0.5
+    python local_runner.py --definition step_function_definition.json --output local_run.json
+"""
+
+import argparse
+import copy
+import hashlib
+import importlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_FUNCTIONS_DIR = os.path.join(REPO_ROOT, 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+# 가짜 Bedrock의 모델 목록이 실제 실행용 카탈로그 파일(/tmp/model-catalog.json)에 섞이지 않도록 분리
+os.environ.setdefault('MODEL_CATALOG_PATH', os.path.join(tempfile.gettempdir(), 'local-runner-model-catalog.json'))
+
+import aws_clients  # noqa: E402  핸들러와 같은 클라이언트 레지스트리
+import vector_index  # noqa: E402
+
+DEFINITION_PATH = os.path.join(REPO_ROOT, 'step_function_definition.json')
+
+# Lambda 함수 이름 -> 핸들러 모듈
+DEFAULT_FUNCTIONS = {
+    'fetch-s3-data': 'fetch_s3_data',
+    'generate-curriculum-kb': 'generate_curriculum_kb',
+    'save-curriculum': 'save_curriculum'
+}
+
+# step_function_definition.json의 ${...} 자리 표시자 기본값
+DEFINITION_SUBSTITUTIONS = {
+    'FetchS3DataLambdaArn': 'fetch-s3-data',
+    'GenerateCurriculumLambdaArn': 'generate-curriculum-kb',
+    'SaveCurriculumLambdaArn': 'save-curriculum',
+    'KnowledgeBaseId': ''
+}
+
+# aws-sdk 통합 오류 이름 앞에 붙는 서비스 이름 (예: S3.NoSuchKeyException)
+SERVICE_ERROR_PREFIXES = {'s3': 'S3', 'bedrock-runtime': 'Bedrock', 'bedrock': 'Bedrock'}
+
+# MaxConcurrency가 0(제한 없음)일 때 사용할 스레드 수
+UNLIMITED_CONCURRENCY_THREADS = 40
+
+FAKE_MODEL_IDS = [
+    'amazon.titan-text-express-v1',
+    'amazon.titan-text-lite-v1',
+    'anthropic.claude-3-sonnet-20240229-v1:0',
+    'anthropic.claude-3-haiku-20240307-v1:0'
+]
+# 가짜 Bedrock이 돌려주는 시스템 정의 추론 프로필 (프롬프트 캐시를 지원하는 모델)
+FAKE_INFERENCE_PROFILE_IDS = [
+    'us.anthropic.claude-3-5-haiku-20241022-v1:0',
+    'us.anthropic.claude-3-7-sonnet-20250219-v1:0'
+]
+
+
+class StatesError(Exception):
+    """상태 실행 오류 (Step Functions의 Error/Cause 쌍)"""
+
+    def __init__(self, error, cause=''):
+        super().__init__(f"{error}: {cause}")
+        self.error = error
+        self.cause = cause
+
+
+# ---------------------------------------------------------------------------
+# JSONPath와 내장 함수
+# ---------------------------------------------------------------------------
+
+_PATH_TOKEN = re.compile(r"\.([^.\[\]]+)|\[(\d+)\]|\['([^']+)'\]")
+
+
+def _path_tokens(path):
+    if path.startswith('$$'):
+        rest, use_context = path[2:], True
+    elif path.startswith('$'):
+        rest, use_context = path[1:], False
+    else:
+        raise StatesError('States.Runtime', f"JSONPath는 '$'로 시작해야 합니다: {path}")
+
+    tokens = []
+    pos = 0
+    while pos < len(rest):
+        match = _PATH_TOKEN.match(rest, pos)
+        if not match:
+            raise StatesError('States.Runtime', f"지원하지 않는 JSONPath: {path}")
+        name = match.group(1) or match.group(3)
+        tokens.append(int(match.group(2)) if name is None else name)
+        pos = match.end()
+    return use_context, tokens
+
+
+def get_path(data, path, context=None):
+    """
+    JSONPath 값 읽기 ('$$'로 시작하면 컨텍스트 객체에서 읽음)
+
+    Args:
+        data: 상태 입력
+        path (str): JSONPath (예: '$.fetched.title.Body', '$$.Map.Item.Value')
+        context (dict, optional): 컨텍스트 객체
+
+    Returns:
+        경로의 값 (없으면 States.Runtime 오류)
+    """
+    use_context, tokens = _path_tokens(path)
+    value = context if use_context else data
+    for token in tokens:
+        try:
+            value = value[token]
+        except (KeyError, IndexError, TypeError):
+            raise StatesError('States.Runtime', f"JSONPath '{path}'의 값을 입력에서 찾을 수 없습니다.")
+    return value
+
+
+def set_path(data, path, value):
+    """
+    ResultPath 규칙으로 값을 넣은 새 입력 반환 ('$'이면 값으로 교체, 중간 객체는 필요하면 생성)
+
+    Args:
+        data: 상태 입력
+        path (str): ResultPath
+        value: 넣을 값
+
+    Returns:
+        새 상태 데이터 (원래 입력은 바꾸지 않음)
+    """
+    use_context, tokens = _path_tokens(path)
+    if use_context:
+        raise StatesError('States.Runtime', f"ResultPath에는 컨텍스트 경로를 쓸 수 없습니다: {path}")
+    if not tokens:
+        return value
+    if not isinstance(data, dict):
+        raise StatesError('States.Runtime', f"객체가 아닌 입력에 ResultPath '{path}'를 적용할 수 없습니다.")
+
+    result = dict(data)
+    target = result
+    for token in tokens[:-1]:
+        child = target.get(token)
+        child = dict(child) if isinstance(child, dict) else {}
+        target[token] = child
+        target = child
+    target[tokens[-1]] = value
+    return result
+
+
+class _Literal(str):
+    """내장 함수의 문자열 상수 (이스케이프를 풀지 않은 원문)"""
+
+
+def _unescape(raw):
+    return re.sub(r"\\(.)", r"\1", raw, flags=re.DOTALL)
+
+
+class _IntrinsicParser:
+    """States.* 내장 함수 식을 한 글자씩 읽어 평가"""
+
+    def __init__(self, expression, data, context):
+        self.text = expression
+        self.pos = 0
+        self.data = data
+        self.context = context
+
+    def parse(self):
+        value = self._value()
+        self._skip_spaces()
+        if self.pos != len(self.text):
+            self._fail('식 뒤에 남은 문자가 있습니다')
+        return value
+
+    def _fail(self, message):
+        raise StatesError('States.Runtime', f"내장 함수 식 오류 ({message}, 위치 {self.pos}): {self.text[:80]}")
+
+    def _skip_spaces(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def _value(self):
+        self._skip_spaces()
+        text = self.text
+        if text.startswith('States.', self.pos):
+            return self._call()
+        if text.startswith("'", self.pos):
+            return self._string()
+        if text.startswith('$', self.pos):
+            end = self.pos
+            while end < len(text) and text[end] not in ',)':
+                end += 1
+            path = text[self.pos:end].strip()
+            self.pos = end
+            return get_path(self.data, path, self.context)
+
+        match = re.compile(r"-?\d+(\.\d+)?|true|false|null").match(text, self.pos)
+        if not match:
+            self._fail('알 수 없는 인자')
+        self.pos = match.end()
+        return json.loads(match.group(0))
+
+    def _string(self):
+        self.pos += 1
+        start = self.pos
+        while self.pos < len(self.text):
+            ch = self.text[self.pos]
+            if ch == '\\':
+                self.pos += 2
+                continue
+            if ch == "'":
+                raw = self.text[start:self.pos]
+                self.pos += 1
+                return _Literal(raw)
+            self.pos += 1
+        self._fail('닫히지 않은 문자열')
+
+    def _call(self):
+        open_paren = self.text.find('(', self.pos)
+        if open_paren < 0:
+            self._fail("'('가 없습니다")
+        name = self.text[self.pos:open_paren].strip()
+        self.pos = open_paren + 1
+
+        args = []
+        self._skip_spaces()
+        if self.text.startswith(')', self.pos):
+            self.pos += 1
+        else:
+            while True:
+                args.append(self._value())
+                self._skip_spaces()
+                if self.text.startswith(',', self.pos):
+                    self.pos += 1
+                elif self.text.startswith(')', self.pos):
+                    self.pos += 1
+                    break
+                else:
+                    self._fail("',' 또는 ')'가 필요합니다")
+        return call_intrinsic(name, args)
+
+
+def _format_argument(value):
+    if isinstance(value, str):
+        return _unescape(value) if isinstance(value, _Literal) else value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _plain(value):
+    return _unescape(value) if isinstance(value, _Literal) else value
+
+
+def call_intrinsic(name, args):
+    """
+    내장 함수 호출
+
+    Args:
+        name (str): 함수 이름 (예: 'States.Format')
+        args (list): 평가된 인자 (문자열 상수는 이스케이프를 풀지 않은 _Literal)
+
+    Returns:
+        함수 결과
+    """
+    if name == 'States.Format':
+        template, values = args[0], iter(args[1:])
+        out = []
+        i = 0
+        while i < len(template):
+            if template[i] == '\\' and i + 1 < len(template):
+                out.append(template[i + 1])
+                i += 2
+            elif template.startswith('{}', i):
+                try:
+                    out.append(_format_argument(next(values)))
+                except StopIteration:
+                    raise StatesError('States.Runtime', 'States.Format의 인자 수가 자리 표시자보다 적습니다.')
+                i += 2
+            else:
+                out.append(template[i])
+                i += 1
+        return ''.join(out)
+
+    args = [_plain(arg) for arg in args]
+    if name == 'States.StringToJson':
+        return json.loads(args[0])
+    if name == 'States.JsonToString':
+        return json.dumps(args[0], ensure_ascii=False, separators=(',', ':'))
+    if name == 'States.Array':
+        return list(args)
+    if name == 'States.ArrayGetItem':
+        return args[0][int(args[1])]
+    if name == 'States.ArrayLength':
+        return len(args[0])
+    if name == 'States.MathAdd':
+        return args[0] + args[1]
+    if name == 'States.UUID':
+        return str(uuid.uuid4())
+    raise StatesError('States.Runtime', f"지원하지 않는 내장 함수: {name}")
+
+
+def evaluate(expression, data, context):
+    """'.$' 키의 값(JSONPath 또는 내장 함수 식) 평가"""
+    if expression.startswith('States.'):
+        return _IntrinsicParser(expression, data, context).parse()
+    return get_path(data, expression, context)
+
+
+def apply_template(template, data, context):
+    """
+    Parameters/ItemSelector/ResultSelector 템플릿 적용 ('.$'로 끝나는 키는 경로/식으로 평가)
+
+    Args:
+        template: 템플릿 (dict, list 또는 상수)
+        data: 경로를 평가할 입력
+        context (dict): 컨텍스트 객체
+
+    Returns:
+        템플릿을 채운 새 값
+    """
+    if isinstance(template, dict):
+        result = {}
+        for key, value in template.items():
+            if key.endswith('.$'):
+                result[key[:-2]] = evaluate(value, data, context)
+            else:
+                result[key] = apply_template(value, data, context)
+        return result
+    if isinstance(template, list):
+        return [apply_template(item, data, context) for item in template]
+    return template
+
+
+# Choice 규칙의 비교 연산자 -> (값, 기준) 비교 함수
+CHOICE_COMPARATORS = {
+    'BooleanEquals': lambda value, expected: isinstance(value, bool) and value == expected,
+    'StringEquals': lambda value, expected: isinstance(value, str) and value == expected,
+    'NumericEquals': lambda value, expected: _is_number(value) and value == expected,
+    'NumericGreaterThan': lambda value, expected: _is_number(value) and value > expected,
+    'NumericGreaterThanEquals': lambda value, expected: _is_number(value) and value >= expected,
+    'NumericLessThan': lambda value, expected: _is_number(value) and value < expected,
+    'NumericLessThanEquals': lambda value, expected: _is_number(value) and value <= expected,
+}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def choice_matches(rule, data, context=None):
+    """
+    Choice 규칙 하나가 입력과 맞는지 확인
+
+    Args:
+        rule (dict): Choices의 항목 (And/Or/Not 또는 Variable과 비교 연산자)
+        data: 상태 입력
+        context (dict, optional): 컨텍스트 객체
+
+    Returns:
+        bool: 규칙이 맞으면 True
+    """
+    if 'And' in rule:
+        return all(choice_matches(child, data, context) for child in rule['And'])
+    if 'Or' in rule:
+        return any(choice_matches(child, data, context) for child in rule['Or'])
+    if 'Not' in rule:
+        return not choice_matches(rule['Not'], data, context)
+
+    try:
+        value, present = get_path(data, rule['Variable'], context), True
+    except StatesError:
+        value, present = None, False
+    if 'IsPresent' in rule:
+        return present == rule['IsPresent']
+    if not present:
+        raise StatesError('States.Runtime', f"Choice 규칙의 변수 '{rule['Variable']}'가 입력에 없습니다.")
+    if 'IsNull' in rule:
+        return (value is None) == rule['IsNull']
+    for operator, compare in CHOICE_COMPARATORS.items():
+        if operator in rule:
+            return compare(value, rule[operator])
+    raise StatesError('States.Runtime', f"지원하지 않는 Choice 규칙: {rule}")
+
+
+def _error_matches(error_equals, error):
+    for name in error_equals:
+        if name == error or name == 'States.ALL':
+            return True
+        if name == 'States.TaskFailed' and error != 'States.Timeout':
+            return True
+    return False
+
+
+# ---------------------------------------------------------------------------
+# 가짜 AWS 클라이언트
+# ---------------------------------------------------------------------------
+
+class _ServiceError(Exception):
+    """가짜 클라이언트 오류 (botocore ClientError처럼 response['Error']['Code']를 가짐)"""
+
+    def __init__(self, message=''):
+        super().__init__(message)
+        self.response = {'Error': {'Code': type(self).__name__, 'Message': message}}
+
+
+class NoSuchKey(_ServiceError):
+    pass
+
+
+class NoSuchUpload(_ServiceError):
+    pass
+
+
+class PreconditionFailed(_ServiceError):
+    pass
+
+
+class ThrottlingException(_ServiceError):
+    pass
+
+
+class InvalidRange(_ServiceError):
+    pass
+
+
+class _Body(io.BytesIO):
+    """StreamingBody 대역 (read/close만 사용)"""
+
+
+class FakeS3:
+    """
+    메모리 안의 S3 클라이언트
+
+    핸들러가 쓰는 get_object(Range, IfMatch), head_object, put_object, list_objects_v2,
+    멀티파트 업로드를 지원합니다. 읽기/쓰기 바이트 수와 호출 횟수를 기록합니다.
+
+    Attributes:
+        objects: (bucket, key) -> {'body', 'etag', 'contentType', 'lastModified'}
+        calls: 작업 이름 -> 호출 횟수
+        bytes_read: get_object로 반환한 바이트 수
+        bytes_written: put_object/upload_part로 받은 바이트 수
+    """
+
+    exceptions = SimpleNamespace(NoSuchKey=NoSuchKey, NoSuchUpload=NoSuchUpload, PreconditionFailed=PreconditionFailed)
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.objects = {}
+        self.calls = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def _call(self, operation):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _store(self, bucket, key, body, content_type):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        elif hasattr(body, 'read'):
+            body = body.read()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        with self._lock:
+            self.objects[(bucket, key)] = {'body': bytes(body), 'etag': etag, 'contentType': content_type,
+                                           'lastModified': datetime.now(timezone.utc)}
+            self.bytes_written += len(body)
+        return etag
+
+    def _get(self, bucket, key):
+        obj = self.objects.get((bucket, key))
+        if obj is None:
+            raise NoSuchKey(f"The specified key does not exist: {key}")
+        return obj
+
+    def put_object(self, Bucket, Key, Body=b'', ContentType='binary/octet-stream', **kwargs):
+        self._call('PutObject')
+        return {'ETag': self._store(Bucket, Key, Body, ContentType)}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._call('HeadObject')
+        obj = self._get(Bucket, Key)
+        return {'ETag': obj['etag'], 'ContentLength': len(obj['body']), 'ContentType': obj['contentType']}
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None, **kwargs):
+        self._call('GetObject')
+        obj = self._get(Bucket, Key)
+        if IfMatch and IfMatch != obj['etag']:
+            raise PreconditionFailed(f"ETag가 일치하지 않습니다: {Key}")
+
+        body = obj['body']
+        response = {'ETag': obj['etag'], 'ContentType': obj['contentType']}
+        if Range:
+            start, _, end = Range.replace('bytes=', '').partition('-')
+            start, end = int(start), min(int(end) if end else len(body) - 1, len(body) - 1)
+            if start >= len(body):
+                # S3처럼 객체 범위를 벗어난 Range(빈 객체 포함)는 416으로 거절
+                raise InvalidRange(f"요청한 범위를 만족할 수 없습니다: {Key} ({Range})")
+            response['ContentRange'] = f"bytes {start}-{end}/{len(body)}"
+            body = body[start:end + 1]
+        with self._lock:
+            self.bytes_read += len(body)
+        response.update({'Body': _Body(body), 'ContentLength': len(body)})
+        return response
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._call('DeleteObject')
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix='', MaxKeys=1000, ContinuationToken=None, **kwargs):
+        self._call('ListObjectsV2')
+        keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + MaxKeys]
+        response = {
+            'Contents': [
+                {'Key': key, 'Size': len(self.objects[(Bucket, key)]['body']), 'ETag': self.objects[(Bucket, key)]['etag'],
+                 'LastModified': self.objects[(Bucket, key)]['lastModified']}
+                for key in page
+            ],
+            'KeyCount': len(page),
+            'IsTruncated': start + MaxKeys < len(keys)
+        }
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(start + MaxKeys)
+        return response
+
+    def get_paginator(self, operation_name):
+        if operation_name != 'list_objects_v2':
+            raise NotImplementedError(operation_name)
+        client = self
+
+        class _Paginator:
+            def paginate(self, **kwargs):
+                token = None
+                while True:
+                    page = client.list_objects_v2(ContinuationToken=token, **kwargs)
+                    yield page
+                    if not page['IsTruncated']:
+                        return
+                    token = page['NextContinuationToken']
+
+        return _Paginator()
+
+    def create_multipart_upload(self, Bucket, Key, ContentType='binary/octet-stream', **kwargs):
+        self._call('CreateMultipartUpload')
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {'bucket': Bucket, 'key': Key, 'contentType': ContentType, 'parts': {}}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self._call('UploadPart')
+        upload = self._uploads.get(UploadId)
+        if upload is None:
+            raise NoSuchUpload(UploadId)
+        data = Body.encode('utf-8') if isinstance(Body, str) else bytes(Body)
+        upload['parts'][PartNumber] = data
+        return {'ETag': f'"part-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload=None, **kwargs):
+        self._call('CompleteMultipartUpload')
+        upload = self._uploads.pop(UploadId, None)
+        if upload is None:
+            raise NoSuchUpload(UploadId)
+        body = b''.join(upload['parts'][number] for number in sorted(upload['parts']))
+        return {'ETag': self._store(Bucket, Key, body, upload['contentType'])}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._call('AbortMultipartUpload')
+        self._uploads.pop(UploadId, None)
+        return {}
+
+    # 로컬 실행 편의 함수
+
+    def put_text(self, bucket, key, text):
+        """텍스트 객체 저장 (호출 횟수에 포함하지 않음)"""
+        return self._store(bucket, key, text, 'text/plain; charset=utf-8')
+
+    def read_text(self, bucket, key):
+        """저장된 객체를 UTF-8 텍스트로 반환 (없으면 None)"""
+        obj = self.objects.get((bucket, key))
+        return obj['body'].decode('utf-8') if obj else None
+
+
+def _prompt_from_body(body):
+    """invoke_model 요청 본문에서 프롬프트 추출 (Claude messages / Titan / 기타 형식)"""
+    if 'messages' in body:
+        content = body['messages'][-1]['content']
+        if isinstance(content, list):
+            return ''.join(part.get('text', '') for part in content)
+        return content
+    return body.get('inputText') or body.get('prompt') or ''
+
+
+def _max_tokens_from_body(body):
+    if 'textGenerationConfig' in body:
+        return body['textGenerationConfig'].get('maxTokenCount', 512)
+    return body.get('max_tokens', 512)
+
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 (한글/영문 혼합 텍스트를 문자 3개당 1토큰으로 계산)"""
+    return max(1, len(text) // 3)
+
+
+class FakeBedrockRuntime:
+    """
+    Bedrock Runtime 대역 (converse, converse_stream, invoke_model, invoke_model_with_response_stream)
+
+    모델 ID에 맞는 응답 형식(Claude messages, Titan)으로 프롬프트에서 결정적으로 만든 커리큘럼을 반환합니다.
+    임베딩 모델(Titan Embeddings)은 입력 텍스트의 해시 특징으로 만든 벡터를 반환합니다.
+
+    Attributes:
+        latency: 첫 토큰까지의 지연(초) 또는 지연을 뽑는 함수 (호출마다 다른 분포를 쓸 때)
+        tokens_per_second: 출력 토큰 생성 속도 (0이면 지연 없음)
+        output_tokens: 응답 하나의 출력 토큰 수 (요청의 최대 토큰 수를 넘지 않음)
+        throttle_rate: 호출이 ThrottlingException으로 거절될 확률 (0~1)
+        calls: 호출 횟수 (거절된 호출 포함)
+        throttles: 거절한 호출 수
+        embed_latency: 임베딩 호출당 지연(초) 또는 지연을 뽑는 함수
+        embed_calls: 임베딩 호출 횟수
+    """
+
+    def __init__(self, latency=0.0, tokens_per_second=0.0, output_tokens=400, throttle_rate=0.0, seed=None,
+                 embed_latency=0.0):
+        self.latency = latency
+        self.embed_latency = embed_latency
+        self.embed_calls = 0
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.throttle_rate = throttle_rate
+        self.calls = 0
+        self.throttles = 0
+        self._random = random.Random(seed)
+        self.input_tokens = 0
+        self.generated_tokens = 0
+        self._prompt_cache = set()
+        self._lock = threading.Lock()
+
+    def generate_text(self, prompt, max_tokens):
+        """프롬프트에서 결정적인 커리큘럼 텍스트 생성"""
+        topic = next((line.strip() for line in prompt.splitlines() if line.strip()), '주제')[:60]
+        sections = ['주제 소개', '교수진 소개', '교수별 대표 강의', '교수별 주요 컬럼', '평가 방식']
+        lines = [f"# 커리큘럼: {topic}", '']
+        tokens = min(self.output_tokens, max_tokens)
+        i = 0
+        while estimate_tokens('\n'.join(lines)) < tokens:
+            section = sections[i % len(sections)]
+            lines.append(f"## {i + 1}. {section}")
+            lines.append(f"{section}에 대한 설명입니다. 입력 데이터 {len(prompt)}자를 바탕으로 작성된 로컬 응답입니다.")
+            lines.append('')
+            i += 1
+        return '\n'.join(lines)
+
+    def _generate(self, modelId, body):
+        request = json.loads(body) if isinstance(body, (str, bytes)) else body
+        return self._complete(_prompt_from_body(request), _max_tokens_from_body(request))
+
+    def _complete(self, prompt, max_tokens, input_text=None):
+        """프롬프트로 응답 생성 (input_text는 입력 토큰 수 계산용, 기본값은 prompt)"""
+        with self._lock:
+            self.calls += 1
+            throttled = self.throttle_rate > 0 and self._random.random() < self.throttle_rate
+            if throttled:
+                self.throttles += 1
+        if throttled:
+            raise ThrottlingException('Rate exceeded')
+
+        text = self.generate_text(prompt, max_tokens)
+        with self._lock:
+            self.input_tokens += estimate_tokens(input_text or prompt)
+            self.generated_tokens += estimate_tokens(text)
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+        return prompt, text
+
+    def _embed(self, body):
+        """Titan 임베딩 대역 (토큰 해시 특징을 정규화한 결정적인 벡터)"""
+        request = json.loads(body) if isinstance(body, (str, bytes)) else body
+        dimensions = request.get('dimensions', 1024)
+        with self._lock:
+            self.embed_calls += 1
+        latency = self.embed_latency() if callable(self.embed_latency) else self.embed_latency
+        if latency:
+            time.sleep(latency)
+        features = vector_index.hashed_features(request['inputText'], dimensions)
+        norm = sum(weight * weight for weight in features.values()) ** 0.5 or 1.0
+        embedding = [0.0] * dimensions
+        for index, weight in features.items():
+            embedding[index] = weight / norm
+        payload = {'embedding': embedding, 'inputTextTokenCount': estimate_tokens(request['inputText'])}
+        return {'body': _Body(json.dumps(payload).encode('utf-8')), 'contentType': 'application/json'}
+
+    def _generation_delay(self, text):
+        if self.tokens_per_second:
+            time.sleep(estimate_tokens(text) / self.tokens_per_second)
+
+    def invoke_model(self, modelId, body, contentType='application/json', accept='application/json', **kwargs):
+        if 'embed' in modelId.lower():
+            return self._embed(body)
+        prompt, text = self._generate(modelId, body)
+        self._generation_delay(text)
+        if 'claude' in modelId.lower():
+            payload = {
+                'type': 'message',
+                'role': 'assistant',
+                'content': [{'type': 'text', 'text': text}],
+                'stop_reason': 'end_turn',
+                'usage': {'input_tokens': estimate_tokens(prompt), 'output_tokens': estimate_tokens(text)}
+            }
+        elif 'titan' in modelId.lower():
+            payload = {
+                'inputTextTokenCount': estimate_tokens(prompt),
+                'results': [{'tokenCount': estimate_tokens(text), 'outputText': text, 'completionReason': 'FINISH'}]
+            }
+        else:
+            payload = {'completion': text}
+        return {'body': _Body(json.dumps(payload, ensure_ascii=False).encode('utf-8')), 'contentType': 'application/json'}
+
+    def invoke_model_with_response_stream(self, modelId, body, contentType='application/json',
+                                          accept='application/json', **kwargs):
+        start_time = time.perf_counter()
+        prompt, text = self._generate(modelId, body)
+        pieces = [text[i:i + 64] for i in range(0, len(text), 64)]
+
+        def events():
+            for i, piece in enumerate(pieces):
+                self._generation_delay(piece)
+                if 'claude' in modelId.lower():
+                    chunk = {'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': piece}}
+                elif 'titan' in modelId.lower():
+                    chunk = {'outputText': piece}
+                else:
+                    chunk = {'completion': piece}
+                if i == len(pieces) - 1:
+                    # 실제 스트림처럼 마지막 청크에 호출 지표 포함
+                    chunk['amazon-bedrock-invocationMetrics'] = {
+                        'inputTokenCount': estimate_tokens(prompt),
+                        'outputTokenCount': estimate_tokens(text),
+                        'invocationLatency': int((time.perf_counter() - start_time) * 1000)
+                    }
+                yield {'chunk': {'bytes': json.dumps(chunk, ensure_ascii=False).encode('utf-8')}}
+
+        return {'body': events(), 'contentType': 'application/json'}
+
+
+    def _converse_request(self, system, messages, inferenceConfig):
+        """converse 요청에서 (사용자 메시지, 전체 입력, 최대 토큰 수, 캐시 지점 앞부분) 추출"""
+        system_text = ''.join(block.get('text', '') for block in system or [])
+        cached_prefix = system_text if any('cachePoint' in block for block in system or []) else None
+        prompt = ''.join(block.get('text', '') for block in messages[-1]['content'])
+        return prompt, system_text + prompt, (inferenceConfig or {}).get('maxTokens', 512), cached_prefix
+
+    def _converse_usage(self, input_text, text, cached_prefix, start_time):
+        """converse 응답의 usage/metrics (캐시 지점 앞부분은 두 번째 호출부터 캐시에서 읽은 것으로 계산)"""
+        usage = {'inputTokens': estimate_tokens(input_text), 'outputTokens': estimate_tokens(text)}
+        if cached_prefix:
+            with self._lock:
+                hit = cached_prefix in self._prompt_cache
+                self._prompt_cache.add(cached_prefix)
+            cached_tokens = estimate_tokens(cached_prefix)
+            usage['inputTokens'] -= cached_tokens
+            usage['cacheReadInputTokens' if hit else 'cacheWriteInputTokens'] = cached_tokens
+        usage['totalTokens'] = usage['inputTokens'] + usage['outputTokens']
+        return usage, {'latencyMs': int((time.perf_counter() - start_time) * 1000)}
+
+    def converse(self, modelId, messages, system=None, inferenceConfig=None, **kwargs):
+        start_time = time.perf_counter()
+        prompt, input_text, max_tokens, cached_prefix = self._converse_request(system, messages, inferenceConfig)
+        _, text = self._complete(prompt, max_tokens, input_text)
+        self._generation_delay(text)
+        usage, metrics = self._converse_usage(input_text, text, cached_prefix, start_time)
+        return {
+            'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}},
+            'stopReason': 'end_turn',
+            'usage': usage,
+            'metrics': metrics
+        }
+
+    def converse_stream(self, modelId, messages, system=None, inferenceConfig=None, **kwargs):
+        start_time = time.perf_counter()
+        prompt, input_text, max_tokens, cached_prefix = self._converse_request(system, messages, inferenceConfig)
+        _, text = self._complete(prompt, max_tokens, input_text)
+
+        def events():
+            yield {'messageStart': {'role': 'assistant'}}
+            for i in range(0, len(text), 64):
+                piece = text[i:i + 64]
+                self._generation_delay(piece)
+                yield {'contentBlockDelta': {'contentBlockIndex': 0, 'delta': {'text': piece}}}
+            yield {'contentBlockStop': {'contentBlockIndex': 0}}
+            yield {'messageStop': {'stopReason': 'end_turn'}}
+            usage, metrics = self._converse_usage(input_text, text, cached_prefix, start_time)
+            yield {'metadata': {'usage': usage, 'metrics': metrics}}
+
+        return {'stream': events()}
+
+
+class FakeBedrock:
+    """
+    Bedrock 제어 영역 대역 (list_foundation_models, list_inference_profiles, 배치 추론 작업)
+
+    배치 추론 작업은 get_model_invocation_job을 처음 호출할 때 입력 JSONL을 runtime으로 모두 처리하고
+    결과를 <outputUri><작업 ID>/<입력 파일 이름>.out에 저장한 뒤 Completed 상태가 됩니다.
+    """
+
+    def __init__(self, model_ids=None, runtime=None, s3=None, inference_profile_ids=None):
+        self.model_ids = list(model_ids or FAKE_MODEL_IDS)
+        self.inference_profile_ids = list(FAKE_INFERENCE_PROFILE_IDS if inference_profile_ids is None
+                                          else inference_profile_ids)
+        self.runtime = runtime
+        self.s3 = s3
+        self.jobs = {}
+
+    def list_foundation_models(self, **kwargs):
+        return {'modelSummaries': [{'modelId': model_id} for model_id in self.model_ids]}
+
+    def list_inference_profiles(self, **kwargs):
+        return {'inferenceProfileSummaries': [{'inferenceProfileId': profile_id}
+                                              for profile_id in self.inference_profile_ids]}
+
+    def create_model_invocation_job(self, jobName, roleArn, modelId, inputDataConfig, outputDataConfig, **kwargs):
+        job_id = uuid.uuid4().hex[:12]
+        job_arn = f"arn:aws:bedrock:local:000000000000:model-invocation-job/{job_id}"
+        self.jobs[job_arn] = {
+            'jobArn': job_arn,
+            'jobName': jobName,
+            'modelId': modelId,
+            'roleArn': roleArn,
+            'status': 'Submitted',
+            'inputDataConfig': inputDataConfig,
+            'outputDataConfig': outputDataConfig
+        }
+        return {'jobArn': job_arn}
+
+    def get_model_invocation_job(self, jobIdentifier, **kwargs):
+        job = self.jobs[jobIdentifier]
+        if job['status'] == 'Submitted':
+            self._run_job(job)
+        return dict(job)
+
+    def _run_job(self, job):
+        bucket, _, input_prefix = job['inputDataConfig']['s3InputDataConfig']['s3Uri'][5:].partition('/')
+        output_uri = job['outputDataConfig']['s3OutputDataConfig']['s3Uri']
+        output_prefix = output_uri[5:].partition('/')[2] + job['jobArn'].rsplit('/', 1)[-1] + '/'
+        input_keys = sorted(key for bucket_name, key in self.s3.objects
+                            if bucket_name == bucket and key.startswith(input_prefix) and key.endswith('.jsonl'))
+        for key in input_keys:
+            lines = []
+            for line in self.s3._get(bucket, key)['body'].decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                result = {'recordId': record['recordId'], 'modelInput': record['modelInput']}
+                try:
+                    response = self.runtime.invoke_model(job['modelId'], json.dumps(record['modelInput']))
+                    result['modelOutput'] = json.loads(response['body'].read())
+                except ThrottlingException as e:
+                    result['error'] = {'errorCode': 429, 'errorMessage': str(e)}
+                lines.append(json.dumps(result, ensure_ascii=False))
+            out_key = output_prefix + key.rsplit('/', 1)[-1] + '.out'
+            self.s3.put_object(Bucket=bucket, Key=out_key, Body='\n'.join(lines) + '\n')
+        job['status'] = 'Completed'
+
+
+class FakeBedrockAgentRuntime:
+    """
+    Knowledge Base RAG 대역 (retrieve, retrieve_and_generate)
+
+    retrieve는 가짜 S3의 input/data-*.txt를 문단으로 나눠, 쿼리와 겹치는 단어 수로 점수를 매겨 반환합니다.
+    latency(초 또는 지연을 뽑는 함수)로 쿼리 임베딩과 벡터 검색에 걸리는 시간을 흉내 냅니다.
+    """
+
+    def __init__(self, runtime, s3=None, bucket='curriculum-bucket-20250331', prefix='input/data-', latency=0.0):
+        self.runtime = runtime
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.latency = latency
+        self.retrieve_calls = 0
+
+    def retrieve(self, knowledgeBaseId, retrievalQuery, retrievalConfiguration=None, **kwargs):
+        with self.runtime._lock:
+            self.retrieve_calls += 1
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+        query_words = set(re.findall(r'\w+', retrievalQuery['text']))
+        number_of_results = ((retrievalConfiguration or {}).get('vectorSearchConfiguration', {})
+                             .get('numberOfResults', 5))
+        results = []
+        for (bucket, key), obj in list(self.s3.objects.items()) if self.s3 else []:
+            if bucket != self.bucket or not key.startswith(self.prefix):
+                continue
+            for paragraph in re.split(r'\n\s*\n', obj['body'].decode('utf-8')):
+                words = set(re.findall(r'\w+', paragraph))
+                if not words:
+                    continue
+                score = len(words & query_words) / len(query_words | words)
+                results.append({
+                    'content': {'text': paragraph.strip()},
+                    'location': {'type': 'S3', 's3Location': {'uri': f"s3://{bucket}/{key}"}},
+                    'score': round(score, 4)
+                })
+        results.sort(key=lambda result: -result['score'])
+        return {'retrievalResults': results[:number_of_results]}
+
+    def retrieve_and_generate(self, input, retrieveAndGenerateConfiguration, **kwargs):
+        prompt = input.get('text', '')
+        _, text = self.runtime._generate('anthropic.claude', {'prompt': prompt, 'max_tokens': 4000})
+        self.runtime._generation_delay(text)
+        return {'output': {'text': text}, 'citations': [], 'sessionId': uuid.uuid4().hex}
+
+
+class FakeBedrockAgent:
+    """
+    Knowledge Base 제어 영역 대역 (데이터 소스 조회, 수집 작업)
+
+    수집 작업은 시작할 때 데이터 소스 접두사 아래 객체를 지난 수집 결과와 비교해 통계를 계산하고,
+    get_ingestion_job을 두 번 호출하면(IN_PROGRESS → COMPLETE) 끝납니다.
+    fail_jobs가 0보다 크면 그 수만큼의 다음 작업은 FAILED로 끝납니다.
+    """
+
+    def __init__(self, s3, bucket='curriculum-bucket-20250331', prefix='input/'):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.jobs = {}
+        self.indexed = {}
+        self.fail_jobs = 0
+        self._tokens = {}
+
+    def list_data_sources(self, knowledgeBaseId, **kwargs):
+        return {'dataSourceSummaries': [{'dataSourceId': 'FAKEDS0001', 'knowledgeBaseId': knowledgeBaseId}]}
+
+    def get_data_source(self, knowledgeBaseId, dataSourceId, **kwargs):
+        return {'dataSource': {
+            'dataSourceId': dataSourceId,
+            'knowledgeBaseId': knowledgeBaseId,
+            'dataSourceConfiguration': {'type': 'S3', 's3Configuration': {
+                'bucketArn': f"arn:aws:s3:::{self.bucket}",
+                'inclusionPrefixes': [self.prefix]
+            }}
+        }}
+
+    def start_ingestion_job(self, knowledgeBaseId, dataSourceId, clientToken=None, **kwargs):
+        if clientToken in self._tokens:
+            return {'ingestionJob': dict(self.jobs[self._tokens[clientToken]])}
+
+        current = {key: obj['etag'] for (bucket, key), obj in self.s3.objects.items()
+                   if bucket == self.bucket and key.startswith(self.prefix)}
+        statistics = {
+            'numberOfDocumentsScanned': len(current),
+            'numberOfNewDocumentsIndexed': sum(1 for key in current if key not in self.indexed),
+            'numberOfModifiedDocumentsIndexed': sum(1 for key in current
+                                                    if key in self.indexed and self.indexed[key] != current[key]),
+            'numberOfDocumentsDeleted': sum(1 for key in self.indexed if key not in current),
+            'numberOfDocumentsFailed': 0
+        }
+        job_id = uuid.uuid4().hex[:10].upper()
+        self.jobs[job_id] = {
+            'ingestionJobId': job_id,
+            'knowledgeBaseId': knowledgeBaseId,
+            'dataSourceId': dataSourceId,
+            'status': 'STARTING',
+            'startedAt': datetime.now(timezone.utc).isoformat(),
+            'statistics': statistics,
+            '_indexed': current
+        }
+        if clientToken:
+            self._tokens[clientToken] = job_id
+        return {'ingestionJob': self._public(job_id)}
+
+    def get_ingestion_job(self, knowledgeBaseId, dataSourceId, ingestionJobId, **kwargs):
+        job = self.jobs[ingestionJobId]
+        if job['status'] == 'STARTING':
+            job['status'] = 'IN_PROGRESS'
+        elif job['status'] == 'IN_PROGRESS':
+            if self.fail_jobs > 0:
+                self.fail_jobs -= 1
+                job['status'] = 'FAILED'
+                job['failureReasons'] = ['가짜 수집 실패']
+            else:
+                job['status'] = 'COMPLETE'
+                self.indexed = job['_indexed']
+        return {'ingestionJob': self._public(ingestionJobId)}
+
+    def list_ingestion_jobs(self, knowledgeBaseId, dataSourceId, filters=None, sortBy=None, maxResults=None,
+                            **kwargs):
+        statuses = None
+        for condition in filters or []:
+            if condition['attribute'] == 'STATUS':
+                statuses = condition['values']
+        summaries = [self._public(job_id) for job_id, job in self.jobs.items()
+                     if statuses is None or job['status'] in statuses]
+        if sortBy and sortBy.get('order') == 'DESCENDING':
+            summaries.reverse()  # 시작한 순서대로 저장되어 있음
+        return {'ingestionJobSummaries': summaries[:maxResults] if maxResults else summaries}
+
+    def _public(self, job_id):
+        return {name: value for name, value in self.jobs[job_id].items() if not name.startswith('_')}
+
+
+def install_fakes(s3_latency=0.0, model_latency=0.0, tokens_per_second=0.0, output_tokens=400,
+                  throttle_rate=0.0, seed=None):
+    """
+    가짜 S3/Bedrock 클라이언트를 aws_clients 레지스트리에 등록
+
+    Args:
+        s3_latency (float): S3 호출당 지연(초)
+        model_latency (float or callable): 모델 호출당 첫 토큰 지연(초) 또는 지연을 뽑는 함수
+        tokens_per_second (float): 출력 토큰 생성 속도 (0이면 지연 없음)
+        output_tokens (int): 응답 하나의 출력 토큰 수
+        throttle_rate (float): 모델 호출이 ThrottlingException으로 거절될 확률
+        seed (int, optional): 거절 여부를 정하는 난수 시드
+
+    Returns:
+        SimpleNamespace: s3, bedrock_runtime, bedrock, bedrock_agent_runtime, bedrock_agent
+    """
+    runtime = FakeBedrockRuntime(model_latency, tokens_per_second, output_tokens, throttle_rate, seed)
+    s3 = FakeS3(s3_latency)
+    fakes = SimpleNamespace(
+        s3=s3,
+        bedrock_runtime=runtime,
+        bedrock=FakeBedrock(runtime=runtime, s3=s3),
+        bedrock_agent_runtime=FakeBedrockAgentRuntime(runtime, s3),
+        bedrock_agent=FakeBedrockAgent(s3)
+    )
+    aws_clients.set_client('s3', fakes.s3)
+    aws_clients.set_client('bedrock-runtime', fakes.bedrock_runtime)
+    aws_clients.set_client('bedrock', fakes.bedrock)
+    aws_clients.set_client('bedrock-agent-runtime', fakes.bedrock_agent_runtime)
+    aws_clients.set_client('bedrock-agent', fakes.bedrock_agent)
+    return fakes
+
+
+# ---------------------------------------------------------------------------
+# 인터프리터
+# ---------------------------------------------------------------------------
+
+class LocalLambdaContext:
+    """Lambda 핸들러에 넘길 컨텍스트 대역"""
+
+    def __init__(self, function_name, timeout_seconds=300):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self.invoked_function_arn = f"arn:aws:lambda:local:000000000000:function:{function_name}"
+        self.memory_limit_in_mb = 512
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def _function_name(function_ref):
+    """Lambda ARN/이름에서 함수 이름 추출 (버전/별칭 제외)"""
+    if ':function:' in function_ref:
+        function_ref = function_ref.split(':function:', 1)[1]
+    return function_ref.split(':', 1)[0]
+
+
+def _snake_case(name):
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+class LocalWorkflowRunner:
+    """
+    ASL 정의를 프로세스 안에서 실행
+
+    Attributes:
+        definition: 상태 머신 정의
+        functions: Lambda 함수 이름 -> 핸들러 모듈 이름 또는 호출 가능 객체
+        time_scale: Retry/Wait 대기 시간에 곱할 값 (0이면 기다리지 않음)
+    """
+
+    def __init__(self, definition, functions=None, time_scale=0.0):
+        self.definition = definition
+        self.functions = dict(DEFAULT_FUNCTIONS, **(functions or {}))
+        self.time_scale = time_scale
+        self._handlers = {}
+        self._records = []
+        self._lock = threading.Lock()
+
+    def run(self, execution_input, name=None):
+        """
+        실행 하나를 끝까지 수행
+
+        Args:
+            execution_input (dict): 실행 입력
+            name (str, optional): 실행 이름 (컨텍스트 객체의 $$.Execution.Name)
+
+        Returns:
+            dict: {'status', 'output', 'error', 'cause', 'wallTime', 'states', 'lastStateOutput'}
+                  states는 실행 순서대로 {'name', 'type', 'durationMs', 'attempts', 'error'}
+                  lastStateOutput은 마지막으로 성공한 최상위 상태의 출력 (실패한 실행의 사용량 기록용)
+        """
+        name = name or f"local-{uuid.uuid4().hex[:12]}"
+        context = {
+            'Execution': {
+                'Id': f"arn:aws:states:local:000000000000:execution:local:{name}",
+                'Name': name,
+                'Input': execution_input,
+                'StartTime': datetime.now(timezone.utc).isoformat()
+            },
+            'StateMachine': {'Name': 'local'}
+        }
+        self._records = []
+        self._last_output = None
+        start_time = time.perf_counter()
+        result = {'status': 'SUCCEEDED', 'output': None, 'error': None, 'cause': None}
+        try:
+            result['output'] = self._run_machine(self.definition, copy.deepcopy(execution_input), context, '')
+        except StatesError as e:
+            result.update(status='FAILED', error=e.error, cause=e.cause)
+        result['wallTime'] = round(time.perf_counter() - start_time, 3)
+        result['states'] = list(self._records)
+        result['lastStateOutput'] = self._last_output
+        return result
+
+    def _run_machine(self, machine, data, context, prefix):
+        state_name = machine['StartAt']
+        while True:
+            state = machine['States'].get(state_name)
+            if state is None:
+                raise StatesError('States.Runtime', f"상태 '{state_name}'가 정의에 없습니다.")
+            data, state_name = self._run_state(prefix + state_name, state, data, context)
+            if not prefix:
+                self._last_output = data
+            if state_name is None:
+                return data
+
+    def _record(self, name, state, start_time, attempts, error):
+        with self._lock:
+            self._records.append({
+                'name': name,
+                'type': state['Type'],
+                'durationMs': round((time.perf_counter() - start_time) * 1000, 1),
+                'attempts': attempts,
+                'error': error
+            })
+
+    def _sleep(self, seconds):
+        if self.time_scale and seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def _run_state(self, name, state, data, context):
+        """상태 하나를 실행하고 (출력, 다음 상태 이름)을 반환 (마지막 상태면 다음 상태는 None)"""
+        state_type = state['Type']
+        start_time = time.perf_counter()
+        attempts = [0]
+        try:
+            if state_type == 'Fail':
+                raise StatesError(state.get('Error', 'States.Fail'), state.get('Cause', ''))
+
+            input_path = state.get('InputPath', '$')
+            effective_input = {} if input_path is None else get_path(data, input_path, context)
+
+            if state_type == 'Pass':
+                result = state['Result'] if 'Result' in state else self._parameters(state, effective_input, context)
+            elif state_type == 'Choice':
+                result = effective_input
+                next_state = next((rule['Next'] for rule in state['Choices']
+                                   if choice_matches(rule, effective_input, context)), state.get('Default'))
+                if next_state is None:
+                    raise StatesError('States.NoChoiceMatched', f"Choice 상태 '{name}'에서 맞는 규칙이 없습니다.")
+            elif state_type == 'Wait':
+                self._sleep(state.get('Seconds') or get_path(effective_input, state.get('SecondsPath', '$'), context))
+                result = effective_input
+            elif state_type == 'Succeed':
+                result = effective_input
+            elif state_type in ('Task', 'Map', 'Parallel'):
+                result = self._with_retry(state, lambda: self._execute(name, state, effective_input, context), attempts)
+                if 'ResultSelector' in state:
+                    result = apply_template(state['ResultSelector'], result, context)
+            else:
+                raise StatesError('States.Runtime', f"지원하지 않는 상태 유형: {state_type}")
+
+            if state_type in ('Wait', 'Succeed', 'Choice'):
+                output = result
+            else:
+                output = self._apply_result_path(data, state.get('ResultPath', '$'), result)
+            if state.get('OutputPath', '$') is None:
+                output = {}
+            elif state.get('OutputPath', '$') != '$':
+                output = get_path(output, state['OutputPath'], context)
+        except StatesError as e:
+            self._record(name, state, start_time, attempts[0], e.error)
+            for catcher in state.get('Catch', []):
+                if _error_matches(catcher['ErrorEquals'], e.error):
+                    output = self._apply_result_path(data, catcher.get('ResultPath', '$'),
+                                                     {'Error': e.error, 'Cause': e.cause})
+                    return output, catcher['Next']
+            raise
+
+        self._record(name, state, start_time, attempts[0], None)
+        if state_type in ('Succeed',) or state.get('End'):
+            return output, None
+        if state_type == 'Choice':
+            return output, next_state
+        return output, state['Next']
+
+    @staticmethod
+    def _apply_result_path(data, result_path, result):
+        if result_path is None:
+            return data
+        return set_path(data, result_path, result)
+
+    @staticmethod
+    def _parameters(state, effective_input, context, key='Parameters'):
+        if key in state:
+            return apply_template(state[key], effective_input, context)
+        return effective_input
+
+    def _with_retry(self, state, action, attempts):
+        retry_counts = {}
+        while True:
+            attempts[0] += 1
+            try:
+                return action()
+            except StatesError as e:
+                index = next((i for i, retrier in enumerate(state.get('Retry', []))
+                              if _error_matches(retrier['ErrorEquals'], e.error)), None)
+                if index is None:
+                    raise
+                retrier = state['Retry'][index]
+                count = retry_counts.get(index, 0)
+                if count >= retrier.get('MaxAttempts', 3):
+                    raise
+                retry_counts[index] = count + 1
+                delay = retrier.get('IntervalSeconds', 1) * retrier.get('BackoffRate', 2.0) ** count
+                if 'MaxDelaySeconds' in retrier:
+                    delay = min(delay, retrier['MaxDelaySeconds'])
+                if retrier.get('JitterStrategy') == 'FULL':
+                    delay = random.uniform(0, delay)
+                self._sleep(delay)
+
+    def _execute(self, name, state, effective_input, context):
+        if state['Type'] == 'Map':
+            return self._run_map(name, state, effective_input, context)
+        if state['Type'] == 'Parallel':
+            return self._run_parallel(name, state, effective_input, context)
+        return self._run_task(state, self._parameters(state, effective_input, context))
+
+    def _run_map(self, name, state, effective_input, context):
+        if 'ItemReader' in state:
+            reader = state['ItemReader']
+            params = apply_template(reader.get('Parameters', {}), effective_input, context)
+            body = self._call_service('s3', 'getObject', params)['Body']
+            items = json.loads(body) if reader.get('ReaderConfig', {}).get('InputType', 'JSON') == 'JSON' else body.splitlines()
+        else:
+            items = get_path(effective_input, state.get('ItemsPath', '$'), context)
+        if not isinstance(items, list):
+            raise StatesError('States.Runtime', f"Map 상태 '{name}'의 항목이 배열이 아닙니다.")
+
+        processor = state.get('ItemProcessor') or state['Iterator']
+        selector = state.get('ItemSelector') or state.get('Parameters')
+
+        def run_item(index):
+            item_context = dict(context, Map={'Item': {'Index': index, 'Value': items[index]}})
+            item_input = apply_template(selector, effective_input, item_context) if selector else items[index]
+            return item_input, self._run_machine(processor, item_input, item_context, f"{name}/")
+
+        max_concurrency = state.get('MaxConcurrency', 0) or UNLIMITED_CONCURRENCY_THREADS
+        results = []
+        if items:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+                results = list(executor.map(run_item, range(len(items))))
+        if 'ResultWriter' in state:
+            return self._write_map_results(state['ResultWriter'], effective_input, context, results)
+        return [output for _, output in results]
+
+    def _write_map_results(self, writer, effective_input, context, results):
+        """
+        ResultWriter처럼 항목별 결과를 S3에 쓰고 결과 매니페스트 위치를 반환
+
+        <Prefix>/<맵 실행 ID>/SUCCEEDED_0.json에 하위 실행 결과 배열을,
+        같은 위치의 manifest.json에 결과 파일 목록을 씁니다 (하위 실행이 실패하면 Map 상태가 실패하므로 FAILED 파일은 없음).
+        """
+        params = apply_template(writer.get('Parameters', {}), effective_input, context)
+        bucket = params['Bucket']
+        map_run_id = uuid.uuid4().hex
+        base_key = f"{params['Prefix'].rstrip('/')}/{map_run_id}" if params.get('Prefix') else map_run_id
+        map_run_arn = f"{context['Execution']['Id']}:{map_run_id}"
+
+        entries = [
+            {
+                'ExecutionArn': f"{map_run_arn}:{index}",
+                'Name': str(index),
+                'Input': json.dumps(item_input, ensure_ascii=False),
+                'Output': json.dumps(output, ensure_ascii=False),
+                'Status': 'SUCCEEDED'
+            }
+            for index, (item_input, output) in enumerate(results)
+        ]
+        result_files = {'FAILED': [], 'PENDING': [], 'SUCCEEDED': []}
+        if entries:
+            body = json.dumps(entries, ensure_ascii=False)
+            result_key = f"{base_key}/SUCCEEDED_0.json"
+            self._call_service('s3', 'putObject', {'Bucket': bucket, 'Key': result_key, 'Body': body})
+            result_files['SUCCEEDED'].append({'Key': result_key, 'Size': len(body.encode('utf-8'))})
+        manifest_key = f"{base_key}/manifest.json"
+        manifest = {'DestinationBucket': bucket, 'MapRunArn': map_run_arn, 'ResultFiles': result_files}
+        self._call_service('s3', 'putObject', {'Bucket': bucket, 'Key': manifest_key, 'Body': json.dumps(manifest)})
+        return {'MapRunArn': map_run_arn, 'ResultWriterDetails': {'Bucket': bucket, 'Key': manifest_key}}
+
+    def _run_parallel(self, name, state, effective_input, context):
+        branches = state['Branches']
+        with ThreadPoolExecutor(max_workers=len(branches)) as executor:
+            futures = [
+                executor.submit(self._run_machine, branch, copy.deepcopy(effective_input), context, f"{name}/")
+                for branch in branches
+            ]
+            return [future.result() for future in futures]
+
+    def _run_task(self, state, params):
+        resource = state['Resource']
+        if resource.startswith('arn:aws:states:::lambda:invoke'):
+            if resource != 'arn:aws:states:::lambda:invoke':
+                raise StatesError('States.Runtime', f"지원하지 않는 통합 패턴: {resource}")
+            payload = self._invoke_lambda(params['FunctionName'], params.get('Payload', {}))
+            return {'Payload': payload, 'StatusCode': 200, 'ExecutedVersion': '$LATEST'}
+        if resource.startswith('arn:aws:lambda:') or resource in self.functions:
+            return self._invoke_lambda(resource, params)
+        if resource.startswith('arn:aws:states:::aws-sdk:'):
+            service, action = resource[len('arn:aws:states:::aws-sdk:'):].split(':', 1)
+            return self._call_service(service, action, params)
+        if resource == 'arn:aws:states:::bedrock:invokeModel':
+            return self._invoke_model(params)
+        raise StatesError('States.Runtime', f"지원하지 않는 Task 리소스: {resource}")
+
+    def _handler(self, function_ref):
+        function_name = _function_name(function_ref)
+        handler = self._handlers.get(function_name)
+        if handler is None:
+            target = self.functions.get(function_name) or function_name.replace('-', '_')
+            if not callable(target):
+                target = importlib.import_module(target).lambda_handler
+            handler = self._handlers[function_name] = target
+        return function_name, handler
+
+    def _invoke_lambda(self, function_ref, payload):
+        try:
+            function_name, handler = self._handler(function_ref)
+        except ImportError as e:
+            raise StatesError('Lambda.ResourceNotFoundException', str(e))
+        try:
+            result = handler(copy.deepcopy(payload), LocalLambdaContext(function_name))
+        except Exception as e:
+            raise StatesError(type(e).__name__, json.dumps({
+                'errorMessage': str(e),
+                'errorType': type(e).__name__
+            }, ensure_ascii=False))
+        # 실제 Lambda처럼 JSON으로 직렬화할 수 있는 값만 통과
+        return json.loads(json.dumps(result, ensure_ascii=False))
+
+    def _call_service(self, service, action, params):
+        client = aws_clients.get_client(service)
+        prefix = SERVICE_ERROR_PREFIXES.get(service, service.capitalize())
+        try:
+            response = getattr(client, _snake_case(action))(**params)
+        except StatesError:
+            raise
+        except Exception as e:
+            error_name = type(e).__name__
+            raise StatesError(f"{prefix}.{error_name if error_name.endswith('Exception') else error_name + 'Exception'}", str(e))
+
+        # Step Functions는 스트리밍 본문을 문자열로 돌려줌
+        response = dict(response)
+        if hasattr(response.get('Body'), 'read'):
+            response['Body'] = response['Body'].read().decode('utf-8')
+        return json.loads(json.dumps(response, ensure_ascii=False, default=str))
+
+    def _invoke_model(self, params):
+        model_id = params['ModelId'].split('foundation-model/', 1)[-1]
+        body = params.get('Body', {})
+        try:
+            response = aws_clients.get_client('bedrock-runtime').invoke_model(
+                modelId=model_id,
+                body=body if isinstance(body, str) else json.dumps(body, ensure_ascii=False),
+                contentType=params.get('ContentType', 'application/json'),
+                accept=params.get('Accept', 'application/json')
+            )
+        except Exception as e:
+            raise StatesError(f"Bedrock.{type(e).__name__}", str(e))
+        return {'Body': json.loads(response['body'].read()), 'ContentType': response.get('contentType')}
+
+
+class StateMachineDoesNotExist(_ServiceError):
+    pass
+
+
+class LocalStepFunctions:
+    """
+    Step Functions 클라이언트 대역
+
+    등록한 정의를 start_execution/start_sync_execution 호출 시 LocalWorkflowRunner로 바로 실행하므로,
+    진입점 스크립트(execute_workflow, run_workflow)를 AWS 없이 그대로 실행할 수 있습니다.
+
+    Attributes:
+        definitions: 상태 머신 ARN -> 정의
+        results: 실행 ARN -> LocalWorkflowRunner.run 결과 (상태별 소요 시간 포함)
+    """
+
+    exceptions = SimpleNamespace(StateMachineDoesNotExist=StateMachineDoesNotExist)
+
+    def __init__(self, definitions=None, time_scale=0.0):
+        self.definitions = dict(definitions or {})
+        self.time_scale = time_scale
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def register(self, state_machine_arn, definition):
+        """상태 머신 ARN에 정의 등록"""
+        self.definitions[state_machine_arn] = definition
+
+    def _execute(self, state_machine_arn, name, execution_input, kind):
+        definition = self.definitions.get(state_machine_arn)
+        if definition is None:
+            raise StateMachineDoesNotExist(f"State Machine Does Not Exist: '{state_machine_arn}'")
+
+        name = name or uuid.uuid4().hex
+        execution_arn = state_machine_arn.replace(':stateMachine:', f":{kind}:") + f":{name}"
+        start_date = datetime.now(timezone.utc)
+        result = LocalWorkflowRunner(definition, time_scale=self.time_scale).run(json.loads(execution_input or '{}'), name)
+        result.update(executionArn=execution_arn, startDate=start_date, stopDate=datetime.now(timezone.utc))
+        with self._lock:
+            self.results[execution_arn] = result
+        return result
+
+    def _describe(self, result):
+        return {
+            'executionArn': result['executionArn'],
+            'status': result['status'],
+            'output': json.dumps(result['output'], ensure_ascii=False) if result['status'] == 'SUCCEEDED' else None,
+            'error': result['error'],
+            'cause': result['cause'],
+            'startDate': result['startDate'],
+            'stopDate': result['stopDate']
+        }
+
+    def start_execution(self, stateMachineArn, name=None, input='{}', **kwargs):
+        result = self._execute(stateMachineArn, name, input, 'execution')
+        return {'executionArn': result['executionArn'], 'startDate': result['startDate']}
+
+    def describe_execution(self, executionArn):
+        return self._describe(self.results[executionArn])
+
+    def get_execution_history(self, executionArn, **kwargs):
+        """마지막으로 성공한 최상위 상태의 StateExited 이벤트만 반환 (상태 출력 외의 기록은 남기지 않음)"""
+        result = self.results[executionArn]
+        if result['lastStateOutput'] is None:
+            return {'events': []}
+        return {'events': [{
+            'type': 'StateExited',
+            'stateExitedEventDetails': {'output': json.dumps(result['lastStateOutput'], ensure_ascii=False)}
+        }]}
+
+    def start_sync_execution(self, stateMachineArn, input='{}', name=None, **kwargs):
+        result = self._execute(stateMachineArn, name, input, 'express')
+        response = self._describe(result)
+        response['billingDetails'] = {'billedDurationInMilliseconds': int(result['wallTime'] * 1000)}
+        return response
+
+
+# ---------------------------------------------------------------------------
+# 정의 불러오기와 CLI
+# ---------------------------------------------------------------------------
+
+def load_definition(path=DEFINITION_PATH, substitutions=None):
+    """
+    정의 파일을 읽고 ${이름} 자리 표시자를 채움
+
+    Args:
+        path (str): 정의 JSON 파일 경로
+        substitutions (dict, optional): 자리 표시자 이름 -> 값 (기본값: DEFINITION_SUBSTITUTIONS)
+
+    Returns:
+        dict: 상태 머신 정의
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    for name, value in dict(DEFINITION_SUBSTITUTIONS, **(substitutions or {})).items():
+        text = text.replace('${' + name + '}', value)
+    return json.loads(text)
+
+
+def build_definition(workflow, strategies=None, knowledge_base_id=None, model_id=None):
+    """
+    curriculum_workflow의 정의 생성 함수로 로컬 실행용 정의 생성
+
+    Args:
+        workflow (str): 'standard', 'direct', 'batch' 중 하나
+        strategies (dict, optional): direct 워크플로우의 단계별 실행 방식
+        knowledge_base_id (str, optional): Knowledge Base ID
+        model_id (str, optional): direct 워크플로우가 직접 호출할 모델 ID
+
+    Returns:
+        dict: 상태 머신 정의
+    """
+    import curriculum_workflow
+
+    lambda_arns = {name: name for name in DEFAULT_FUNCTIONS}
+    if workflow == 'standard':
+        return curriculum_workflow.build_workflow_definition(
+            lambda_arns, knowledge_base_id, comment="로컬 실행용 커리큘럼 생성 워크플로우"
+        )
+    if workflow == 'batch':
+        return curriculum_workflow.build_batch_definition(lambda_arns, knowledge_base_id)
+    if workflow == 'direct':
+        return curriculum_workflow.build_direct_definition(
+            lambda_arns, knowledge_base_id, strategies,
+            model_id=model_id or curriculum_workflow.BEDROCK_MODEL_ID,
+            region_name='us-west-2'
+        )
+    raise ValueError(f"알 수 없는 워크플로우: {workflow}")
+
+
+def summarize_metrics(records):
+    """
+    Lambda 지표 레코드(EMF)를 함수별로 합산
+
+    Args:
+        records (list): metrics.MemorySink에 모인 레코드
+
+    Returns:
+        dict: 함수 이름 -> {'invocations', 'coldStarts', 지표 이름 -> 합계}
+    """
+    summary = {}
+    for record in records:
+        function = summary.setdefault(record['FunctionName'], {'invocations': 0})
+        function['invocations'] += 1
+        for definition in record['_aws']['CloudWatchMetrics'][0]['Metrics']:
+            name = definition['Name']
+            function[name] = round(function.get(name, 0) + record[name], 1)
+    return summary
+
+
+def print_state_timings(result):
+    """상태별 소요 시간 표 출력"""
+    print(f"\n{'상태':40s} {'유형':9s} {'시간(ms)':>10s} {'시도':>4s}  오류")
+    for record in result['states']:
+        print(f"{record['name'][:40]:40s} {record['type']:9s} {record['durationMs']:10.1f} "
+              f"{record['attempts']:4d}  {record['error'] or ''}")
+    print(f"\n상태: {result['status']}  전체 {result['wallTime']:.3f} s")
+    if result['error']:
+        print(f"오류: {result['error']} - {result['cause']}")
+
+
+def _parse_strategies(text):
+    if not text:
+        return None
+    return dict(item.split('=', 1) for item in text.split(','))
+
+
+def main():
+    import curriculum_workflow
+    from output_keys import build_output_key
+
+    parser = argparse.ArgumentParser(description='Step Functions 정의를 가짜 S3/Bedrock으로 로컬 실행')
+    parser.add_argument('--title-file', default=os.path.join(REPO_ROOT, 'data', 'title-A-20250331.txt'),
+                        help='제목 파일 경로')
+    parser.add_argument('--data-file', default=os.path.join(REPO_ROOT, 'data', 'data-A-20250331.txt'),
+                        help='데이터 파일 경로')
+    parser.add_argument('--definition', help='실행할 정의 JSON 파일 (지정하면 --workflow 무시)')
+    parser.add_argument('--workflow', choices=['standard', 'direct', 'batch'], default='standard',
+                        help='curriculum_workflow로 생성할 정의 종류')
+    parser.add_argument('--strategies', help="direct 워크플로우의 단계별 방식 (예: 'fetch=direct,generate=lambda')")
+    parser.add_argument('--model-id', help='direct 워크플로우가 직접 호출할 모델 ID')
+    parser.add_argument('--s3-latency', type=float, default=0.0, help='가짜 S3 호출당 지연(초)')
+    parser.add_argument('--latency', type=float, default=0.0, help='가짜 모델의 첫 토큰 지연(초)')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='가짜 모델의 출력 토큰 속도')
+    parser.add_argument('--time-scale', type=float, default=0.0, help='Retry/Wait 대기 시간 배율 (0이면 기다리지 않음)')
+    parser.add_argument('--output', help='실행 결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    fakes = install_fakes(args.s3_latency, args.latency, args.tokens_per_second)
+    bucket = curriculum_workflow.BUCKET_NAME
+
+    with open(args.title_file, 'r', encoding='utf-8') as f:
+        title_key = curriculum_workflow.INPUT_PREFIX + os.path.basename(args.title_file)
+        fakes.s3.put_text(bucket, title_key, f.read())
+    with open(args.data_file, 'r', encoding='utf-8') as f:
+        data_key = curriculum_workflow.INPUT_PREFIX + os.path.basename(args.data_file)
+        fakes.s3.put_text(bucket, data_key, f.read())
+
+    if args.definition:
+        definition = load_definition(args.definition)
+    else:
+        definition = build_definition(args.workflow, _parse_strategies(args.strategies), model_id=args.model_id)
+
+    if args.workflow == 'batch' and not args.definition:
+        manifest_key = curriculum_workflow.BATCH_PREFIX + 'local-manifest.json'
+        fakes.s3.put_text(bucket, manifest_key, json.dumps([{'titleKey': title_key, 'dataKey': data_key}]))
+        execution_input = {'bucket': bucket, 'manifestKey': manifest_key, 'correlationId': uuid.uuid4().hex}
+    else:
+        execution_input = {
+            'bucket': bucket,
+            'titleKey': title_key,
+            'dataKey': data_key,
+            'outputKey': build_output_key(title_key),
+            'correlationId': uuid.uuid4().hex
+        }
+
+    import metrics
+
+    sink = metrics.MemorySink()
+    metrics.set_sink(sink)
+    runner = LocalWorkflowRunner(definition, time_scale=args.time_scale)
+    result = runner.run(execution_input)
+    print_state_timings(result)
+
+    print(f"\nLambda 지표 (correlationId {execution_input['correlationId']}):")
+    lambda_metrics = summarize_metrics(sink.records)
+    for function_name, values in lambda_metrics.items():
+        print(f"  {function_name}: " + ', '.join(f"{name}={value}" for name, value in values.items()))
+
+    outputs = {key: fakes.s3.read_text(bucket, key) for (_, key) in fakes.s3.objects
+               if key.startswith(curriculum_workflow.OUTPUT_PREFIX)}
+    for key, text in outputs.items():
+        print(f"\n저장된 커리큘럼: s3://{bucket}/{key} ({len(text.encode('utf-8'))} bytes)")
+        print(text[:300])
+    print(f"\nS3 호출: {fakes.s3.calls}  모델 호출: {fakes.bedrock_runtime.calls}회")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(dict(result, s3Calls=fakes.s3.calls, modelCalls=fakes.bedrock_runtime.calls,
+                           lambdaMetrics=lambda_metrics),
+                      f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,7 +10,6 @@
 
 import os
 import sys
-import boto3
 import json
 import time
 import argparse
@@ -18,14 +17,16 @@ from datetime import datetime
 
 # 현재 디렉토리를 Python 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
 
 # 필요한 모듈 가져오기
-from lambda_functions.lambda_make import LambdaFunctionManager, add_bedrock_permissions_to_role
-from create_bedrock_role import create_bedrock_role_functions, create_step_function_role
-from curriculum_workflow import create_step_function, execute_workflow
-
-# AWS 서비스 클라이언트 초기화
-s3_client = boto3.client('s3')
+from aws_clients import get_client  # noqa: E402
+from lambda_functions.lambda_make import LambdaFunctionManager, add_bedrock_permissions_to_role  # noqa: E402
+from create_bedrock_role import create_bedrock_role_functions, create_step_function_role  # noqa: E402
+from curriculum_workflow import create_step_function, execute_workflow  # noqa: E402
 
 # 환경 설정
 BUCKET_NAME = 'curriculum-bucket-20250331'
@@ -37,12 +38,12 @@ def setup_s3_bucket():
     """S3 버킷 생성 및 설정"""
     try:
         # 버킷이 이미 존재하는지 확인
-        s3_client.head_bucket(Bucket=BUCKET_NAME)
+        get_client('s3').head_bucket(Bucket=BUCKET_NAME)
         print(f"S3 버킷 '{BUCKET_NAME}'이(가) 이미 존재합니다.")
     except Exception:
         # 버킷 생성
         print(f"S3 버킷 '{BUCKET_NAME}' 생성 중...")
-        s3_client.create_bucket(
+        get_client('s3').create_bucket(
             Bucket=BUCKET_NAME,
             CreateBucketConfiguration={'LocationConstraint': 'us-west-2'}
         )
@@ -60,7 +61,7 @@ def upload_sample_files(title, data):
     
     # 파일 업로드
     print(f"제목 파일 '{title_key}' 업로드 중...")
-    s3_client.put_object(
+    get_client('s3').put_object(
         Bucket=BUCKET_NAME,
         Key=title_key,
         Body=title.encode('utf-8'),
@@ -68,7 +69,7 @@ def upload_sample_files(title, data):
     )
     
     print(f"데이터 파일 '{data_key}' 업로드 중...")
-    s3_client.put_object(
+    get_client('s3').put_object(
         Bucket=BUCKET_NAME,
         Key=data_key,
         Body=data.encode('utf-8'),
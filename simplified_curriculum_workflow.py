@@ -8,21 +8,28 @@
 
 import os
 import sys
-import boto3
 import json
-import time
+import uuid
 import argparse
 from datetime import datetime
 
-# AWS 서비스 클라이언트 초기화
-s3_client = boto3.client('s3')
-sfn_client = boto3.client('stepfunctions')
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+import cost_ledger  # noqa: E402
+from aws_clients import get_client  # noqa: E402
+from execution_waiter import wait_for_execution, run_sync_execution  # noqa: E402
+from output_keys import build_output_key  # noqa: E402
 
 # 환경 설정
 BUCKET_NAME = 'curriculum-bucket-20250331'
 INPUT_PREFIX = 'input/'
 OUTPUT_PREFIX = 'curriculum/'
 DEFAULT_STATE_MACHINE_ARN = "arn:aws:states:us-west-2:211125752707:stateMachine:CurriculumGenerator-미술-20250401"
+DEFAULT_EXPRESS_STATE_MACHINE_ARN = DEFAULT_STATE_MACHINE_ARN + "-Express"  # create_step_function(workflow_type='EXPRESS')로 생성
+DEFAULT_MODEL_ID = 'anthropic.claude-3-sonnet-20240229-v1:0'
 
 def upload_input_files(title, data):
     """입력 파일 업로드"""
@@ -34,7 +41,7 @@ def upload_input_files(title, data):
     
     # 파일 업로드
     print(f"제목 파일 '{title_key}' 업로드 중...")
-    s3_client.put_object(
+    get_client('s3').put_object(
         Bucket=BUCKET_NAME,
         Key=title_key,
         Body=title.encode('utf-8'),
@@ -42,7 +49,7 @@ def upload_input_files(title, data):
     )
     
     print(f"데이터 파일 '{data_key}' 업로드 중...")
-    s3_client.put_object(
+    get_client('s3').put_object(
         Bucket=BUCKET_NAME,
         Key=data_key,
         Body=data.encode('utf-8'),
@@ -51,8 +58,34 @@ def upload_input_files(title, data):
     
     return title_key, data_key
 
-def execute_workflow(title_key, data_key, state_machine_arn=DEFAULT_STATE_MACHINE_ARN):
-    """워크플로우 실행"""
+def curriculum_from_output(output):
+    """
+    실행 출력에서 커리큘럼 본문 찾기
+    
+    생성 단계 결과에 본문(curriculum)이나 인라인 참조(curriculumRef.inline)가 있으면 그대로 사용하고,
+    없으면 저장된 출력 파일(saveResult.Payload.outputKey)을 S3에서 읽습니다.
+    
+    Returns:
+        str: 커리큘럼 본문 (찾지 못하면 None)
+    """
+    generated = output.get('generateResult', {}).get('Payload', {})
+    if generated.get('curriculum'):
+        return generated['curriculum']
+    if (generated.get('curriculumRef') or {}).get('inline'):
+        return generated['curriculumRef']['inline']
+    
+    output_key = output.get('saveResult', {}).get('Payload', {}).get('outputKey')
+    if not output_key:
+        return None
+    response = get_client('s3').get_object(Bucket=BUCKET_NAME, Key=output_key)
+    return response['Body'].read().decode('utf-8')
+
+def execute_workflow(title_key, data_key, state_machine_arn=DEFAULT_STATE_MACHINE_ARN, sync=False):
+    """
+    워크플로우 실행
+    
+    sync가 True이면 EXPRESS 상태 머신을 start_sync_execution으로 실행해 폴링 없이 응답으로 커리큘럼을 받습니다.
+    """
     # 실행 이름 생성
     execution_name = f"Execution-{datetime.now().strftime('%Y%m%d%H%M%S')}"
     
@@ -60,64 +93,110 @@ def execute_workflow(title_key, data_key, state_machine_arn=DEFAULT_STATE_MACHIN
     input_data = {
         "titleKey": title_key,
         "dataKey": data_key,
-        "bucket": BUCKET_NAME
+        "bucket": BUCKET_NAME,
+        "outputKey": build_output_key(title_key),  # 직접 통합 저장 단계(aws-sdk:s3:putObject)가 사용
+        "correlationId": uuid.uuid4().hex  # 모든 Lambda의 지표 레코드에 기록되는 상관관계 ID
     }
     
     # Step Function 실행
-    print(f"Step Function '{state_machine_arn}' 실행 중...")
-    response = sfn_client.start_execution(
-        stateMachineArn=state_machine_arn,
-        name=execution_name,
-        input=json.dumps(input_data)
-    )
-    
-    execution_arn = response['executionArn']
-    print(f"실행 ARN: {execution_arn}")
-    
-    # 실행 상태 확인
-    print("실행 상태 확인 중...")
-    while True:
-        execution = sfn_client.describe_execution(executionArn=execution_arn)
-        status = execution['status']
-        
-        print(f"현재 상태: {status}")
+    if sync:
+        print(f"Step Function '{state_machine_arn}' 동기 실행 중...")
+        execution = run_sync_execution(get_client('stepfunctions'), state_machine_arn, input_data, execution_name)
+        execution_arn = execution['executionArn']
+        print(f"실행 ARN: {execution_arn}")
+    else:
+        print(f"Step Function '{state_machine_arn}' 실행 중...")
+        response = get_client('stepfunctions').start_execution(
+            stateMachineArn=state_machine_arn,
+            name=execution_name,
+            input=json.dumps(input_data)
+        )
         
-        if status in ['SUCCEEDED', 'FAILED', 'TIMED_OUT', 'ABORTED']:
-            break
+        execution_arn = response['executionArn']
+        print(f"실행 ARN: {execution_arn}")
         
-        time.sleep(5)
+        # 실행 상태 확인
+        print("실행 상태 확인 중...")
+        execution = wait_for_execution(get_client('stepfunctions'), execution_arn)
+    status = execution['status']
     
     # 실행 결과 확인
     if status == 'SUCCEEDED':
-        print("워크플로우 실행 성공!")
+        print(f"워크플로우 실행 성공! (소요 시간: {execution['wallTime']:.1f}초)")
         
         # 출력 확인
         output = json.loads(execution['output'])
-        if 'saveResult' in output and 'Payload' in output['saveResult']:
-            result = output['saveResult']['Payload']
-            if 'outputKey' in result:
-                output_key = result['outputKey']
-                print(f"생성된 커리큘럼: s3://{BUCKET_NAME}/{output_key}")
-                
-                # 커리큘럼 내용 가져오기
-                try:
-                    response = s3_client.get_object(Bucket=BUCKET_NAME, Key=output_key)
-                    curriculum = response['Body'].read().decode('utf-8')
-                    print("\n=== 생성된 커리큘럼 ===\n")
-                    print(curriculum)
-                except Exception as e:
-                    print(f"커리큘럼 내용 가져오기 실패: {str(e)}")
+        cost_ledger.record_execution(execution_arn, title_key, output, execution['wallTime'], input_data['correlationId'])
+        output_key = output.get('saveResult', {}).get('Payload', {}).get('outputKey')
+        if output_key:
+            print(f"생성된 커리큘럼: s3://{BUCKET_NAME}/{output_key}")
+        
+        # 커리큘럼 내용 가져오기 (동기 실행은 대부분 응답에 본문이 포함되어 S3를 읽지 않음)
+        try:
+            curriculum = curriculum_from_output(output)
+            if curriculum:
+                print("\n=== 생성된 커리큘럼 ===\n")
+                print(curriculum)
+        except Exception as e:
+            print(f"커리큘럼 내용 가져오기 실패: {str(e)}")
     else:
         print(f"워크플로우 실행 실패: {status}")
-        if 'error' in execution:
+        if execution.get('error'):
             print(f"오류: {execution['error']}")
-        if 'cause' in execution:
+        if execution.get('cause'):
             print(f"원인: {execution['cause']}")
+        
+        # 실패/시간 초과/중단된 실행도 마지막으로 성공한 상태까지 쓴 토큰을 장부에 기록
+        cost_ledger.record_execution(execution_arn, title_key, None, execution['wallTime'],
+                                     input_data['correlationId'], status=status,
+                                     calls=cost_ledger.usage_from_history(execution_arn))
     
     return execution_arn
 
-def run_workflow(title, data, state_machine_arn=DEFAULT_STATE_MACHINE_ARN):
-    """워크플로우 실행"""
+def stream_workflow(title, data, model_id=DEFAULT_MODEL_ID, output_file=None):
+    """
+    Step Function을 거치지 않고 Bedrock 응답을 스트리밍하여 생성되는 대로 출력
+    
+    생성된 텍스트는 표준 출력과 S3(curriculum/)에 동시에 기록되며,
+    output_file을 지정하면 로컬 파일에도 저장합니다.
+    
+    Returns:
+        str: 저장된 커리큘럼의 S3 키 (실패 시 None)
+    """
+    import streaming
+    from generate_curriculum_kb import generate_without_kb_stream
+    
+    print("=== 스트리밍 커리큘럼 생성 시작 ===")
+    
+    try:
+        # 1. 입력 파일 업로드
+        print("\n1. 입력 파일 업로드 중...")
+        title_key, data_key = upload_input_files(title, data)
+        
+        # 2. 생성 결과를 스트리밍으로 출력 및 저장
+        output_key = build_output_key(title_key)
+        print(f"\n2. 커리큘럼 생성 중... (저장 위치: s3://{BUCKET_NAME}/{output_key})\n")
+        
+        sinks = [streaming.StdoutSink(), streaming.S3MultipartSink(get_client('s3'), BUCKET_NAME, output_key)]
+        if output_file:
+            sinks.append(streaming.FileSink(output_file))
+        
+        generate_without_kb_stream(title, data, model_id, sinks)
+        
+        print(f"\n생성된 커리큘럼: s3://{BUCKET_NAME}/{output_key}")
+        print("\n=== 스트리밍 커리큘럼 생성 완료 ===")
+        
+        return output_key
+    
+    except Exception as e:
+        print(f"\n오류 발생: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        print("\n=== 스트리밍 커리큘럼 생성 실패 ===")
+        return None
+
+def run_workflow(title, data, state_machine_arn=DEFAULT_STATE_MACHINE_ARN, sync=False):
+    """워크플로우 실행 (sync가 True이면 EXPRESS 상태 머신을 동기 실행)"""
     print("=== 간소화된 커리큘럼 생성 워크플로우 시작 ===")
     
     try:
@@ -127,7 +206,7 @@ def run_workflow(title, data, state_machine_arn=DEFAULT_STATE_MACHINE_ARN):
         
         # 2. 워크플로우 실행
         print("\n2. 워크플로우 실행 중...")
-        execution_arn = execute_workflow(title_key, data_key, state_machine_arn)
+        execution_arn = execute_workflow(title_key, data_key, state_machine_arn, sync)
         
         print("\n=== 간소화된 커리큘럼 생성 워크플로우 완료 ===")
         
@@ -145,11 +224,19 @@ def main():
     parser = argparse.ArgumentParser(description='간소화된 커리큘럼 생성 워크플로우')
     parser.add_argument('--title', '-t', required=True, help='커리큘럼 제목')
     parser.add_argument('--data', '-d', required=True, help='커리큘럼 데이터')
-    parser.add_argument('--state-machine', '-s', default=DEFAULT_STATE_MACHINE_ARN, help='Step Function ARN')
+    parser.add_argument('--state-machine', '-s', help='Step Function ARN (기본값: --sync이면 EXPRESS, 아니면 STANDARD 상태 머신)')
+    parser.add_argument('--sync', action='store_true', help='EXPRESS 상태 머신을 동기 실행하여 응답으로 커리큘럼 수신')
+    parser.add_argument('--stream', action='store_true', help='Step Function 대신 Bedrock 응답을 스트리밍하여 바로 출력')
+    parser.add_argument('--model', '-m', default=DEFAULT_MODEL_ID, help='스트리밍 모드에서 사용할 모델 ID')
+    parser.add_argument('--output', '-o', help='스트리밍 모드에서 결과를 함께 저장할 로컬 파일 경로')
     
     args = parser.parse_args()
     
-    run_workflow(args.title, args.data, args.state_machine)
+    if args.stream:
+        stream_workflow(args.title, args.data, args.model, args.output)
+    else:
+        state_machine_arn = args.state_machine or (DEFAULT_EXPRESS_STATE_MACHINE_ARN if args.sync else DEFAULT_STATE_MACHINE_ARN)
+        run_workflow(args.title, args.data, state_machine_arn, args.sync)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
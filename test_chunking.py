@@ -0,0 +1,81 @@
+import threading
+
+import chunking
+
+
+def _section(number, body_chars):
+    return f"{number}. 섹션 {number}\n" + '가' * body_chars
+
+
+def test_estimate_tokens_counts_korean_per_character():
+    assert chunking.estimate_tokens('') == 0
+    assert chunking.estimate_tokens('천문학') == 3
+    assert chunking.estimate_tokens('abcdefgh') == 2
+    assert chunking.estimate_tokens('별 star') == 1 + 2
+
+
+def test_split_sections_on_headings():
+    text = "머리말\n1. 역사\n내용\n1.1 정의\n내용\n2. 응용"
+
+    assert chunking.split_sections(text) == ['머리말', '1. 역사\n내용', '1.1 정의\n내용', '2. 응용']
+
+
+def test_build_chunks_respects_budget_and_overlaps():
+    text = '\n'.join(_section(i, 40) for i in range(1, 7))
+
+    chunks = chunking.build_chunks(text, chunk_tokens=100, overlap_tokens=10)
+
+    assert len(chunks) == 3
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # 앞 청크의 끝부분이 다음 청크 앞에 붙음
+        assert chunk.startswith(previous[-10:])
+    # 겹친 부분을 빼면 예산 안에 들어옴
+    assert chunking.estimate_tokens(chunks[0]) <= 100
+    assert all(chunking.estimate_tokens(chunk) <= 100 + 10 + 2 for chunk in chunks[1:])
+    # 모든 섹션이 어느 청크에든 포함됨
+    assert all(any(f"{i}. 섹션 {i}" in chunk for chunk in chunks) for i in range(1, 7))
+
+
+def test_oversized_section_is_split_by_characters():
+    chunks = chunking.build_chunks(_section(1, 250), chunk_tokens=100, overlap_tokens=0)
+
+    assert len(chunks) == 3
+    assert all(chunking.estimate_tokens(chunk) <= 100 for chunk in chunks)
+    assert ''.join(chunks).count('가') == 250
+
+
+def test_map_outlines_generates_one_outline_per_chunk():
+    text = '\n'.join(_section(i, 40) for i in range(1, 7))
+    options = dict(chunking.DEFAULT_CHUNK_OPTIONS, chunkTokens=100, chunkOverlapTokens=0, fanOut=2)
+    prompts = []
+    lock = threading.Lock()
+
+    def generate(prompt):
+        with lock:
+            prompts.append(prompt)
+        return '개요'
+
+    outlines = chunking.map_outlines('천문학', text, generate, options)
+
+    assert outlines == ['개요'] * 3
+    assert sorted(prompt.split('(')[1].split(')')[0] for prompt in prompts) == ['1/3', '2/3', '3/3']
+
+
+def test_map_outlines_summarizes_again_when_outlines_exceed_budget():
+    text = '\n'.join(_section(i, 40) for i in range(1, 7))
+    options = dict(chunking.DEFAULT_CHUNK_OPTIONS, chunkTokens=100, chunkOverlapTokens=0, fanOut=1)
+    budget_without_outlines = chunking.estimate_tokens(chunking.build_reduce_prompt('천문학', []))
+    options['tokenBudget'] = budget_without_outlines + 60
+    rounds = []
+
+    def generate(prompt):
+        rounds.append(prompt.split('(')[1].split(')')[0])
+        # 첫 단계 개요는 길고, 다시 요약한 개요는 짧음
+        return '나' * 30 if prompt.count('가') else '요약'
+
+    outlines = chunking.map_outlines('천문학', text, generate, options)
+
+    # 세 개요(각 30토큰)를 다시 청크 하나로 묶어 한 번 더 요약
+    assert rounds == ['1/3', '2/3', '3/3', '1/1']
+    assert outlines == ['요약']
+    assert chunking.estimate_tokens(chunking.build_reduce_prompt('천문학', outlines)) <= options['tokenBudget']
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import cost_ledger
+from local_runner import LocalStepFunctions
+
+STATE_MACHINE_ARN = 'arn:aws:states:us-west-2:000000000000:stateMachine:test'
+SONNET = 'anthropic.claude-3-7-sonnet-20250219-v1:0'
+USAGE = {'calls': [{'modelId': SONNET, 'inputTokens': 1000, 'outputTokens': 2000, 'latencyMs': 4000}]}
+
+
+def test_estimate_cost_prices_cache_tokens_separately():
+    price = cost_ledger.MODEL_PRICING[SONNET]
+
+    cost = cost_ledger.estimate_cost(SONNET, 1000, 2000, cache_read_tokens=10000, cache_write_tokens=2000)
+
+    assert cost == pytest.approx(price['input'] + 2 * price['output']
+                                 + 10 * price['cacheRead'] + 2 * price['cacheWrite'])
+
+
+def test_estimate_cost_uses_input_price_without_cache_prices():
+    model_id = 'amazon.titan-text-express-v1'
+    price = cost_ledger.MODEL_PRICING[model_id]
+
+    assert cost_ledger.estimate_cost(model_id, 0, 0, cache_read_tokens=1000) == pytest.approx(price['input'])
+
+
+def test_estimate_cost_resolves_inference_profiles():
+    assert cost_ledger.estimate_cost('us.' + SONNET, 1000, 0) == pytest.approx(cost_ledger.MODEL_PRICING[SONNET]['input'])
+    assert cost_ledger.estimate_cost('unknown.model-v1', 1000, 0) is None
+    assert cost_ledger.estimate_cost(SONNET, None, 0) is None
+
+
+def test_ledger_entry_totals_and_subject():
+    calls = [dict(USAGE['calls'][0], cacheReadInputTokens=500), {'modelId': 'unknown.model-v1', 'inputTokens': 10,
+                                                                 'outputTokens': 10}]
+
+    entry = cost_ledger.build_ledger_entry('arn:exec:Execution-A', 'input/title-미술-20250401.txt', calls,
+                                           now=datetime(2025, 4, 1, tzinfo=timezone.utc))
+
+    assert entry['subject'] == '미술'
+    assert entry['day'] == '2025-04-01'
+    assert (entry['inputTokens'], entry['outputTokens'], entry['cacheReadInputTokens']) == (1010, 2010, 500)
+    assert entry['unpricedCalls'] == 1
+    assert entry['cost'] == entry['calls'][0]['cost']
+
+
+def test_usage_from_output_supports_every_workflow_shape():
+    assert cost_ledger.usage_from_output({'generateResult': {'Payload': {'usage': USAGE}}}) == USAGE['calls']
+    assert cost_ledger.usage_from_output({'generated': {'usage': USAGE['calls'][0]}}) == USAGE['calls']
+    assert cost_ledger.usage_from_output({'usage': USAGE}) == USAGE['calls']
+    assert cost_ledger.usage_from_output(None) == []
+
+
+def test_failed_execution_usage_comes_from_last_successful_state():
+    sfn = LocalStepFunctions({STATE_MACHINE_ARN: {
+        'StartAt': 'GenerateCurriculum',
+        'States': {
+            'GenerateCurriculum': {'Type': 'Pass', 'Result': {'Payload': {'usage': USAGE}},
+                                   'ResultPath': '$.generateResult', 'Next': 'SaveCurriculum'},
+            'SaveCurriculum': {'Type': 'Fail', 'Error': 'S3.AccessDenied', 'Cause': 'denied'}
+        }
+    }})
+    execution_arn = sfn.start_execution(stateMachineArn=STATE_MACHINE_ARN, name='Execution-A',
+                                        input=json.dumps({'titleKey': 'input/title-A.txt'}))['executionArn']
+    assert sfn.describe_execution(executionArn=execution_arn)['status'] == 'FAILED'
+
+    calls = cost_ledger.usage_from_history(execution_arn, sfn)
+    entry = cost_ledger.build_ledger_entry(execution_arn, 'input/title-A.txt', calls, status='FAILED')
+
+    assert calls == USAGE['calls']
+    assert entry['status'] == 'FAILED'
+    assert entry['cost'] > 0
+
+
+def test_usage_from_history_without_history_is_empty():
+    class NoHistory:
+        def get_execution_history(self, **kwargs):
+            raise RuntimeError('express executions have no history')
+
+    assert cost_ledger.usage_from_history('arn:express:Execution-A', NoHistory()) == []
+
+
+def test_summarize_groups_by_model():
+    entries = [
+        cost_ledger.build_ledger_entry(f'arn:exec:{name}', f'input/title-{name}.txt', USAGE['calls'])
+        for name in ('A', 'B')
+    ]
+
+    rows = cost_ledger.summarize(entries, by='model')
+
+    assert len(rows) == 1
+    assert rows[0]['key'] == SONNET
+    assert rows[0]['executions'] == 2
+    assert rows[0]['outputTokens'] == 4000
+    assert rows[0]['outputTokensPerSecond'] == 500.0
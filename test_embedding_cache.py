@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+import embedding_cache
+from embedding_cache import CachedEmbedder, EmbeddingCache, text_hash
+
+DIMENSIONS = 8
+
+
+class CountingEmbedder:
+    """텍스트 길이로 벡터를 만드는 가짜 임베더 (넘겨받은 텍스트 기록)"""
+
+    name = 'counting'
+    model_id = 'counting-v1'
+    dimensions = DIMENSIONS
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return np.asarray([[len(text) / (i + 1) for i in range(DIMENSIONS)] for text in texts], dtype=np.float32)
+
+    def config(self):
+        return {'embedder': self.name}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache('model/v1', DIMENSIONS, str(tmp_path))
+
+
+def test_text_hash_ignores_whitespace_differences():
+    assert text_hash('천문학  입문\n') == text_hash('천문학 입문')
+    assert text_hash('천문학 입문') != text_hash('천문학')
+
+
+def test_float16_round_trip_across_reopen(cache, tmp_path):
+    vector = np.linspace(-1, 1, DIMENSIONS, dtype=np.float32)
+    cache.put_many([text_hash('a')], [vector])
+
+    reopened = EmbeddingCache('model/v1', DIMENSIONS, str(tmp_path))
+    [restored] = reopened.get_many([text_hash('a')])
+
+    assert len(reopened) == 1
+    assert restored.dtype == np.float32
+    np.testing.assert_allclose(restored, vector, atol=1e-3)
+
+
+def test_put_many_skips_existing_entries(cache):
+    digest = text_hash('a')
+
+    assert cache.put_many([digest, digest], [np.ones(DIMENSIONS), np.ones(DIMENSIONS)]) == 1
+    assert cache.put_many([digest], [np.zeros(DIMENSIONS)]) == 0
+    np.testing.assert_array_equal(cache.get_many([digest])[0], np.ones(DIMENSIONS))
+
+
+def test_truncated_tail_is_ignored_and_appends_realign(cache, tmp_path):
+    cache.put_many([text_hash('a')], [np.ones(DIMENSIONS)])
+    # 벡터 행을 쓰다가 중단된 상황 (색인 레코드 없이 행 일부만 기록)
+    with open(cache.vectors_path, 'ab') as f:
+        f.write(b'\x01' * 5)
+
+    reopened = EmbeddingCache('model/v1', DIMENSIONS, str(tmp_path))
+    reopened.put_many([text_hash('b')], [np.full(DIMENSIONS, 2.0)])
+
+    a, b = reopened.get_many([text_hash('a'), text_hash('b')])
+    np.testing.assert_array_equal(a, np.ones(DIMENSIONS))
+    np.testing.assert_array_equal(b, np.full(DIMENSIONS, 2.0))
+
+
+def test_index_pointing_past_vector_file_is_ignored(cache, tmp_path):
+    cache.put_many([text_hash('a'), text_hash('b')], [np.ones(DIMENSIONS), np.ones(DIMENSIONS)])
+    with open(cache.vectors_path, 'r+b') as f:
+        f.truncate(cache.row_bytes)
+
+    reopened = EmbeddingCache('model/v1', DIMENSIONS, str(tmp_path))
+
+    assert len(reopened) == 1
+    assert reopened.get_many([text_hash('b')]) == [None]
+
+
+def test_stale_row_is_treated_as_miss(cache):
+    cache.put_many([text_hash('a'), text_hash('b')], [np.ones(DIMENSIONS), np.full(DIMENSIONS, 2.0)])
+    # 다른 벡터 파일과 짝이 된 색인처럼 'a'의 레코드가 'b'의 행을 가리킴
+    cache._offsets[text_hash('a')] = cache.row_bytes
+
+    a, b = cache.get_many([text_hash('a'), text_hash('b')])
+
+    assert a is None
+    np.testing.assert_array_equal(b, np.full(DIMENSIONS, 2.0))
+    assert text_hash('a') not in cache._offsets
+
+
+def test_cached_embedder_embeds_each_missing_text_once(cache):
+    embedder = CountingEmbedder()
+    cached = CachedEmbedder(embedder, cache)
+
+    first = cached.embed(['별', '행성', '별'])
+    second = cached.embed(['행성', '은하'])
+
+    assert embedder.calls == [['별', '행성'], ['은하']]
+    np.testing.assert_allclose(first[1], second[0], atol=1e-3)
+    # 한 번에 넘긴 같은 텍스트는 둘 다 실패로 세고 임베딩만 한 번 함
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_create_cache_none_backend_returns_embedder_unchanged(tmp_path):
+    embedder = CountingEmbedder()
+
+    assert embedding_cache.cached(embedder, 'none', str(tmp_path)) is embedder
+    assert isinstance(embedding_cache.cached(embedder, 'disk', str(tmp_path)), CachedEmbedder)
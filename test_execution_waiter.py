@@ -0,0 +1,182 @@
+import json
+
+import execution_waiter
+from execution_waiter import ExecutionWaiter, SqsNotificationSource
+
+def execution_arn(name):
+    return f"arn:aws:states:us-west-2:123456789012:execution:Curriculum:{name}"
+
+
+class FakeClock:
+    """주입용 시계 (sleep을 호출한 만큼만 시간이 흐름)"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeSfn:
+    """
+    describe_execution/list_executions만 구현한 가짜 Step Functions 클라이언트
+
+    finish_at: 실행 ARN -> 완료되는 시계 시각 (그 전에는 RUNNING)
+    """
+
+    def __init__(self, clock, finish_at, status='SUCCEEDED'):
+        self.clock = clock
+        self.finish_at = finish_at
+        self.status = status
+        self.describe_calls = []
+        self.list_calls = 0
+
+    def _status(self, arn):
+        return self.status if self.clock() >= self.finish_at[arn] else 'RUNNING'
+
+    def describe_execution(self, executionArn):
+        self.describe_calls.append(executionArn)
+        status = self._status(executionArn)
+        execution = {'executionArn': executionArn, 'status': status}
+        if status != 'RUNNING':
+            execution['output'] = json.dumps({'arn': executionArn})
+        return execution
+
+    def get_paginator(self, operation):
+        assert operation == 'list_executions'
+        return self
+
+    def paginate(self, stateMachineArn, statusFilter):
+        assert statusFilter == 'RUNNING'
+        self.list_calls += 1
+        running = [{'executionArn': arn} for arn in self.finish_at
+                   if execution_waiter.state_machine_arn_from_execution(arn) == stateMachineArn
+                   and self._status(arn) == 'RUNNING']
+        yield {'executions': running}
+
+
+class FakeSqs:
+    """receive_message/delete_message만 구현한 가짜 SQS 클라이언트"""
+
+    def __init__(self, events):
+        self.messages = [
+            {'ReceiptHandle': f"handle-{index}", 'Body': json.dumps({'detail': detail})}
+            for index, detail in enumerate(events)
+        ]
+        self.deleted = []
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds):
+        visible = [message for message in self.messages if message['ReceiptHandle'] not in self.deleted]
+        return {'Messages': visible[:MaxNumberOfMessages]}
+
+    def delete_message(self, QueueUrl, ReceiptHandle):
+        self.deleted.append(ReceiptHandle)
+
+
+def make_waiter(sfn, clock, **kwargs):
+    return ExecutionWaiter(sfn, sleep=clock.sleep, clock=clock, **kwargs)
+
+
+def test_single_execution_polls_until_terminal_with_backoff():
+    clock = FakeClock()
+    arn = execution_arn('single')
+    sfn = FakeSfn(clock, {arn: 5.0})
+    waiter = make_waiter(sfn, clock, min_interval=0.5, max_interval=2.0)
+
+    result = waiter.wait([arn])[arn]
+
+    assert result['status'] == 'SUCCEEDED'
+    assert json.loads(result['output']) == {'arn': arn}
+    assert result['wallTime'] == clock.now
+    assert clock.now >= 5.0
+    assert all(0.5 <= seconds <= 2.0 for seconds in clock.sleeps)
+    # 실행이 하나면 목록 조회 없이 describe_execution만 호출
+    assert sfn.list_calls == 0
+    assert len(sfn.describe_calls) == len(clock.sleeps) + 1
+
+
+def test_multiple_executions_share_one_listing_per_poll():
+    clock = FakeClock()
+    arns = [execution_arn(f"batch-{index}") for index in range(5)]
+    sfn = FakeSfn(clock, {arn: 1.0 + index for index, arn in enumerate(arns)})
+    waiter = make_waiter(sfn, clock, min_interval=0.5, max_interval=1.0)
+    completed = []
+
+    results = waiter.wait(arns, on_complete=lambda result: completed.append(result['executionArn']))
+
+    assert set(results) == set(arns)
+    assert completed == arns
+    # 실행 중인 실행은 목록으로 걸러지므로 describe_execution은 완료된 실행마다 한 번
+    # (하나만 남으면 목록 없이 직접 조회)
+    assert [sfn.describe_calls.count(arn) for arn in arns[:-1]] == [1] * (len(arns) - 1)
+    assert sfn.list_calls >= 1
+    assert all(waiter.wall_time(arn) >= 1.0 + index for index, arn in enumerate(arns))
+
+
+def test_timeout_returns_only_finished_executions():
+    clock = FakeClock()
+    done, slow = execution_arn('done'), execution_arn('slow')
+    sfn = FakeSfn(clock, {done: 0.0, slow: 1000.0})
+    waiter = make_waiter(sfn, clock, min_interval=1.0, max_interval=4.0)
+
+    results = waiter.wait([done, slow], timeout=30.0)
+
+    assert list(results) == [done]
+    assert 30.0 <= clock.now < 40.0
+    assert waiter.wall_time(slow) is None
+
+
+def test_notify_completes_without_polling():
+    clock = FakeClock()
+    arn = execution_arn('callback')
+    sfn = FakeSfn(clock, {arn: float('inf')})
+    waiter = make_waiter(sfn, clock)
+    waiter.track(arn)
+    waiter.notify(arn, 'FAILED', error='States.TaskFailed', cause='boom')
+
+    result = waiter.wait()[arn]
+
+    assert result['status'] == 'FAILED'
+    assert result['cause'] == 'boom'
+    assert sfn.describe_calls == []
+    assert clock.sleeps == []
+
+
+def test_sqs_source_leaves_untracked_messages_on_queue():
+    clock = FakeClock()
+    mine, other = execution_arn('mine'), execution_arn('other')
+    sqs = FakeSqs([
+        {'executionArn': other, 'status': 'SUCCEEDED', 'output': '{}'},
+        {'executionArn': mine, 'status': 'SUCCEEDED', 'output': '{"ok": true}'},
+    ])
+    sfn = FakeSfn(clock, {mine: float('inf'), other: float('inf')})
+    waiter = make_waiter(sfn, clock, notification_source=SqsNotificationSource(sqs, 'queue-url'))
+    waiter.track(mine)
+
+    # 첫 확인은 폴링(아직 RUNNING), 이후 알림으로 완료
+    result = waiter.wait()[mine]
+
+    assert result['output'] == '{"ok": true}'
+    assert sqs.deleted == ['handle-1']
+    assert sfn.describe_calls == [mine]
+
+
+def test_sqs_notification_without_output_is_described():
+    clock = FakeClock()
+    arn = execution_arn('large-output')
+    sqs = FakeSqs([{'executionArn': arn, 'status': 'SUCCEEDED'}])
+    sfn = FakeSfn(clock, {arn: 0.0})
+    source = SqsNotificationSource(sqs, 'queue-url')
+    waiter = make_waiter(sfn, clock, notification_source=source)
+    waiter._notified.extend(source.poll(0, [arn]))
+    waiter.track(arn)
+
+    result = waiter.wait()[arn]
+
+    assert json.loads(result['output']) == {'arn': arn}
+    assert sfn.describe_calls == [arn]
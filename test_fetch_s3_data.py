@@ -0,0 +1,103 @@
+import io
+
+import pytest
+
+import aws_clients
+import claim_check
+import fetch_s3_data
+from fetch_s3_data import PayloadTooLargeError
+from local_runner import FakeS3
+
+BUCKET = 'test-bucket'
+
+
+class StreamingOnlyS3:
+    """ContentLength 없이 본문 스트림만 돌려주는 가짜 S3 클라이언트 (크기를 읽으면서 확인해야 하는 경우)"""
+
+    def __init__(self, body):
+        self.body = body
+
+    def get_object(self, **kwargs):
+        return {'Body': io.BytesIO(self.body)}
+
+
+@pytest.fixture
+def s3():
+    fake = FakeS3()
+    aws_clients.set_client('s3', fake)
+    yield fake
+    aws_clients.reset_clients()
+
+
+def test_object_larger_than_budget_is_rejected_before_reading(s3):
+    s3.put_object(Bucket=BUCKET, Key='input/data-A.txt', Body='가' * 100)
+
+    with pytest.raises(PayloadTooLargeError) as excinfo:
+        fetch_s3_data.read_text(BUCKET, 'input/data-A.txt', max_bytes=299)
+    assert (excinfo.value.size, excinfo.value.limit) == (300, 299)
+
+    text, stats = fetch_s3_data.read_text(BUCKET, 'input/data-A.txt', max_bytes=300)
+    assert text == '가' * 100
+    assert stats['bytes'] == 300 and not stats['truncated']
+
+
+def test_budget_is_enforced_while_streaming(monkeypatch):
+    monkeypatch.setattr(fetch_s3_data, 'READ_CHUNK_BYTES', 10)
+
+    with pytest.raises(PayloadTooLargeError):
+        fetch_s3_data.read_text(BUCKET, 'key', max_bytes=25, s3_client=StreamingOnlyS3(b'x' * 26))
+    text, _ = fetch_s3_data.read_text(BUCKET, 'key', max_bytes=25, s3_client=StreamingOnlyS3(b'x' * 25))
+    assert text == 'x' * 25
+
+
+def test_preview_drops_incomplete_multibyte_character(s3):
+    s3.put_object(Bucket=BUCKET, Key='input/data-A.txt', Body='천문학 입문')
+
+    text, stats = fetch_s3_data.read_text(BUCKET, 'input/data-A.txt', preview_bytes=8)
+
+    # 8바이트는 세 번째 글자 중간에서 잘리므로 두 글자만 남음
+    assert text == '천문'
+    assert stats['bytes'] == 8
+    assert stats['contentLength'] == len('천문학 입문'.encode('utf-8'))
+    assert stats['truncated']
+
+
+def test_preview_of_empty_object_reads_without_range(s3):
+    s3.put_object(Bucket=BUCKET, Key='input/data-empty.txt', Body=b'')
+
+    text, stats = fetch_s3_data.read_text(BUCKET, 'input/data-empty.txt', preview_bytes=1024)
+
+    assert text == ''
+    assert not stats['truncated']
+
+
+def test_handler_rejects_oversized_object_with_claim_check(s3):
+    s3.put_object(Bucket=BUCKET, Key='input/title-A.txt', Body='A')
+    s3.put_object(Bucket=BUCKET, Key='input/data-A.txt', Body='x' * 2048)
+    event = {'bucket': BUCKET, 'titleKey': 'input/title-A.txt', 'dataKey': 'input/data-A.txt',
+             'claimCheck': True, 'inlineBytes': 0, 'maxBytes': 1024}
+
+    with pytest.raises(PayloadTooLargeError):
+        fetch_s3_data.lambda_handler(event, None)
+
+
+def test_read_ref_enforces_max_bytes(s3):
+    s3.put_object(Bucket=BUCKET, Key='input/data-A.txt', Body='x' * 2048)
+    ref = claim_check.ref_for_object(BUCKET, 'input/data-A.txt', inline_bytes=0)
+
+    with pytest.raises(PayloadTooLargeError):
+        claim_check.resolve({'dataRef': ref, 'maxBytes': 1024}, 'data')
+    assert s3.calls.get('GetObject') is None
+    assert claim_check.resolve({'dataRef': ref, 'maxBytes': 2048}, 'data') == 'x' * 2048
+
+    # 참조의 크기가 실제보다 작게 기록되어 있어도 한도보다 많이 읽지 않음
+    with pytest.raises(PayloadTooLargeError):
+        claim_check.read_ref(dict(ref, size=10), max_bytes=1024)
+
+
+def test_read_ref_of_empty_object(s3):
+    s3.put_object(Bucket=BUCKET, Key='preview/empty.txt', Body=b'')
+    ref = claim_check.ref_for_object(BUCKET, 'preview/empty.txt', inline_bytes=0)
+
+    assert ref['size'] == 0
+    assert claim_check.read_ref(ref) == ''
@@ -0,0 +1,160 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import aws_clients
+import kb_ingestion
+
+KB_ID = 'KB123'
+DATA_SOURCE_ID = 'DS123'
+
+
+class NoSuchKey(Exception):
+    pass
+
+
+class StubS3:
+    """list_objects_v2 페이지네이터와 get_object/put_object만 구현한 가짜 S3 클라이언트"""
+
+    exceptions = SimpleNamespace(NoSuchKey=NoSuchKey)
+
+    def __init__(self):
+        self.objects = {}  # 키 -> (ETag, 본문)
+
+    def upload(self, key, body):
+        self.objects[key] = (f'"etag-{body}"', body.encode('utf-8'))
+
+    def get_paginator(self, operation_name):
+        assert operation_name == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        contents = [{'Key': key, 'ETag': etag, 'Size': len(body)}
+                    for key, (etag, body) in sorted(self.objects.items()) if key.startswith(Prefix)]
+        return [{'Contents': contents}]
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise NoSuchKey(Key)
+        return {'Body': io.BytesIO(self.objects[Key][1])}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = ('"manifest"', Body)
+
+
+class StubAgent:
+    """수집 작업 API만 구현한 가짜 bedrock-agent 클라이언트 (시작한 작업은 바로 COMPLETE)"""
+
+    def __init__(self):
+        self.started = []
+
+    def list_ingestion_jobs(self, **kwargs):
+        return {'ingestionJobSummaries': []}
+
+    def start_ingestion_job(self, **kwargs):
+        self.started.append(kwargs)
+        return {'ingestionJob': {'ingestionJobId': f'JOB{len(self.started)}', 'status': 'STARTING'}}
+
+    def get_ingestion_job(self, ingestionJobId, **kwargs):
+        return {'ingestionJob': {'ingestionJobId': ingestionJobId, 'status': 'COMPLETE', 'statistics': {}}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self.on_sleep = None  # 대기 중에 실행할 함수 (업로드가 계속되는 상황 흉내)
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        if self.on_sleep:
+            self.on_sleep()
+
+
+@pytest.fixture
+def s3():
+    stub = StubS3()
+    aws_clients.set_client('s3', stub)
+    yield stub
+    aws_clients.reset_clients()
+
+
+@pytest.fixture
+def agent():
+    stub = StubAgent()
+    aws_clients.set_client('bedrock-agent', stub)
+    yield stub
+    aws_clients.reset_clients()
+
+
+def test_reupload_with_same_etag_is_unchanged(s3):
+    s3.upload('input/data-A.txt', 'A')
+    s3.upload('input/data-B.txt', 'B')
+    previous = kb_ingestion.snapshot()
+
+    # 같은 내용을 다시 올리면 수정 시각만 바뀌고 ETag/크기는 같음
+    current = kb_ingestion.snapshot()
+    current['input/data-A.txt']['lastModified'] = '2026-10-17T00:00:00+00:00'
+    assert not kb_ingestion.has_changes(kb_ingestion.diff_manifest(previous, current))
+
+
+def test_modified_added_and_deleted_objects_are_detected(s3):
+    s3.upload('input/data-A.txt', 'A')
+    s3.upload('input/data-B.txt', 'B')
+    previous = kb_ingestion.snapshot()
+
+    s3.upload('input/data-A.txt', 'A2')
+    del s3.objects['input/data-B.txt']
+    s3.upload('input/data-C.txt', 'C')
+
+    assert kb_ingestion.diff_manifest(previous, kb_ingestion.snapshot()) == {
+        'added': ['input/data-C.txt'],
+        'modified': ['input/data-A.txt'],
+        'deleted': ['input/data-B.txt']
+    }
+
+
+def test_wait_for_quiet_coalesces_uploads(s3):
+    clock = FakeClock()
+    pending = ['input/data-B.txt', 'input/data-C.txt']
+    clock.on_sleep = lambda: pending and s3.upload(pending.pop(0), 'x')
+    s3.upload('input/data-A.txt', 'A')
+
+    current = kb_ingestion.wait_for_quiet({}, quiet_seconds=30, max_wait=300, sleep=clock.sleep, clock=clock)
+
+    # 업로드가 이어지는 동안 기다렸다가 목록이 한 번 그대로일 때 모두 묶어서 반환
+    assert sorted(current) == ['input/data-A.txt', 'input/data-B.txt', 'input/data-C.txt']
+    assert clock.sleeps == [30, 30, 30]
+
+
+def test_wait_for_quiet_stops_at_max_wait(s3):
+    clock = FakeClock()
+    uploads = iter(range(100))
+    clock.on_sleep = lambda: s3.upload(f'input/data-{next(uploads)}.txt', 'x')
+    s3.upload('input/data-A.txt', 'A')
+
+    current = kb_ingestion.wait_for_quiet({}, quiet_seconds=30, max_wait=90, sleep=clock.sleep, clock=clock)
+
+    assert len(clock.sleeps) == 3
+    assert len(current) == 4
+
+
+def test_sync_skips_ingestion_when_nothing_changed(s3, agent):
+    clock = FakeClock()
+    s3.upload('input/data-A.txt', 'A')
+
+    first = kb_ingestion.sync(KB_ID, DATA_SOURCE_ID, sleep=clock.sleep, clock=clock)
+    assert first['status'] == 'COMPLETE'
+    assert len(agent.started) == 1
+    manifest = json.loads(s3.objects[kb_ingestion.MANIFEST_KEY][1])
+    assert list(manifest['objects']) == ['input/data-A.txt']
+
+    second = kb_ingestion.sync(KB_ID, DATA_SOURCE_ID, sleep=clock.sleep, clock=clock)
+    assert second['status'] == 'UNCHANGED'
+    assert len(agent.started) == 1
@@ -0,0 +1,100 @@
+import pytest
+
+import model_catalog
+
+FOUNDATION_MODEL_IDS = ['amazon.titan-text-express-v1', 'anthropic.claude-3-sonnet-20240229-v1:0']
+PROFILE_IDS = ['us.anthropic.claude-3-7-sonnet-20250219-v1:0', 'eu.anthropic.claude-3-5-haiku-20241022-v1:0']
+
+
+class StubBedrock:
+    """list_foundation_models/list_inference_profiles만 구현한 가짜 Bedrock 클라이언트"""
+
+    def __init__(self, profile_pages=(PROFILE_IDS,), fail_models=False, fail_profiles=False):
+        self.profile_pages = [list(page) for page in profile_pages]
+        self.fail_models = fail_models
+        self.fail_profiles = fail_profiles
+        self.model_calls = 0
+        self.profile_calls = []
+
+    def list_foundation_models(self, **kwargs):
+        self.model_calls += 1
+        if self.fail_models:
+            raise RuntimeError('AccessDenied')
+        return {'modelSummaries': [{'modelId': model_id} for model_id in FOUNDATION_MODEL_IDS]}
+
+    def list_inference_profiles(self, **kwargs):
+        self.profile_calls.append(kwargs)
+        if self.fail_profiles:
+            raise RuntimeError('UnknownOperation')
+        page = int(kwargs.get('nextToken', 0))
+        response = {'inferenceProfileSummaries': [{'inferenceProfileId': profile_id}
+                                                  for profile_id in self.profile_pages[page]]}
+        if page + 1 < len(self.profile_pages):
+            response['nextToken'] = str(page + 1)
+        return response
+
+
+@pytest.fixture(autouse=True)
+def empty_catalog(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_catalog, 'MODEL_CATALOG_PATH', str(tmp_path / 'model-catalog.json'))
+    monkeypatch.setattr(model_catalog, 'MODEL_CATALOG_BUCKET', None)
+    monkeypatch.setattr(model_catalog, '_catalog',
+                        {'modelIds': None, 'fetchedAt': 0.0, 'retryAfter': 0.0, 'profilesListed': False})
+    monkeypatch.setattr(model_catalog, '_resolved', {})
+
+
+def test_listed_inference_profile_is_used_unchanged():
+    bedrock = StubBedrock(profile_pages=(PROFILE_IDS[:1], PROFILE_IDS[1:]))
+
+    for profile_id in PROFILE_IDS:
+        assert model_catalog.resolve_model_id(profile_id, bedrock) == profile_id
+    # 프로필 목록은 nextToken을 따라 모든 페이지를 읽음
+    assert [call.get('nextToken') for call in bedrock.profile_calls] == [None, '1']
+    assert bedrock.model_calls == 1
+
+
+def test_unknown_model_falls_back_to_claude():
+    bedrock = StubBedrock()
+
+    assert model_catalog.resolve_model_id('us.anthropic.claude-v9', bedrock) == model_catalog.DEFAULT_CLAUDE_MODEL_ID
+    assert model_catalog.resolve_model_id('anthropic.claude-v9', bedrock) == model_catalog.DEFAULT_CLAUDE_MODEL_ID
+
+
+def test_profiles_pass_through_when_profile_listing_fails():
+    bedrock = StubBedrock(fail_profiles=True)
+
+    assert model_catalog.resolve_model_id(PROFILE_IDS[0], bedrock) == PROFILE_IDS[0]
+    # 기본 모델 ID는 여전히 목록으로 확인
+    assert model_catalog.resolve_model_id('anthropic.claude-v9', bedrock) == model_catalog.DEFAULT_CLAUDE_MODEL_ID
+
+
+def test_listing_failure_keeps_stale_catalog(monkeypatch):
+    bedrock = StubBedrock()
+    assert model_catalog.get_catalog(bedrock) >= set(FOUNDATION_MODEL_IDS + PROFILE_IDS)
+
+    # 만료된 뒤 조회가 실패하면 이전 카탈로그를 계속 쓰고, 재시도 간격 동안은 다시 조회하지 않음
+    monkeypatch.setattr(model_catalog, 'MODEL_CATALOG_TTL_SECONDS', 0)
+    failing = StubBedrock(fail_models=True)
+    assert PROFILE_IDS[0] in model_catalog.get_catalog(failing)
+    assert PROFILE_IDS[0] in model_catalog.get_catalog(failing)
+    assert failing.model_calls == 1
+
+
+def test_prompt_cache_profiles_keep_their_cache_point():
+    import model_adapters
+
+    profile_ids = [f"us.anthropic.{name}-20250101-v1:0" for name in model_adapters.AnthropicAdapter.prompt_cache_models]
+    bedrock = StubBedrock(profile_pages=(profile_ids,))
+
+    for profile_id in profile_ids:
+        resolved = model_catalog.resolve_model_id(profile_id, bedrock)
+        request = model_adapters.get_adapter(resolved).build_request('prompt', system='instructions', cache=True)
+        assert request['modelId'] == profile_id
+        assert model_adapters.CACHE_POINT in request['system']
+
+
+def test_profile_of_listed_base_model_is_used_unchanged():
+    bedrock = StubBedrock()
+    profile_id = 'us.anthropic.claude-3-sonnet-20240229-v1:0'
+
+    assert model_catalog.resolve_model_id(profile_id, bedrock) == profile_id
@@ -0,0 +1,146 @@
+import copy
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limiter
+from rate_limiter import BedrockThrottledError, DynamoDBStore, RateLimiter
+
+MODEL_ID = 'anthropic.claude-3-haiku-20240307-v1:0'
+
+
+class ConditionalCheckFailedException(Exception):
+    pass
+
+
+class StubDynamoDB:
+    """get_item/put_item(조건식 포함)만 구현한 가짜 DynamoDB 클라이언트"""
+
+    exceptions = SimpleNamespace(ConditionalCheckFailedException=ConditionalCheckFailedException)
+
+    def __init__(self):
+        self.items = {}
+        self.conflicts = 0
+        self.before_put = None  # 다음 put_item 직전에 한 번 실행할 함수 (다른 컨테이너의 갱신 흉내)
+
+    def get_item(self, TableName, Key, ConsistentRead):
+        item = self.items.get(Key['pk']['S'])
+        return {'Item': copy.deepcopy(item)} if item else {}
+
+    def put_item(self, TableName, Item, ConditionExpression, ExpressionAttributeValues=None):
+        if self.before_put:
+            hook, self.before_put = self.before_put, None
+            hook()
+        current = self.items.get(Item['pk']['S'])
+        if ConditionExpression == 'attribute_not_exists(pk)':
+            allowed = current is None
+        else:
+            allowed = current is not None and current['version'] == ExpressionAttributeValues[':version']
+        if not allowed:
+            self.conflicts += 1
+            raise ConditionalCheckFailedException()
+        self.items[Item['pk']['S']] = copy.deepcopy(Item)
+
+    def state(self, key):
+        return json.loads(self.items[key]['state']['S'])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ThrottlingException(Exception):
+    response = {'Error': {'Code': 'ThrottlingException'}}
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setitem(rate_limiter.RATE_LIMITS, MODEL_ID, {'rpm': 2, 'tpm': 100000, 'maxConcurrency': 4})
+
+
+def make_limiter(client, clock, max_wait=5):
+    return RateLimiter(DynamoDBStore(dynamodb_client=client), max_wait=max_wait, clock=clock, sleep=clock.sleep)
+
+
+def test_conditional_put_conflict_rereads_and_retries():
+    client = StubDynamoDB()
+    store = DynamoDBStore(dynamodb_client=client)
+
+    def competing_write():
+        client.items['counter'] = {'pk': {'S': 'counter'}, 'state': {'S': json.dumps({'n': 5})}, 'version': {'N': '1'}}
+
+    client.before_put = competing_write
+    result = store.update('counter', lambda state: ({'n': (state or {'n': 0})['n'] + 1}, 'done'))
+
+    assert result == 'done'
+    assert client.conflicts == 1
+    # 충돌 뒤에는 다른 컨테이너가 쓴 값을 다시 읽어 그 위에 갱신
+    assert client.state('counter') == {'n': 6}
+    assert client.items['counter']['version'] == {'N': '2'}
+
+
+def test_request_bucket_is_shared_across_limiters(limits):
+    client, clock = StubDynamoDB(), FakeClock()
+    first, second = make_limiter(client, clock), make_limiter(client, clock)
+
+    assert first.try_acquire(MODEL_ID, 10)[0]
+    assert second.try_acquire(MODEL_ID, 10)[0]
+    lease, wait = first.try_acquire(MODEL_ID, 10)
+
+    # 분당 2회 한도를 두 인스턴스가 나눠 쓰므로 세 번째 요청은 30초 뒤에 가능
+    assert lease is None
+    assert wait == pytest.approx(30.0)
+
+
+def test_acquire_raises_when_wait_exceeds_max_wait(limits):
+    client, clock = StubDynamoDB(), FakeClock()
+    limiter = make_limiter(client, clock, max_wait=1)
+    limiter.acquire(MODEL_ID, 10)
+    limiter.acquire(MODEL_ID, 10)
+
+    with pytest.raises(BedrockThrottledError):
+        limiter.acquire(MODEL_ID, 10)
+
+
+def test_throttle_halves_concurrency_and_success_grows_it(limits):
+    client, clock = StubDynamoDB(), FakeClock()
+    limiter = make_limiter(client, clock)
+
+    with pytest.raises(BedrockThrottledError):
+        with limiter.slot(MODEL_ID, 10):
+            raise ThrottlingException('Too many requests')
+    state = client.state(MODEL_ID)
+    assert state['concurrency'] == 2.0
+    # 서버 쪽 한도가 더 낮으므로 남은 요청 버킷도 비움
+    assert state['requests'] <= 0
+    assert state['leases'] == {}
+
+    clock.now += 60
+    with limiter.slot(MODEL_ID, 10) as usage:
+        usage['tokens'] = 10
+    assert client.state(MODEL_ID)['concurrency'] == pytest.approx(2.5)
+
+
+def test_non_throttle_error_releases_slot_without_decrease(limits):
+    client, clock = StubDynamoDB(), FakeClock()
+    limiter = make_limiter(client, clock)
+
+    with pytest.raises(ValueError):
+        with limiter.slot(MODEL_ID, 10):
+            raise ValueError('bad request')
+    state = client.state(MODEL_ID)
+    assert state['leases'] == {}
+    assert state['concurrency'] == 4.0
+
+
+def test_limiter_disables_botocore_retries():
+    assert RateLimiter.client_options['retries']['max_attempts'] == 1
+    assert rate_limiter.NullLimiter.client_options == {}
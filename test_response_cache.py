@@ -0,0 +1,103 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import response_cache
+
+
+class NoSuchKey(Exception):
+    pass
+
+
+class StubS3:
+    """get_object/put_object/delete_object만 구현한 가짜 S3 클라이언트"""
+
+    exceptions = SimpleNamespace(NoSuchKey=NoSuchKey)
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise NoSuchKey(Key)
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = SimpleNamespace(time=1000.0)
+    monkeypatch.setattr(response_cache.time, 'time', lambda: clock.time)
+    return clock
+
+
+def test_cache_key_depends_on_every_part():
+    key = response_cache.make_cache_key('model', 'v2', '천문학', 'data', None)
+
+    assert key == response_cache.make_cache_key('model', 'v2', '천문학', 'data', None)
+    assert key != response_cache.make_cache_key('model', 'v3', '천문학', 'data', None)
+    assert key != response_cache.make_cache_key('model', 'v2', '천문학', 'data', 'KB123')
+
+
+def test_entry_expires_after_ttl(now):
+    cache = response_cache.ResponseCache(response_cache.MemoryBackend(), ttl=60)
+    cache.put('key', 'curriculum')
+
+    now.time += 60
+    assert cache.get('key') == 'curriculum'
+    now.time += 1
+    assert cache.get('key') is None
+    # 만료된 항목은 백엔드에서도 삭제
+    assert cache.backend.get('key') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1}
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = response_cache.MemoryBackend(max_entries=2)
+    cache = response_cache.ResponseCache(backend, ttl=0)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    cache.get('a')
+    cache.put('c', 'C')
+
+    assert cache.get('a') == 'A'
+    assert cache.get('b') is None
+    assert cache.get('c') == 'C'
+
+
+def test_disk_namespaces_do_not_share_entries(monkeypatch, tmp_path):
+    monkeypatch.setattr(response_cache, 'CACHE_DIR', str(tmp_path))
+    responses = response_cache.create_cache('disk')
+    retrievals = response_cache.create_cache('disk', namespace='retrieval')
+
+    responses.put('key', 'curriculum')
+    retrievals.put('key', '[]')
+
+    assert responses.get('key') == 'curriculum'
+    assert retrievals.get('key') == '[]'
+    assert (tmp_path / 'retrieval' / 'key.json').exists()
+
+
+def test_s3_namespace_uses_sub_prefix(now):
+    s3 = StubS3()
+    cache = response_cache.create_cache('s3', s3_client=s3, ttl=60, namespace='retrieval')
+
+    cache.put('key', '[]')
+
+    stored_key = f"{response_cache.CACHE_PREFIX}retrieval/key.json"
+    assert json.loads(s3.objects[stored_key])['value'] == '[]'
+    assert cache.get('key') == '[]'
+    now.time += 61
+    assert cache.get('key') is None
+    assert stored_key not in s3.objects
+
+
+def test_none_backend_disables_cache():
+    assert response_cache.create_cache('none') is None
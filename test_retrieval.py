@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+import aws_clients
+import retrieval
+import upload_files
+
+
+class StubS3:
+    """put_object만 구현한 가짜 S3 클라이언트"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+
+
+@pytest.fixture
+def s3():
+    stub = StubS3()
+    aws_clients.set_client('s3', stub)
+    yield stub
+    aws_clients.reset_clients()
+
+
+def test_long_title_does_not_crowd_out_terms():
+    title = '천문학 입문 ' * 100 + '\n두 번째 줄'
+    data = '블랙홀 블랙홀 초신성 은하'
+
+    query = retrieval.build_query(title, data)
+
+    title_part, terms = query.split(': ', 1)
+    assert len(title_part) <= retrieval.QUERY_TITLE_MAX_CHARS
+    assert '두 번째 줄' not in query
+    assert terms.split() == ['블랙홀', '초신성', '은하']
+
+
+def test_subject_comes_from_file_names():
+    assert retrieval.subject_from_keys('input/title-천문학-20250331.txt', 'input/data-천문학-20250331.txt') == '천문학'
+    assert retrieval.subject_from_keys('input/title-A.txt') == 'A'
+    assert retrieval.subject_from_keys('input/notes.txt', None) is None
+
+
+def test_subject_filter_uses_subject_not_title():
+    options = retrieval.options_from_event({'filterBySubject': True,
+                                            'retrievalFilter': {'equals': {'key': 'lang', 'value': 'ko'}}})
+
+    assert retrieval.build_filter('천문학', options) == {'andAll': [
+        {'equals': {'key': 'lang', 'value': 'ko'}},
+        {'equals': {'key': retrieval.SUBJECT_METADATA_KEY, 'value': '천문학'}}
+    ]}
+    # 주제를 모르면 주제 필터 없이 검색
+    assert retrieval.build_filter(None, options) == {'equals': {'key': 'lang', 'value': 'ko'}}
+    assert retrieval.build_filter('천문학', retrieval.options_from_event({})) is None
+
+
+def test_upload_writes_metadata_matching_subject(s3):
+    title_key, data_key = upload_files.upload_input_files('천문학', '별과 은하')
+
+    metadata = json.loads(s3.objects[data_key + '.metadata.json'])
+    assert metadata == {'metadataAttributes': {retrieval.SUBJECT_METADATA_KEY: '천문학'}}
+    assert retrieval.subject_from_keys(title_key, data_key) == '천문학'
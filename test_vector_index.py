@@ -0,0 +1,73 @@
+import pytest
+
+import vector_index
+
+ASTRONOMY = 'input/data-천문학-20250331.txt'
+ART = 'input/data-미술-20250331.txt'
+DOCUMENTS = [
+    (ASTRONOMY, "1. 항성\n항성 진화와 주계열성\n2. 행성\n태양계 행성의 궤도\n3. 은하\n은하 구조와 성단"),
+    (ART, "1. 회화\n르네상스 회화와 원근법\n2. 조각\n고대 그리스 조각"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / 'index.cvix')
+    # 섹션마다 청크 하나가 되도록 작은 청크 크기로 생성
+    vector_index.build_index(DOCUMENTS, path, chunk_tokens=20, overlap_tokens=0)
+    return vector_index.VectorIndex(path)
+
+
+def test_subject_from_source():
+    assert vector_index.subject_from_source(ASTRONOMY) == '천문학'
+    assert vector_index.subject_from_source('input/data-미술.txt') == '미술'
+    assert vector_index.subject_from_source('notes.txt') is None
+
+
+def test_index_keeps_chunk_metadata(index):
+    assert index.header['count'] == len(index.chunks) == 5
+    assert {chunk['metadata']['subject'] for chunk in index.chunks} == {'천문학', '미술'}
+    assert all(chunk['metadata']['source'] == chunk['source'] for chunk in index.chunks)
+
+
+def test_search_returns_top_k_in_score_order(index):
+    results = index.search('항성 진화', k=2)
+
+    assert len(results) == 2
+    assert '항성' in results[0]['text']
+    assert results[0]['score'] >= results[1]['score']
+    assert len(index.search('항성 진화', k=100)) == 5
+    assert index.search('항성 진화', k=0) == []
+
+
+def test_search_applies_subject_filter(index):
+    subject_filter = {'equals': {'key': 'subject', 'value': '미술'}}
+
+    results = index.search('항성 진화', k=5, retrieval_filter=subject_filter)
+
+    assert len(results) == 2
+    assert {result['source'] for result in results} == {ART}
+
+    combined = {'andAll': [subject_filter, {'startsWith': {'key': 'source', 'value': 'input/'}}]}
+    assert {result['source'] for result in index.search('회화', k=5, retrieval_filter=combined)} == {ART}
+
+
+def test_search_without_matching_chunks_is_empty(index):
+    subject_filter = {'equals': {'key': 'subject', 'value': '역사'}}
+
+    assert index.search('항성', k=5, retrieval_filter=subject_filter) == []
+
+
+def test_matches_filter_operators():
+    metadata = {'subject': '천문학', 'source': ASTRONOMY}
+
+    assert vector_index.matches_filter(metadata, None)
+    assert vector_index.matches_filter(metadata, {'notEquals': {'key': 'subject', 'value': '미술'}})
+    assert vector_index.matches_filter(metadata, {'in': {'key': 'subject', 'value': ['천문학', '미술']}})
+    assert not vector_index.matches_filter(metadata, {'notIn': {'key': 'subject', 'value': ['천문학']}})
+    assert vector_index.matches_filter(metadata, {'orAll': [
+        {'equals': {'key': 'subject', 'value': '미술'}},
+        {'startsWith': {'key': 'source', 'value': 'input/data-천문학'}}
+    ]})
+    with pytest.raises(ValueError):
+        vector_index.matches_filter(metadata, {'greaterThan': {'key': 'subject', 'value': 1}})
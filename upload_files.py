@@ -3,17 +3,27 @@
 S3 버킷에 커리큘럼 생성에 필요한 입력 파일을 업로드하는 스크립트
 """
 
-import boto3
 import argparse
+import json
+import os
+import sys
 from datetime import datetime
 
-# AWS 서비스 클라이언트 초기화
-s3_client = boto3.client('s3')
+# Lambda 핸들러와 같은 모듈 이름(aws_clients 등)으로 가져오도록 lambda_functions 디렉토리를 경로에 추가
+LAMBDA_FUNCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda_functions')
+if LAMBDA_FUNCTIONS_DIR not in sys.path:
+    sys.path.append(LAMBDA_FUNCTIONS_DIR)
+
+from aws_clients import get_client  # noqa: E402
+from vector_index import subject_from_source  # noqa: E402
 
 # 환경 설정
 BUCKET_NAME = 'curriculum-bucket-20250331'
 INPUT_PREFIX = 'input/'
 
+# Knowledge Base 메타데이터 파일의 주제 키 (retrieval.SUBJECT_METADATA_KEY와 같은 값이어야 filterBySubject가 동작)
+SUBJECT_METADATA_KEY = os.environ.get('SUBJECT_METADATA_KEY', 'subject')
+
 def upload_input_files(title, data=None):
     """
     입력 파일 업로드
@@ -50,7 +60,7 @@ def upload_input_files(title, data=None):
     
     # 제목 파일 업로드
     print(f"제목 파일 '{title_key}' 업로드 중...")
-    s3_client.put_object(
+    get_client('s3').put_object(
         Bucket=BUCKET_NAME,
         Key=title_key,
         Body=title.encode('utf-8'),
@@ -59,13 +69,24 @@ def upload_input_files(title, data=None):
     
     # 데이터 파일 업로드
     print(f"데이터 파일 '{data_key}' 업로드 중...")
-    s3_client.put_object(
+    get_client('s3').put_object(
         Bucket=BUCKET_NAME,
         Key=data_key,
         Body=data.encode('utf-8'),
         ContentType='text/plain; charset=utf-8'
     )
     
+    # Knowledge Base 메타데이터 파일 업로드 (filterBySubject 검색이 데이터 파일 이름의 주제로 문단을 거름)
+    metadata_key = f"{data_key}.metadata.json"
+    print(f"메타데이터 파일 '{metadata_key}' 업로드 중...")
+    get_client('s3').put_object(
+        Bucket=BUCKET_NAME,
+        Key=metadata_key,
+        Body=json.dumps({'metadataAttributes': {SUBJECT_METADATA_KEY: subject_from_source(data_key)}},
+                        ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json'
+    )
+    
     print("파일 업로드 완료")
     return title_key, data_key
 